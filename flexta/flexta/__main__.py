@@ -0,0 +1,4 @@
+from flexta.main import main
+
+
+raise SystemExit(main())
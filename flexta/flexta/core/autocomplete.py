@@ -0,0 +1,432 @@
+from __future__ import annotations
+
+from bisect import bisect_left, insort
+from collections import Counter
+from dataclasses import dataclass
+import hashlib
+import heapq
+import json
+import logging
+import marshal
+import os
+from pathlib import Path
+import re
+import threading
+from typing import Iterable, Optional
+
+from PySide6.QtCore import QObject
+
+from flexta.utils.resource_loader import get_resources_dir
+
+from .editor import EditorDocument
+
+
+LANGUAGES = ("html", "css", "javascript")
+# Bump when the serialized index layout changes so old cache files are ignored.
+_CACHE_VERSION = b"1"
+# Prefix ranges longer than this keep their best entries cached instead of
+# being ranked on every request.
+_RANK_SCAN_LIMIT = 256
+_CACHED_TOP = 64
+_KEY_END = "￿"
+
+logger = logging.getLogger(__name__)
+
+
+def get_completions_dir() -> Path:
+    return get_resources_dir() / "completions"
+
+
+def get_completion_cache_dir() -> Path:
+    return Path.home() / ".flexta" / "cache" / "completions"
+
+
+@dataclass(frozen=True)
+class Completion:
+    label: str
+    kind: str
+    weight: int = 1
+
+
+def _key(label: str) -> str:
+    # Sort and match case-insensitively; the original label keeps keys unique.
+    return f"{label.lower()}\0{label}"
+
+
+def _label(key: str) -> str:
+    return key[key.index("\0") + 1:]
+
+
+class CompletionIndex:
+    # Keys sorted by their lowercased label, so every prefix is a contiguous
+    # range found with two bisects. Ranking is by weight, then length.
+    def __init__(self, labels: Iterable[str] = ()) -> None:
+        weights = Counter(_key(label) for label in labels)
+        self._weights: dict[str, int] = dict(weights)
+        self._keys = sorted(weights)
+        # prefix -> best _CACHED_TOP rank tuples, for prefixes with long ranges.
+        self._top: dict[str, list[tuple[int, int, str]]] = {}
+
+    @classmethod
+    def from_data(cls, keys: list[str], weights: list[int]) -> "CompletionIndex":
+        index = cls()
+        index._keys = keys
+        index._weights = dict(zip(keys, weights))
+        return index
+
+    def to_data(self) -> tuple[list[str], list[int]]:
+        return list(self._keys), [self._weights[key] for key in self._keys]
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __contains__(self, label: str) -> bool:
+        return _key(label) in self._weights
+
+    def weight(self, label: str) -> int:
+        return self._weights.get(_key(label), 0)
+
+    def search(self, prefix: str, limit: int = 20) -> list[tuple[str, int]]:
+        lowered = prefix.lower()
+        keys = self._keys
+        start = bisect_left(keys, lowered)
+        end = bisect_left(keys, lowered + _KEY_END, start)
+        if end - start <= _RANK_SCAN_LIMIT or limit > _CACHED_TOP:
+            ranked = heapq.nsmallest(limit, map(self._rank, keys[start:end]))
+        else:
+            ranked = self._top.get(lowered)
+            if ranked is None:
+                ranked = heapq.nsmallest(_CACHED_TOP, map(self._rank, keys[start:end]))
+                self._top[lowered] = ranked
+            ranked = ranked[:limit]
+        return [(_label(key), -weight) for weight, _, key in ranked]
+
+    def add(self, label: str, weight: int = 1) -> None:
+        key = _key(label)
+        previous = self._weights.get(key)
+        if previous is None:
+            insort(self._keys, key)
+            self._weights[key] = weight
+        else:
+            self._weights[key] = previous + weight
+        if self._top:
+            self._promote(key)
+
+    def update(self, weights: dict[str, int]) -> None:
+        # Bulk insert (opening a file): past a handful of new labels one sort
+        # beats shifting the key list for each insort.
+        if len(weights) < 64:
+            for label, weight in weights.items():
+                self.add(label, weight)
+            return
+        current = self._weights
+        for label, weight in weights.items():
+            key = _key(label)
+            current[key] = current.get(key, 0) + weight
+        self._keys = sorted(current)
+        self._top.clear()
+
+    def discard(self, label: str, weight: int = 1) -> None:
+        key = _key(label)
+        previous = self._weights.get(key)
+        if previous is None:
+            return
+        if previous > weight:
+            self._weights[key] = previous - weight
+        else:
+            del self._weights[key]
+            del self._keys[bisect_left(self._keys, key)]
+        if self._top:
+            # A demoted entry may fall out of a cached top list; recompute
+            # those lists on demand rather than track the runner-up.
+            for prefix in self._cached_prefixes(key):
+                if any(entry[2] == key for entry in self._top[prefix]):
+                    del self._top[prefix]
+
+    def _rank(self, key: str) -> tuple[int, int, str]:
+        return -self._weights[key], len(key), key
+
+    def _cached_prefixes(self, key: str) -> list[str]:
+        lowered = key[:key.index("\0")]
+        return [lowered[:size] for size in range(len(lowered) + 1) if lowered[:size] in self._top]
+
+    def _promote(self, key: str) -> None:
+        # Gaining weight can only move an entry up, so cached lists are
+        # patched in place.
+        rank = self._rank(key)
+        for prefix in self._cached_prefixes(key):
+            ranked = [entry for entry in self._top[prefix] if entry[2] != key]
+            if len(ranked) < _CACHED_TOP or rank < ranked[-1]:
+                insort(ranked, rank)
+                del ranked[_CACHED_TOP:]
+            self._top[prefix] = ranked
+
+
+class BuiltinCompletions:
+    # Indexes over the packaged HTML/CSS/JS vocabularies, named like
+    # "html.tags", "html.attributes:img" or "css.values:display".
+    def __init__(self, indexes: dict[str, CompletionIndex]) -> None:
+        self._indexes = indexes
+
+    def index(self, name: str) -> Optional[CompletionIndex]:
+        return self._indexes.get(name)
+
+    def names(self) -> list[str]:
+        return sorted(self._indexes)
+
+    @classmethod
+    def load(cls, data_dir: Optional[Path] = None, cache_dir: Optional[Path] = None) -> "BuiltinCompletions":
+        data_dir = data_dir if data_dir is not None else get_completions_dir()
+        cache_dir = cache_dir if cache_dir is not None else get_completion_cache_dir()
+        sources = {language: (data_dir / f"{language}.json").read_bytes() for language in LANGUAGES}
+        digest = hashlib.sha256(b"\0".join([_CACHE_VERSION, *sources.values()])).hexdigest()
+        cache_path = cache_dir / f"builtins-{digest[:16]}.marshal"
+        try:
+            data = marshal.loads(cache_path.read_bytes())
+            return cls({name: CompletionIndex.from_data(keys, weights) for name, (keys, weights) in data.items()})
+        except (OSError, EOFError, ValueError, TypeError):
+            pass
+        indexes = {}
+        for language, source in sources.items():
+            for field, value in json.loads(source).items():
+                if isinstance(value, dict):
+                    for name, labels in value.items():
+                        indexes[f"{language}.{field}:{name}"] = CompletionIndex(labels)
+                else:
+                    indexes[f"{language}.{field}"] = CompletionIndex(value)
+        _write_cache(cache_path, {name: index.to_data() for name, index in indexes.items()})
+        return cls(indexes)
+
+
+def _write_cache(path: Path, data: dict[str, tuple[list[str], list[int]]]) -> None:
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        for stale in path.parent.glob(f"builtins-{'?' * 16}.marshal"):
+            stale.unlink(missing_ok=True)
+        temporary = path.with_suffix(f".{os.getpid()}.tmp")
+        temporary.write_bytes(marshal.dumps(data))
+        os.replace(temporary, path)
+    except OSError:
+        logger.warning("Could not cache completion indexes", exc_info=True)
+
+
+_builtins: Optional[BuiltinCompletions] = None
+_builtins_lock = threading.Lock()
+
+
+def get_builtin_completions() -> BuiltinCompletions:
+    global _builtins
+    with _builtins_lock:
+        if _builtins is None:
+            _builtins = BuiltinCompletions.load()
+        return _builtins
+
+
+_JS_KEYWORDS = frozenset(
+    "async await break case catch class const continue debugger default delete do else export extends false "
+    "finally for from function if import in instanceof let new null of return static super switch this throw "
+    "true try typeof undefined var void while with yield".split()
+)
+_IDENTIFIER = re.compile(r"[A-Za-z_$][\w$]{2,}")
+_CLASS_ATTRIBUTE = re.compile(r"""\bclass\s*=\s*["']([^"']*)""")
+_ID_ATTRIBUTE = re.compile(r"""\bid\s*=\s*["']([^"']*)""")
+_CSS_CLASS = re.compile(r"\.(-?[A-Za-z_][\w-]*)")
+_CSS_ID = re.compile(r"#(-?[A-Za-z_][\w-]*)")
+
+_Symbol = tuple[str, str]
+
+
+def _harvest(language: str, line: str) -> list[_Symbol]:
+    symbols: list[_Symbol] = []
+    if language == "html":
+        for match in _CLASS_ATTRIBUTE.finditer(line):
+            symbols.extend(("class", name) for name in match.group(1).split())
+        symbols.extend(("id", match.group(1).strip()) for match in _ID_ATTRIBUTE.finditer(line) if match.group(1).strip())
+    elif language == "css":
+        # Only selector text: declarations hold colors and decimals that
+        # look like ids and classes.
+        brace = line.find("{")
+        selectors = line[:brace] if brace >= 0 else ("" if ";" in line else line)
+        symbols.extend(("class", name) for name in _CSS_CLASS.findall(selectors))
+        symbols.extend(("id", name) for name in _CSS_ID.findall(selectors))
+    elif language == "javascript":
+        symbols.extend(("identifier", name) for name in _IDENTIFIER.findall(line) if name not in _JS_KEYWORDS)
+    return symbols
+
+
+class ProjectSymbols(QObject):
+    # Class names, ids and identifiers from the open documents. Each tracked
+    # document keeps its symbols per line, so an edit re-harvests only the
+    # lines it touched and applies the difference to the shared indexes.
+    KINDS = ("class", "id", "identifier")
+
+    def __init__(self, parent: Optional[QObject] = None) -> None:
+        super().__init__(parent)
+        self.indexes = {kind: CompletionIndex() for kind in self.KINDS}
+        self._lines: dict[EditorDocument, list[list[_Symbol]]] = {}
+
+    def track(self, document: EditorDocument) -> None:
+        if document in self._lines:
+            return
+        self._lines[document] = self._harvest_all(document)
+        document.text_changed.connect(self._handle_text_changed)
+        document.destroyed.connect(self._handle_destroyed)
+
+    def untrack(self, document: EditorDocument) -> None:
+        lines = self._lines.pop(document, None)
+        if lines is None:
+            return
+        self._apply(Counter(symbol for line in lines for symbol in line), Counter())
+        document.text_changed.disconnect(self._handle_text_changed)
+        document.destroyed.disconnect(self._handle_destroyed)
+
+    def _harvest_all(self, document: EditorDocument) -> list[list[_Symbol]]:
+        lines = [_harvest(document.language, line) for line in document.text().split("\n")]
+        self._apply(Counter(), Counter(symbol for line in lines for symbol in line))
+        return lines
+
+    def _handle_text_changed(self, position: int, removed: int, added: int) -> None:
+        document = self.sender()
+        lines = self._lines.get(document)
+        if lines is None:
+            return
+        if removed < 0:
+            self._apply(Counter(symbol for line in lines for symbol in line), Counter())
+            self._lines[document] = self._harvest_all(document)
+            return
+        buffer = document.buffer
+        first = buffer.line_at(position)
+        last = buffer.line_at(position + added)
+        old_last = last - (buffer.line_count - len(lines))
+        fresh = [_harvest(document.language, buffer.line_text(number)) for number in range(first, last + 1)]
+        stale = lines[first:old_last + 1]
+        lines[first:old_last + 1] = fresh
+        self._apply(
+            Counter(symbol for line in stale for symbol in line),
+            Counter(symbol for line in fresh for symbol in line),
+        )
+
+    def _handle_destroyed(self, document: QObject) -> None:
+        lines = self._lines.pop(document, None)
+        if lines is not None:
+            self._apply(Counter(symbol for line in lines for symbol in line), Counter())
+
+    def _apply(self, removed: Counter, added: Counter) -> None:
+        # Only the difference touches the indexes: retyping a line leaves its
+        # unchanged symbols (and any cached rankings) alone.
+        for (kind, label), count in (removed - added).items():
+            self.indexes[kind].discard(label, count)
+        grouped: dict[str, dict[str, int]] = {}
+        for (kind, label), count in (added - removed).items():
+            grouped.setdefault(kind, {})[label] = count
+        for kind, weights in grouped.items():
+            self.indexes[kind].update(weights)
+
+
+_HTML_TAG_NAME = re.compile(r"</?([A-Za-z][\w-]*)?$")
+_HTML_OPEN_TAG = re.compile(r"<([A-Za-z][\w-]*)\s(?:[^<>\"']|\"[^\"]*\"|'[^']*')*$")
+_HTML_CLASS_OR_ID_VALUE = re.compile(r"""<([A-Za-z][\w-]*)\s[^<>]*?\b(class|id)\s*=\s*["'](?:[^"'<>]*\s)?([\w-]*)$""")
+_CSS_VALUE = re.compile(r"([\w-]+)\s*:\s*(?:[^;{}]*[\s,(])?([\w-]*)$")
+_CSS_CLASS_PREFIX = re.compile(r"\.([\w-]*)$")
+_CSS_ID_PREFIX = re.compile(r"#([\w-]*)$")
+_JS_ID_STRING = re.compile(r"""(?:getElementById\(\s*["']|querySelector(?:All)?\(\s*["'][^"']*#)([\w-]*)$""")
+_JS_CLASS_STRING = re.compile(r"""(?:querySelector(?:All)?\(\s*["'][^"']*\.|classList\.\w+\(\s*["'])([\w-]*)$""")
+_JS_MEMBER = re.compile(r"\.\s*([A-Za-z_$][\w$]*)?$")
+_JS_WORD = re.compile(r"[A-Za-z_$][\w$]*$")
+_WORD = re.compile(r"[\w-]*$")
+
+# (index, kind) pairs a request draws from.
+_Sources = list[tuple[Optional[CompletionIndex], str]]
+
+
+class AutocompleteEngine:
+    def __init__(
+        self, builtins: Optional[BuiltinCompletions] = None, project: Optional[ProjectSymbols] = None
+    ) -> None:
+        self.builtins = builtins if builtins is not None else get_builtin_completions()
+        self.project = project if project is not None else ProjectSymbols()
+
+    def complete(self, language: str, line: str, column: int, limit: int = 20) -> list[Completion]:
+        context = self._context(language, line[:column])
+        if context is None:
+            return []
+        prefix, sources = context
+        seen = set()
+        candidates = []
+        for index, kind in sources:
+            if index is None:
+                continue
+            for label, weight in index.search(prefix, limit):
+                if label not in seen:
+                    seen.add(label)
+                    candidates.append((-weight, len(label), label.lower(), label, kind))
+        return [
+            Completion(label, kind, -weight)
+            for weight, _, _, label, kind in heapq.nsmallest(limit, candidates)
+        ]
+
+    def _context(self, language: str, before: str) -> Optional[tuple[str, _Sources]]:
+        if language == "html":
+            return self._html_context(before)
+        if language == "css":
+            return self._css_context(before)
+        if language == "javascript":
+            return self._js_context(before)
+        return None
+
+    def _html_context(self, before: str) -> Optional[tuple[str, _Sources]]:
+        builtins = self.builtins
+        match = _HTML_TAG_NAME.search(before)
+        if match is not None:
+            return match.group(1) or "", [(builtins.index("html.tags"), "tag")]
+        match = _HTML_CLASS_OR_ID_VALUE.search(before)
+        if match is not None:
+            return match.group(3), [(self.project.indexes[match.group(2)], match.group(2))]
+        match = _HTML_OPEN_TAG.search(before)
+        if match is not None:
+            tag = match.group(1).lower()
+            return _WORD.search(before).group(0), [
+                (builtins.index(f"html.attributes:{tag}"), "attribute"),
+                (builtins.index("html.global_attributes"), "attribute"),
+            ]
+        return None
+
+    def _css_context(self, before: str) -> Optional[tuple[str, _Sources]]:
+        builtins = self.builtins
+        match = _CSS_VALUE.search(before)
+        properties = builtins.index("css.properties")
+        if match is not None and properties is not None and match.group(1) in properties:
+            return match.group(2), [
+                (builtins.index(f"css.values:{match.group(1)}"), "value"),
+                (builtins.index("css.global_values"), "value"),
+            ]
+        match = _CSS_CLASS_PREFIX.search(before)
+        if match is not None:
+            return match.group(1), [(self.project.indexes["class"], "class")]
+        match = _CSS_ID_PREFIX.search(before)
+        if match is not None:
+            return match.group(1), [(self.project.indexes["id"], "id")]
+        prefix = _WORD.search(before).group(0)
+        if "{" in before or ";" in before or before[:1].isspace():
+            return prefix, [(properties, "property")]
+        return prefix, [(builtins.index("html.tags"), "tag")]
+
+    def _js_context(self, before: str) -> Optional[tuple[str, _Sources]]:
+        project = self.project.indexes
+        match = _JS_ID_STRING.search(before)
+        if match is not None:
+            return match.group(1), [(project["id"], "id")]
+        match = _JS_CLASS_STRING.search(before)
+        if match is not None:
+            return match.group(1), [(project["class"], "class")]
+        match = _JS_MEMBER.search(before)
+        if match is not None:
+            return match.group(1) or "", [(project["identifier"], "identifier")]
+        match = _JS_WORD.search(before)
+        if match is None:
+            return None
+        return match.group(0), [
+            (self.builtins.index("javascript.keywords"), "keyword"),
+            (self.builtins.index("javascript.globals"), "global"),
+            (project["identifier"], "identifier"),
+        ]
@@ -0,0 +1,335 @@
+from __future__ import annotations
+
+from bisect import bisect_right
+from collections import Counter
+from dataclasses import dataclass
+import os
+from pathlib import Path
+import re
+from typing import Optional, Union
+
+from .autocomplete import CompletionIndex
+from .editor import EditorDocument
+from .error_detector import Diagnostic
+from .symbol_index import iter_project_files
+
+
+class CssDocument(EditorDocument):
+    language = "css"
+    suffixes = (".css",)
+
+
+CSS_SUFFIXES = (".css",)
+HTML_SUFFIXES = (".html", ".htm")
+
+# ("class", name), ("id", name) or ("tag", name).
+_Token = tuple[str, str]
+# (line, column)
+_Position = tuple[int, int]
+
+_CSS_COMMENT = re.compile(r"/\*.*?(?:\*/|$)", re.S)
+_CSS_STRING = re.compile(r"\"(?:[^\"\\\n]|\\.)*\"|'(?:[^'\\\n]|\\.)*'")
+_CSS_STRUCTURE = re.compile(r"[{};]")
+# At-rules whose blocks hold style rules; the others (@font-face,
+# @keyframes, @page) hold descriptors or keyframe selectors.
+_GROUPING_AT_RULES = frozenset(
+    ("@media", "@supports", "@layer", "@container", "@document", "@scope", "@starting-style")
+)
+_ATTRIBUTE_SELECTOR = re.compile(r"\[[^\]]*\]")
+_PSEUDO_ARGUMENTS = re.compile(r"(?<!\\):[\w-]+\([^()]*\)")
+_PSEUDO = re.compile(r"(?<!\\)::?[\w-]+")
+_SELECTOR_TOKEN = re.compile(r"([.#]?)((?:-?[A-Za-z_]|\\.)(?:[\w-]|\\.)*)")
+_CSS_ESCAPE = re.compile(r"\\(.)")
+
+_HTML_COMMENT = re.compile(r"<!--.*?(?:-->|$)", re.S)
+_HTML_TAG = re.compile(r"<([A-Za-z][\w-]*)((?:[^<>\"']|\"[^\"]*\"|'[^']*')*)>")
+_HTML_ATTRIBUTE = re.compile(r"""([^\s=/"'<>]+)(?:\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s"'=<>`]+)))?""")
+_WORD = re.compile(r"\S+")
+
+
+def _blank(match: re.Match) -> str:
+    return re.sub(r"[^\n]", " ", match.group(0))
+
+
+def _blank_string(match: re.Match) -> str:
+    # Keep the quotes so offsets and the surrounding syntax are unchanged.
+    text = match.group(0)
+    return text[0] + re.sub(r"[^\n]", " ", text[1:-1]) + text[-1]
+
+
+def _locator(text: str):
+    line_starts = [0] + [match.end() for match in re.finditer("\n", text)]
+
+    def locate(offset: int) -> _Position:
+        line = bisect_right(line_starts, offset) - 1
+        return line, offset - line_starts[line]
+
+    return locate
+
+
+def _split_selector_list(prelude: str) -> list[tuple[int, str]]:
+    parts = []
+    depth = 0
+    start = 0
+    for index, char in enumerate(prelude):
+        if char in "([":
+            depth += 1
+        elif char in ")]":
+            depth = max(depth - 1, 0)
+        elif char == "," and depth == 0:
+            parts.append((start, prelude[start:index]))
+            start = index + 1
+    parts.append((start, prelude[start:]))
+    return parts
+
+
+def selector_requirements(selector: str) -> frozenset:
+    # The classes, ids and tags an element needs for selector to match it.
+    # Attribute selectors and pseudo-class arguments are dropped: :not()
+    # excludes and :is() offers alternatives, so neither is a requirement.
+    stripped = _ATTRIBUTE_SELECTOR.sub(" ", selector)
+    previous = None
+    while previous != stripped:
+        previous, stripped = stripped, _PSEUDO_ARGUMENTS.sub(" ", stripped)
+    stripped = _PSEUDO.sub(" ", stripped)
+    tokens = set()
+    for match in _SELECTOR_TOKEN.finditer(stripped):
+        name = _CSS_ESCAPE.sub(r"\1", match.group(2))
+        if match.group(1) == ".":
+            tokens.add(("class", name))
+        elif match.group(1) == "#":
+            tokens.add(("id", name))
+        elif match.start() == 0 or stripped[match.start() - 1] in " \t\n>+~(&,":
+            tokens.add(("tag", name.lower()))
+    return frozenset(tokens)
+
+
+def parse_stylesheet(text: str) -> list[tuple[str, int, int, frozenset]]:
+    # (selector, line, column, requirements) for every selector of every
+    # style rule, including rules nested in @media and friends.
+    source = text
+    text = _CSS_STRING.sub(_blank_string, _CSS_COMMENT.sub(_blank, text))
+    locate = _locator(text)
+    rows = []
+    # Per open block: whether its contents are style rules.
+    stack: list[bool] = []
+    start = 0
+    for match in _CSS_STRUCTURE.finditer(text):
+        holds_rules = not stack or stack[-1]
+        if match.group() == "{":
+            prelude = text[start:match.start()]
+            stripped = prelude.strip()
+            if stripped.startswith("@"):
+                stack.append(holds_rules and stripped.split(None, 1)[0].lower() in _GROUPING_AT_RULES)
+            else:
+                if holds_rules and stripped:
+                    for offset, part in _split_selector_list(prelude):
+                        if not part.strip():
+                            continue
+                        # Shown as written: strings were blanked only for parsing.
+                        begin = start + offset + len(part) - len(part.lstrip())
+                        selector = " ".join(source[begin:start + offset + len(part)].split())
+                        rows.append((selector, *locate(begin), selector_requirements(part)))
+                # Nested rules (CSS nesting) are selectors too.
+                stack.append(holds_rules)
+        elif match.group() == "}" and stack:
+            stack.pop()
+        start = match.end()
+    return rows
+
+
+def parse_markup(text: str) -> dict[_Token, list[_Position]]:
+    text = _HTML_COMMENT.sub(_blank, text)
+    locate = _locator(text)
+    tokens: dict[_Token, list[_Position]] = {}
+    for tag in _HTML_TAG.finditer(text):
+        tokens.setdefault(("tag", tag.group(1).lower()), []).append(locate(tag.start(1)))
+        offset = tag.start(2)
+        for attribute in _HTML_ATTRIBUTE.finditer(tag.group(2)):
+            name = attribute.group(1).lower()
+            if name not in ("class", "id"):
+                continue
+            for group in (2, 3, 4):
+                if attribute.group(group) is not None:
+                    break
+            value_start = offset + attribute.start(group)
+            for word in _WORD.finditer(attribute.group(group)):
+                tokens.setdefault((name, word.group(0)), []).append(locate(value_start + word.start()))
+    return tokens
+
+
+@dataclass(frozen=True, eq=False)
+class CssRule:
+    path: str
+    selector: str
+    line: int
+    column: int
+    requirements: frozenset
+
+
+@dataclass(frozen=True)
+class SelectorUsage:
+    path: str
+    line: int
+    column: int
+
+
+class SelectorIndex:
+    # Selectors of every stylesheet under root cross-referenced with the
+    # classes, ids and tags of every HTML file. Two inverted indexes map a
+    # token to the rules that require it and to the pages that use it; each
+    # rule keeps a count of its requirements no page provides, so a file
+    # update adjusts only the rules whose tokens appeared or disappeared and
+    # "unused selectors" is a stored set rather than a scan.
+    def __init__(self, root: Union[str, Path]) -> None:
+        self.root = Path(root).resolve()
+        # Class names the stylesheets define, weighted by rule count.
+        self.classes = CompletionIndex()
+        self._rules: dict[str, list[CssRule]] = {}
+        self._markup: dict[str, dict[_Token, list[_Position]]] = {}
+        self._rules_by_token: dict[_Token, set[CssRule]] = {}
+        self._usages: dict[_Token, dict[str, list[_Position]]] = {}
+        self._missing: dict[CssRule, int] = {}
+        self._unused: dict[str, set[CssRule]] = {}
+
+    def build(self) -> None:
+        root = os.fspath(self.root)
+        classes: Counter = Counter()
+        # Pages first: each stylesheet is then checked against complete sets.
+        for suffixes in (HTML_SUFFIXES, CSS_SUFFIXES):
+            for entry in iter_project_files(root, suffixes):
+                classes.update(self._load(self._key(entry.path), None))
+        # One bulk insert instead of one per stylesheet.
+        self.classes.update(classes)
+
+    def update_file(self, path: Union[str, Path], text: Optional[str] = None) -> None:
+        # text is an editor's unsaved buffer; otherwise the file is read.
+        self.classes.update(self._load(self._key(path), text))
+
+    def update_files(self, paths: list[str]) -> None:
+        # For ProjectWatcher.files_changed; deleted files are removed.
+        classes: Counter = Counter()
+        for path in paths:
+            if path.endswith(CSS_SUFFIXES + HTML_SUFFIXES) and Path(path).resolve().is_relative_to(self.root):
+                classes.update(self._load(self._key(path), None))
+        self.classes.update(classes)
+
+    def remove_file(self, path: Union[str, Path]) -> None:
+        key = self._key(path)
+        self._remove_stylesheet(key)
+        if key in self._markup:
+            self._set_markup(key, {})
+            del self._markup[key]
+
+    def rules(self, name: str, kind: str = "class") -> list[CssRule]:
+        return sorted(self._rules_by_token.get((kind, name), ()), key=lambda rule: (rule.path, rule.line, rule.column))
+
+    def usages(self, name: str, kind: str = "class") -> list[SelectorUsage]:
+        return [
+            SelectorUsage(path, line, column)
+            for path, positions in sorted(self._usages.get((kind, name), {}).items())
+            for line, column in positions
+        ]
+
+    def is_used(self, rule: CssRule) -> bool:
+        return self._missing.get(rule, 0) == 0
+
+    def unused_selectors(self, path: Optional[Union[str, Path]] = None) -> list[CssRule]:
+        if path is not None:
+            unused = self._unused.get(self._key(path), ())
+        else:
+            unused = [rule for rules in self._unused.values() for rule in rules]
+        return sorted(unused, key=lambda rule: (rule.path, rule.line, rule.column))
+
+    def diagnostics(self, path: Union[str, Path]) -> list[Diagnostic]:
+        return [
+            Diagnostic(
+                rule.line,
+                rule.column,
+                len(rule.selector),
+                "warning",
+                f"Selector '{rule.selector}' matches nothing in the project's HTML",
+            )
+            for rule in self.unused_selectors(path)
+        ]
+
+    def complete_class(self, prefix: str, limit: int = 20) -> list[str]:
+        return [label for label, _ in self.classes.search(prefix, limit)]
+
+    def _key(self, path: Union[str, Path]) -> str:
+        path = Path(path)
+        if path.is_absolute():
+            path = path.resolve().relative_to(self.root)
+        return path.as_posix()
+
+    def _load(self, key: str, text: Optional[str]) -> dict[str, int]:
+        if text is None:
+            try:
+                text = (self.root / key).read_text(encoding="utf-8", errors="replace")
+            except OSError:
+                self.remove_file(key)
+                return {}
+        if key.endswith(CSS_SUFFIXES):
+            self._remove_stylesheet(key)
+            return self._add_stylesheet(key, [CssRule(key, *row) for row in parse_stylesheet(text)])
+        if key.endswith(HTML_SUFFIXES):
+            self._set_markup(key, parse_markup(text))
+        return {}
+
+    def _add_stylesheet(self, key: str, rules: list[CssRule]) -> dict[str, int]:
+        # Returns the class names the rules define, for the completion index.
+        self._rules[key] = rules
+        unused = set()
+        classes: dict[str, int] = {}
+        for rule in rules:
+            missing = 0
+            for token in rule.requirements:
+                self._rules_by_token.setdefault(token, set()).add(rule)
+                if token not in self._usages:
+                    missing += 1
+                if token[0] == "class":
+                    classes[token[1]] = classes.get(token[1], 0) + 1
+            self._missing[rule] = missing
+            if missing:
+                unused.add(rule)
+        self._unused[key] = unused
+        return classes
+
+    def _remove_stylesheet(self, key: str) -> None:
+        for rule in self._rules.pop(key, ()):
+            del self._missing[rule]
+            for token in rule.requirements:
+                rules = self._rules_by_token[token]
+                rules.discard(rule)
+                if not rules:
+                    del self._rules_by_token[token]
+                if token[0] == "class":
+                    self.classes.discard(token[1])
+        self._unused.pop(key, None)
+
+    def _set_markup(self, key: str, tokens: dict[_Token, list[_Position]]) -> None:
+        old = self._markup.get(key, {})
+        for token in old.keys() - tokens.keys():
+            pages = self._usages[token]
+            del pages[key]
+            if not pages:
+                del self._usages[token]
+                self._adjust(token, 1)
+        for token, positions in tokens.items():
+            pages = self._usages.get(token)
+            if pages is None:
+                pages = self._usages[token] = {}
+                self._adjust(token, -1)
+            pages[key] = positions
+        self._markup[key] = tokens
+
+    def _adjust(self, token: _Token, delta: int) -> None:
+        # token just appeared in (-1) or vanished from (+1) the project's
+        # pages: only the rules requiring it change state.
+        for rule in self._rules_by_token.get(token, ()):
+            missing = self._missing[rule] + delta
+            self._missing[rule] = missing
+            if missing == 0:
+                self._unused[rule.path].discard(rule)
+            elif missing == 1 and delta > 0:
+                self._unused[rule.path].add(rule)
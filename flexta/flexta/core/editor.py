@@ -0,0 +1,595 @@
+from __future__ import annotations
+
+from bisect import bisect_left
+from contextlib import contextmanager
+from dataclasses import dataclass
+import os
+from pathlib import Path
+import random
+import re
+from typing import Iterator, Optional, Union
+
+from PySide6.QtCore import QObject, Signal
+from PySide6.QtGui import QTextCursor, QTextDocument
+from PySide6.QtWidgets import QPlainTextDocumentLayout
+
+
+_NEWLINE = re.compile("\n")
+_DEFAULT_UNDO_LIMIT = 1000
+_WRITE_CHUNK = 1 << 20
+# QTextCursor.selectedText() reports line breaks as U+2029/U+2028.
+_QT_LINE_BREAKS = {0x2029: "\n", 0x2028: "\n"}
+
+
+def _utf16_length(text: str) -> int:
+    # Qt positions count UTF-16 code units; characters outside the BMP
+    # (most emoji) take two.
+    return len(text.encode("utf-16-le")) // 2
+
+
+def _code_points(text: str, units: int) -> int:
+    # How many of text's characters fit in its first units UTF-16 units.
+    return len(text.encode("utf-16-le")[:units * 2].decode("utf-16-le", "ignore"))
+
+
+class _Buffer:
+    # An immutable source string plus the offsets of its line breaks, so a
+    # piece can count or locate newlines by bisecting instead of scanning.
+    __slots__ = ("text", "newlines")
+
+    def __init__(self, text: str) -> None:
+        self.text = text
+        self.newlines = [match.start() for match in _NEWLINE.finditer(text)] if "\n" in text else []
+
+    def count_newlines(self, start: int, end: int) -> int:
+        newlines = self.newlines
+        if not newlines:
+            return 0
+        return bisect_left(newlines, end) - bisect_left(newlines, start)
+
+
+# Treap nodes are tuples; every edit copies only the O(log n) nodes on the
+# paths it touches, so old roots stay valid and snapshots are free. Nodes
+# refer to buffers by index and hold nothing but numbers and other nodes,
+# which lets CPython's collector untrack them instead of rescanning the tree.
+_LEFT, _RIGHT, _PRIORITY, _BUFFER, _START, _LENGTH, _NEWLINES, _SIZE, _LINES = range(9)
+_Node = tuple
+
+
+def _make(
+    left: Optional[_Node],
+    right: Optional[_Node],
+    priority: float,
+    buffer: int,
+    start: int,
+    length: int,
+    newlines: int,
+) -> _Node:
+    size = length
+    lines = newlines
+    if left is not None:
+        size += left[_SIZE]
+        lines += left[_LINES]
+    if right is not None:
+        size += right[_SIZE]
+        lines += right[_LINES]
+    return (left, right, priority, buffer, start, length, newlines, size, lines)
+
+
+def _with_children(node: _Node, left: Optional[_Node], right: Optional[_Node]) -> _Node:
+    return _make(left, right, node[_PRIORITY], node[_BUFFER], node[_START], node[_LENGTH], node[_NEWLINES])
+
+
+def _split(
+    node: Optional[_Node], offset: int, buffers: list[_Buffer]
+) -> tuple[Optional[_Node], Optional[_Node]]:
+    if node is None:
+        return None, None
+    left = node[_LEFT]
+    left_size = left[_SIZE] if left is not None else 0
+    if offset <= left_size:
+        first, second = _split(left, offset, buffers)
+        return first, _with_children(node, second, node[_RIGHT])
+    piece_end = left_size + node[_LENGTH]
+    if offset >= piece_end:
+        first, second = _split(node[_RIGHT], offset - piece_end, buffers)
+        return _with_children(node, left, first), second
+    # The split point falls inside this piece: cut it in two.
+    buffer = node[_BUFFER]
+    start = node[_START]
+    cut = offset - left_size
+    head_newlines = buffers[buffer].count_newlines(start, start + cut)
+    priority = node[_PRIORITY]
+    head = _make(left, None, priority, buffer, start, cut, head_newlines)
+    tail = _make(
+        None, node[_RIGHT], priority, buffer, start + cut, node[_LENGTH] - cut, node[_NEWLINES] - head_newlines
+    )
+    return head, tail
+
+
+def _merge(first: Optional[_Node], second: Optional[_Node]) -> Optional[_Node]:
+    if first is None:
+        return second
+    if second is None:
+        return first
+    if first[_PRIORITY] > second[_PRIORITY]:
+        return _with_children(first, first[_LEFT], _merge(first[_RIGHT], second))
+    return _with_children(second, _merge(first, second[_LEFT]), second[_RIGHT])
+
+
+def _collect(node: Optional[_Node], start: int, end: int, buffers: list[_Buffer], out: list[str]) -> None:
+    # Appends the slices of [start, end) in order, skipping subtrees outside it.
+    while node is not None:
+        left = node[_LEFT]
+        left_size = left[_SIZE] if left is not None else 0
+        if start < left_size:
+            _collect(left, start, min(end, left_size), buffers, out)
+        piece_end = left_size + node[_LENGTH]
+        if start < piece_end and end > left_size:
+            piece_start = node[_START]
+            out.append(
+                buffers[node[_BUFFER]].text[
+                    piece_start + max(0, start - left_size):piece_start + min(node[_LENGTH], end - left_size)
+                ]
+            )
+        if end <= piece_end:
+            return
+        start = max(0, start - piece_end)
+        end -= piece_end
+        node = node[_RIGHT]
+
+
+def _iter_pieces(node: Optional[_Node], buffers: list[_Buffer]) -> Iterator[str]:
+    stack: list[_Node] = []
+    while stack or node is not None:
+        while node is not None:
+            stack.append(node)
+            node = node[_LEFT]
+        node = stack.pop()
+        start = node[_START]
+        yield buffers[node[_BUFFER]].text[start:start + node[_LENGTH]]
+        node = node[_RIGHT]
+
+
+def _newline_offset(node: Optional[_Node], index: int, buffers: list[_Buffer]) -> int:
+    # Offset of the index-th (0-based) newline in the document.
+    base = 0
+    while node is not None:
+        left = node[_LEFT]
+        left_lines = left[_LINES] if left is not None else 0
+        if index < left_lines:
+            node = left
+            continue
+        index -= left_lines
+        left_size = left[_SIZE] if left is not None else 0
+        if index < node[_NEWLINES]:
+            buffer = buffers[node[_BUFFER]]
+            position = buffer.newlines[bisect_left(buffer.newlines, node[_START]) + index]
+            return base + left_size + position - node[_START]
+        index -= node[_NEWLINES]
+        base += left_size + node[_LENGTH]
+        node = node[_RIGHT]
+    raise IndexError("newline index out of range")
+
+
+def _newlines_before(node: Optional[_Node], offset: int, buffers: list[_Buffer]) -> int:
+    count = 0
+    while node is not None:
+        left = node[_LEFT]
+        left_size = left[_SIZE] if left is not None else 0
+        if offset <= left_size:
+            node = left
+            continue
+        if left is not None:
+            count += left[_LINES]
+        piece_end = left_size + node[_LENGTH]
+        if offset < piece_end:
+            start = node[_START]
+            return count + buffers[node[_BUFFER]].count_newlines(start, start + offset - left_size)
+        count += node[_NEWLINES]
+        offset -= piece_end
+        node = node[_RIGHT]
+    return count
+
+
+class TextView:
+    # Read-only queries shared by the live buffer and its snapshots.
+    __slots__ = ()
+    _root: Optional[_Node]
+    # Append-only and shared with snapshots; nodes index into it.
+    _buffers: list[_Buffer]
+
+    def __len__(self) -> int:
+        return self._root[_SIZE] if self._root is not None else 0
+
+    @property
+    def line_count(self) -> int:
+        return (self._root[_LINES] if self._root is not None else 0) + 1
+
+    def text(self, start: int = 0, end: Optional[int] = None) -> str:
+        length = len(self)
+        end = length if end is None else min(end, length)
+        start = max(0, start)
+        if start >= end:
+            return ""
+        parts: list[str] = []
+        _collect(self._root, start, end, self._buffers, parts)
+        return "".join(parts)
+
+    def chunks(self) -> Iterator[str]:
+        return _iter_pieces(self._root, self._buffers)
+
+    def line_start(self, line: int) -> int:
+        if not 0 <= line < self.line_count:
+            raise IndexError(f"line {line} out of range")
+        if line == 0:
+            return 0
+        return _newline_offset(self._root, line - 1, self._buffers) + 1
+
+    def line_end(self, line: int) -> int:
+        if not 0 <= line < self.line_count:
+            raise IndexError(f"line {line} out of range")
+        if line == self.line_count - 1:
+            return len(self)
+        return _newline_offset(self._root, line, self._buffers)
+
+    def line_text(self, line: int) -> str:
+        return self.text(self.line_start(line), self.line_end(line))
+
+    def line_at(self, offset: int) -> int:
+        return _newlines_before(self._root, max(0, min(offset, len(self))), self._buffers)
+
+
+class TextSnapshot(TextView):
+    # Immutable view of one buffer revision; safe to read from any thread.
+    __slots__ = ("_root", "_buffers", "revision")
+
+    def __init__(self, root: Optional[_Node], buffers: list[_Buffer], revision: int) -> None:
+        self._root = root
+        self._buffers = buffers
+        self.revision = revision
+
+
+@dataclass(frozen=True)
+class TextEdit:
+    offset: int
+    removed: str
+    inserted: str
+
+    def inverse(self) -> "TextEdit":
+        return TextEdit(self.offset, self.inserted, self.removed)
+
+
+@dataclass
+class _UndoStep:
+    before: Optional[_Node]
+    after: Optional[_Node]
+    edits: list[TextEdit]
+
+
+class PieceTable(TextView):
+    def __init__(self, text: str = "", undo_limit: int = _DEFAULT_UNDO_LIMIT, seed: Optional[int] = None) -> None:
+        self._random = random.Random(seed)
+        self._buffers: list[_Buffer] = []
+        self._root = self._leaf(text)
+        self._revision = 0
+        self._undo_limit = undo_limit
+        self._undo: list[_UndoStep] = []
+        self._redo: list[_UndoStep] = []
+        self._group: Optional[_UndoStep] = None
+        self._group_depth = 0
+
+    @property
+    def revision(self) -> int:
+        return self._revision
+
+    def snapshot(self) -> TextSnapshot:
+        return TextSnapshot(self._root, self._buffers, self._revision)
+
+    def set_text(self, text: str) -> None:
+        # Snapshots keep the old buffer list alive; start a fresh one.
+        self._buffers = []
+        self._root = self._leaf(text)
+        self._revision += 1
+        self._undo.clear()
+        self._redo.clear()
+
+    def insert(self, offset: int, text: str) -> None:
+        self.replace(offset, 0, text)
+
+    def delete(self, offset: int, length: int) -> None:
+        self.replace(offset, length, "")
+
+    def replace(self, offset: int, length: int, text: str) -> TextEdit:
+        size = len(self)
+        if not 0 <= offset <= size:
+            raise IndexError(f"offset {offset} out of range")
+        length = max(0, min(length, size - offset))
+        if not length and not text:
+            return TextEdit(offset, "", "")
+        before = self._root
+        head, rest = _split(before, offset, self._buffers)
+        removed = ""
+        if length:
+            middle, rest = _split(rest, length, self._buffers)
+            parts: list[str] = []
+            _collect(middle, 0, length, self._buffers, parts)
+            removed = "".join(parts)
+        self._root = _merge(_merge(head, self._leaf(text)), rest)
+        self._revision += 1
+        edit = TextEdit(offset, removed, text)
+        self._record(before, edit)
+        return edit
+
+    @contextmanager
+    def group(self) -> Iterator[None]:
+        # Edits made inside the block undo and redo as one step.
+        self._group_depth += 1
+        try:
+            yield
+        finally:
+            self._group_depth -= 1
+            if self._group_depth == 0 and self._group is not None:
+                self._push_undo(self._group)
+                self._group = None
+
+    def can_undo(self) -> bool:
+        return bool(self._undo)
+
+    def can_redo(self) -> bool:
+        return bool(self._redo)
+
+    def undo(self) -> list[TextEdit]:
+        # Returns the edits that turn the previous text into the restored one,
+        # in application order, so views can replay them.
+        if not self._undo:
+            return []
+        step = self._undo.pop()
+        self._redo.append(step)
+        self._root = step.before
+        self._revision += 1
+        return [edit.inverse() for edit in reversed(step.edits)]
+
+    def redo(self) -> list[TextEdit]:
+        if not self._redo:
+            return []
+        step = self._redo.pop()
+        self._undo.append(step)
+        self._root = step.after
+        self._revision += 1
+        return list(step.edits)
+
+    def _leaf(self, text: str) -> Optional[_Node]:
+        if not text:
+            return None
+        buffer = _Buffer(text)
+        self._buffers.append(buffer)
+        return _make(None, None, self._random.random(), len(self._buffers) - 1, 0, len(text), len(buffer.newlines))
+
+    def _record(self, before: Optional[_Node], edit: TextEdit) -> None:
+        self._redo.clear()
+        if self._group_depth:
+            if self._group is None:
+                self._group = _UndoStep(before, self._root, [edit])
+            else:
+                self._group.edits.append(edit)
+                self._group.after = self._root
+            return
+        last = self._undo[-1] if self._undo else None
+        if last is not None and _continues_typing(last.edits[-1], edit):
+            # Consecutive keystrokes on one line undo together.
+            previous = last.edits[-1]
+            last.edits[-1] = TextEdit(previous.offset, "", previous.inserted + edit.inserted)
+            last.after = self._root
+            return
+        self._push_undo(_UndoStep(before, self._root, [edit]))
+
+    def _push_undo(self, step: _UndoStep) -> None:
+        self._undo.append(step)
+        if len(self._undo) > self._undo_limit:
+            del self._undo[: len(self._undo) - self._undo_limit]
+
+
+def _continues_typing(previous: TextEdit, edit: TextEdit) -> bool:
+    return (
+        not previous.removed
+        and not edit.removed
+        and len(edit.inserted) == 1
+        and edit.inserted != "\n"
+        and not previous.inserted.endswith("\n")
+        and edit.offset == previous.offset + len(previous.inserted)
+    )
+
+
+class EditorDocument(QObject):
+    # Keeps a QTextDocument (what the editor widget edits) and a PieceTable
+    # (what background readers snapshot) in step. The piece table owns undo,
+    # so the QTextDocument's own undo stack is disabled.
+    language = "plain"
+    suffixes: tuple[str, ...] = ()
+
+    text_changed = Signal(int, int, int)
+    # The TextEdit behind each incremental text_changed, with the text
+    # itself; undo and redo replay several against intermediate states.
+    edit_applied = Signal(object)
+    path_changed = Signal(str)
+    saved = Signal(str)
+
+    def __init__(self, text: str = "", path: Optional[Path] = None, parent: Optional[QObject] = None) -> None:
+        super().__init__(parent)
+        self.path = path
+        self.buffer = PieceTable(text)
+        self.document = QTextDocument(self)
+        self.document.setDocumentLayout(QPlainTextDocumentLayout(self.document))
+        self.document.setUndoRedoEnabled(False)
+        self._replaying = False
+        # The document's length in UTF-16 units, and whether it may hold
+        # characters outside the BMP. Until it does, Qt positions and piece
+        # table offsets are the same numbers.
+        self._units = 0
+        self._wide = False
+        self._set_document_text(text)
+        self.document.contentsChange.connect(self._mirror_change)
+
+    @classmethod
+    def from_file(cls, path: Union[str, Path], parent: Optional[QObject] = None) -> "EditorDocument":
+        path = Path(path)
+        return cls(path.read_text(encoding="utf-8"), path, parent)
+
+    def text(self) -> str:
+        return self.buffer.text()
+
+    def snapshot(self) -> TextSnapshot:
+        return self.buffer.snapshot()
+
+    def is_modified(self) -> bool:
+        return self.document.isModified()
+
+    def set_text(self, text: str) -> None:
+        self.buffer.set_text(text)
+        self._set_document_text(text)
+        self.text_changed.emit(0, -1, len(text))
+
+    def apply_edit(self, offset: int, length: int, text: str) -> None:
+        # Programmatic edits go through the QTextDocument so views update;
+        # the change is mirrored into the piece table like a keystroke.
+        start = self._to_position(offset)
+        end = start + _utf16_length(self.buffer.text(offset, offset + length)) if self._wide else start + length
+        cursor = QTextCursor(self.document)
+        cursor.setPosition(start)
+        cursor.setPosition(end, QTextCursor.MoveMode.KeepAnchor)
+        cursor.insertText(text)
+
+    def undo(self) -> bool:
+        return self._replay(self.buffer.undo())
+
+    def redo(self) -> bool:
+        return self._replay(self.buffer.redo())
+
+    def save(self, path: Optional[Union[str, Path]] = None) -> Path:
+        target = Path(path) if path is not None else self.path
+        if target is None:
+            raise ValueError("Document has no path")
+        snapshot = self.buffer.snapshot()
+        temporary = target.with_name(f".{target.name}.{os.getpid()}.tmp")
+        with temporary.open("w", encoding="utf-8", newline="") as handle:
+            pending: list[str] = []
+            pending_size = 0
+            for chunk in snapshot.chunks():
+                pending.append(chunk)
+                pending_size += len(chunk)
+                if pending_size >= _WRITE_CHUNK:
+                    handle.write("".join(pending))
+                    pending, pending_size = [], 0
+            handle.write("".join(pending))
+        os.replace(temporary, target)
+        self.document.setModified(False)
+        if target != self.path:
+            self.path = target
+            self.path_changed.emit(str(target))
+        self.saved.emit(str(target))
+        return target
+
+    def _set_document_text(self, text: str) -> None:
+        self._replaying = True
+        try:
+            self.document.setPlainText(text)
+        finally:
+            self._replaying = False
+        self._units = self.document.characterCount() - 1
+        self._wide = self._units != len(text)
+        self.document.setModified(False)
+
+    def _replay(self, edits: list[TextEdit]) -> bool:
+        if not edits:
+            return False
+        self._replaying = True
+        try:
+            for edit in edits:
+                self._wide = self._wide or _utf16_length(edit.inserted) != len(edit.inserted)
+                self._wide = self._wide or _utf16_length(edit.removed) != len(edit.removed)
+                if self._wide:
+                    # The piece table already holds the final text; positions
+                    # come from the document's intermediate one.
+                    text = self.document.toPlainText()
+                    start = _utf16_length(text[:edit.offset])
+                else:
+                    start = edit.offset
+                removed = _utf16_length(edit.removed)
+                cursor = QTextCursor(self.document)
+                cursor.setPosition(start)
+                cursor.setPosition(start + removed, QTextCursor.MoveMode.KeepAnchor)
+                cursor.insertText(edit.inserted)
+                self._units += _utf16_length(edit.inserted) - removed
+                self.text_changed.emit(edit.offset, len(edit.removed), len(edit.inserted))
+                self.edit_applied.emit(edit)
+        finally:
+            self._replaying = False
+        self._verify_sync()
+        return True
+
+    def _mirror_change(self, position: int, removed: int, added: int) -> None:
+        if self._replaying:
+            return
+        # Qt counts the document's trailing paragraph separator in some
+        # reports (e.g. the first edit of a document); clamp to real text.
+        text_length = self.document.characterCount() - 1
+        removed = max(min(removed, self._units - position), 0)
+        added_end = min(position + added, text_length)
+        cursor = QTextCursor(self.document)
+        cursor.setPosition(position)
+        cursor.setPosition(added_end, QTextCursor.MoveMode.KeepAnchor)
+        inserted = cursor.selectedText().translate(_QT_LINE_BREAKS)
+        offset = self._to_offset(position)
+        length = _code_points(self.buffer.text(offset, offset + removed), removed) if self._wide else removed
+        edit = self.buffer.replace(offset, length, inserted)
+        inserted_units = _utf16_length(inserted)
+        self._units += inserted_units - removed
+        self._wide = self._wide or inserted_units != len(inserted)
+        if edit.removed or edit.inserted:
+            self.text_changed.emit(offset, len(edit.removed), len(edit.inserted))
+            self.edit_applied.emit(edit)
+        self._verify_sync()
+
+    def _to_offset(self, position: int) -> int:
+        # Piece table offset of a Qt position. The text before it is the
+        # same in both, whichever of them has seen the latest change.
+        if not self._wide:
+            return position
+        block = self.document.findBlock(position)
+        column = _code_points(block.text(), position - block.position())
+        return self.buffer.line_start(block.blockNumber()) + column
+
+    def _to_position(self, offset: int) -> int:
+        if not self._wide:
+            return offset
+        line = self.buffer.line_at(offset)
+        start = self.buffer.line_start(line)
+        return self.document.findBlockByNumber(line).position() + _utf16_length(self.buffer.text(start, offset))
+
+    def _verify_sync(self) -> None:
+        # Cheap length check, in UTF-16 units on both sides; a mismatch
+        # means Qt reported something we could not mirror, so fall back to
+        # a full resync from the document.
+        units = self.document.characterCount() - 1
+        if self._units != units:
+            self.buffer.set_text(self.document.toPlainText())
+            self._units = units
+            self._wide = units != len(self.buffer)
+            self.text_changed.emit(0, -1, len(self.buffer))
+
+
+def document_class_for(path: Union[str, Path]) -> type[EditorDocument]:
+    from .css_editor import CssDocument
+    from .html_editor import HtmlDocument
+    from .js_editor import JsDocument
+
+    suffix = Path(path).suffix.lower()
+    for document_class in (HtmlDocument, CssDocument, JsDocument):
+        if suffix in document_class.suffixes:
+            return document_class
+    return EditorDocument
+
+
+def open_document(path: Union[str, Path], parent: Optional[QObject] = None) -> EditorDocument:
+    return document_class_for(path).from_file(path, parent)
@@ -0,0 +1,680 @@
+from __future__ import annotations
+
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+import re
+import threading
+import time
+from typing import Optional
+
+from PySide6.QtCore import QObject, QTimer, Signal
+
+from flexta.utils.metrics import TimingStats
+
+from .editor import EditorDocument, TextSnapshot
+
+
+_DEFAULT_DEBOUNCE_MS = 300
+_DEFAULT_WORKERS = 2
+# Lines between cancellation checks in a worker.
+_CANCEL_CHECK_LINES = 256
+# Latency samples kept per document.
+_MAX_SAMPLES = 256
+
+# (column, length, severity, message)
+Finding = tuple[int, int, str, str]
+
+
+@dataclass(frozen=True, eq=False)
+class Diagnostic:
+    # Compared by identity: the diff published by DiagnosticsScheduler
+    # removes exactly the objects it added earlier. line is the line at
+    # publish time; lines inserted or deleted above move a diagnostic
+    # without republishing it, so DiagnosticsScheduler.located() gives
+    # where it is now.
+    line: int
+    column: int
+    length: int
+    severity: str
+    message: str
+
+    @property
+    def key(self) -> Finding:
+        return self.column, self.length, self.severity, self.message
+
+
+class Validator:
+    # Validators are line-state machines: check_line sees one line and the
+    # state at its start, so an edit is re-checked from its first line until
+    # the end state matches the one stored from the previous run.
+    language = ""
+    initial_state: object = None
+
+    def check_line(self, text: str, state) -> tuple[list[Finding], object]:
+        raise NotImplementedError
+
+    def finish(self, state) -> list[Finding]:
+        return []
+
+
+def _string_end(text: str, start: int) -> int:
+    quote = text[start]
+    index = start + 1
+    while index < len(text):
+        char = text[index]
+        if char == "\\":
+            index += 2
+            continue
+        if char == quote:
+            return index
+        index += 1
+    return -1
+
+
+_CSS_DECLARATION = re.compile(r"(?:^|(?<=[;{]))\s*(-?[A-Za-z][\w-]*)\s*:\s*([^;{}]*?)\s*(?=;|}|$)")
+_CSS_MISSING_COLON = re.compile(r"(?:^|(?<=[;{]))\s*([A-Za-z][\w-]*)\s+[^:;{}\s][^:;{}]*;")
+_CSS_HEX_COLOR = re.compile(r"#([0-9A-Za-z]+)")
+
+
+class CssValidator(Validator):
+    # State: (brace depth, inside a comment).
+    language = "css"
+    initial_state = (0, False)
+
+    def __init__(self) -> None:
+        from .autocomplete import get_builtin_completions
+
+        self._properties = get_builtin_completions().index("css.properties")
+
+    def check_line(self, text: str, state) -> tuple[list[Finding], object]:
+        depth, in_comment = state
+        findings: list[Finding] = []
+        # The line with comments and string contents blanked, for the
+        # declaration checks below.
+        code = list(text)
+        start_depth = depth
+        index = 0
+        while index < len(text):
+            if in_comment:
+                end = text.find("*/", index)
+                stop = len(text) if end < 0 else end + 2
+                code[index:stop] = " " * (stop - index)
+                in_comment = end < 0
+                index = stop
+                continue
+            char = text[index]
+            if text.startswith("/*", index):
+                code[index:index + 2] = "  "
+                in_comment = True
+                index += 2
+                continue
+            if char in "\"'":
+                end = _string_end(text, index)
+                if end < 0:
+                    findings.append((index, len(text) - index, "error", "Unterminated string"))
+                    code[index:] = " " * (len(text) - index)
+                    break
+                code[index + 1:end] = " " * (end - index - 1)
+                index = end + 1
+                continue
+            if char == "{":
+                depth += 1
+            elif char == "}":
+                if depth == 0:
+                    findings.append((index, 1, "error", "Unexpected '}'"))
+                else:
+                    depth -= 1
+            index += 1
+        findings.extend(self._check_declarations("".join(code), start_depth))
+        return findings, (depth, in_comment)
+
+    def _check_declarations(self, code: str, depth: int) -> list[Finding]:
+        if depth == 0 and "{" not in code:
+            return []
+        findings: list[Finding] = []
+
+        def depth_at(position: int) -> int:
+            before = code[:position]
+            return depth + before.count("{") - before.count("}")
+
+        for match in _CSS_DECLARATION.finditer(code):
+            if depth_at(match.start()) <= 0:
+                continue
+            name, value = match.group(1), match.group(2)
+            if not name.startswith("-") and self._properties is not None and name.lower() not in self._properties:
+                findings.append((match.start(1), len(name), "warning", f"Unknown property '{name}'"))
+            if not value and code.startswith(";", match.end()):
+                findings.append((match.start(1), len(name), "error", f"Missing value for '{name}'"))
+            for color in _CSS_HEX_COLOR.finditer(value):
+                digits = color.group(1)
+                if len(digits) not in (3, 4, 6, 8) or not all(char in "0123456789abcdefABCDEF" for char in digits):
+                    column = match.start(2) + color.start()
+                    findings.append((column, len(color.group(0)), "error", f"Invalid hex color '{color.group(0)}'"))
+        for match in _CSS_MISSING_COLON.finditer(code):
+            if depth_at(match.start()) > 0:
+                name = match.group(1)
+                findings.append((match.start(1), len(name), "error", f"Expected ':' after '{name}'"))
+        return findings
+
+    def finish(self, state) -> list[Finding]:
+        depth, in_comment = state
+        if in_comment:
+            return [(0, 0, "error", "Unterminated comment")]
+        if depth:
+            return [(0, 0, "error", "Unclosed '{'")]
+        return []
+
+
+_JS_PAIRS = {")": "(", "]": "[", "}": "{"}
+_JS_IDENTIFIER = re.compile(r"[A-Za-z_$][\w$]*|\d[\w.]*")
+# Words after which "/" starts a regular expression rather than a division.
+_JS_REGEX_KEYWORDS = frozenset(
+    "return typeof case do else in of new delete void throw instanceof yield await".split()
+)
+
+
+def _regex_end(text: str, start: int) -> int:
+    index = start + 1
+    in_class = False
+    while index < len(text):
+        char = text[index]
+        if char == "\\":
+            index += 2
+            continue
+        if char == "[":
+            in_class = True
+        elif char == "]":
+            in_class = False
+        elif char == "/" and not in_class:
+            return index
+        index += 1
+    return -1
+
+
+class JsValidator(Validator):
+    # State: (stack of open brackets, inside a block comment). Template
+    # literals push "`" and their substitutions push "${", so the stack also
+    # says whether a line starts inside template text.
+    language = "javascript"
+    initial_state = ((), False)
+
+    def check_line(self, text: str, state) -> tuple[list[Finding], object]:
+        stack, in_comment = state
+        stack = list(stack)
+        findings: list[Finding] = []
+        # Whether the previous token ends an expression; decides "/" below.
+        after_value = False
+        index = 0
+        length = len(text)
+        while index < length:
+            if in_comment:
+                end = text.find("*/", index)
+                if end < 0:
+                    break
+                in_comment = False
+                index = end + 2
+                continue
+            char = text[index]
+            if stack and stack[-1] == "`":
+                if char == "\\":
+                    index += 2
+                elif char == "`":
+                    stack.pop()
+                    after_value = True
+                    index += 1
+                elif text.startswith("${", index):
+                    stack.append("${")
+                    after_value = False
+                    index += 2
+                else:
+                    index += 1
+                continue
+            if char.isspace():
+                index += 1
+                continue
+            if text.startswith("//", index):
+                break
+            if text.startswith("/*", index):
+                in_comment = True
+                index += 2
+                continue
+            if char in "\"'":
+                end = _string_end(text, index)
+                if end < 0:
+                    if not text.endswith("\\"):
+                        findings.append((index, length - index, "error", "Unterminated string"))
+                    break
+                index = end + 1
+                after_value = True
+                continue
+            if char == "`":
+                stack.append("`")
+                index += 1
+                continue
+            if char == "/" and not after_value:
+                end = _regex_end(text, index)
+                if end >= 0:
+                    index = end + 1
+                    after_value = True
+                    continue
+            match = _JS_IDENTIFIER.match(text, index)
+            if match is not None:
+                after_value = match.group(0) not in _JS_REGEX_KEYWORDS
+                index = match.end()
+                continue
+            if char in "([{":
+                stack.append(char)
+            elif char in ")]}":
+                top = stack[-1] if stack else None
+                if top == _JS_PAIRS[char] or (char == "}" and top == "${"):
+                    stack.pop()
+                elif top is None:
+                    findings.append((index, 1, "error", f"Unexpected '{char}'"))
+                else:
+                    expected = {"(": ")", "[": "]", "{": "}", "${": "}"}[top]
+                    findings.append((index, 1, "error", f"Expected '{expected}' but found '{char}'"))
+            after_value = char in ")]}"
+            index += 1
+        return findings, (tuple(stack), in_comment)
+
+    def finish(self, state) -> list[Finding]:
+        stack, in_comment = state
+        if in_comment:
+            return [(0, 0, "error", "Unterminated comment")]
+        if not stack:
+            return []
+        if "`" in stack:
+            return [(0, 0, "error", "Unterminated template literal")]
+        return [(0, 0, "error", f"Unclosed '{stack[0]}'")]
+
+
+_VOID_ELEMENTS = frozenset(
+    "area base br col embed hr img input link meta param source track wbr".split()
+)
+# Elements whose end tag may be left out; never reported as unclosed.
+_OPTIONAL_CLOSE = frozenset(
+    "html head body p li dt dd option optgroup thead tbody tfoot tr td th colgroup rt rp caption".split()
+)
+_RAW_TEXT = frozenset(("script", "style", "textarea", "title"))
+_HTML_TAG_START = re.compile(r"<(/?)([A-Za-z][\w:-]*)")
+
+
+class HtmlValidator(Validator):
+    # State: (stack of open elements, mode). Mode is "" in text, "comment",
+    # "tag:<name>" inside a start tag spanning lines, or "raw:<name>" inside
+    # script/style contents.
+    language = "html"
+    initial_state = ((), "")
+
+    def check_line(self, text: str, state) -> tuple[list[Finding], object]:
+        stack, mode = state
+        stack = list(stack)
+        findings: list[Finding] = []
+        index = 0
+        length = len(text)
+        while index < length:
+            if mode == "comment":
+                end = text.find("-->", index)
+                if end < 0:
+                    break
+                mode = ""
+                index = end + 3
+            elif mode.startswith("tag:"):
+                index, mode = self._finish_start_tag(text, index, mode[4:], stack)
+            elif mode.startswith("raw:"):
+                name = mode[4:]
+                end = text.lower().find(f"</{name}", index)
+                if end < 0:
+                    break
+                mode = ""
+                index = end
+            else:
+                start = text.find("<", index)
+                if start < 0:
+                    break
+                if text.startswith("<!--", start):
+                    mode = "comment"
+                    index = start + 4
+                    continue
+                if text.startswith("<!", start) or text.startswith("<?", start):
+                    end = text.find(">", start)
+                    index = length if end < 0 else end + 1
+                    continue
+                match = _HTML_TAG_START.match(text, start)
+                if match is None:
+                    index = start + 1
+                    continue
+                name = match.group(2).lower()
+                if match.group(1):
+                    end = text.find(">", match.end())
+                    index = length if end < 0 else end + 1
+                    self._close(name, start, index - start, stack, findings)
+                else:
+                    index, mode = self._finish_start_tag(text, match.end(), name, stack)
+        return findings, (tuple(stack), mode)
+
+    def _finish_start_tag(self, text: str, index: int, name: str, stack: list[str]) -> tuple[int, str]:
+        while index < len(text):
+            char = text[index]
+            if char in "\"'":
+                end = text.find(char, index + 1)
+                if end < 0:
+                    return len(text), f"tag:{name}"
+                index = end + 1
+            elif char == ">":
+                if text[index - 1] == "/" or name in _VOID_ELEMENTS:
+                    return index + 1, ""
+                stack.append(name)
+                return index + 1, f"raw:{name}" if name in _RAW_TEXT else ""
+            else:
+                index += 1
+        return index, f"tag:{name}"
+
+    def _close(self, name: str, column: int, length: int, stack: list[str], findings: list[Finding]) -> None:
+        if name not in stack:
+            findings.append((column, length, "error", f"Unexpected </{name}>"))
+            return
+        while stack[-1] != name:
+            inner = stack.pop()
+            if inner not in _OPTIONAL_CLOSE:
+                findings.append((column, length, "error", f"Unclosed <{inner}> before </{name}>"))
+        stack.pop()
+
+    def finish(self, state) -> list[Finding]:
+        stack, mode = state
+        if mode == "comment":
+            return [(0, 0, "error", "Unterminated comment")]
+        return [(0, 0, "error", f"Unclosed <{name}>") for name in stack if name not in _OPTIONAL_CLOSE]
+
+
+def validator_for(language: str) -> Optional[Validator]:
+    for validator_class in (HtmlValidator, CssValidator, JsValidator):
+        if validator_class.language == language:
+            return validator_class()
+    return None
+
+
+@dataclass(frozen=True)
+class DiagnosticsMetrics:
+    edits: int
+    runs: int
+    full_runs: int
+    cancelled: int
+    # Lines the last run re-checked.
+    lines_checked: int
+    # Worker time per run, and last edit to published diff.
+    validation: TimingStats
+    latency: TimingStats
+
+
+class _Job:
+    def __init__(self, generation: int, snapshot: TextSnapshot, states: list, first: int, last: int, full: bool) -> None:
+        self.generation = generation
+        self.snapshot = snapshot
+        self.states = states
+        self.first = first
+        self.last = last
+        self.full = full
+        self.cancel = threading.Event()
+        self.applied = False
+        self.future: Optional[Future] = None
+        # Filled in by the worker.
+        self.findings: dict[int, list[Finding]] = {}
+        self.tail: Optional[list[Finding]] = None
+        self.elapsed_ms = 0.0
+
+
+class _DocumentState:
+    def __init__(self, document: EditorDocument, validator: Validator, timer: QTimer) -> None:
+        self.document = document
+        self.validator = validator
+        self.timer = timer
+        lines = document.buffer.line_count
+        # states[n] is the validator state at the start of line n, None when
+        # unknown; states[lines] is the state at the end of the document.
+        self.states: list = [validator.initial_state] + [None] * lines
+        self.lines: list[list[Diagnostic]] = [[] for _ in range(lines)]
+        self.tail: list[Diagnostic] = []
+        # Published diagnostics on lines deleted since the last run.
+        self.dropped: list[Diagnostic] = []
+        self.dirty: Optional[tuple[int, int]] = (0, lines - 1)
+        self.full = True
+        self.generation = 0
+        self.job: Optional[_Job] = None
+        self.last_edit = time.perf_counter()
+        self.edits = 0
+        self.runs = 0
+        self.full_runs = 0
+        self.cancelled = 0
+        self.lines_checked = 0
+        self.validation_ms: deque[float] = deque(maxlen=_MAX_SAMPLES)
+        self.latency_ms: deque[float] = deque(maxlen=_MAX_SAMPLES)
+
+
+def _run_job(validator: Validator, job: _Job) -> _Job:
+    started = time.perf_counter()
+    snapshot = job.snapshot
+    states = job.states
+    line_count = snapshot.line_count
+    line = job.first
+    while line < line_count:
+        if line % _CANCEL_CHECK_LINES == 0 and job.cancel.is_set():
+            return job
+        job.findings[line], end = validator.check_line(snapshot.line_text(line), states[line])
+        line += 1
+        if line > job.last and states[line] == end and line < line_count:
+            # Converged: everything below checks exactly as before.
+            break
+        states[line] = end
+    else:
+        job.tail = validator.finish(states[line_count])
+    job.elapsed_ms = (time.perf_counter() - started) * 1000
+    return job
+
+
+class DiagnosticsScheduler(QObject):
+    # Validates watched documents off the GUI thread. Edits restart a
+    # per-document debounce timer and cancel any run in flight; a run checks
+    # a snapshot from the first edited line until the validator state
+    # converges, and its result is published as a diff against what was
+    # published before. Results from a superseded snapshot are dropped.
+    diagnostics_changed = Signal(object, list, list)
+
+    _job_finished = Signal(object, object)
+
+    def __init__(
+        self,
+        debounce_ms: int = _DEFAULT_DEBOUNCE_MS,
+        workers: int = _DEFAULT_WORKERS,
+        parent: Optional[QObject] = None,
+    ) -> None:
+        super().__init__(parent)
+        self.debounce_ms = debounce_ms
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="flexta-diagnostics")
+        self._documents: dict[EditorDocument, _DocumentState] = {}
+        self._job_finished.connect(self._apply)
+
+    def watch(self, document: EditorDocument, validator: Optional[Validator] = None) -> bool:
+        if document in self._documents:
+            return True
+        validator = validator if validator is not None else validator_for(document.language)
+        if validator is None:
+            return False
+        timer = QTimer(self)
+        timer.setSingleShot(True)
+        timer.setInterval(self.debounce_ms)
+        state = _DocumentState(document, validator, timer)
+        timer.timeout.connect(lambda: self._start(state))
+        self._documents[document] = state
+        document.text_changed.connect(self._handle_text_changed)
+        document.destroyed.connect(self._handle_destroyed)
+        self._start(state)
+        return True
+
+    def unwatch(self, document: EditorDocument) -> None:
+        state = self._documents.pop(document, None)
+        if state is None:
+            return
+        document.text_changed.disconnect(self._handle_text_changed)
+        document.destroyed.disconnect(self._handle_destroyed)
+        self._discard(state)
+
+    def diagnostics(self, document: EditorDocument) -> list[Diagnostic]:
+        state = self._documents.get(document)
+        if state is None:
+            return []
+        return [diagnostic for line in state.lines for diagnostic in line] + state.tail
+
+    def located(self, document: EditorDocument) -> list[tuple[int, Diagnostic]]:
+        # (current line, diagnostic); document-level ones sit on the last line.
+        state = self._documents.get(document)
+        if state is None:
+            return []
+        located = [(number, diagnostic) for number, line in enumerate(state.lines) for diagnostic in line]
+        last = max(len(state.lines) - 1, 0)
+        return located + [(last, diagnostic) for diagnostic in state.tail]
+
+    def is_idle(self, document: EditorDocument) -> bool:
+        state = self._documents.get(document)
+        return state is None or (state.dirty is None and state.job is None)
+
+    def flush(self, document: EditorDocument) -> None:
+        # Validate now and publish before returning; for tests and saves.
+        state = self._documents.get(document)
+        if state is None:
+            return
+        if state.dirty is not None:
+            state.timer.stop()
+            self._start(state)
+        job = state.job
+        if job is not None and job.future is not None:
+            self._apply(state, job.future.result())
+
+    def metrics(self, document: EditorDocument) -> Optional[DiagnosticsMetrics]:
+        state = self._documents.get(document)
+        if state is None:
+            return None
+        return DiagnosticsMetrics(
+            edits=state.edits,
+            runs=state.runs,
+            full_runs=state.full_runs,
+            cancelled=state.cancelled,
+            lines_checked=state.lines_checked,
+            validation=TimingStats.from_samples(state.validation_ms),
+            latency=TimingStats.from_samples(state.latency_ms),
+        )
+
+    def close(self) -> None:
+        for document in list(self._documents):
+            self.unwatch(document)
+        self._pool.shutdown(wait=True, cancel_futures=True)
+
+    def _handle_destroyed(self, document: QObject) -> None:
+        state = self._documents.pop(document, None)
+        if state is not None:
+            self._discard(state)
+
+    def _discard(self, state: _DocumentState) -> None:
+        state.timer.stop()
+        state.timer.deleteLater()
+        if state.job is not None:
+            state.job.cancel.set()
+            state.job = None
+
+    def _handle_text_changed(self, position: int, removed: int, added: int) -> None:
+        state = self._documents.get(self.sender())
+        if state is None:
+            return
+        state.edits += 1
+        state.generation += 1
+        state.last_edit = time.perf_counter()
+        if state.job is not None:
+            state.job.cancel.set()
+            state.job = None
+            state.cancelled += 1
+        buffer = state.document.buffer
+        if removed < 0:
+            for line in state.lines:
+                state.dropped.extend(line)
+            state.dropped.extend(state.tail)
+            lines = buffer.line_count
+            state.states = [state.validator.initial_state] + [None] * lines
+            state.lines = [[] for _ in range(lines)]
+            state.tail = []
+            state.dirty = (0, lines - 1)
+            state.full = True
+        else:
+            first = buffer.line_at(position)
+            last = buffer.line_at(position + added)
+            delta = buffer.line_count - len(state.lines)
+            # Lines come and go after the first edited line; its diagnostics
+            # stay with it unless the edit began at its start, in which case
+            # its old text now ends the edited range.
+            at = first if position == buffer.line_start(first) else first + 1
+            if delta > 0:
+                state.lines[at:at] = [[] for _ in range(delta)]
+                state.states[first + 1:first + 1] = [None] * delta
+            elif delta < 0:
+                for line in state.lines[at:at - delta]:
+                    state.dropped.extend(line)
+                del state.lines[at:at - delta]
+                del state.states[first + 1:first + 1 - delta]
+            if state.dirty is not None:
+                dirty_first, dirty_last = state.dirty
+                if dirty_last > first:
+                    dirty_last = max(first, dirty_last + delta)
+                first, last = min(first, dirty_first), max(last, dirty_last)
+            state.dirty = (first, min(last, buffer.line_count - 1))
+        state.timer.start()
+
+    def _start(self, state: _DocumentState) -> None:
+        if state.dirty is None:
+            return
+        first, last = state.dirty
+        job = _Job(state.generation, state.document.snapshot(), list(state.states), first, last, state.full)
+        state.job = job
+        job.future = self._pool.submit(_run_job, state.validator, job)
+        # Runs on the worker; the signal queues _apply onto the GUI thread.
+        job.future.add_done_callback(
+            lambda future: None if future.cancelled() else self._job_finished.emit(state, future.result())
+        )
+
+    def _apply(self, state: _DocumentState, job: _Job) -> None:
+        if job.applied or job is not state.job or job.generation != state.generation or job.cancel.is_set():
+            return
+        job.applied = True
+        state.job = None
+        state.dirty = None
+        state.states = job.states
+        removed = state.dropped
+        state.dropped = []
+        added: list[Diagnostic] = []
+        for line, findings in job.findings.items():
+            state.lines[line] = self._diff(state.lines[line], findings, line, removed, added)
+        if job.tail is not None:
+            state.tail = self._diff(state.tail, job.tail, len(state.lines) - 1, removed, added)
+        state.runs += 1
+        state.full_runs += job.full
+        state.full = False
+        state.lines_checked = len(job.findings)
+        state.validation_ms.append(job.elapsed_ms)
+        state.latency_ms.append((time.perf_counter() - state.last_edit) * 1000)
+        if removed or added:
+            self.diagnostics_changed.emit(state.document, removed, added)
+
+    def _diff(
+        self, old: list[Diagnostic], findings: list[Finding], line: int, removed: list, added: list
+    ) -> list[Diagnostic]:
+        # Unchanged findings keep their published object, so re-checking a
+        # line that still has the same error publishes nothing for it.
+        kept = {diagnostic.key: diagnostic for diagnostic in old}
+        current = []
+        for finding in findings:
+            diagnostic = kept.pop(finding, None)
+            if diagnostic is None:
+                diagnostic = Diagnostic(line, *finding)
+                added.append(diagnostic)
+            current.append(diagnostic)
+        removed.extend(kept.values())
+        return current
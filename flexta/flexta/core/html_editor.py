@@ -0,0 +1,8 @@
+from __future__ import annotations
+
+from .editor import EditorDocument
+
+
+class HtmlDocument(EditorDocument):
+    language = "html"
+    suffixes = (".html", ".htm")
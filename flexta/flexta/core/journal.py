@@ -0,0 +1,381 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+import hashlib
+import logging
+import os
+from pathlib import Path
+import struct
+import threading
+from typing import Optional, Union
+import uuid
+import zlib
+
+from PySide6.QtCore import QObject
+
+from flexta.database import settings_db
+
+from .editor import EditorDocument, PieceTable, TextEdit, TextSnapshot
+
+
+AUTOSAVE_SETTING = "autosave_enabled"
+_JOURNAL_DIRNAME = "journal"
+_SUFFIX = ".journal"
+# Appends that arrive within this window share one write and one fsync.
+_FLUSH_DELAY = 1.0
+# A journal is compacted into a snapshot once its edit records outgrow the
+# document (and this floor), so replay never costs more than a rewrite.
+_COMPACT_MIN_BYTES = 4 * 1024 * 1024
+_COMPACT_RATIO = 1.0
+
+# Every record is (kind, payload length, crc32 of the payload seeded with
+# the kind) then the payload. Replay stops at the first record that is short
+# or fails its checksum: the tail of an append a crash interrupted.
+_RECORD = struct.Struct("<BII")
+_EDIT = struct.Struct("<QQ")
+_BASE = struct.Struct("<Q32s")
+# The document's path, or an id for an untitled buffer; always first.
+_KIND_HEADER = 1
+# The full text at this point.
+_KIND_SNAPSHOT = 2
+# The text equals the file at the header's path, identified by the size and
+# BLAKE2b digest of its text as UTF-8; written on open and save instead of a
+# snapshot.
+_KIND_BASE = 3
+# (offset, removed characters) then the inserted text.
+_KIND_EDIT = 4
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class RecoveredBuffer:
+    # A document with edits that never reached disk. path is None for an
+    # untitled buffer; edits counts the records replayed.
+    path: Optional[str]
+    text: str
+    edits: int
+    journal: str
+
+
+def autosave_enabled() -> bool:
+    return settings_db.get_setting(AUTOSAVE_SETTING, "0") == "1"
+
+
+def default_journal_dir() -> Path:
+    return Path.home() / ".flexta" / _JOURNAL_DIRNAME
+
+
+def _journal_file(directory: Path, name: str) -> Path:
+    return directory / (hashlib.blake2b(name.encode("utf-8"), digest_size=10).hexdigest() + _SUFFIX)
+
+
+def _record(kind: int, payload: bytes) -> bytes:
+    return _RECORD.pack(kind, len(payload), zlib.crc32(payload, kind)) + payload
+
+
+def _edit_record(edit: TextEdit) -> bytes:
+    return _record(_KIND_EDIT, _EDIT.pack(edit.offset, len(edit.removed)) + edit.inserted.encode("utf-8"))
+
+
+def _merge_edits(previous: TextEdit, edit: TextEdit) -> Optional[TextEdit]:
+    # Typing and backspacing at the end of the previous edit fold into it,
+    # so a burst of keystrokes costs one record rather than one each.
+    end = previous.offset + len(previous.inserted)
+    if not edit.removed and edit.offset == end:
+        return TextEdit(previous.offset, previous.removed, previous.inserted + edit.inserted)
+    if (
+        edit.removed
+        and not edit.inserted
+        and edit.offset + len(edit.removed) == end
+        and previous.inserted.endswith(edit.removed)
+    ):
+        return TextEdit(previous.offset, previous.removed, previous.inserted[: -len(edit.removed)])
+    return None
+
+
+def _digest(chunks) -> tuple[int, bytes]:
+    digest = hashlib.blake2b(digest_size=32)
+    size = 0
+    for chunk in chunks:
+        data = chunk.encode("utf-8")
+        size += len(data)
+        digest.update(data)
+    return size, digest.digest()
+
+
+def read_records(data: bytes) -> list[tuple[int, bytes]]:
+    records = []
+    offset = 0
+    while offset + _RECORD.size <= len(data):
+        kind, length, checksum = _RECORD.unpack_from(data, offset)
+        start = offset + _RECORD.size
+        payload = data[start:start + length]
+        if len(payload) < length or zlib.crc32(payload, kind) != checksum:
+            break
+        records.append((kind, payload))
+        offset = start + length
+    return records
+
+
+def replay(data: bytes, journal: str = "") -> Optional[RecoveredBuffer]:
+    # Rebuilds the text a journal describes, or None if nothing changed
+    # since the last save or the base file changed on disk since.
+    records = read_records(data)
+    if not records or records[0][0] != _KIND_HEADER:
+        return None
+    name = records[0][1].decode("utf-8")
+    path = None if name.startswith("untitled:") else name
+    table: Optional[PieceTable] = None
+    edits = 0
+    # A snapshot is only ever taken of unsaved text; an empty one is a new
+    # untitled buffer.
+    changed = False
+    for kind, payload in records[1:]:
+        if kind == _KIND_SNAPSHOT:
+            table = PieceTable(payload.decode("utf-8"), undo_limit=0)
+            changed = bool(payload)
+        elif kind == _KIND_BASE:
+            size, digest = _BASE.unpack(payload)
+            try:
+                # Read the way EditorDocument.from_file reads it.
+                text = Path(path).read_text(encoding="utf-8") if path is not None else ""
+            except (OSError, UnicodeDecodeError):
+                text = None
+            if text is None or _digest([text]) != (size, digest):
+                logger.warning("Journal base for %s no longer matches the file; edits after it are lost", path)
+                table = None
+                continue
+            table = PieceTable(text, undo_limit=0)
+            changed = False
+        elif kind == _KIND_EDIT and table is not None:
+            offset, removed = _EDIT.unpack_from(payload)
+            table.replace(offset, removed, payload[_EDIT.size:].decode("utf-8"))
+            edits += 1
+            changed = True
+    if table is None or not changed:
+        return None
+    return RecoveredBuffer(path, table.text(), edits, journal)
+
+
+class DocumentJournal:
+    # The journal of one open document. Edits are encoded on the GUI thread
+    # as they happen and handed to the manager's writer, which appends and
+    # fsyncs them in batches. Saves and compactions restart the file.
+    def __init__(self, manager: "JournalManager", document: EditorDocument, name: str) -> None:
+        self.manager = manager
+        self.document = document
+        self.name = name
+        self.file = _journal_file(manager.directory, name)
+        self.restored = False
+        # Guarded by the manager's lock.
+        self.pending: list[bytes] = []
+        self.restart: Optional[tuple[int, TextSnapshot]] = None
+        self.log_bytes = 0
+        # The edit behind pending[-1], while it can still be extended.
+        self._last: Optional[TextEdit] = None
+        self.handle = None
+        document.edit_applied.connect(self._handle_edit)
+        document.text_changed.connect(self._handle_text_changed)
+        document.saved.connect(self._handle_saved)
+        document.path_changed.connect(self._handle_path_changed)
+
+    def _handle_edit(self, edit: TextEdit) -> None:
+        compact = False
+        with self.manager.lock:
+            merged = _merge_edits(self._last, edit) if self._last is not None and self.pending else None
+            if merged is not None:
+                self.log_bytes -= len(self.pending.pop())
+                edit = merged
+            record = _edit_record(edit)
+            self.pending.append(record)
+            self._last = edit
+            self.log_bytes += len(record)
+            compact = self.log_bytes > max(_COMPACT_MIN_BYTES, len(self.document.buffer) * _COMPACT_RATIO)
+        if compact:
+            self.compact()
+        self.manager.wakeup.set()
+
+    def _handle_text_changed(self, position: int, removed: int, added: int) -> None:
+        if removed < 0:
+            self.compact()
+
+    def _handle_saved(self, path: str) -> None:
+        self.rebase()
+
+    def _handle_path_changed(self, path: str) -> None:
+        # Saved under a new name: the old journal goes, a new one starts
+        # from the base the save is about to record.
+        self.manager.discard(self)
+        self.name = path
+        self.file = _journal_file(self.manager.directory, path)
+        self.manager.register(self)
+
+    def compact(self) -> None:
+        self._restart(_KIND_SNAPSHOT)
+
+    def rebase(self) -> None:
+        # The text matches the file on disk: record that instead of a copy.
+        self._restart(_KIND_BASE)
+
+    def _restart(self, kind: int) -> None:
+        # The snapshot is immutable, so the writer serialises it off the GUI
+        # thread; records queued before it are already part of it.
+        with self.manager.lock:
+            self.pending = []
+            self.restart = (kind, self.document.snapshot())
+            self.log_bytes = 0
+        self.manager.wakeup.set()
+
+    def write(self) -> int:
+        # Writer side, under the manager's io lock. Returns bytes written.
+        with self.manager.lock:
+            pending, self.pending = self.pending, []
+            restart, self.restart = self.restart, None
+        if restart is None and not pending:
+            return 0
+        written = 0
+        if restart is not None:
+            kind, snapshot = restart
+            if self.handle is not None:
+                self.handle.close()
+            temporary = self.file.with_name(f"{self.file.name}.tmp")
+            with open(temporary, "wb") as handle:
+                handle.write(_record(_KIND_HEADER, self.name.encode("utf-8")))
+                if kind == _KIND_BASE:
+                    payload = _BASE.pack(*_digest(snapshot.chunks()))
+                else:
+                    payload = snapshot.text().encode("utf-8")
+                handle.write(_record(kind, payload))
+                handle.write(b"".join(pending))
+                handle.flush()
+                os.fsync(handle.fileno())
+                written = handle.tell()
+            os.replace(temporary, self.file)
+            self.handle = open(self.file, "ab")
+        else:
+            if self.handle is None:
+                self.handle = open(self.file, "ab")
+            data = b"".join(pending)
+            self.handle.write(data)
+            self.handle.flush()
+            os.fsync(self.handle.fileno())
+            written = len(data)
+        return written
+
+
+class JournalManager(QObject):
+    # Owns the journal directory and one writer thread for every open
+    # document. Journals left behind by a crash are replayed by recover()
+    # or, for a document being opened again, by attach().
+    def __init__(
+        self,
+        directory: Optional[Union[str, Path]] = None,
+        flush_delay: float = _FLUSH_DELAY,
+        parent: Optional[QObject] = None,
+    ) -> None:
+        super().__init__(parent)
+        self.directory = Path(directory) if directory is not None else default_journal_dir()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._flush_delay = flush_delay
+        # lock guards journals' pending state; io_lock serialises file work
+        # between the writer thread and flush(), detach() and close().
+        self.lock = threading.Lock()
+        self._io_lock = threading.Lock()
+        self._journals: dict[Path, DocumentJournal] = {}
+        self.bytes_written = 0
+        self.fsyncs = 0
+        self.wakeup = threading.Event()
+        self._closing = threading.Event()
+        self._writer = threading.Thread(target=self._run_writer, name="flexta-journal-writer", daemon=True)
+        self._writer.start()
+
+    def attach(self, document: EditorDocument, restore: bool = True) -> DocumentJournal:
+        name = os.fspath(document.path) if document.path is not None else f"untitled:{uuid.uuid4().hex}"
+        journal = DocumentJournal(self, document, name)
+        if restore and journal.file.exists():
+            recovered = replay(journal.file.read_bytes())
+            if recovered is not None and recovered.text != document.text():
+                # Reopened after a crash: bring back the unsaved text. The
+                # reset below becomes the journal's new snapshot.
+                document.set_text(recovered.text)
+                document.document.setModified(True)
+                journal.restored = True
+        self.register(journal)
+        if journal.restored or document.path is None:
+            journal.compact()
+        else:
+            journal.rebase()
+        return journal
+
+    def register(self, journal: DocumentJournal) -> None:
+        with self._io_lock:
+            self._journals[journal.file] = journal
+
+    def detach(self, document: EditorDocument) -> None:
+        # A clean close: nothing to recover, so the journal is deleted.
+        for journal in [journal for journal in self._journals.values() if journal.document is document]:
+            document.edit_applied.disconnect(journal._handle_edit)
+            document.text_changed.disconnect(journal._handle_text_changed)
+            document.saved.disconnect(journal._handle_saved)
+            document.path_changed.disconnect(journal._handle_path_changed)
+            self.discard(journal)
+
+    def discard(self, journal: DocumentJournal) -> None:
+        with self._io_lock:
+            self._journals.pop(journal.file, None)
+            with self.lock:
+                journal.pending = []
+                journal.restart = None
+            if journal.handle is not None:
+                journal.handle.close()
+                journal.handle = None
+            journal.file.unlink(missing_ok=True)
+
+    def recover(self) -> list[RecoveredBuffer]:
+        # Unsaved buffers from journals no open document owns.
+        recovered = []
+        for file in sorted(self.directory.glob(f"*{_SUFFIX}")):
+            if file in self._journals:
+                continue
+            try:
+                buffer = replay(file.read_bytes(), str(file))
+            except (OSError, UnicodeDecodeError, struct.error):
+                logger.exception("Could not replay journal %s", file)
+                continue
+            if buffer is not None:
+                recovered.append(buffer)
+        return recovered
+
+    def dismiss(self, buffer: RecoveredBuffer) -> None:
+        # The user restored or declined a recovered buffer.
+        Path(buffer.journal).unlink(missing_ok=True)
+
+    def flush(self) -> None:
+        with self._io_lock:
+            for journal in list(self._journals.values()):
+                written = journal.write()
+                if written:
+                    self.bytes_written += written
+                    self.fsyncs += 1
+
+    def close(self) -> None:
+        self._closing.set()
+        self.wakeup.set()
+        self._writer.join()
+        self.flush()
+        with self._io_lock:
+            for journal in self._journals.values():
+                if journal.handle is not None:
+                    journal.handle.close()
+                    journal.handle = None
+
+    def _run_writer(self) -> None:
+        while not self._closing.is_set():
+            self.wakeup.wait()
+            self._closing.wait(self._flush_delay)
+            self.wakeup.clear()
+            try:
+                self.flush()
+            except OSError:
+                logger.exception("Failed to write edit journals to %s", self.directory)
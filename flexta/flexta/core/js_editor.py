@@ -0,0 +1,8 @@
+from __future__ import annotations
+
+from .editor import EditorDocument
+
+
+class JsDocument(EditorDocument):
+    language = "javascript"
+    suffixes = (".js", ".mjs", ".cjs")
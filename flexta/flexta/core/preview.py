@@ -0,0 +1,798 @@
+from __future__ import annotations
+
+from collections import Counter, OrderedDict, deque
+from dataclasses import dataclass, field
+from functools import partial
+from html.parser import HTMLParser
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import itertools
+import json
+import logging
+import mimetypes
+import os
+from pathlib import Path
+import re
+import threading
+import time
+from typing import Callable, Optional, Union
+from urllib.parse import quote, unquote, urlsplit
+
+from PySide6.QtCore import QObject, QTimer, Signal
+
+from flexta.utils.metrics import TimingStats
+
+from .editor import EditorDocument, TextSnapshot
+
+
+_DEFAULT_DEBOUNCE_MS = 120
+_MAX_SAMPLES = 256
+_CACHE_BYTES = 64 * 1024 * 1024
+# Larger files are streamed from disk (sendfile where the OS has it) rather
+# than held in the cache.
+_CACHE_ENTRY_LIMIT = 2 * 1024 * 1024
+_STREAM_CHUNK = 1 << 20
+_RANGE = re.compile(r"bytes=(\d*)-(\d*)$")
+_TEXT_TYPES = ("text/", "application/javascript", "application/json", "image/svg+xml")
+
+logger = logging.getLogger(__name__)
+
+_VOID_ELEMENTS = frozenset(
+    "area base br col embed hr img input link meta param source track wbr".split()
+)
+# Top-level elements a browser puts in <head> when a page has no <body> tag.
+_HEAD_ELEMENTS = frozenset("base link meta noscript script style template title".split())
+
+# Applies a list of operations in the page and reports whether it could. Every
+# target is located and tag-checked first, so a page whose DOM no longer
+# matches the parsed source (scripts moved nodes, the parser disagreed) is
+# left untouched and reloaded instead. Reading offsetHeight forces style and
+# layout before the result is returned, so the round trip covers the work a
+# paint needs.
+_PATCH_RUNTIME = """(function (operations) {
+  function find(path, tags) {
+    var node = document.body;
+    for (var i = 0; node && i < path.length; i++) {
+      node = node.children[path[i]];
+      if (!node || node.tagName.toLowerCase() !== tags[i]) return null;
+    }
+    return node;
+  }
+  var targets = [];
+  for (var i = 0; i < operations.length; i++) {
+    var op = operations[i], target = null;
+    if (op.op === "inner" || op.op === "attrs") target = find(op.path, op.tags);
+    else if (op.op === "splice") {
+      target = find(op.path, op.tags);
+      if (target && op.index + op.remove > target.children.length) target = null;
+    }
+    else if (op.op === "style") target = document.querySelectorAll("style:not([data-flexta-source])")[op.index];
+    else if (op.op === "sheet") {
+      // The <style> an earlier patch put in for the sheet, else its <link>;
+      // a sheet the page does not use (an @import, say) needs a reload.
+      target = document.querySelector('style[data-flexta-source="' + op.url + '"]');
+      var links = target ? [] : document.querySelectorAll('link[rel~="stylesheet"]');
+      for (var j = 0; j < links.length; j++) {
+        if (links[j].href.split(/[?#]/)[0] === op.url) { target = links[j]; break; }
+      }
+    }
+    else target = document;
+    if (!target) return false;
+    targets.push(target);
+  }
+  for (var i = 0; i < operations.length; i++) {
+    var op = operations[i], target = targets[i];
+    if (op.op === "inner") target.innerHTML = op.html;
+    else if (op.op === "splice") {
+      for (var j = 0; j < op.remove; j++) target.children[op.index].remove();
+      var before = target.children[op.index];
+      if (before) before.insertAdjacentHTML("beforebegin", op.html);
+      else target.insertAdjacentHTML("beforeend", op.html);
+    }
+    else if (op.op === "style") target.textContent = op.css;
+    else if (op.op === "title") document.title = op.text;
+    else if (op.op === "attrs") {
+      for (var j = target.attributes.length - 1; j >= 0; j--) {
+        var name = target.attributes[j].name;
+        if (!(name in op.attrs)) target.removeAttribute(name);
+      }
+      for (var name in op.attrs) target.setAttribute(name, op.attrs[name]);
+    } else if (op.op === "sheet") {
+      if (target.tagName === "LINK") {
+        var style = document.createElement("style");
+        style.setAttribute("data-flexta-source", op.url);
+        target.after(style);
+        target.disabled = true;
+        target = style;
+      }
+      target.textContent = op.css;
+    }
+  }
+  void document.body.offsetHeight;
+  return true;
+})(%s)"""
+
+
+class _Node:
+    __slots__ = ("tag", "attrs", "children", "texts", "start", "inner_start", "inner_end", "signature")
+
+    def __init__(self, tag: str, attrs: tuple, start: int, inner_start: int) -> None:
+        self.tag = tag
+        self.attrs = attrs
+        self.children: list[_Node] = []
+        # texts[k] is the raw text before children[k]; the last entry follows
+        # the last child.
+        self.texts: list[str] = [""]
+        self.start = start
+        self.inner_start = inner_start
+        self.inner_end = inner_start
+        self.signature = 0
+
+
+class _PageParser(HTMLParser):
+    def __init__(self, source: str) -> None:
+        super().__init__(convert_charrefs=False)
+        self._source = source
+        self._line_starts = [0] + [index + 1 for index, char in enumerate(source) if char == "\n"]
+        self.root = _Node("#document", (), 0, 0)
+        self._stack = [self.root]
+
+    def _offset(self) -> int:
+        line, column = self.getpos()
+        return self._line_starts[line - 1] + column
+
+    def handle_starttag(self, tag: str, attrs: list) -> None:
+        start = self._offset()
+        end = start + len(self.get_starttag_text() or "")
+        node = _Node(tag, tuple(attrs), start, end)
+        parent = self._stack[-1]
+        parent.children.append(node)
+        parent.texts.append("")
+        if tag in _VOID_ELEMENTS:
+            node.inner_end = end
+        else:
+            self._stack.append(node)
+
+    def handle_startendtag(self, tag: str, attrs: list) -> None:
+        start = self._offset()
+        end = start + len(self.get_starttag_text() or "")
+        node = _Node(tag, tuple(attrs), start, end)
+        self._stack[-1].children.append(node)
+        self._stack[-1].texts.append("")
+
+    def handle_endtag(self, tag: str) -> None:
+        if not any(node.tag == tag for node in self._stack[1:]):
+            return
+        end = self._offset()
+        while self._stack[-1].tag != tag:
+            self._stack.pop().inner_end = end
+        self._stack.pop().inner_end = end
+
+    def _text(self, text: str) -> None:
+        self._stack[-1].texts[-1] += text
+
+    def handle_data(self, data: str) -> None:
+        self._text(data)
+
+    def handle_entityref(self, name: str) -> None:
+        self._text(f"&{name};")
+
+    def handle_charref(self, name: str) -> None:
+        self._text(f"&#{name};")
+
+    def handle_comment(self, data: str) -> None:
+        self._text(f"<!--{data}-->")
+
+    def close(self) -> None:
+        super().close()
+        while len(self._stack) > 1:
+            self._stack.pop().inner_end = len(self._source)
+
+
+def _sign(node: _Node) -> int:
+    # Style contents are left out: stylesheet edits are swapped separately
+    # and must not also show up as a changed subtree.
+    for child in node.children:
+        _sign(child)
+    texts = () if node.tag == "style" else tuple(node.texts)
+    node.signature = hash((node.tag, node.attrs, texts, tuple(child.signature for child in node.children)))
+    return node.signature
+
+
+@dataclass
+class _Page:
+    source: str
+    body: _Node
+    # What a patch cannot reach: elements outside the body other than style
+    # and title, and every script.
+    fixed: tuple
+    styles: list[str]
+    title: Optional[str]
+
+
+def _walk(node: _Node):
+    for child in node.children:
+        yield child
+        yield from _walk(child)
+
+
+def _parse_page(source: str) -> _Page:
+    parser = _PageParser(source)
+    parser.feed(source)
+    parser.close()
+    root = parser.root
+    _sign(root)
+    elements = list(_walk(root))
+    body = next((node for node in elements if node.tag == "body"), None)
+    if body is None:
+        # No <body> tag: the browser builds one from the top-level content.
+        top = root.children
+        if len(top) == 1 and top[0].tag == "html":
+            top = top[0].children
+        body = _Node("body", (), 0, 0)
+        body.children = [node for node in top if node.tag not in _HEAD_ELEMENTS and node.tag != "head"]
+        body.texts = [""] * (len(body.children) + 1)
+        _sign(body)
+    body_elements = set(map(id, _walk(body)))
+    styles = [source[node.inner_start:node.inner_end] for node in elements if node.tag == "style"]
+    title = next((source[node.inner_start:node.inner_end] for node in elements if node.tag == "title"), None)
+    fixed = tuple(
+        (node.tag, node.attrs, tuple(node.texts))
+        for node in elements
+        if node.tag == "script"
+        or (node is not body and id(node) not in body_elements and node.tag not in ("style", "title"))
+    )
+    return _Page(source, body, fixed, styles, title)
+
+
+def _diff_node(old: _Node, new: _Node, source: str, path: list[int], tags: list[str], operations: list) -> None:
+    if old.signature == new.signature:
+        return
+    if old.attrs != new.attrs:
+        operations.append({"op": "attrs", "path": list(path), "tags": list(tags), "attrs": dict(new.attrs)})
+    same_shape = (
+        old.texts == new.texts
+        and len(old.children) == len(new.children)
+        and all(a.tag == b.tag for a, b in zip(old.children, new.children))
+    )
+    if not same_shape or new.tag == "style":
+        html = source[new.inner_start:new.inner_end] if new.inner_end > new.inner_start else ""
+        if not html and new.children:
+            # A synthetic body has no span of its own.
+            html = source[new.children[0].start:new.children[-1].inner_end]
+        operations.append({"op": "inner", "path": list(path), "tags": list(tags), "html": html})
+        return
+    for index, (a, b) in enumerate(zip(old.children, new.children)):
+        path.append(index)
+        tags.append(b.tag)
+        _diff_node(a, b, source, path, tags, operations)
+        path.pop()
+        tags.pop()
+
+
+def diff_pages(old: _Page, new: _Page) -> Optional[list[dict]]:
+    # The operations turning the rendered old page into new, or None when
+    # only a reload can: scripts or head elements changed, or a style/title
+    # element came or went.
+    if old.fixed != new.fixed or len(old.styles) != len(new.styles) or (old.title is None) != (new.title is None):
+        return None
+    operations: list[dict] = []
+    if old.title != new.title:
+        operations.append({"op": "title", "text": new.title})
+    for index, (before, after) in enumerate(zip(old.styles, new.styles)):
+        if before != after:
+            operations.append({"op": "style", "index": index, "css": after})
+    _diff_node(old.body, new.body, new.source, [], [], operations)
+    return operations
+
+
+def patch_script(operations: list[dict]) -> str:
+    return _PATCH_RUNTIME % json.dumps(operations)
+
+
+@dataclass(frozen=True)
+class PreviewUpdate:
+    id: int
+    # "patch" (run script in the page) or "reload" (load html at base_url).
+    kind: str
+    # What changed: any of "css", "html", "js".
+    changes: frozenset
+    script: str = ""
+    html: str = ""
+    base_url: str = ""
+    operations: tuple = ()
+    # perf_counter() of the earliest edit this update contains.
+    edited_at: float = field(default=0.0, compare=False)
+
+
+@dataclass(frozen=True)
+class PreviewMetrics:
+    updates: dict
+    patches: int
+    reloads: int
+    fallbacks: int
+    # First edit to the page confirming the update was applied and laid out.
+    latency: TimingStats
+
+
+class PreviewPipeline(QObject):
+    # Turns edits to the previewed page and the stylesheets and scripts it
+    # uses into the cheapest update that shows them: stylesheet text swaps
+    # and DOM subtree patches are batched into one script run in the page;
+    # script changes (or anything the diff cannot express) reload it.
+    # Views emit painted()/failed() back so latency covers the whole trip.
+    update_ready = Signal(object)
+
+    def __init__(
+        self,
+        debounce_ms: int = _DEFAULT_DEBOUNCE_MS,
+        server: Optional["PreviewServer"] = None,
+        parent: Optional[QObject] = None,
+    ) -> None:
+        super().__init__(parent)
+        # With a server, the page and its assets load over HTTP and open
+        # documents are served from memory; otherwise from file:// URLs.
+        self.server = server
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(debounce_ms)
+        self._timer.timeout.connect(self.flush)
+        self._ids = itertools.count(1)
+        self._page_document: Optional[EditorDocument] = None
+        self._page: Optional[_Page] = None
+        self._resources: set[EditorDocument] = set()
+        self._dirty: set[EditorDocument] = set()
+        self._edited_at: Optional[float] = None
+        self._in_flight: dict[int, PreviewUpdate] = {}
+        self._counts: Counter = Counter()
+        self._latency_ms: deque[float] = deque(maxlen=_MAX_SAMPLES)
+
+    def set_page(self, document: EditorDocument) -> PreviewUpdate:
+        if self._page_document is not None:
+            self._page_document.text_changed.disconnect(self._handle_text_changed)
+        self._page_document = document
+        document.text_changed.connect(self._handle_text_changed)
+        if self.server is not None:
+            self.server.open_document(document)
+        self._dirty.clear()
+        self._edited_at = time.perf_counter()
+        update = self._reload(frozenset(("html",)))
+        self.update_ready.emit(update)
+        return update
+
+    def track(self, document: EditorDocument) -> None:
+        if document not in self._resources:
+            self._resources.add(document)
+            document.text_changed.connect(self._handle_text_changed)
+            if self.server is not None:
+                self.server.open_document(document)
+
+    def untrack(self, document: EditorDocument) -> None:
+        if document in self._resources:
+            self._resources.discard(document)
+            self._dirty.discard(document)
+            document.text_changed.disconnect(self._handle_text_changed)
+            if self.server is not None:
+                self.server.close_document(document)
+
+    def flush(self) -> Optional[PreviewUpdate]:
+        self._timer.stop()
+        if not self._dirty or self._page_document is None:
+            return None
+        dirty, self._dirty = self._dirty, set()
+        changes = set()
+        operations: list[dict] = []
+        reload = False
+        for document in dirty:
+            if document is self._page_document:
+                changes.add("html")
+                page = _parse_page(document.text())
+                page_operations = diff_pages(self._page, page) if self._page is not None else None
+                if page_operations is None:
+                    reload = True
+                else:
+                    operations.extend(page_operations)
+                self._page = page
+            elif document.language == "css":
+                if document.path is None:
+                    # No URL for the page to load it by, so nothing to patch.
+                    continue
+                changes.add("css")
+                operations.append({"op": "sheet", "url": self._url(document.path), "css": document.text()})
+            else:
+                changes.add("js")
+                reload = True
+        if reload:
+            update = self._reload(frozenset(changes))
+        elif not operations:
+            self._edited_at = None
+            return None
+        else:
+            update = PreviewUpdate(
+                id=next(self._ids),
+                kind="patch",
+                changes=frozenset(changes),
+                script=patch_script(operations),
+                operations=tuple(operations),
+                edited_at=self._edited_at,
+            )
+        self._edited_at = None
+        self._in_flight[update.id] = update
+        self._counts.update(update.changes)
+        self._counts[update.kind] += 1
+        self.update_ready.emit(update)
+        return update
+
+    def painted(self, update: PreviewUpdate) -> None:
+        if self._in_flight.pop(update.id, None) is not None and update.edited_at:
+            self._latency_ms.append((time.perf_counter() - update.edited_at) * 1000)
+
+    def failed(self, update: PreviewUpdate) -> None:
+        # The page could not take the patch; reload it to its current source.
+        if self._in_flight.pop(update.id, None) is None or self._page_document is None:
+            return
+        self._counts["fallback"] += 1
+        self._edited_at = update.edited_at
+        reload = self._reload(update.changes)
+        self._edited_at = None
+        self._in_flight[reload.id] = reload
+        self.update_ready.emit(reload)
+
+    def discard(self, update: PreviewUpdate) -> None:
+        # A later update made this one moot before the view showed it.
+        self._in_flight.pop(update.id, None)
+
+    def current_source(self) -> Optional[str]:
+        return self._page.source if self._page is not None else None
+
+    def metrics(self) -> PreviewMetrics:
+        return PreviewMetrics(
+            updates={kind: self._counts[kind] for kind in ("css", "html", "js")},
+            patches=self._counts["patch"],
+            reloads=self._counts["reload"],
+            fallbacks=self._counts["fallback"],
+            latency=TimingStats.from_samples(self._latency_ms),
+        )
+
+    def _reload(self, changes: frozenset) -> PreviewUpdate:
+        document = self._page_document
+        source = document.text()
+        self._page = _parse_page(source)
+        base_url = self._url(Path(document.path).parent) + "/" if document.path is not None else ""
+        update = PreviewUpdate(
+            id=next(self._ids),
+            kind="reload",
+            changes=changes,
+            html=source,
+            base_url=base_url,
+            edited_at=self._edited_at or 0.0,
+        )
+        self._in_flight[update.id] = update
+        return update
+
+    def _url(self, path: Optional[Path]) -> str:
+        if path is None:
+            return ""
+        path = Path(path).resolve()
+        if self.server is not None and self.server.contains(path):
+            return self.server.url_for(path)
+        return path.as_uri()
+
+    def _handle_text_changed(self, position: int, removed: int, added: int) -> None:
+        self._dirty.add(self.sender())
+        if self._edited_at is None:
+            self._edited_at = time.perf_counter()
+        self._timer.start()
+
+
+class _ByteCache:
+    # LRU of whole small files: path -> (etag, body, content type).
+    def __init__(self, max_bytes: int) -> None:
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[str, tuple[str, bytes, str]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[tuple[str, bytes, str]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key: str, entry: tuple[str, bytes, str]) -> None:
+        if len(entry[1]) > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.size -= len(previous[1])
+            self._entries[key] = entry
+            self.size += len(entry[1])
+            while self.size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.size -= len(evicted[1])
+
+    def discard(self, key: str) -> None:
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self.size -= len(entry[1])
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+
+def _content_type(path: Path) -> str:
+    content_type = mimetypes.guess_type(path.name)[0] or "application/octet-stream"
+    if content_type.startswith(_TEXT_TYPES):
+        content_type += "; charset=utf-8"
+    return content_type
+
+
+def _disk_etag(status: os.stat_result) -> str:
+    return f'"{status.st_mtime_ns:x}-{status.st_size:x}"'
+
+
+def _byte_range(header: Optional[str], size: int) -> Optional[tuple[int, int]]:
+    # One "bytes=start-end" range as (start, stop), None for a whole-file
+    # response; multipart ranges are answered with the whole file.
+    if not header:
+        return None
+    match = _RANGE.match(header.strip())
+    if match is None:
+        return None
+    first, last = match.groups()
+    if not first:
+        if not last:
+            return None
+        # The last N bytes; none of them for N = 0 or an empty file.
+        if int(last) == 0 or size == 0:
+            raise ValueError(header)
+        return max(0, size - int(last)), size
+    start = int(first)
+    stop = min(size, int(last) + 1) if last else size
+    if start >= size or stop <= start:
+        raise ValueError(header)
+    return start, stop
+
+
+class _AssetHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_version = "FlextaPreview"
+    # Headers and body go out in separate writes; with Nagle on, each
+    # keep-alive response would wait for the client's delayed ACK (~40 ms).
+    disable_nagle_algorithm = True
+    # (start, stop) of the body being sent, set by _send_headers.
+    range = (0, 0)
+
+    def do_GET(self) -> None:
+        self.server.preview._serve(self, send_body=True)
+
+    def do_HEAD(self) -> None:
+        self.server.preview._serve(self, send_body=False)
+
+    def log_message(self, format: str, *args) -> None:
+        logger.debug("preview %s - %s", self.address_string(), format % args)
+
+
+class _AssetHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address: tuple[str, int], preview: "PreviewServer") -> None:
+        super().__init__(address, _AssetHandler)
+        self.preview = preview
+
+    def handle_error(self, request, client_address) -> None:
+        # Browsers drop connections mid-response all the time (navigation,
+        # cancelled image loads); that is not worth a traceback.
+        logger.debug("Preview request from %s failed", client_address, exc_info=True)
+
+
+class PreviewServer:
+    # Serves one project on a loopback port. Documents open in the editor
+    # are served from their latest snapshot, so the preview shows unsaved
+    # text; other files come from an LRU byte cache (cleared per path by
+    # ProjectWatcher.files_changed through invalidate_files()), or are
+    # streamed when large. Every
+    # response carries an ETag and "no-cache", so reloads revalidate and
+    # unchanged assets cost a 304.
+    def __init__(
+        self,
+        root: Union[str, Path],
+        port: int = 0,
+        cache_bytes: int = _CACHE_BYTES,
+        entry_limit: int = _CACHE_ENTRY_LIMIT,
+    ) -> None:
+        self.root = Path(root).resolve()
+        self.port = port
+        self.cache = _ByteCache(cache_bytes)
+        self.entry_limit = entry_limit
+        self._httpd: Optional[_AssetHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        # path -> (version, latest snapshot), and the encoded body of the
+        # last version sent. Versions are unique across documents and
+        # reopenings, so they double as ETags.
+        self._versions = itertools.count(1)
+        self._snapshots: dict[str, tuple[int, TextSnapshot]] = {}
+        self._encoded: dict[str, tuple[int, bytes]] = {}
+        self._listeners: dict[EditorDocument, tuple[str, Callable]] = {}
+
+    @property
+    def url(self) -> str:
+        if self._httpd is None:
+            return ""
+        return f"http://127.0.0.1:{self._httpd.server_address[1]}"
+
+    def start(self) -> str:
+        if self._httpd is None:
+            self._httpd = _AssetHTTPServer(("127.0.0.1", self.port), self)
+            self._thread = threading.Thread(
+                target=self._httpd.serve_forever, name="flexta-preview-server", daemon=True
+            )
+            self._thread.start()
+        return self.url
+
+    def stop(self) -> None:
+        if self._httpd is None:
+            return
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        self._thread.join()
+        self._httpd = None
+        self._thread = None
+
+    def contains(self, path: Union[str, Path]) -> bool:
+        return Path(path).resolve().is_relative_to(self.root)
+
+    def url_for(self, path: Union[str, Path]) -> str:
+        relative = Path(path).resolve().relative_to(self.root).as_posix()
+        return f"{self.url}/{quote(relative)}" if relative != "." else self.url
+
+    def open_document(self, document: EditorDocument) -> None:
+        if document.path is None or document in self._listeners or not self.contains(document.path):
+            return
+        key = os.fspath(Path(document.path).resolve())
+        listener = partial(self._store_snapshot, key, document)
+        self._listeners[document] = (key, listener)
+        document.text_changed.connect(listener)
+        self._store_snapshot(key, document)
+
+    def close_document(self, document: EditorDocument) -> None:
+        entry = self._listeners.pop(document, None)
+        if entry is None:
+            return
+        key, listener = entry
+        document.text_changed.disconnect(listener)
+        with self._lock:
+            self._snapshots.pop(key, None)
+            self._encoded.pop(key, None)
+
+    def invalidate(self, path: Optional[Union[str, Path]] = None) -> None:
+        if path is None:
+            self.cache.clear()
+        else:
+            self.cache.discard(os.fspath(Path(path).resolve()))
+
+    def invalidate_files(self, paths: list[str]) -> None:
+        for path in paths:
+            self.cache.discard(os.fspath(Path(path).resolve()))
+
+    def _store_snapshot(self, key: str, document: EditorDocument, *args) -> None:
+        # Called on the GUI thread; snapshots are immutable, so handler
+        # threads read them without further locking.
+        snapshot = document.snapshot()
+        with self._lock:
+            self._snapshots[key] = (next(self._versions), snapshot)
+
+    def _resolve(self, url_path: str) -> Optional[Path]:
+        relative = unquote(url_path).lstrip("/")
+        path = (self.root / relative).resolve()
+        if not path.is_relative_to(self.root):
+            return None
+        if path.is_dir():
+            path = path / "index.html"
+        return path
+
+    def _memory_entry(self, key: str) -> Optional[tuple[str, bytes, str]]:
+        with self._lock:
+            current = self._snapshots.get(key)
+            encoded = self._encoded.get(key)
+        if current is None:
+            return None
+        version, snapshot = current
+        if encoded is None or encoded[0] != version:
+            encoded = (version, snapshot.text().encode("utf-8"))
+            with self._lock:
+                self._encoded[key] = encoded
+        return f'"m{version:x}"', encoded[1], _content_type(Path(key))
+
+    def _serve(self, handler: _AssetHandler, send_body: bool) -> None:
+        path = self._resolve(urlsplit(handler.path).path)
+        if path is None:
+            handler.send_error(HTTPStatus.NOT_FOUND)
+            return
+        key = os.fspath(path)
+        entry = self._memory_entry(key) or self.cache.get(key)
+        try:
+            if entry is None:
+                status = os.stat(key)
+                if status.st_size > self.entry_limit:
+                    self._send_file(handler, path, status, send_body)
+                    return
+                with open(key, "rb") as handle:
+                    entry = (_disk_etag(status), handle.read(), _content_type(path))
+                self.cache.put(key, entry)
+        except (FileNotFoundError, IsADirectoryError, NotADirectoryError):
+            handler.send_error(HTTPStatus.NOT_FOUND)
+            return
+        except OSError:
+            handler.send_error(HTTPStatus.FORBIDDEN)
+            return
+        etag, body, content_type = entry
+        if not self._send_headers(handler, etag, content_type, len(body)):
+            return
+        if send_body:
+            start, stop = handler.range
+            handler.wfile.write(memoryview(body)[start:stop])
+
+    def _send_headers(self, handler: _AssetHandler, etag: str, content_type: str, size: int) -> bool:
+        # Writes the status line and headers; True when a body should follow.
+        matches = handler.headers.get("If-None-Match")
+        if matches is not None and (matches.strip() == "*" or etag in (tag.strip() for tag in matches.split(","))):
+            handler.send_response(HTTPStatus.NOT_MODIFIED)
+            handler.send_header("ETag", etag)
+            handler.end_headers()
+            return False
+        try:
+            byte_range = _byte_range(handler.headers.get("Range"), size)
+        except ValueError:
+            handler.send_response(HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE)
+            handler.send_header("Content-Range", f"bytes */{size}")
+            handler.send_header("Content-Length", "0")
+            handler.end_headers()
+            return False
+        if byte_range is None:
+            handler.range = (0, size)
+            handler.send_response(HTTPStatus.OK)
+        else:
+            handler.range = byte_range
+            handler.send_response(HTTPStatus.PARTIAL_CONTENT)
+            handler.send_header("Content-Range", f"bytes {byte_range[0]}-{byte_range[1] - 1}/{size}")
+        handler.send_header("Content-Type", content_type)
+        handler.send_header("Content-Length", str(handler.range[1] - handler.range[0]))
+        handler.send_header("ETag", etag)
+        handler.send_header("Cache-Control", "no-cache")
+        handler.send_header("Accept-Ranges", "bytes")
+        handler.end_headers()
+        return True
+
+    def _send_file(self, handler: _AssetHandler, path: Path, status: os.stat_result, send_body: bool) -> None:
+        if not self._send_headers(handler, _disk_etag(status), _content_type(path), status.st_size) or not send_body:
+            return
+        start, stop = handler.range
+        with open(path, "rb") as handle:
+            handler.wfile.flush()
+            if hasattr(os, "sendfile"):
+                socket_fd = handler.connection.fileno()
+                while start < stop:
+                    sent = os.sendfile(socket_fd, handle.fileno(), start, min(_STREAM_CHUNK, stop - start))
+                    if sent == 0:
+                        break
+                    start += sent
+                return
+            handle.seek(start)
+            while start < stop:
+                chunk = handle.read(min(_STREAM_CHUNK, stop - start))
+                if not chunk:
+                    break
+                handler.wfile.write(chunk)
+                start += len(chunk)
@@ -0,0 +1,205 @@
+from __future__ import annotations
+
+from concurrent.futures import FIRST_EXCEPTION, ThreadPoolExecutor, wait
+import errno
+import os
+from pathlib import Path
+import re
+import shutil
+import sys
+import threading
+from typing import BinaryIO, Callable, Mapping, Optional
+
+from flexta.exceptions import FlextaError
+from flexta.utils.resource_loader import Template, TemplateFile
+
+
+_CHUNK_SIZE = 1 << 20
+_DEFAULT_WORKERS = 4
+# Longest "{{ name }}" carried over a chunk boundary while substituting.
+_MAX_PLACEHOLDER = 128
+_PLACEHOLDER = re.compile(rb"\{\{\s*([A-Za-z_][A-Za-z0-9_]*)\s*\}\}")
+_TEXT_SUFFIXES = frozenset(
+    {".html", ".htm", ".css", ".js", ".mjs", ".ts", ".json", ".md", ".txt", ".svg", ".xml"}
+)
+# ioctl(FICLONE) asks btrfs/XFS/bcachefs for a copy-on-write clone.
+_FICLONE = 0x40049409 if sys.platform.startswith("linux") else None
+_REFLINK_UNSUPPORTED = {errno.EOPNOTSUPP, errno.EXDEV, errno.EINVAL, errno.ENOTTY, errno.EBADF}
+
+ProgressCallback = Callable[[int, int], None]
+
+
+class SeedCancelled(FlextaError):
+    pass
+
+
+def _try_reflink(source: Path, destination: Path) -> bool:
+    if _FICLONE is None:
+        return False
+    import fcntl
+
+    with source.open("rb") as source_handle, destination.open("wb") as destination_handle:
+        try:
+            fcntl.ioctl(destination_handle.fileno(), _FICLONE, source_handle.fileno())
+        except OSError as error:
+            if error.errno in _REFLINK_UNSUPPORTED:
+                return False
+            raise
+    return True
+
+
+class ProjectSeeder:
+    def __init__(
+        self,
+        template: Template,
+        destination: Path,
+        variables: Optional[Mapping[str, str]] = None,
+        progress: Optional[ProgressCallback] = None,
+        max_workers: int = _DEFAULT_WORKERS,
+        allow_hardlinks: bool = False,
+    ) -> None:
+        self.template = template
+        self.destination = Path(destination)
+        self.max_workers = max_workers
+        # Hardlinked files share storage with the template, so editing one in
+        # the project would edit the template too. Only opt in for read-only
+        # template locations.
+        self.allow_hardlinks = allow_hardlinks
+        # Only templates that declare variables (or callers that pass some)
+        # are rewritten; everything else is cloned byte for byte.
+        self._substitutes = bool(template.variables or variables)
+        self._values = {
+            key: value.encode("utf-8")
+            for key, value in {
+                **template.variables,
+                "project_name": self.destination.name,
+                **(variables or {}),
+            }.items()
+        }
+        self._progress = progress
+        self._cancelled = threading.Event()
+        self._progress_lock = threading.Lock()
+        self._bytes_done = 0
+        self._reported_permille = -1
+        self._reflink_supported = True
+
+    @property
+    def total_bytes(self) -> int:
+        return self.template.total_size
+
+    def cancel(self) -> None:
+        self._cancelled.set()
+
+    def is_cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def run(self) -> None:
+        self.destination.mkdir(parents=True, exist_ok=False)
+        try:
+            self._check_cancelled()
+            root = self.destination.resolve()
+            jobs = []
+            for template_file in self.template.files:
+                target = (self.destination / template_file.path).resolve()
+                if root not in target.parents:
+                    raise FlextaError(f"Template file escapes the project: {template_file.path}")
+                target.parent.mkdir(parents=True, exist_ok=True)
+                jobs.append((template_file, target))
+
+            with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="flexta-seed") as pool:
+                futures = [pool.submit(self._seed_file, template_file, target) for template_file, target in jobs]
+                done, _ = wait(futures, return_when=FIRST_EXCEPTION)
+                if any(future.exception() is not None for future in done):
+                    self._cancelled.set()
+                for future in futures:
+                    future.result()
+            self._check_cancelled()
+        except BaseException:
+            shutil.rmtree(self.destination, ignore_errors=True)
+            raise
+        self._report(0, force=True)
+
+    def _check_cancelled(self) -> None:
+        if self._cancelled.is_set():
+            raise SeedCancelled(str(self.destination))
+
+    def _seed_file(self, template_file: TemplateFile, target: Path) -> None:
+        self._check_cancelled()
+        if self._substitutes and Path(template_file.path).suffix.lower() in _TEXT_SUFFIXES:
+            with template_file.open() as source, target.open("wb") as destination:
+                self._substitute(source, destination)
+        elif template_file.member is not None:
+            with template_file.open() as source, target.open("wb") as destination:
+                self._stream(source, destination)
+        elif self._link(template_file.source, target):
+            self._report(template_file.size)
+            return
+        else:
+            with template_file.source.open("rb") as source, target.open("wb") as destination:
+                self._stream(source, destination)
+        if template_file.member is None:
+            shutil.copystat(template_file.source, target)
+
+    def _link(self, source: Path, target: Path) -> bool:
+        if self._reflink_supported:
+            if _try_reflink(source, target):
+                shutil.copystat(source, target)
+                return True
+            self._reflink_supported = False
+        if self.allow_hardlinks:
+            try:
+                target.unlink(missing_ok=True)
+                os.link(source, target)
+                return True
+            except OSError:
+                pass
+        return False
+
+    def _stream(self, source: BinaryIO, destination: BinaryIO) -> None:
+        while True:
+            self._check_cancelled()
+            chunk = source.read(_CHUNK_SIZE)
+            if not chunk:
+                return
+            destination.write(chunk)
+            self._report(len(chunk))
+
+    def _substitute(self, source: BinaryIO, destination: BinaryIO) -> None:
+        values = self._values
+
+        def replace(match: re.Match) -> bytes:
+            return values.get(match.group(1).decode("ascii"), match.group(0))
+
+        carry = b""
+        while True:
+            self._check_cancelled()
+            chunk = source.read(_CHUNK_SIZE)
+            data = carry + chunk
+            carry = b""
+            if chunk:
+                # Hold back a trailing, still-open placeholder so it is
+                # substituted once the rest of it arrives in the next chunk.
+                window_start = max(0, len(data) - _MAX_PLACEHOLDER)
+                opening = data.rfind(b"{{", window_start)
+                if opening != -1 and data.find(b"}}", opening) == -1:
+                    carry, data = data[opening:], data[:opening]
+                elif data.endswith(b"{"):
+                    carry, data = data[-1:], data[:-1]
+            destination.write(_PLACEHOLDER.sub(replace, data))
+            if not chunk:
+                return
+            self._report(len(chunk))
+
+    def _report(self, num_bytes: int, force: bool = False) -> None:
+        if self._progress is None:
+            return
+        total = self.total_bytes
+        with self._progress_lock:
+            self._bytes_done += num_bytes
+            done = min(self._bytes_done, total)
+            # Thousands of tiny assets would otherwise flood the UI thread.
+            permille = done * 1000 // total if total else 1000
+            if permille == self._reported_permille and not force:
+                return
+            self._reported_permille = permille
+        self._progress(done, total)
@@ -0,0 +1,272 @@
+from __future__ import annotations
+
+import os
+from pathlib import Path
+import threading
+import time
+from typing import Iterable, Optional, Union
+
+from PySide6.QtCore import QFileSystemWatcher, QObject, QTimer, Signal
+
+from flexta.utils.file_utils import (
+    DEFAULT_EXCLUDES,
+    GITIGNORE,
+    FileTree,
+    TreeChange,
+    TreeScan,
+    list_directory,
+    root_rules,
+)
+
+
+_DEFAULT_DEBOUNCE_MS = 50
+# Directories per batch handed to the GUI thread. The root listing goes out
+# on its own so the explorer can paint before the walk goes deeper.
+_BATCH_DIRECTORIES = 256
+_BATCH_SECONDS = 0.05
+# More dirty directories than this in one debounce window (a checkout, an
+# npm install) is treated like a watcher overflow: one full rescan.
+_OVERFLOW_DIRECTORIES = 512
+# Without watches (inotify limit reached) the tree is kept current by
+# rescanning on this interval.
+_POLL_INTERVAL_MS = 5000
+
+
+def _parent(relative: str) -> str:
+    return relative.rpartition("/")[0]
+
+
+class ProjectWatcher(QObject):
+    # Keeps a FileTree of the project current. The initial scan runs off the
+    # GUI thread, breadth-first, and streams directory listings back in
+    # batches. Each listed directory is watched; a change event relists only
+    # that directory and applies the difference, and new folders are scanned
+    # as subtrees. A full rescan happens only when watches cannot be added
+    # or events arrive faster than directories can be relisted.
+    entries_added = Signal(list)
+    entries_removed = Signal(list)
+    # Absolute paths of files created, modified or deleted after the
+    # initial scan, for caches and indexes keyed by file.
+    files_changed = Signal(list)
+    scan_finished = Signal()
+
+    _batch_ready = Signal(object, bool, bool)
+
+    def __init__(
+        self,
+        root: Union[str, Path],
+        excludes: Iterable[str] = DEFAULT_EXCLUDES,
+        debounce_ms: int = _DEFAULT_DEBOUNCE_MS,
+        parent: Optional[QObject] = None,
+    ) -> None:
+        super().__init__(parent)
+        self.root = os.fspath(Path(root).resolve())
+        self.tree = FileTree()
+        self._root_rules = root_rules(excludes)
+        # What each listed directory's subdirectories inherit.
+        self._rules: dict[str, tuple] = {}
+        self._scans: list[tuple[TreeScan, threading.Thread]] = []
+        self._dirty: set[str] = set()
+        self._files: set[str] = set()
+        self._overflowed = False
+        self._watcher = QFileSystemWatcher(self)
+        self._watcher.directoryChanged.connect(self._handle_directory_changed)
+        self._watcher.fileChanged.connect(self._handle_file_changed)
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(debounce_ms)
+        self._timer.timeout.connect(self._flush)
+        self._poll = QTimer(self)
+        self._poll.setInterval(_POLL_INTERVAL_MS)
+        self._poll.timeout.connect(self._handle_poll)
+        self._batch_ready.connect(self._apply_batch)
+        self._started = 0.0
+        self.first_batch_seconds: Optional[float] = None
+        self.scan_seconds: Optional[float] = None
+        self.full_scans = 0
+        self.directory_rescans = 0
+
+    @property
+    def is_scanning(self) -> bool:
+        return any(thread.is_alive() for _, thread in self._scans)
+
+    @property
+    def overflowed(self) -> bool:
+        return self._overflowed
+
+    def start(self) -> None:
+        self._started = time.perf_counter()
+        self._scan("", self._root_rules, initial=True)
+
+    def stop(self) -> None:
+        self._timer.stop()
+        self._poll.stop()
+        for scan, _ in self._scans:
+            scan.cancel()
+        for _, thread in self._scans:
+            thread.join()
+        self._scans.clear()
+        watched = self._watcher.directories() + self._watcher.files()
+        if watched:
+            self._watcher.removePaths(watched)
+
+    def files(self) -> list[tuple[str, int]]:
+        # (absolute path, size) of every file in the tree, for project-wide
+        # search.
+        return [(self._absolute(path), size) for path, size in self.tree.file_sizes()]
+
+    def prioritize(self, path: Union[str, Path]) -> None:
+        # A folder the user expanded: list it ahead of the rest.
+        relative = self._relative(path)
+        for scan, _ in self._scans:
+            scan.prioritize(relative)
+
+    def watch_file(self, path: Union[str, Path]) -> None:
+        # Directory events miss in-place writes, so open documents are
+        # watched individually as well.
+        path = os.fspath(path)
+        self._files.add(path)
+        self._watcher.addPath(path)
+
+    def unwatch_file(self, path: Union[str, Path]) -> None:
+        path = os.fspath(path)
+        self._files.discard(path)
+        if path in self._watcher.files():
+            self._watcher.removePath(path)
+
+    def rescan(self) -> None:
+        # Relists everything and applies it as a diff, so consumers still
+        # get precise change signals.
+        self.full_scans += 1
+        for scan, _ in self._scans:
+            scan.cancel()
+        self._scan("", self._root_rules, initial=False)
+
+    def _relative(self, path: Union[str, Path]) -> str:
+        path = os.fspath(path)
+        if os.path.isabs(path):
+            path = os.path.relpath(path, self.root)
+        path = path.replace(os.sep, "/")
+        return "" if path == "." else path
+
+    def _absolute(self, relative: str) -> str:
+        return os.path.join(self.root, *relative.split("/")) if relative else self.root
+
+    def _scan(self, start: str, rules: tuple, initial: bool) -> None:
+        scan = TreeScan(self.root, start, rules)
+        thread = threading.Thread(target=self._run_scan, args=(scan, initial), name="flexta-project-scan", daemon=True)
+        self._scans = [running for running in self._scans if running[1].is_alive()]
+        self._scans.append((scan, thread))
+        thread.start()
+
+    def _run_scan(self, scan: TreeScan, initial: bool) -> None:
+        # Worker thread; the queued signal delivers batches to the GUI thread.
+        batch = []
+        first = True
+        flushed = time.perf_counter()
+        for listing in scan:
+            batch.append(listing)
+            now = time.perf_counter()
+            if first or len(batch) >= _BATCH_DIRECTORIES or now - flushed >= _BATCH_SECONDS:
+                self._batch_ready.emit(batch, initial, False)
+                batch = []
+                first = False
+                flushed = now
+        if not scan.cancelled:
+            self._batch_ready.emit(batch, initial, True)
+
+    def _apply_batch(self, batch: list, initial: bool, finished: bool) -> None:
+        if initial and batch and self.first_batch_seconds is None:
+            self.first_batch_seconds = time.perf_counter() - self._started
+        change = TreeChange()
+        listed = []
+        for relative, entries, rules in batch:
+            node = self.tree.node(relative)
+            if node is None or not node.is_dir:
+                # Removed since the worker listed it.
+                continue
+            if node.children is None:
+                listed.append(self._absolute(relative))
+            self._rules[relative] = rules
+            change.extend(self.tree.apply(relative, entries))
+        self._watch(listed)
+        self._publish(change, quiet=initial)
+        if finished and initial:
+            self.scan_seconds = time.perf_counter() - self._started
+            self.scan_finished.emit()
+
+    def _watch(self, directories: list[str]) -> None:
+        if not directories or self._overflowed:
+            return
+        failed = self._watcher.addPaths(directories)
+        # A directory removed since it was listed cannot be watched either;
+        # its parent's event takes it out of the tree.
+        if any(os.path.isdir(path) for path in failed):
+            # Out of inotify watches: stop adding them and keep the tree
+            # current by rescanning periodically instead.
+            self._overflowed = True
+            self._poll.start()
+
+    def _handle_poll(self) -> None:
+        if not self.is_scanning:
+            self.rescan()
+
+    def _handle_directory_changed(self, path: str) -> None:
+        self._dirty.add(self._relative(path))
+        self._timer.start()
+
+    def _handle_file_changed(self, path: str) -> None:
+        self._dirty.add(_parent(self._relative(path)))
+        self._timer.start()
+
+    def _flush(self) -> None:
+        dirty, self._dirty = self._dirty, set()
+        if len(dirty) > _OVERFLOW_DIRECTORIES:
+            self.rescan()
+            return
+        change = TreeChange()
+        for relative in sorted(dirty):
+            node = self.tree.node(relative)
+            if node is None or node.children is None:
+                continue
+            inherited = self._rules.get(_parent(relative), self._root_rules) if relative else self._root_rules
+            try:
+                entries, rules = list_directory(self.root, relative, inherited)
+            except OSError:
+                # Gone: the parent's own event removes it.
+                continue
+            self.directory_rescans += 1
+            self._rules[relative] = rules
+            listing = self.tree.apply(relative, entries)
+            change.extend(listing)
+            prefix = f"{relative}/" if relative else ""
+            # A .gitignore edit changes what belongs below every subfolder.
+            rules_changed = prefix + GITIGNORE in listing.added + listing.modified + listing.removed
+            for name, is_dir, _, _ in entries:
+                if is_dir and (rules_changed or node.children[name].children is None):
+                    self._scan(prefix + name, rules, initial=False)
+        # Saving by rename drops the watch on the replaced file.
+        missing = [path for path in self._files - set(self._watcher.files()) if os.path.exists(path)]
+        if missing:
+            self._watcher.addPaths(missing)
+        self._publish(change, quiet=False)
+
+    def _publish(self, change: TreeChange, quiet: bool) -> None:
+        if change.removed:
+            removed = [self._absolute(path) for path in change.removed]
+            stale = [
+                watched
+                for watched in self._watcher.directories()
+                if any(watched == path or watched.startswith(path + os.sep) for path in removed)
+            ]
+            if stale:
+                self._watcher.removePaths(stale)
+            self.entries_removed.emit(change.removed)
+        if change.added:
+            self.entries_added.emit(change.added)
+        if quiet:
+            return
+        added_files = [path for path in change.added if not self.tree.node(path).is_dir]
+        files = [self._absolute(path) for path in added_files + change.modified + change.removed_files]
+        if files:
+            self.files_changed.emit(files)
@@ -0,0 +1,450 @@
+from __future__ import annotations
+
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from dataclasses import dataclass
+from functools import lru_cache
+import logging
+import mmap
+import multiprocessing
+import os
+import re
+import shutil
+import tempfile
+import threading
+import time
+from typing import Iterable, Optional, Union
+
+from PySide6.QtCore import QObject, Signal
+
+
+# Files at least this large are searched through mmap: only the pages the
+# regex touches are read, and nothing is decoded but the matching lines.
+_MMAP_THRESHOLD = 1024 * 1024
+# Small files are read whole and grouped into tasks of about this many bytes.
+_BATCH_BYTES = 8 * 1024 * 1024
+_BATCH_FILES = 512
+# Searches smaller than this run on the coordinating thread: starting or
+# feeding worker processes costs more than the search itself.
+_INLINE_BYTES = 16 * 1024 * 1024
+# Tasks in flight per worker; the rest wait, so a cancelled search leaves
+# little queued work behind.
+_TASKS_PER_WORKER = 3
+_CHUNK_SECONDS = 0.05
+_BINARY_SNIFF = 8192
+_PREVIEW_CHARS = 240
+_DEFAULT_MAX_RESULTS = 20_000
+_MAX_MATCHES_PER_FILE = 1000
+
+logger = logging.getLogger(__name__)
+
+_REGEX_SPECIAL = set("\\.^$*+?{}[]|()")
+# Quantifiers that allow zero repetitions of what they follow.
+_OPTIONAL = frozenset("*?{")
+_QUANTIFIER = re.compile(r"\{\d*(?:,\d*)?\}")
+_INLINE_FLAGS = frozenset("aiLmsux-")
+_ASCII_LETTERS = re.compile(rb"[A-Za-z]+")
+# ASCII letters from most to least common in source code.
+_LETTER_FREQUENCY = b"etaoinsrlcdpmuhfgbyvwkxjqz"
+
+
+@dataclass(frozen=True)
+class SearchQuery:
+    pattern: str
+    regex: bool = False
+    case_sensitive: bool = False
+    whole_word: bool = False
+    max_results: int = _DEFAULT_MAX_RESULTS
+
+
+@dataclass(frozen=True)
+class SearchMatch:
+    # line is 0-based; column and length count characters of the line.
+    line: int
+    column: int
+    length: int
+    text: str
+
+
+@dataclass(frozen=True)
+class FileMatches:
+    path: str
+    matches: tuple[SearchMatch, ...]
+
+
+@dataclass(frozen=True)
+class SearchStats:
+    files: int
+    bytes: int
+    files_matched: int
+    matches: int
+    seconds: float
+    cancelled: bool
+    # Stopped at query.max_results.
+    truncated: bool
+
+
+def required_literal(pattern: str) -> str:
+    # The longest run of plain characters every match of pattern contains,
+    # or "" if there is none (top-level alternation, nothing but classes).
+    # Only the top level counts: groups and classes end a run, and so does
+    # a character that a quantifier may repeat zero times.
+    runs = [""]
+    depth = 0
+    index = 0
+    while index < len(pattern):
+        char = pattern[index]
+        step = 1
+        literal = None
+        if char == "\\" and index + 1 < len(pattern):
+            step = 2
+            if not pattern[index + 1].isalnum():
+                literal = pattern[index + 1]
+        elif char == "[":
+            # "]" first in a class (or after "^") is a member, not the end.
+            end = index + 1
+            if pattern[end:end + 1] == "^":
+                end += 1
+            if pattern[end:end + 1] == "]":
+                end += 1
+            end = pattern.find("]", end)
+            step = (end if end >= 0 else len(pattern)) - index + 1
+        elif char == "(":
+            # Inline flags such as (?i) change what the literal matches.
+            if pattern[index + 1:index + 2] == "?" and pattern[index + 2:index + 3] in _INLINE_FLAGS:
+                return ""
+            depth += 1
+        elif char == "{" and _QUANTIFIER.match(pattern, index):
+            # A repeat count, not text; it ends the run like any quantifier.
+            step = _QUANTIFIER.match(pattern, index).end() - index
+        elif char == ")":
+            depth = max(depth - 1, 0)
+        elif char == "|" and depth == 0:
+            return ""
+        elif char not in _REGEX_SPECIAL:
+            literal = char
+        following = pattern[index + step:index + step + 1]
+        if depth == 0 and literal is not None and following not in _OPTIONAL:
+            runs[-1] += literal
+            if following == "+":
+                runs.append("")
+        elif runs[-1]:
+            runs.append("")
+        index += step
+    return max(runs, key=len)
+
+
+def _needles(literal: bytes, case_sensitive: bool) -> tuple[bytes, ...]:
+    # Byte strings a file must contain at least one of to have a match of
+    # literal; () when there is nothing to look for. A bytes regex folds
+    # ASCII case only, so without ASCII letters the literal is found as is.
+    if case_sensitive or not _ASCII_LETTERS.search(literal):
+        return (literal,) if literal else ()
+    longest = max(_ASCII_LETTERS.split(literal), key=len)
+    if len(longest) >= 2:
+        return (longest,)
+    # Otherwise its rarest letter, in either case.
+    letter = bytes([max(set(literal.lower()) & set(_LETTER_FREQUENCY), key=_LETTER_FREQUENCY.index)])
+    return (letter, letter.upper())
+
+
+@lru_cache(maxsize=16)
+def compile_query(query: SearchQuery) -> tuple[re.Pattern, tuple[bytes, ...]]:
+    # The bytes regex, and needles for a cheap bytes.find() before it runs:
+    # a file containing none of them has no match. Searching bytes means
+    # files are never decoded whole; patterns and needles are UTF-8 encoded.
+    source = query.pattern if query.regex else re.escape(query.pattern)
+    if query.whole_word:
+        source = rf"\b(?:{source})\b"
+    flags = re.MULTILINE | (0 if query.case_sensitive else re.IGNORECASE)
+    regex = re.compile(source.encode("utf-8"), flags)
+    literal = required_literal(query.pattern) if query.regex else query.pattern
+    return regex, _needles(literal.encode("utf-8"), query.case_sensitive)
+
+
+def _contains_any(data, needles: tuple[bytes, ...]) -> bool:
+    return not needles or any(data.find(needle) >= 0 for needle in needles)
+
+
+# (path, [(line, column, length, text)])
+_FileResult = tuple[str, list[tuple[int, int, int, str]]]
+
+
+def _search_data(data, regex: re.Pattern, needles: tuple[bytes, ...], limit: int) -> list[tuple[int, int, int, str]]:
+    if b"\0" in data[:_BINARY_SNIFF]:
+        return []
+    if not _contains_any(data, needles):
+        return []
+    found = []
+    line = 0
+    counted = 0
+    # bytes can count newlines in place; an mmap region is sliced first.
+    count = data.count if isinstance(data, bytes) else (lambda needle, start, end: data[start:end].count(needle))
+    for match in regex.finditer(data):
+        start, end = match.span()
+        if start == end:
+            continue
+        line += count(b"\n", counted, start)
+        counted = start
+        line_start = data.rfind(b"\n", 0, start) + 1
+        line_end = data.find(b"\n", start)
+        if line_end < 0:
+            line_end = len(data)
+        prefix = data[line_start:start].decode("utf-8", "replace")
+        text = data[line_start:min(line_end, line_start + _PREVIEW_CHARS * 4)].decode("utf-8", "replace")
+        length = len(match.group().decode("utf-8", "replace"))
+        found.append((line, len(prefix), length, text.rstrip("\r")[:_PREVIEW_CHARS]))
+        if len(found) >= limit:
+            break
+    return found
+
+
+def search_file(path: str, regex: re.Pattern, needles: tuple[bytes, ...], limit: int = _MAX_MATCHES_PER_FILE) -> list:
+    try:
+        with open(path, "rb") as handle:
+            size = os.fstat(handle.fileno()).st_size
+            if size == 0:
+                return []
+            if size < _MMAP_THRESHOLD:
+                return _search_data(handle.read(), regex, needles, limit)
+            with mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                return _search_data(data, regex, needles, limit)
+    except (OSError, ValueError):
+        return []
+
+
+def _search_batch(query: SearchQuery, files: list[tuple[str, int]]) -> tuple[list[_FileResult], int]:
+    # Runs in a worker process. Returns the files with matches and the
+    # bytes searched.
+    regex, needles = compile_query(query)
+    results = []
+    for path, _ in files:
+        found = search_file(path, regex, needles)
+        if found:
+            results.append((path, found))
+    return results, sum(size for _, size in files)
+
+
+def _batches(files: Iterable[tuple[str, int]]) -> Iterable[list[tuple[str, int]]]:
+    # Large files one per task, small ones grouped; scanner order is kept so
+    # results for the top of the tree come first.
+    batch: list[tuple[str, int]] = []
+    batch_bytes = 0
+    for path, size in files:
+        if size >= _MMAP_THRESHOLD:
+            yield [(path, size)]
+            continue
+        batch.append((path, size))
+        batch_bytes += size
+        if batch_bytes >= _BATCH_BYTES or len(batch) >= _BATCH_FILES:
+            yield batch
+            batch = []
+            batch_bytes = 0
+    if batch:
+        yield batch
+
+
+class _Search:
+    def __init__(self, search_id: int, query: SearchQuery, files: list[tuple[str, int]]) -> None:
+        self.id = search_id
+        self.query = query
+        self.files = files
+        self.cancelled = threading.Event()
+
+
+class SearchEngine(QObject):
+    # Project-wide find and replace. A search runs on a coordinating thread
+    # that splits the file list into tasks for a process pool (the regex
+    # engine holds the GIL, so threads would not scale) and streams matches
+    # back in chunks. Starting a new search cancels the previous one:
+    # queued tasks are dropped and late results are ignored.
+    results_ready = Signal(int, list)
+    search_finished = Signal(int, object)
+
+    def __init__(self, workers: Optional[int] = None, parent: Optional[QObject] = None) -> None:
+        super().__init__(parent)
+        self.workers = workers or os.cpu_count() or 1
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._pool_lock = threading.Lock()
+        self._current: Optional[_Search] = None
+        self._thread: Optional[threading.Thread] = None
+        self._ids = 0
+
+    def search(self, query: SearchQuery, files: Iterable[tuple[str, int]]) -> int:
+        # files: (path, size) pairs, e.g. ProjectWatcher.files(). Returns the
+        # id that results_ready and search_finished carry.
+        self.cancel()
+        self._ids += 1
+        search = _Search(self._ids, query, list(files))
+        self._current = search
+        self._thread = threading.Thread(target=self._run, args=(search,), name="flexta-search", daemon=True)
+        self._thread.start()
+        return search.id
+
+    def cancel(self) -> None:
+        if self._current is not None:
+            self._current.cancelled.set()
+            self._current = None
+
+    def wait(self, timeout: Optional[float] = None) -> None:
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def close(self) -> None:
+        self.cancel()
+        self.wait()
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.shutdown(cancel_futures=True)
+                self._pool = None
+
+    def replace(self, query: SearchQuery, replacement: str, paths: Iterable[str]) -> dict[str, int]:
+        # Rewrites each file on disk, atomically; returns replacements per
+        # changed file. Open documents are the caller's to update.
+        regex, needles = compile_query(query)
+        encoded = replacement.encode("utf-8")
+        counts = {}
+        for path in paths:
+            count = replace_in_file(path, regex, needles, encoded if query.regex else (lambda match: encoded))
+            if count:
+                counts[path] = count
+        return counts
+
+    def _executor(self) -> ProcessPoolExecutor:
+        with self._pool_lock:
+            if self._pool is None:
+                # spawn, not fork: the GUI process has Qt threads running.
+                context = multiprocessing.get_context("spawn")
+                self._pool = ProcessPoolExecutor(self.workers, mp_context=context)
+            return self._pool
+
+    def _run(self, search: _Search) -> None:
+        started = time.perf_counter()
+        collector = _Collector(self, search)
+        try:
+            if self.workers == 1 or sum(size for _, size in search.files) <= _INLINE_BYTES:
+                self._run_inline(search, collector)
+            else:
+                self._run_pool(search, collector)
+        except Exception:
+            logger.exception("Search for %r failed", search.query.pattern)
+        if not search.cancelled.is_set():
+            collector.flush()
+        self.search_finished.emit(search.id, collector.stats(time.perf_counter() - started))
+
+    def _run_inline(self, search: _Search, collector: "_Collector") -> None:
+        regex, needles = compile_query(search.query)
+        for path, size in search.files:
+            if search.cancelled.is_set() or collector.truncated:
+                return
+            found = search_file(path, regex, needles)
+            collector.add([(path, found)] if found else [], size, 1)
+
+    def _run_pool(self, search: _Search, collector: "_Collector") -> None:
+        pool = self._executor()
+        batches = iter(_batches(search.files))
+        pending: dict[Future, int] = {}
+        limit = self.workers * _TASKS_PER_WORKER
+        while True:
+            while len(pending) < limit:
+                batch = next(batches, None)
+                if batch is None:
+                    break
+                pending[pool.submit(_search_batch, search.query, batch)] = len(batch)
+            if not pending:
+                return
+            done, _ = wait(pending, timeout=_CHUNK_SECONDS, return_when=FIRST_COMPLETED)
+            if search.cancelled.is_set() or collector.truncated:
+                for future in pending:
+                    future.cancel()
+                return
+            for future in done:
+                files = pending.pop(future)
+                results, searched = future.result()
+                collector.add(results, searched, files)
+
+
+class _Collector:
+    # Counts a search's progress and paces its results into chunks: the
+    # first files with matches go out at once, later ones every
+    # _CHUNK_SECONDS.
+    def __init__(self, engine: SearchEngine, search: _Search) -> None:
+        self.engine = engine
+        self.search = search
+        self.files = 0
+        self.bytes = 0
+        self.files_matched = 0
+        self.matches = 0
+        self.truncated = False
+        self._chunk: list[FileMatches] = []
+        self._flushed: Optional[float] = None
+
+    def add(self, results: list[_FileResult], searched: int, files: int) -> None:
+        self.files += files
+        self.bytes += searched
+        for path, found in results:
+            room = self.search.query.max_results - self.matches
+            if len(found) >= room:
+                found = found[:room]
+                self.truncated = True
+            if found:
+                self.files_matched += 1
+                self.matches += len(found)
+                self._chunk.append(FileMatches(path, tuple(SearchMatch(*item) for item in found)))
+            if self.truncated:
+                break
+        if self._chunk and (self._flushed is None or time.perf_counter() - self._flushed >= _CHUNK_SECONDS):
+            self.flush()
+
+    def flush(self) -> None:
+        if self._chunk:
+            self.engine.results_ready.emit(self.search.id, self._chunk)
+            self._chunk = []
+        self._flushed = time.perf_counter()
+
+    def stats(self, seconds: float) -> SearchStats:
+        return SearchStats(
+            files=self.files,
+            bytes=self.bytes,
+            files_matched=self.files_matched,
+            matches=self.matches,
+            seconds=seconds,
+            cancelled=self.search.cancelled.is_set(),
+            truncated=self.truncated,
+        )
+
+
+def replace_in_file(path: str, regex: re.Pattern, needles: tuple[bytes, ...], replacement) -> int:
+    # Writes a temporary file beside path and renames it over, so a failure
+    # leaves the original intact. Returns the number of replacements.
+    try:
+        with open(path, "rb") as handle:
+            data = handle.read()
+    except OSError:
+        return 0
+    if b"\0" in data[:_BINARY_SNIFF] or not _contains_any(data, needles):
+        return 0
+    replaced, count = regex.subn(replacement, data)
+    if not count or replaced == data:
+        return 0
+    directory = os.path.dirname(path)
+    descriptor, temporary = tempfile.mkstemp(prefix=".flexta-replace-", dir=directory)
+    try:
+        with os.fdopen(descriptor, "wb") as handle:
+            handle.write(replaced)
+        shutil.copymode(path, temporary)
+        os.replace(temporary, path)
+    except OSError:
+        os.unlink(temporary)
+        raise
+    return count
+
+
+def search_paths(paths: Iterable[Union[str, os.PathLike]]) -> list[tuple[str, int]]:
+    # (path, size) pairs for a plain list of files.
+    files = []
+    for path in paths:
+        try:
+            files.append((os.fspath(path), os.path.getsize(path)))
+        except OSError:
+            continue
+    return files
@@ -0,0 +1,383 @@
+from __future__ import annotations
+
+from bisect import bisect_right
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from dataclasses import dataclass
+import hashlib
+import logging
+import multiprocessing
+import os
+from pathlib import Path
+import re
+import sqlite3
+import threading
+import time
+from typing import Iterator, Optional, Union
+
+from flexta.utils import db_utils
+
+
+JS_SUFFIXES = (".js", ".mjs", ".cjs")
+# Directories that hold vendored or generated code, never the project's own.
+_SKIPPED_DIRS = frozenset((".git", ".hg", ".svn", "node_modules", "bower_components", "__pycache__", ".flexta"))
+# Files per worker task: enough to amortise pickling, small enough that
+# results stream back while the pool is still busy.
+_BATCH_SIZE = 64
+# Files written per transaction; each commit makes them visible to queries.
+_COMMIT_EVERY = 256
+_MAX_FILE_SIZE = 2 * 1024 * 1024
+
+_MIGRATIONS: tuple[tuple[int, str], ...] = (
+    (
+        1,
+        """
+        CREATE TABLE IF NOT EXISTS files (
+            path TEXT PRIMARY KEY,
+            mtime_ns INTEGER NOT NULL,
+            size INTEGER NOT NULL,
+            hash TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS symbols (
+            path TEXT NOT NULL,
+            name TEXT NOT NULL,
+            kind TEXT NOT NULL,
+            line INTEGER NOT NULL,
+            column INTEGER NOT NULL,
+            detail TEXT
+        );
+        CREATE INDEX IF NOT EXISTS idx_symbols_name ON symbols (name);
+        CREATE INDEX IF NOT EXISTS idx_symbols_path ON symbols (path);
+        """,
+    ),
+)
+_SCHEMA_VERSION = max(version for version, _ in _MIGRATIONS)
+
+_SELECT_FILES = "SELECT path, mtime_ns, size, hash FROM files"
+_UPSERT_FILE = """
+    INSERT INTO files (path, mtime_ns, size, hash)
+    VALUES (?, ?, ?, ?)
+    ON CONFLICT(path) DO UPDATE SET
+        mtime_ns = excluded.mtime_ns,
+        size = excluded.size,
+        hash = excluded.hash
+"""
+_DELETE_FILE = "DELETE FROM files WHERE path = ?"
+_DELETE_SYMBOLS = "DELETE FROM symbols WHERE path = ?"
+_INSERT_SYMBOL = "INSERT INTO symbols (path, name, kind, line, column, detail) VALUES (?, ?, ?, ?, ?, ?)"
+_SYMBOL_COLUMNS = "SELECT path, name, kind, line, column, detail FROM symbols"
+_SELECT_BY_NAME = f"{_SYMBOL_COLUMNS} WHERE name = ? ORDER BY path, line"
+_SELECT_DEFINITIONS = f"{_SYMBOL_COLUMNS} WHERE name = ? AND kind IN ('function', 'class') ORDER BY path, line"
+_SELECT_IMPORTS = f"{_SYMBOL_COLUMNS} WHERE name = ? AND kind = 'import' ORDER BY path, line"
+_SELECT_IN_PATH = f"{_SYMBOL_COLUMNS} WHERE path = ? ORDER BY line, column"
+_SELECT_PREFIX = f"""
+    {_SYMBOL_COLUMNS} WHERE name >= ? AND name < ? AND kind IN ('function', 'class')
+    ORDER BY name, path LIMIT ?
+"""
+
+logger = logging.getLogger(__name__)
+
+
+def get_index_dir() -> Path:
+    return Path.home() / ".flexta" / "index"
+
+
+def _index_path(root: Path) -> Path:
+    digest = hashlib.sha256(os.fsencode(root)).hexdigest()[:16]
+    return get_index_dir() / f"{root.name or 'root'}-{digest}.db"
+
+
+@dataclass(frozen=True)
+class Symbol:
+    path: str
+    name: str
+    # "function", "class", "export" or "import".
+    kind: str
+    line: int
+    column: int
+    # The module an import comes from.
+    detail: Optional[str] = None
+
+
+_NAME = r"[A-Za-z_$][\w$]*"
+_BLOCK_COMMENT = re.compile(r"/\*.*?\*/", re.S)
+_DECLARATION = re.compile(
+    rf"^[ \t]*(?P<export>export[ \t]+(?:default[ \t]+)?)?"
+    rf"(?:(?:async[ \t]+)?function\b[ \t]*\*?[ \t]*(?P<function>{_NAME})"
+    rf"|class[ \t]+(?P<class>{_NAME})"
+    rf"|(?:const|let|var)[ \t]+(?P<binding>{_NAME})[ \t]*=[ \t]*"
+    rf"(?P<callable>(?:async[ \t]*)?(?:function\b|\([^)\n]*\)[ \t]*=>|{_NAME}[ \t]*=>))?)",
+    re.M,
+)
+_EXPORT_LIST = re.compile(r"^[ \t]*export[ \t]*\{([^}]*)\}", re.M)
+_COMMONJS_EXPORT = re.compile(rf"^[ \t]*(?:module\.)?exports\.({_NAME})[ \t]*=(?!=)", re.M)
+_IMPORT = re.compile(r"^[ \t]*import[ \t]+([^'\";]*?)[ \t]*\bfrom[ \t]*(['\"])([^'\"\n]+)\2", re.M)
+_REQUIRE = re.compile(
+    rf"(?:const|let|var)[ \t]+(\{{[^}}]*\}}|{_NAME})[ \t]*=[ \t]*require\([ \t]*(['\"])([^'\"\n]+)\2"
+)
+# "a as b" in import/export lists, "a: b" in destructured requires.
+_ALIAS = re.compile(rf"({_NAME})(?:(?:[ \t]+as[ \t]+|[ \t]*:[ \t]*)({_NAME}))?")
+
+# (name, kind, line, column, detail)
+_Row = tuple[str, str, int, int, Optional[str]]
+# (path, mtime_ns, size, hash, rows); rows is None when the file is unreadable.
+_Parsed = tuple[str, int, int, str, Optional[list[_Row]]]
+
+
+def parse_symbols(text: str) -> list[_Row]:
+    # Declarations are recognised at the start of a line only: cheap, and
+    # good enough for navigation. Block comments are blanked (keeping the
+    # newlines) so commented-out code is not indexed.
+    text = _BLOCK_COMMENT.sub(lambda match: re.sub(r"[^\n]", " ", match.group(0)), text)
+    line_starts = [0] + [match.end() for match in re.finditer("\n", text)]
+
+    def locate(offset: int) -> tuple[int, int]:
+        line = bisect_right(line_starts, offset) - 1
+        return line, offset - line_starts[line]
+
+    rows: list[_Row] = []
+
+    def add(name: str, kind: str, offset: int, detail: Optional[str] = None) -> None:
+        rows.append((name, kind, *locate(offset), detail))
+
+    def add_aliases(clause: str, kind: str, offset: int, detail: Optional[str] = None) -> None:
+        # "a", "a as b": the name bound in this file is the last one.
+        for alias in _ALIAS.finditer(clause):
+            group = 2 if alias.group(2) else 1
+            if alias.group(group) != "as":
+                add(alias.group(group), kind, offset + alias.start(group), detail)
+
+    for match in _DECLARATION.finditer(text):
+        for group, kind in (("function", "function"), ("class", "class"), ("binding", "function")):
+            name = match.group(group)
+            if name is None:
+                continue
+            if group != "binding" or match.group("callable"):
+                add(name, kind, match.start(group))
+            if match.group("export"):
+                add(name, "export", match.start(group))
+    for match in _EXPORT_LIST.finditer(text):
+        add_aliases(match.group(1), "export", match.start(1))
+    for match in _COMMONJS_EXPORT.finditer(text):
+        add(match.group(1), "export", match.start(1))
+    for match in _IMPORT.finditer(text):
+        add_aliases(match.group(1).replace("*", " "), "import", match.start(1), match.group(3))
+    for match in _REQUIRE.finditer(text):
+        add_aliases(match.group(1), "import", match.start(1), match.group(3))
+    return rows
+
+
+def _parse_file(path: str) -> _Parsed:
+    try:
+        status = os.stat(path)
+        if status.st_size > _MAX_FILE_SIZE:
+            return path, status.st_mtime_ns, status.st_size, "", []
+        with open(path, "rb") as handle:
+            data = handle.read()
+    except OSError:
+        return path, 0, 0, "", None
+    digest = hashlib.blake2b(data, digest_size=16).hexdigest()
+    return path, status.st_mtime_ns, status.st_size, digest, parse_symbols(data.decode("utf-8", "replace"))
+
+
+def _parse_batch(paths: list[str]) -> list[_Parsed]:
+    return [_parse_file(path) for path in paths]
+
+
+def iter_js_files(root: Union[str, Path]) -> Iterator[os.DirEntry]:
+    return iter_project_files(root, JS_SUFFIXES)
+
+
+def iter_project_files(root: Union[str, Path], suffixes: tuple[str, ...]) -> Iterator[os.DirEntry]:
+    pending = [os.fspath(root)]
+    while pending:
+        directory = pending.pop()
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            if entry.name not in _SKIPPED_DIRS:
+                                pending.append(entry.path)
+                        elif entry.name.endswith(suffixes) and entry.is_file(follow_symlinks=False):
+                            yield entry
+                    except OSError:
+                        continue
+        except OSError:
+            continue
+
+
+class SymbolIndex:
+    # Functions, classes, exports and imports of every JS file under root,
+    # persisted per project. Opening compares each file's mtime and size with
+    # the stored row and only sends changed files to a process pool; a file
+    # whose content hash still matches keeps its symbols. Results are
+    # committed in batches, so queries answer from a partial index while the
+    # build runs.
+    def __init__(
+        self,
+        root: Union[str, Path],
+        db_path: Optional[Path] = None,
+        workers: Optional[int] = None,
+    ) -> None:
+        self.root = Path(root).resolve()
+        self.path = db_path if db_path is not None else _index_path(self.root)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._workers = workers
+        self._lock = threading.Lock()
+        self._connection = db_utils.connect(self.path)
+        db_utils.migrate(self._connection, _SCHEMA_VERSION, lambda: _MIGRATIONS)
+        self._cancelled = threading.Event()
+        self._ready = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.total = 0
+        self.parsed = 0
+        self.build_seconds = 0.0
+
+    @property
+    def is_ready(self) -> bool:
+        return self._ready.is_set()
+
+    def build(self) -> None:
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run_build, name="flexta-symbol-index", daemon=True)
+        self._thread.start()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        return self._ready.wait(timeout)
+
+    def close(self) -> None:
+        self._cancelled.set()
+        if self._thread is not None:
+            self._thread.join()
+        with self._lock:
+            self._connection.close()
+
+    def definitions(self, name: str) -> list[Symbol]:
+        return self._query(_SELECT_DEFINITIONS, (name,))
+
+    def references(self, name: str) -> list[Symbol]:
+        return self._query(_SELECT_BY_NAME, (name,))
+
+    def importers(self, name: str) -> list[Symbol]:
+        return self._query(_SELECT_IMPORTS, (name,))
+
+    def symbols_in(self, path: Union[str, Path]) -> list[Symbol]:
+        return self._query(_SELECT_IN_PATH, (self._key(path),))
+
+    def search(self, prefix: str, limit: int = 50) -> list[Symbol]:
+        return self._query(_SELECT_PREFIX, (prefix, prefix + "\U0010ffff", limit))
+
+    def update_file(self, path: Union[str, Path]) -> None:
+        # For saves from the editor: one file is cheaper to parse in-process
+        # than to round-trip through the pool.
+        key = self._key(path)
+        parsed = _parse_file(os.fspath(self.root / key))
+        with self._lock, self._connection:
+            self._store(key, parsed)
+
+    def update_files(self, paths: list[str]) -> None:
+        # For ProjectWatcher.files_changed: created, modified and deleted
+        # files alike; deleted ones drop their symbols.
+        keys = [self._key(path) for path in paths if path.endswith(JS_SUFFIXES) and self._contains(path)]
+        if not keys:
+            return
+        parsed = [_parse_file(os.fspath(self.root / key)) for key in keys]
+        with self._lock, self._connection:
+            for key, result in zip(keys, parsed):
+                self._store(key, result)
+
+    def _contains(self, path: Union[str, Path]) -> bool:
+        return Path(path).resolve().is_relative_to(self.root)
+
+    def _key(self, path: Union[str, Path]) -> str:
+        path = Path(path)
+        if path.is_absolute():
+            path = path.resolve().relative_to(self.root)
+        return path.as_posix()
+
+    def _query(self, sql: str, parameters: tuple) -> list[Symbol]:
+        with self._lock:
+            rows = self._connection.execute(sql, parameters).fetchall()
+        return [Symbol(*row) for row in rows]
+
+    def _store(self, key: str, parsed: _Parsed, known_hash: Optional[str] = None) -> None:
+        _, mtime_ns, size, digest, rows = parsed
+        connection = self._connection
+        if rows is None:
+            connection.execute(_DELETE_FILE, (key,))
+            connection.execute(_DELETE_SYMBOLS, (key,))
+            return
+        connection.execute(_UPSERT_FILE, (key, mtime_ns, size, digest))
+        if digest == known_hash:
+            # Touched but unchanged (checkout, formatter no-op).
+            return
+        connection.execute(_DELETE_SYMBOLS, (key,))
+        connection.executemany(_INSERT_SYMBOL, [(key, *row) for row in rows])
+
+    def _run_build(self) -> None:
+        started = time.perf_counter()
+        try:
+            self._build()
+        except (OSError, sqlite3.Error):
+            logger.exception("Failed to index %s", self.root)
+        finally:
+            self.build_seconds = time.perf_counter() - started
+            self._ready.set()
+
+    def _build(self) -> None:
+        with self._lock:
+            known = {row[0]: (row[1], row[2], row[3]) for row in self._connection.execute(_SELECT_FILES)}
+        root = os.fspath(self.root)
+        prefix_length = len(root) + 1
+        changed: list[str] = []
+        seen = set()
+        for entry in iter_js_files(root):
+            key = entry.path[prefix_length:].replace(os.sep, "/")
+            seen.add(key)
+            stored = known.get(key)
+            if stored is not None:
+                try:
+                    status = entry.stat(follow_symlinks=False)
+                except OSError:
+                    continue
+                if stored[0] == status.st_mtime_ns and stored[1] == status.st_size:
+                    continue
+            changed.append(entry.path)
+        removed = [key for key in known if key not in seen]
+        self.total = len(changed)
+        if removed:
+            with self._lock, self._connection:
+                for key in removed:
+                    self._store(key, (key, 0, 0, "", None))
+        if not changed or self._cancelled.is_set():
+            return
+
+        batches = [changed[start:start + _BATCH_SIZE] for start in range(0, len(changed), _BATCH_SIZE)]
+        if len(batches) == 1:
+            self._commit(_parse_batch(batches[0]), known, prefix_length)
+            return
+        # spawn, not fork: the GUI process has Qt threads running.
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(self._workers, mp_context=context) as pool:
+            pending: set[Future] = {pool.submit(_parse_batch, batch) for batch in batches}
+            results: list[_Parsed] = []
+            while pending:
+                done, pending = wait(pending, timeout=0.5, return_when=FIRST_COMPLETED)
+                if self._cancelled.is_set():
+                    for future in pending:
+                        future.cancel()
+                    return
+                for future in done:
+                    results.extend(future.result())
+                if len(results) >= _COMMIT_EVERY or not pending:
+                    self._commit(results, known, prefix_length)
+                    results = []
+
+    def _commit(self, results: list[_Parsed], known: dict, prefix_length: int) -> None:
+        with self._lock, self._connection:
+            for parsed in results:
+                key = parsed[0][prefix_length:].replace(os.sep, "/")
+                stored = known.get(key)
+                self._store(key, parsed, stored[2] if stored is not None else None)
+        self.parsed += len(results)
@@ -1,12 +1,93 @@
 from __future__ import annotations
 
+import atexit
+from dataclasses import dataclass
+from datetime import datetime, timezone
+import heapq
+import logging
+import os
 from pathlib import Path
 import sqlite3
+import threading
 from typing import Iterable, Optional
 
+from flexta.utils import db_utils
+
 
 _DB_FILENAME = "settings.db"
 _SETTINGS_DIRNAME = ".flexta"
+_STATEMENT_CACHE_SIZE = 64
+# Writes that arrive within this window are coalesced into one transaction.
+_FLUSH_DELAY = 0.2
+
+# Version 1 is the base schema in schema.sql; later versions are appended here
+# and applied once, in order, by SettingsStore._migrate.
+_MIGRATIONS: tuple[tuple[int, str], ...] = (
+    (
+        2,
+        """
+        CREATE INDEX IF NOT EXISTS idx_recent_projects_last_opened
+        ON recent_projects (last_opened DESC);
+        """,
+    ),
+    (
+        3,
+        """
+        CREATE TABLE IF NOT EXISTS project_metadata (
+            path TEXT PRIMARY KEY,
+            path_exists INTEGER NOT NULL,
+            modified REAL,
+            file_count INTEGER,
+            total_size INTEGER,
+            scanned_at REAL NOT NULL
+        );
+        """,
+    ),
+)
+_SCHEMA_VERSION = max(version for version, _ in _MIGRATIONS)
+
+_SELECT_SETTINGS = "SELECT key, value FROM settings"
+_UPSERT_SETTING = """
+    INSERT INTO settings (key, value)
+    VALUES (?, ?)
+    ON CONFLICT(key) DO UPDATE SET value = excluded.value
+"""
+_UPSERT_RECENT_PROJECT = """
+    INSERT INTO recent_projects (path, last_opened)
+    VALUES (?, ?)
+    ON CONFLICT(path) DO UPDATE SET last_opened = excluded.last_opened
+"""
+_SELECT_RECENT_PROJECTS = "SELECT path, last_opened FROM recent_projects"
+_DELETE_RECENT_PROJECTS = "DELETE FROM recent_projects"
+_SELECT_PROJECT_METADATA = """
+    SELECT path, path_exists, modified, file_count, total_size, scanned_at
+    FROM project_metadata
+"""
+_UPSERT_PROJECT_METADATA = """
+    INSERT INTO project_metadata (path, path_exists, modified, file_count, total_size, scanned_at)
+    VALUES (?, ?, ?, ?, ?, ?)
+    ON CONFLICT(path) DO UPDATE SET
+        path_exists = excluded.path_exists,
+        modified = excluded.modified,
+        file_count = excluded.file_count,
+        total_size = excluded.total_size,
+        scanned_at = excluded.scanned_at
+"""
+
+_LAST_USED_FOLDER_KEY = "last_used_folder"
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class ProjectMetadata:
+    path: str
+    # None means the path could not be checked in time (e.g. a hung mount).
+    exists: Optional[bool]
+    modified: Optional[float] = None
+    file_count: Optional[int] = None
+    total_size: Optional[int] = None
+    scanned_at: float = 0.0
 
 
 def _get_db_path() -> Path:
@@ -19,80 +100,284 @@ def _get_schema_path() -> Path:
     return Path(__file__).resolve().with_name("schema.sql")
 
 
-def _connect() -> sqlite3.Connection:
-    connection = sqlite3.connect(_get_db_path())
-    connection.row_factory = sqlite3.Row
-    return connection
+def _timestamp() -> str:
+    # Same layout as SQLite's CURRENT_TIMESTAMP, with microseconds so rows
+    # written in the same second still sort in write order.
+    return datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S.%f")
+
+
+class SettingsStore:
+    def __init__(self, db_path: Path, flush_delay: float = _FLUSH_DELAY) -> None:
+        self.path = db_path
+        self._flush_delay = flush_delay
+        # _db_lock serialises transactions on the shared connection; _state_lock
+        # guards the in-memory caches and the pending write batch, so readers on
+        # the GUI thread never wait for an fsync.
+        self._db_lock = threading.Lock()
+        self._state_lock = threading.Lock()
+        self._connection = db_utils.connect(db_path, _STATEMENT_CACHE_SIZE)
+        self._migrate()
+        self._settings: dict[str, str] = {
+            row["key"]: row["value"] for row in self._connection.execute(_SELECT_SETTINGS)
+        }
+        self._recent: dict[str, str] = {
+            row["path"]: row["last_opened"]
+            for row in self._connection.execute(_SELECT_RECENT_PROJECTS)
+        }
+        self._metadata: dict[str, ProjectMetadata] = {
+            row["path"]: ProjectMetadata(
+                path=row["path"],
+                exists=bool(row["path_exists"]),
+                modified=row["modified"],
+                file_count=row["file_count"],
+                total_size=row["total_size"],
+                scanned_at=row["scanned_at"],
+            )
+            for row in self._connection.execute(_SELECT_PROJECT_METADATA)
+        }
+        self._pending_settings: dict[str, str] = {}
+        self._pending_recent: dict[str, str] = {}
+        self._pending_metadata: dict[str, ProjectMetadata] = {}
+        self._pending_reset = False
+        self._wakeup = threading.Event()
+        self._closing = threading.Event()
+        self._writer = threading.Thread(
+            target=self._run_writer,
+            name="flexta-settings-writer",
+            daemon=True,
+        )
+        self._writer.start()
+
+    def _migrate(self) -> None:
+        db_utils.migrate(
+            self._connection,
+            _SCHEMA_VERSION,
+            lambda: [(1, _get_schema_path().read_text(encoding="utf-8")), *_MIGRATIONS],
+        )
+
+    @property
+    def schema_version(self) -> int:
+        with self._db_lock:
+            return db_utils.schema_version(self._connection)
+
+    @property
+    def has_pending_writes(self) -> bool:
+        with self._state_lock:
+            return bool(
+                self._pending_settings
+                or self._pending_recent
+                or self._pending_metadata
+                or self._pending_reset
+            )
+
+    def get_setting(self, key: str, default: Optional[str] = None) -> Optional[str]:
+        with self._state_lock:
+            return self._settings.get(key, default)
+
+    def set_setting(self, key: str, value: str) -> None:
+        with self._state_lock:
+            self._settings[key] = value
+            self._pending_settings[key] = value
+        self._wakeup.set()
+
+    def add_recent_project(self, path: str) -> None:
+        timestamp = _timestamp()
+        with self._state_lock:
+            self._recent[path] = timestamp
+            self._pending_recent[path] = timestamp
+        self._wakeup.set()
+
+    def get_recent_projects(self, limit: Optional[int] = 10) -> list[str]:
+        with self._state_lock:
+            entries = list(self._recent.items())
+        if limit is None:
+            newest = sorted(entries, key=lambda entry: entry[1], reverse=True)
+        else:
+            newest = heapq.nlargest(limit, entries, key=lambda entry: entry[1])
+        return [path for path, _ in newest]
+
+    def set_recent_projects(self, projects: Iterable[str]) -> None:
+        timestamp = _timestamp()
+        recent = {project: timestamp for project in projects}
+        with self._state_lock:
+            self._recent = recent
+            self._pending_recent = dict(recent)
+            self._pending_reset = True
+        self._wakeup.set()
+
+    def get_project_metadata(self, path: str) -> Optional[ProjectMetadata]:
+        with self._state_lock:
+            return self._metadata.get(path)
+
+    def get_projects_metadata(self, paths: Iterable[str]) -> dict[str, ProjectMetadata]:
+        # One lock round trip for a whole list of recent projects.
+        with self._state_lock:
+            metadata = self._metadata
+            return {path: metadata[path] for path in paths if path in metadata}
+
+    def set_project_metadata(self, metadata: ProjectMetadata) -> None:
+        with self._state_lock:
+            self._metadata[metadata.path] = metadata
+            self._pending_metadata[metadata.path] = metadata
+        self._wakeup.set()
+
+    def flush(self) -> None:
+        with self._db_lock:
+            with self._state_lock:
+                settings = self._pending_settings
+                recent = self._pending_recent
+                metadata = self._pending_metadata
+                reset = self._pending_reset
+                self._pending_settings = {}
+                self._pending_recent = {}
+                self._pending_metadata = {}
+                self._pending_reset = False
+            if not (settings or recent or metadata or reset):
+                return
+            try:
+                with self._connection:
+                    if reset:
+                        self._connection.execute(_DELETE_RECENT_PROJECTS)
+                    self._connection.executemany(_UPSERT_SETTING, settings.items())
+                    self._connection.executemany(_UPSERT_RECENT_PROJECT, recent.items())
+                    self._connection.executemany(
+                        _UPSERT_PROJECT_METADATA,
+                        [
+                            (
+                                entry.path,
+                                int(bool(entry.exists)),
+                                entry.modified,
+                                entry.file_count,
+                                entry.total_size,
+                                entry.scanned_at,
+                            )
+                            for entry in metadata.values()
+                        ],
+                    )
+            except sqlite3.Error:
+                self._requeue(settings, recent, metadata, reset)
+                raise
+
+    def _requeue(
+        self,
+        settings: dict[str, str],
+        recent: dict[str, str],
+        metadata: dict[str, ProjectMetadata],
+        reset: bool,
+    ) -> None:
+        with self._state_lock:
+            for key, value in settings.items():
+                self._pending_settings.setdefault(key, value)
+            for path, entry in metadata.items():
+                self._pending_metadata.setdefault(path, entry)
+            # A newer set_recent_projects call supersedes the failed batch.
+            if self._pending_reset:
+                return
+            for path, timestamp in recent.items():
+                self._pending_recent.setdefault(path, timestamp)
+            self._pending_reset = reset
+
+    def _run_writer(self) -> None:
+        while not self._closing.is_set():
+            self._wakeup.wait()
+            self._closing.wait(self._flush_delay)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except sqlite3.Error:
+                logger.exception("Failed to persist settings to %s", self.path)
+
+    def close(self) -> None:
+        self._closing.set()
+        self._wakeup.set()
+        self._writer.join()
+        self.flush()
+        with self._db_lock:
+            self._connection.close()
+
+
+_store: Optional[SettingsStore] = None
+_store_lock = threading.Lock()
+# What _store's path was resolved from; the path is only looked up again
+# when this changes (a test swapping _get_db_path or the home directory).
+_store_origin: Optional[tuple] = None
+
+
+def _origin() -> tuple:
+    return (_get_db_path, os.environ.get("HOME"), os.environ.get("USERPROFILE"))
+
+
+def get_store() -> SettingsStore:
+    global _store, _store_origin
+    store = _store
+    origin = _origin()
+    if store is not None and _store_origin == origin:
+        return store
+    db_path = _get_db_path()
+    with _store_lock:
+        if _store is None or _store.path != db_path:
+            if _store is not None:
+                _store.close()
+            _store = SettingsStore(db_path)
+        _store_origin = origin
+        return _store
+
+
+def close_store() -> None:
+    global _store, _store_origin
+    with _store_lock:
+        if _store is not None:
+            _store.close()
+            _store = None
+            _store_origin = None
+
+
+atexit.register(close_store)
 
 
 def initialize_db() -> None:
-    schema_path = _get_schema_path()
-    schema = schema_path.read_text(encoding="utf-8")
-    with _connect() as connection:
-        connection.executescript(schema)
+    get_store()
+
+
+def flush() -> None:
+    get_store().flush()
+
+
+def get_setting(key: str, default: Optional[str] = None) -> Optional[str]:
+    return get_store().get_setting(key, default)
+
+
+def set_setting(key: str, value: str) -> None:
+    get_store().set_setting(key, value)
 
 
 def add_recent_project(path: str) -> None:
-    initialize_db()
-    with _connect() as connection:
-        connection.execute(
-            """
-            INSERT INTO recent_projects (path, last_opened)
-            VALUES (?, CURRENT_TIMESTAMP)
-            ON CONFLICT(path) DO UPDATE SET last_opened = CURRENT_TIMESTAMP
-            """,
-            (path,),
-        )
+    get_store().add_recent_project(path)
 
 
-def get_recent_projects(limit: int = 10) -> list[str]:
-    initialize_db()
-    with _connect() as connection:
-        rows = connection.execute(
-            """
-            SELECT path
-            FROM recent_projects
-            ORDER BY last_opened DESC
-            LIMIT ?
-            """,
-            (limit,),
-        ).fetchall()
-    return [row["path"] for row in rows]
+def get_recent_projects(limit: Optional[int] = 10) -> list[str]:
+    return get_store().get_recent_projects(limit)
 
 
 def set_last_used_folder(folder: str) -> None:
-    initialize_db()
-    with _connect() as connection:
-        connection.execute(
-            """
-            INSERT INTO settings (key, value)
-            VALUES ('last_used_folder', ?)
-            ON CONFLICT(key) DO UPDATE SET value = excluded.value
-            """,
-            (folder,),
-        )
+    set_setting(_LAST_USED_FOLDER_KEY, folder)
 
 
 def get_last_used_folder() -> Optional[str]:
-    initialize_db()
-    with _connect() as connection:
-        row = connection.execute(
-            "SELECT value FROM settings WHERE key = 'last_used_folder'"
-        ).fetchone()
-    if row is None:
-        return None
-    return row["value"]
+    return get_setting(_LAST_USED_FOLDER_KEY)
 
 
 def set_recent_projects(projects: Iterable[str]) -> None:
-    initialize_db()
-    with _connect() as connection:
-        connection.execute("DELETE FROM recent_projects")
-        connection.executemany(
-            """
-            INSERT INTO recent_projects (path, last_opened)
-            VALUES (?, CURRENT_TIMESTAMP)
-            ON CONFLICT(path) DO UPDATE SET last_opened = CURRENT_TIMESTAMP
-            """,
-            [(project,) for project in projects],
-        )
+    get_store().set_recent_projects(projects)
+
+
+def get_project_metadata(path: str) -> Optional[ProjectMetadata]:
+    return get_store().get_project_metadata(path)
+
+
+def get_projects_metadata(paths: Iterable[str]) -> dict[str, ProjectMetadata]:
+    return get_store().get_projects_metadata(paths)
+
+
+def set_project_metadata(metadata: ProjectMetadata) -> None:
+    get_store().set_project_metadata(metadata)
@@ -0,0 +1,3 @@
+from .custom_errors import FlextaError, TemplateError, ThemeError
+
+__all__ = ["FlextaError", "TemplateError", "ThemeError"]
@@ -0,0 +1,13 @@
+from __future__ import annotations
+
+
+class FlextaError(Exception):
+    pass
+
+
+class TemplateError(FlextaError):
+    pass
+
+
+class ThemeError(FlextaError):
+    pass
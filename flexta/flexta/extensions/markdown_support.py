@@ -0,0 +1,389 @@
+from __future__ import annotations
+
+import bisect
+from collections import OrderedDict
+from dataclasses import dataclass
+import hashlib
+import html
+import re
+from typing import Iterator, Optional, Sequence
+
+from flexta.core.editor import TextView
+
+
+_DEFAULT_CACHE_SIZE = 4096
+
+_BLANK = re.compile(r"^[ \t]*$")
+_FENCE = re.compile(r"^( {0,3})(`{3,}|~{3,})[ \t]*([^`\s]*)[^`]*$")
+_ATX_HEADING = re.compile(r"^ {0,3}(#{1,6})(?:[ \t]+(.*?))?(?:[ \t]+#+)?[ \t]*$")
+_SETEXT_UNDERLINE = re.compile(r"^ {0,3}(=+|-+)[ \t]*$")
+_THEMATIC_BREAK = re.compile(r"^ {0,3}([-*_])(?:[ \t]*\1){2,}[ \t]*$")
+_LIST_ITEM = re.compile(r"^( {0,3})([-+*]|\d{1,9}[.)])(?:( +)(.*))?$")
+_QUOTE = re.compile(r"^ {0,3}> ?")
+_INDENTED = re.compile(r"^(?: {4}|\t)")
+_HTML_BLOCK = re.compile(r"^ {0,3}<(?:!--|/?[A-Za-z][\w-]*(?:[\s/>]|$))")
+_TABLE_DELIMITER = re.compile(r"^ {0,3}\|?[ \t]*:?-+:?[ \t]*(?:\|[ \t]*:?-+:?[ \t]*)*\|?[ \t]*$")
+_TASK = re.compile(r"^\[([ xX])\][ \t]+")
+
+_CODE_SPAN = re.compile(r"(`+)(.+?)(?<!`)\1(?!`)", re.S)
+_ESCAPE = re.compile(r"\\([!\"#$%&'()*+,\-./:;<=>?@\[\\\]^_`{|}~])")
+_HARD_BREAK = re.compile(r"(?: {2,}|\\)\n")
+_AUTOLINK = re.compile(r"<((?:https?|mailto|ftp):[^\s<>]+)>")
+_INLINE_HTML = re.compile(r"</?[A-Za-z][\w-]*(?:\s+[^<>]*)?/?>|<!--.*?-->", re.S)
+_IMAGE = re.compile(r"!\[([^\]]*)\]\(\s*([^)\s]+)(?:\s+&quot;(.*?)&quot;)?\s*\)")
+_LINK = re.compile(r"\[([^\]]+)\]\(\s*([^)\s]*)(?:\s+&quot;(.*?)&quot;)?\s*\)")
+_STRONG = re.compile(r"(\*\*|__)(?=\S)(.+?)(?<=\S)\1", re.S)
+_EMPHASIS = re.compile(r"(?<![\w*])\*(?=[^\s*])(.+?)(?<=[^\s*])\*(?![*])|(?<![\w_])_(?=\S)(.+?)(?<=\S)_(?![\w_])", re.S)
+_STRIKETHROUGH = re.compile(r"~~(?=\S)(.+?)(?<=\S)~~", re.S)
+_PLACEHOLDER = re.compile("\x00(\\d+)\x00")
+_SLUG_JUNK = re.compile(r"[^\w\- ]+")
+
+
+def _escape(text: str) -> str:
+    return html.escape(text, quote=False)
+
+
+def _attribute(text: str) -> str:
+    return text.replace('"', "&quot;")
+
+
+def render_inline(text: str) -> str:
+    # Code spans, escapes, autolinks and raw HTML are set aside first so the
+    # emphasis and link patterns never see inside them.
+    stash: list[str] = []
+
+    def keep(fragment: str) -> str:
+        stash.append(fragment)
+        return f"\x00{len(stash) - 1}\x00"
+
+    text = _CODE_SPAN.sub(lambda match: keep(f"<code>{_escape(match.group(2).strip())}</code>"), text)
+    text = _HARD_BREAK.sub(lambda match: keep("<br />\n"), text)
+    text = _ESCAPE.sub(lambda match: keep(_escape(match.group(1))), text)
+    text = _AUTOLINK.sub(
+        lambda match: keep(f'<a href="{_attribute(_escape(match.group(1)))}">{_escape(match.group(1))}</a>'), text
+    )
+    text = _INLINE_HTML.sub(lambda match: keep(match.group(0)), text)
+    text = html.escape(text)
+    text = _IMAGE.sub(lambda match: keep(_image(match)), text)
+    text = _LINK.sub(_link, text)
+    text = _STRONG.sub(r"<strong>\2</strong>", text)
+    text = _EMPHASIS.sub(lambda match: f"<em>{match.group(1) or match.group(2)}</em>", text)
+    text = _STRIKETHROUGH.sub(r"<del>\1</del>", text)
+    while "\x00" in text:
+        text = _PLACEHOLDER.sub(lambda match: stash[int(match.group(1))], text)
+    return text
+
+
+def _image(match: re.Match) -> str:
+    title = f' title="{match.group(3)}"' if match.group(3) else ""
+    return f'<img src="{match.group(2)}" alt="{match.group(1)}"{title} />'
+
+
+def _link(match: re.Match) -> str:
+    title = f' title="{match.group(3)}"' if match.group(3) else ""
+    return f'<a href="{match.group(2)}"{title}>{match.group(1)}</a>'
+
+
+def _slug(text: str) -> str:
+    plain = re.sub(r"<[^>]+>", "", text)
+    return _SLUG_JUNK.sub("", html.unescape(plain)).strip().lower().replace(" ", "-")
+
+
+def _starts_block(line: str) -> bool:
+    # Lines that end a paragraph without a blank line in between.
+    if _ATX_HEADING.match(line) or _FENCE.match(line) or _QUOTE.match(line):
+        return True
+    if _THEMATIC_BREAK.match(line) and not _SETEXT_UNDERLINE.match(line):
+        return True
+    item = _LIST_ITEM.match(line)
+    # Only bullets and lists starting at 1 may interrupt a paragraph.
+    return item is not None and item.group(4) and (not item.group(2)[0].isdigit() or item.group(2)[:-1] == "1")
+
+
+def split_blocks(lines: Sequence[str], start: int = 0) -> Iterator[tuple[int, int]]:
+    # Yields the (first, stop) line ranges of top-level blocks from start,
+    # which must be a line outside any block.
+    count = len(lines)
+    index = start
+    while index < count:
+        line = lines[index]
+        if _BLANK.match(line):
+            index += 1
+            continue
+        fence = _FENCE.match(line)
+        if fence is not None:
+            marker = fence.group(2)
+            stop = index + 1
+            while stop < count:
+                closing = lines[stop].strip()
+                stop += 1
+                if closing.startswith(marker[0] * len(marker)) and not closing.strip(marker[0]):
+                    break
+            yield index, stop
+            index = stop
+            continue
+        if _ATX_HEADING.match(line) or _THEMATIC_BREAK.match(line):
+            yield index, index + 1
+            index += 1
+            continue
+        indented = _INDENTED.match(line) is not None
+        paragraph = not (indented or _LIST_ITEM.match(line) or _QUOTE.match(line) or _HTML_BLOCK.match(line))
+        stop = index + 1
+        while stop < count:
+            following = lines[stop]
+            if _BLANK.match(following) or _FENCE.match(following) or _ATX_HEADING.match(following):
+                break
+            if indented and not _INDENTED.match(following):
+                break
+            if paragraph and _starts_block(following):
+                break
+            stop += 1
+            if paragraph and _SETEXT_UNDERLINE.match(following):
+                break
+        yield index, stop
+        index = stop
+
+
+def render_lines(lines: Sequence[str]) -> str:
+    return "\n".join(render_block(lines[first:stop]) for first, stop in split_blocks(lines))
+
+
+def render_block(lines: Sequence[str]) -> str:
+    # Every block renders to exactly one element, so block i is child i of
+    # the container and a splice by index patches the preview.
+    first = lines[0]
+    fence = _FENCE.match(first)
+    if fence is not None:
+        indent = len(fence.group(1))
+        body = list(lines[1:])
+        if body and body[-1].strip().startswith(fence.group(2)[0] * len(fence.group(2))):
+            body.pop()
+        body = [line[min(indent, len(line) - len(line.lstrip(" "))):] for line in body]
+        language = f' class="language-{_attribute(_escape(fence.group(3)))}"' if fence.group(3) else ""
+        code = _escape("\n".join(body) + "\n" if body else "")
+        return f"<pre><code{language}>{code}</code></pre>"
+    heading = _ATX_HEADING.match(first)
+    if heading is not None:
+        level = len(heading.group(1))
+        content = render_inline(heading.group(2) or "")
+        return f'<h{level} id="{_attribute(_slug(content))}">{content}</h{level}>'
+    if _THEMATIC_BREAK.match(first) and len(lines) == 1:
+        return "<hr />"
+    if _INDENTED.match(first):
+        code = "\n".join(re.sub(r"^(?: {1,4}|\t)", "", line) for line in lines)
+        return f"<pre><code>{_escape(code)}\n</code></pre>"
+    if _QUOTE.match(first):
+        inner = [_QUOTE.sub("", line, count=1) for line in lines]
+        return f"<blockquote>\n{render_lines(inner)}\n</blockquote>"
+    if _LIST_ITEM.match(first):
+        return _render_list(lines)
+    if _HTML_BLOCK.match(first):
+        return f'<div class="markdown-html">{chr(10).join(lines)}</div>'
+    if len(lines) >= 2 and "|" in first and _TABLE_DELIMITER.match(lines[1]):
+        return _render_table(lines)
+    if len(lines) >= 2 and _SETEXT_UNDERLINE.match(lines[-1]):
+        level = 1 if lines[-1].strip()[0] == "=" else 2
+        content = _paragraph(lines[:-1])
+        return f'<h{level} id="{_attribute(_slug(content))}">{content}</h{level}>'
+    return f"<p>{_paragraph(lines)}</p>"
+
+
+def _paragraph(lines: Sequence[str]) -> str:
+    # Trailing spaces are kept until the end: two of them make a hard break.
+    return render_inline("\n".join(line.lstrip() for line in lines).rstrip())
+
+
+def _render_list(lines: Sequence[str]) -> str:
+    marker = _LIST_ITEM.match(lines[0])
+    ordered = marker.group(2)[0].isdigit()
+    base = len(marker.group(1))
+    items: list[list[str]] = []
+    content_indent = 0
+    for line in lines:
+        item = _LIST_ITEM.match(line)
+        if item is not None and len(item.group(1)) <= base + 1 and item.group(2)[0].isdigit() == ordered:
+            spacing = len(item.group(3) or " ")
+            content_indent = len(item.group(1)) + len(item.group(2)) + (spacing if spacing <= 4 else 1)
+            items.append([item.group(4) or ""])
+        elif line[:content_indent].strip():
+            # Lazy continuation: an unindented line still belongs to the item.
+            items[-1].append(line.strip())
+        else:
+            items[-1].append(line[content_indent:])
+    rendered = []
+    for item in items:
+        task = _TASK.match(item[0])
+        prefix = ""
+        if task is not None:
+            checked = " checked" if task.group(1) in "xX" else ""
+            prefix = f'<input type="checkbox" disabled{checked} /> '
+            item = [item[0][task.end():], *item[1:]]
+        # Items are always tight: a blank line ends the block, and with it
+        # the list, so paragraphs inside items render without <p>.
+        parts = []
+        for first, stop in split_blocks(item):
+            part = render_block(item[first:stop])
+            if part.startswith("<p>"):
+                part = _paragraph(item[first:stop])
+            parts.append(part)
+        body = "\n".join(parts)
+        rendered.append(f"<li>{prefix}{body}</li>")
+    if not ordered:
+        return "<ul>\n" + "\n".join(rendered) + "\n</ul>"
+    start = int(marker.group(2)[:-1])
+    start_attribute = f' start="{start}"' if start != 1 else ""
+    return f"<ol{start_attribute}>\n" + "\n".join(rendered) + "\n</ol>"
+
+
+def _table_cells(line: str) -> list[str]:
+    line = line.strip()
+    if line.startswith("|"):
+        line = line[1:]
+    if line.endswith("|") and not line.endswith("\\|"):
+        line = line[:-1]
+    return [cell.strip().replace("\\|", "|") for cell in re.split(r"(?<!\\)\|", line)]
+
+
+def _render_table(lines: Sequence[str]) -> str:
+    header = _table_cells(lines[0])
+    alignments = []
+    for cell in _table_cells(lines[1]):
+        if cell.startswith(":") and cell.endswith(":"):
+            alignments.append(' style="text-align: center"')
+        elif cell.endswith(":"):
+            alignments.append(' style="text-align: right"')
+        elif cell.startswith(":"):
+            alignments.append(' style="text-align: left"')
+        else:
+            alignments.append("")
+
+    def row(cells: list[str], tag: str) -> str:
+        cells = (cells + [""] * len(header))[:len(header)]
+        return "<tr>" + "".join(
+            f"<{tag}{alignment}>{render_inline(cell)}</{tag}>" for cell, alignment in zip(cells, alignments)
+        ) + "</tr>"
+
+    body = "\n".join(row(_table_cells(line), "td") for line in lines[2:])
+    body = f"\n<tbody>\n{body}\n</tbody>" if body else ""
+    return f"<table>\n<thead>\n{row(header, 'th')}\n</thead>{body}\n</table>"
+
+
+@dataclass(frozen=True)
+class MarkdownDiff:
+    # Replace `removed` top-level elements starting at `index` with `html`.
+    index: int
+    removed: int
+    html: tuple[str, ...]
+
+    def operation(self, path: Sequence[int] = (), tags: Sequence[str] = ()) -> dict:
+        # A preview patch operation for the container at path (see
+        # flexta.core.preview); the body itself by default.
+        return {
+            "op": "splice",
+            "path": list(path),
+            "tags": list(tags),
+            "index": self.index,
+            "remove": self.removed,
+            "html": "\n".join(self.html),
+        }
+
+
+@dataclass
+class _Block:
+    first: int
+    stop: int
+    key: bytes
+    html: str
+
+
+class MarkdownRenderer:
+    # Keeps a document's lines and its top-level blocks. An edit re-splits
+    # from the block before it until a block starts where an old one did
+    # past the edit, and each block's HTML comes from an LRU keyed by a hash
+    # of its source, so only the touched blocks and their neighbours are
+    # rendered. update() returns the change as a splice on the block list.
+    def __init__(self, text: str = "", cache_size: int = _DEFAULT_CACHE_SIZE) -> None:
+        self.cache_size = cache_size
+        self.rendered = 0
+        self._cache: OrderedDict[bytes, str] = OrderedDict()
+        self._lines: list[str] = []
+        self._blocks: list[_Block] = []
+        self.reset(text)
+
+    @property
+    def block_count(self) -> int:
+        return len(self._blocks)
+
+    def html(self) -> str:
+        return "\n".join(block.html for block in self._blocks)
+
+    def reset(self, text: str) -> MarkdownDiff:
+        removed = len(self._blocks)
+        self._lines = text.split("\n")
+        self._blocks = [self._block(first, stop) for first, stop in split_blocks(self._lines)]
+        return MarkdownDiff(0, removed, tuple(block.html for block in self._blocks))
+
+    def update(self, view: TextView, position: int, removed: int, added: int) -> Optional[MarkdownDiff]:
+        # Arguments follow EditorDocument.text_changed, with view the
+        # document's buffer after the edit.
+        if removed < 0:
+            return self.reset(view.text())
+        first = view.line_at(position)
+        last = view.line_at(position + added)
+        delta = view.line_count - len(self._lines)
+        old_last = last - delta
+        self._lines[first:old_last + 1] = [view.line_text(line) for line in range(first, last + 1)]
+        return self._resplit(first, last, old_last, delta)
+
+    def _resplit(self, first: int, last: int, old_last: int, delta: int) -> Optional[MarkdownDiff]:
+        blocks = self._blocks
+        # Start a block before the one holding the edit: removing the blank
+        # line between them merges the two.
+        start_index = max(bisect.bisect_left(blocks, first, key=lambda block: block.first) - 2, 0)
+        scan_from = blocks[start_index].first if start_index else 0
+        # Stop once a block starts where an old one past the edit did.
+        end_index = bisect.bisect_right(blocks, old_last, key=lambda block: block.first)
+        fresh: list[_Block] = []
+        for block_first, block_stop in split_blocks(self._lines, scan_from):
+            while end_index < len(blocks) and blocks[end_index].first + delta < block_first:
+                end_index += 1
+            if block_first > last and end_index < len(blocks) and blocks[end_index].first + delta == block_first:
+                break
+            fresh.append(self._block(block_first, block_stop))
+        else:
+            end_index = len(blocks)
+        if delta:
+            for block in blocks[end_index:]:
+                block.first += delta
+                block.stop += delta
+        old = blocks[start_index:end_index]
+        # Trim blocks that came out identical so the diff is minimal.
+        head = 0
+        while head < min(len(old), len(fresh)) and old[head].key == fresh[head].key:
+            head += 1
+        tail = 0
+        while (
+            tail < min(len(old), len(fresh)) - head
+            and old[len(old) - 1 - tail].key == fresh[len(fresh) - 1 - tail].key
+        ):
+            tail += 1
+        blocks[start_index:end_index] = fresh
+        changed = fresh[head:len(fresh) - tail]
+        removed = len(old) - head - tail
+        if not changed and not removed:
+            return None
+        return MarkdownDiff(start_index + head, removed, tuple(block.html for block in changed))
+
+    def _block(self, first: int, stop: int) -> _Block:
+        lines = self._lines[first:stop]
+        key = hashlib.blake2b("\n".join(lines).encode("utf-8"), digest_size=16).digest()
+        cached = self._cache.get(key)
+        if cached is None:
+            cached = render_block(lines)
+            self.rendered += 1
+            self._cache[key] = cached
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        else:
+            self._cache.move_to_end(key)
+        return _Block(first, stop, key, cached)
@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+from .engine import RegexLexer
+
+
+# Selectors, declarations and property values, each with a comment state
+# that remembers where to return to.
+TOP, BLOCK, VALUE, TOP_COMMENT, BLOCK_COMMENT, VALUE_COMMENT = range(6)
+
+_STRINGS = (
+    (r'"(?:[^"\\]|\\.)*"?', "string", None),
+    (r"'(?:[^'\\]|\\.)*'?", "string", None),
+)
+_NUMBER = r"[-+]?(?:\d+\.?\d*|\.\d+)(?:%|[A-Za-z]+)?"
+# Media queries and keyframe offsets put numbers in selector position too.
+_SELECTORS = (
+    (r"@[\w-]+", "at_rule", None),
+    (r"[.#][\w-]+", "selector", None),
+    (r"::?[\w-]+", "selector", None),
+    (r"\[[^\]]*\]?", "attribute", None),
+    (_NUMBER, "number", None),
+    (r"&|\*|[A-Za-z][\w-]*", "tag", None),
+)
+
+
+def _comment_rules(comment_state: int) -> tuple:
+    return (
+        (r"/\*.*?\*/", "comment", None),
+        (r"/\*.*", "comment", comment_state),
+    )
+
+
+class CssLexer(RegexLexer):
+    language = "css"
+    rules = {
+        TOP: (
+            *_comment_rules(TOP_COMMENT),
+            *_STRINGS,
+            (r"\{", None, BLOCK),
+            *_SELECTORS,
+        ),
+        BLOCK: (
+            *_comment_rules(BLOCK_COMMENT),
+            # A colon followed by "{" before ";" belongs to a nested selector
+            # (a:hover { ... }), not to a declaration.
+            (r"-{0,2}[A-Za-z][\w-]*(?=\s*:(?![^;{}]*\{))", "property", None),
+            (r":(?![^;{}]*\{)", None, VALUE),
+            (r"\}", None, TOP),
+            (r"\{", None, None),
+            *_STRINGS,
+            *_SELECTORS,
+        ),
+        VALUE: (
+            *_comment_rules(VALUE_COMMENT),
+            (r";", None, BLOCK),
+            (r"\}", None, TOP),
+            *_STRINGS,
+            (r"!\s*important\b", "keyword", None),
+            (r"#[0-9a-fA-F]{3,8}\b", "number", None),
+            (_NUMBER, "number", None),
+            (r"[\w-]+(?=\()", "function", None),
+            (r"-{0,2}[A-Za-z_][\w-]*", "value", None),
+        ),
+        TOP_COMMENT: ((r".*?\*/", "comment", TOP), (r".+", "comment", None)),
+        BLOCK_COMMENT: ((r".*?\*/", "comment", BLOCK), (r".+", "comment", None)),
+        VALUE_COMMENT: ((r".*?\*/", "comment", VALUE), (r".+", "comment", None)),
+    }
@@ -0,0 +1,422 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+import re
+import time
+from typing import Optional, Sequence
+
+from PySide6.QtCore import QObject, QTimer, Signal
+from PySide6.QtGui import QColor, QFont, QTextBlock, QTextCharFormat, QTextDocument, QTextLayout
+
+
+# (start, length, kind) within one line.
+Token = tuple[int, int, str]
+# (pattern, token kind or None for unformatted, next state or None to stay).
+Rule = tuple[str, Optional[str], Optional[int]]
+
+# Lexer states are never negative.
+UNLEXED = -1
+# Formats are set on the layouts of blocks this close to the visible range;
+# the rest keep their lexed tokens until they scroll into view.
+_APPLY_MARGIN = 200
+
+DEFAULT_PALETTE: dict[str, tuple[str, bool, bool]] = {
+    # kind: (color, bold, italic)
+    "keyword": ("#C586C0", False, False),
+    "constant": ("#569CD6", False, False),
+    "function": ("#DCDCAA", False, False),
+    "string": ("#CE9178", False, False),
+    "number": ("#B5CEA8", False, False),
+    "comment": ("#6A9955", False, True),
+    "operator": ("#D4D4D4", False, False),
+    "tag": ("#569CD6", False, False),
+    "attribute": ("#9CDCFE", False, False),
+    "entity": ("#D7BA7D", False, False),
+    "doctype": ("#808080", False, True),
+    "selector": ("#D7BA7D", False, False),
+    "property": ("#9CDCFE", False, False),
+    "value": ("#CE9178", False, False),
+    "at_rule": ("#C586C0", True, False),
+}
+
+
+class Lexer:
+    # Lexers work one line at a time: tokenize() receives the state the
+    # previous line ended in and returns this line's tokens and end state.
+    language = "plain"
+    initial_state = 0
+
+    def tokenize(self, text: str, state: int) -> tuple[list[Token], int]:
+        return [], state
+
+
+class RegexLexer(Lexer):
+    # Each state's rules compile into one alternation; text no rule matches
+    # is left unformatted.
+    rules: dict[int, Sequence[Rule]] = {}
+    # States that do not survive a line break, mapped to where they fall back.
+    line_end_states: dict[int, int] = {}
+
+    def __init__(self) -> None:
+        self._compiled = {state: _compile_rules(rules) for state, rules in self.rules.items()}
+
+    def tokenize(self, text: str, state: int) -> tuple[list[Token], int]:
+        tokens: list[Token] = []
+        _, state = self._scan(text, 0, state, tokens)
+        return tokens, self.line_end_states.get(state, state)
+
+    def _scan(
+        self, text: str, position: int, state: int, tokens: list[Token], stop_states: frozenset[int] = frozenset()
+    ) -> tuple[int, int]:
+        # Lexes from position until the line ends or a rule enters one of
+        # stop_states, so a subclass can take over (e.g. to delegate).
+        end = len(text)
+        while position < end and state not in stop_states:
+            compiled = self._compiled.get(state)
+            if compiled is None:
+                break
+            pattern, actions = compiled
+            match = pattern.search(text, position)
+            if match is None:
+                position = end
+                break
+            kind, next_state = actions[match.lastgroup]
+            start, stop = match.span()
+            if kind is not None and stop > start:
+                tokens.append((start, stop - start, kind))
+            if next_state is not None:
+                state = next_state
+            elif stop == start:
+                stop += 1
+            position = stop
+        return position, state
+
+
+class CachedLexer(Lexer):
+    # Memoizes whole-line results by (text, state). Embedded languages use
+    # it so lines whose text and entry state are unchanged are not re-lexed
+    # when an edit elsewhere sends the highlighter back through them.
+    def __init__(self, lexer: Lexer, max_lines: int = 16384) -> None:
+        self.lexer = lexer
+        self.language = lexer.language
+        self.initial_state = lexer.initial_state
+        self.max_lines = max_lines
+        self.hits = 0
+        self.misses = 0
+        self._lines: OrderedDict[tuple[str, int], tuple[list[Token], int]] = OrderedDict()
+
+    def tokenize(self, text: str, state: int) -> tuple[list[Token], int]:
+        key = (text, state)
+        cached = self._lines.get(key)
+        if cached is not None:
+            self._lines.move_to_end(key)
+            self.hits += 1
+            return cached
+        self.misses += 1
+        cached = self.lexer.tokenize(text, state)
+        self._lines[key] = cached
+        if len(self._lines) > self.max_lines:
+            self._lines.popitem(last=False)
+        return cached
+
+
+# Nested states: a host lexer keeps its own state in the low bits and the
+# embedded lexer's state above them, so one int still describes a line end.
+_EMBED_SHIFT = 8
+_HOST_MASK = (1 << _EMBED_SHIFT) - 1
+
+
+def pack_state(host: int, embedded: int = 0) -> int:
+    return host | (embedded << _EMBED_SHIFT)
+
+
+def unpack_state(state: int) -> tuple[int, int]:
+    return state & _HOST_MASK, state >> _EMBED_SHIFT
+
+
+def _compile_rules(rules: Sequence[Rule]) -> tuple[re.Pattern, dict[str, tuple[Optional[str], Optional[int]]]]:
+    # Rule patterns must not use named groups: lastgroup identifies the rule.
+    alternatives = []
+    actions = {}
+    for index, (pattern, kind, next_state) in enumerate(rules):
+        name = f"r{index}"
+        alternatives.append(f"(?P<{name}>{pattern})")
+        actions[name] = (kind, next_state)
+    return re.compile("|".join(alternatives)), actions
+
+
+class FormatTable:
+    # One QTextCharFormat per token kind, shared by every range that uses it
+    # instead of allocating a format per span.
+    def __init__(self, palette: Optional[dict[str, tuple[str, bool, bool]]] = None) -> None:
+        self._formats: dict[str, QTextCharFormat] = {}
+        self.set_palette(palette if palette is not None else DEFAULT_PALETTE)
+
+    def set_palette(self, palette: dict[str, tuple[str, bool, bool]]) -> None:
+        formats = {}
+        for kind, (color, bold, italic) in palette.items():
+            text_format = QTextCharFormat()
+            text_format.setForeground(QColor(color))
+            if bold:
+                text_format.setFontWeight(QFont.Weight.Bold)
+            if italic:
+                text_format.setFontItalic(True)
+            formats[kind] = text_format
+        self._formats = formats
+
+    def get(self, kind: str) -> Optional[QTextCharFormat]:
+        return self._formats.get(kind)
+
+
+class Highlighter(QObject):
+    # Incremental replacement for QSyntaxHighlighter. The state each block's
+    # line ended in is kept, so an edit re-lexes from the changed block only
+    # until the end state matches what was stored before. Work that does not
+    # fit the per-keystroke budget continues in idle time slices, visible
+    # blocks first.
+    highlighting_finished = Signal()
+
+    def __init__(
+        self,
+        document: QTextDocument,
+        lexer: Lexer,
+        formats: Optional[FormatTable] = None,
+        parent: Optional[QObject] = None,
+    ) -> None:
+        super().__init__(parent if parent is not None else document)
+        self.document = document
+        self.lexer = lexer
+        self.formats = formats if formats is not None else FormatTable()
+        self.sync_budget_ms = 1.0
+        self.slice_ms = 8.0
+        # End state per block number. Kept here rather than in
+        # QTextBlock.userState() so convergence checks and resets stay in
+        # Python lists instead of costing a binding call per block.
+        self._states: list[int] = []
+        # Per block: the formatted tokens last lexed (None if never), and
+        # those currently set on its layout. Only a difference between the
+        # two costs a setFormats() call.
+        self._tokens: list[Optional[tuple[Token, ...]]] = []
+        self._applied: list[Optional[tuple[Token, ...]]] = []
+        # Document span whose formats changed in the current run; marked
+        # dirty once at the end of it.
+        self._dirty: Optional[tuple[int, int]] = None
+        self._pending: set[int] = set()
+        self._visible: Optional[tuple[int, int]] = None
+        self._applying = False
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(0)
+        self._timer.timeout.connect(self._run_slice)
+        document.contentsChange.connect(self._handle_change)
+        self.rehighlight()
+
+    def rehighlight(self) -> None:
+        count = self.document.blockCount()
+        self._states = [UNLEXED] * count
+        self._tokens = [None] * count
+        # A fresh layout has no formats.
+        self._applied = [()] * count
+        self._pending = {0}
+        self._timer.start()
+
+    def set_palette(self, palette: dict[str, tuple[str, bool, bool]]) -> None:
+        self.formats.set_palette(palette)
+        self.rehighlight()
+        # Same tokens, new formats: every layout needs them again.
+        self._applied = [None] * len(self._applied)
+
+    def block_state(self, number: int) -> int:
+        return self._states[number]
+
+    def set_visible_range(self, first: int, last: int) -> None:
+        self._visible = (first, last)
+        self._apply_range(first - _APPLY_MARGIN, last + _APPLY_MARGIN)
+        states = self._states
+        for number in range(max(0, first), min(last + 1, len(states))):
+            if states[number] == UNLEXED:
+                # Lex from the nearest known state now; the pass from the top
+                # corrects it later if that guess was wrong.
+                self._pending.add(number)
+                self._timer.start()
+                return
+
+    def is_pending(self) -> bool:
+        return bool(self._pending)
+
+    def flush(self) -> None:
+        while self._pending:
+            self._run(min(self._pending), float("inf"))
+        self._timer.stop()
+
+    def _handle_change(self, position: int, removed: int, added: int) -> None:
+        if self._applying:
+            return
+        document = self.document
+        first = document.findBlock(position)
+        if not first.isValid():
+            first = document.lastBlock()
+        number = first.blockNumber()
+        states = self._states
+        # The last block of the edited range ends with what the first block
+        # used to end with, so that is where its old end state belongs.
+        delta = document.blockCount() - len(states)
+        tokens = self._tokens
+        applied = self._applied
+        if delta > 0:
+            states[number:number] = [UNLEXED] * delta
+            tokens[number:number] = [None] * delta
+            applied[number:number] = [()] * delta
+        elif delta < 0:
+            del states[number:number - delta]
+            del tokens[number:number - delta]
+            del applied[number:number - delta]
+        if delta:
+            self._shift_pending(number, delta)
+        last = document.findBlock(position + added)
+        last_number = last.blockNumber() if last.isValid() else len(states) - 1
+        # Their text changed under whatever formats their layouts hold.
+        applied[number] = None
+        applied[last_number] = None
+        # Blocks the edit created are already unlexed; the first and last are
+        # reused blocks whose text changed. Their old end states stay, so the
+        # re-lex can still stop right after them.
+        self._pending.add(number)
+        self._pending.add(last_number)
+        self._run(number, time.perf_counter() + self.sync_budget_ms / 1000.0)
+        if self._pending:
+            self._timer.start()
+
+    def _shift_pending(self, number: int, delta: int) -> None:
+        shifted = set()
+        for pending in self._pending:
+            if pending > number:
+                pending = max(number, pending + delta)
+            shifted.add(pending)
+        self._pending = shifted
+
+    def _run_slice(self) -> None:
+        deadline = time.perf_counter() + self.slice_ms / 1000.0
+        while self._pending and time.perf_counter() < deadline:
+            self._run(self._next_start(), deadline)
+        if self._pending:
+            self._timer.start()
+        else:
+            self.highlighting_finished.emit()
+
+    def _next_start(self) -> int:
+        if self._visible is not None:
+            first, last = self._visible
+            visible = [number for number in self._pending if first <= number <= last]
+            if visible:
+                return min(visible)
+        return min(self._pending)
+
+    def _run(self, number: int, deadline: float) -> None:
+        try:
+            self._lex_run(number, deadline)
+        finally:
+            self._mark_dirty()
+
+    def _lex_run(self, number: int, deadline: float) -> None:
+        pending = self._pending
+        pending.discard(number)
+        states = self._states
+        block = self.document.findBlockByNumber(number)
+        if not block.isValid():
+            return
+        state = states[number - 1] if number > 0 else UNLEXED
+        if state == UNLEXED:
+            state = self.lexer.initial_state
+        count = len(states)
+        while True:
+            old_state = states[number]
+            state = self._highlight_block(block, number, state)
+            states[number] = state
+            number += 1
+            if number >= count:
+                return
+            block = block.next()
+            forced = number in pending
+            if forced:
+                pending.discard(number)
+            # Converged: the next block was lexed from this same state.
+            if state == old_state and not forced and states[number] != UNLEXED:
+                return
+            if time.perf_counter() >= deadline:
+                pending.add(number)
+                return
+
+    def _highlight_block(self, block: QTextBlock, number: int, state: int) -> int:
+        tokens, end_state = self.lexer.tokenize(block.text(), state)
+        get_format = self.formats.get
+        formatted = tuple(token for token in tokens if get_format(token[2]) is not None)
+        self._tokens[number] = formatted
+        if formatted != self._applied[number] and self._near_visible(number):
+            self._apply(block, number)
+        return end_state
+
+    def _near_visible(self, number: int) -> bool:
+        if self._visible is None:
+            return True
+        first, last = self._visible
+        return first - _APPLY_MARGIN <= number <= last + _APPLY_MARGIN
+
+    def _apply_range(self, first: int, last: int) -> None:
+        tokens = self._tokens
+        applied = self._applied
+        first = max(first, 0)
+        last = min(last, len(tokens) - 1)
+        block = self.document.findBlockByNumber(first)
+        for number in range(first, last + 1):
+            if not block.isValid():
+                break
+            if tokens[number] is not None and tokens[number] != applied[number]:
+                self._apply(block, number)
+            block = block.next()
+        self._mark_dirty()
+
+    def _apply(self, block: QTextBlock, number: int) -> None:
+        get_format = self.formats.get
+        ranges = []
+        for start, length, kind in self._tokens[number]:
+            format_range = QTextLayout.FormatRange()
+            format_range.start = start
+            format_range.length = length
+            format_range.format = get_format(kind)
+            ranges.append(format_range)
+        block.layout().setFormats(ranges)
+        self._applied[number] = self._tokens[number]
+        start = block.position()
+        end = start + block.length()
+        if self._dirty is not None:
+            start = min(start, self._dirty[0])
+            end = max(end, self._dirty[1])
+        self._dirty = (start, end)
+
+    def _mark_dirty(self) -> None:
+        # One repaint request per run rather than one per block.
+        if self._dirty is None:
+            return
+        start, end = self._dirty
+        self._dirty = None
+        self._applying = True
+        try:
+            self.document.markContentsDirty(start, end - start)
+        finally:
+            self._applying = False
+
+
+def lexer_for(language: str) -> Lexer:
+    from .css_highlighter import CssLexer
+    from .html_highlighter import HtmlLexer
+    from .js_highlighter import JsLexer
+
+    for lexer_class in (HtmlLexer, CssLexer, JsLexer):
+        if lexer_class.language == language:
+            return lexer_class()
+    return Lexer()
+
+
+def attach_highlighter(document: QTextDocument, language: str) -> Highlighter:
+    return Highlighter(document, lexer_for(language))
@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+import re
+
+from .css_highlighter import BLOCK as CSS_DECLARATIONS, CssLexer
+from .engine import CachedLexer, RegexLexer, Token, pack_state, unpack_state
+from .js_highlighter import CODE as JS_CODE, JsLexer
+
+
+(
+    TEXT,
+    COMMENT,
+    TAG,
+    TAG_DOUBLE_QUOTE,
+    TAG_SINGLE_QUOTE,
+    SCRIPT_TAG,
+    STYLE_TAG,
+    SCRIPT,
+    STYLE,
+    STYLE_ATTRIBUTE,
+    EVENT_ATTRIBUTE,
+) = range(11)
+
+# States where HtmlLexer stops its own rules and hands text to another lexer.
+_DELEGATED = frozenset((SCRIPT, STYLE, STYLE_ATTRIBUTE, EVENT_ATTRIBUTE))
+_CLOSING_TAGS = {
+    SCRIPT: re.compile(r"</(?i:script)\s*>?"),
+    STYLE: re.compile(r"</(?i:style)\s*>?"),
+}
+_ATTRIBUTE_VALUE = re.compile(r"\s*(=)\s*([\"'])")
+
+
+def _attribute_rules(close_state: int) -> tuple:
+    return (
+        (r"/?>", "tag", close_state),
+        (r"[^\s\"'>/=]+", "attribute", None),
+        (r"=", "operator", None),
+        (r'"[^"]*"', "string", None),
+        (r"'[^']*'", "string", None),
+    )
+
+
+class HtmlLexer(RegexLexer):
+    # Script and style bodies, style="" and on*="" values are lexed by the
+    # CSS and JS lexers. A line's end state packs the HTML state with the
+    # embedded lexer's state (see pack_state), and each embedded lexer sits
+    # behind its own line cache, so re-highlighting HTML around an unchanged
+    # script does not re-lex the script and vice versa.
+    language = "html"
+    rules = {
+        TEXT: (
+            (r"<!--.*?-->", "comment", None),
+            (r"<!--.*", "comment", COMMENT),
+            (r"<!(?i:doctype)[^>]*>?", "doctype", None),
+            (r"<(?i:script)(?![\w:-])", "tag", SCRIPT_TAG),
+            (r"<(?i:style)(?![\w:-])", "tag", STYLE_TAG),
+            (r"</?[A-Za-z][\w:-]*", "tag", TAG),
+            (r"&(?:#[0-9]+|#[xX][0-9a-fA-F]+|[A-Za-z][A-Za-z0-9]*);", "entity", None),
+        ),
+        COMMENT: (
+            (r".*?-->", "comment", TEXT),
+            (r".+", "comment", None),
+        ),
+        TAG: (
+            (r"(?i:style)(?=\s*=\s*[\"'])", "attribute", STYLE_ATTRIBUTE),
+            (r"(?i:on[a-z]+)(?=\s*=\s*[\"'])", "attribute", EVENT_ATTRIBUTE),
+            *_attribute_rules(TEXT),
+            (r'"[^"]*', "string", TAG_DOUBLE_QUOTE),
+            (r"'[^']*", "string", TAG_SINGLE_QUOTE),
+        ),
+        TAG_DOUBLE_QUOTE: (
+            (r'[^"]*"', "string", TAG),
+            (r".+", "string", None),
+        ),
+        TAG_SINGLE_QUOTE: (
+            (r"[^']*'", "string", TAG),
+            (r".+", "string", None),
+        ),
+        SCRIPT_TAG: _attribute_rules(SCRIPT),
+        STYLE_TAG: _attribute_rules(STYLE),
+    }
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.script_lexer = CachedLexer(JsLexer())
+        self.style_lexer = CachedLexer(CssLexer())
+
+    def tokenize(self, text: str, state: int) -> tuple[list[Token], int]:
+        host, embedded = unpack_state(state)
+        tokens: list[Token] = []
+        position = 0
+        end = len(text)
+        while position < end:
+            if host == SCRIPT or host == STYLE:
+                close = _CLOSING_TAGS[host].search(text, position)
+                stop = close.start() if close is not None else end
+                lexer = self.script_lexer if host == SCRIPT else self.style_lexer
+                embedded = _delegate(lexer, text, position, stop, embedded, tokens)
+                if close is None:
+                    break
+                tokens.append((stop, close.end() - stop, "tag"))
+                host, embedded, position = TEXT, 0, close.end()
+            elif host == STYLE_ATTRIBUTE or host == EVENT_ATTRIBUTE:
+                position, host = self._inline_value(text, position, host, tokens)
+            else:
+                position, host = self._scan(text, position, host, tokens, _DELEGATED)
+                if host == SCRIPT or host == STYLE:
+                    embedded = (self.script_lexer if host == SCRIPT else self.style_lexer).initial_state
+        if host != SCRIPT and host != STYLE:
+            embedded = 0
+        return tokens, pack_state(host, embedded)
+
+    def _inline_value(self, text: str, position: int, host: int, tokens: list[Token]) -> tuple[int, int]:
+        match = _ATTRIBUTE_VALUE.match(text, position)
+        if match is None:
+            return position, TAG
+        tokens.append((match.start(1), 1, "operator"))
+        quote = match.group(2)
+        start = match.end()
+        close = text.find(quote, start)
+        if close == -1:
+            # Values spanning lines stay plain strings.
+            tokens.append((start - 1, len(text) - start + 1, "string"))
+            return len(text), TAG_DOUBLE_QUOTE if quote == '"' else TAG_SINGLE_QUOTE
+        tokens.append((start - 1, 1, "string"))
+        if host == STYLE_ATTRIBUTE:
+            _delegate(self.style_lexer, text, start, close, CSS_DECLARATIONS, tokens)
+        else:
+            _delegate(self.script_lexer, text, start, close, JS_CODE, tokens)
+        tokens.append((close, 1, "string"))
+        return close + 1, TAG
+
+
+def _delegate(lexer: CachedLexer, text: str, start: int, stop: int, state: int, tokens: list[Token]) -> int:
+    if stop <= start:
+        return state
+    embedded_tokens, state = lexer.tokenize(text[start:stop], state)
+    tokens.extend((start + offset, length, kind) for offset, length, kind in embedded_tokens)
+    return state
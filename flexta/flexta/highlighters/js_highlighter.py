@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+from .engine import RegexLexer
+
+
+CODE, BLOCK_COMMENT, TEMPLATE = range(3)
+
+KEYWORDS = (
+    "async", "await", "break", "case", "catch", "class", "const", "continue", "debugger", "default",
+    "delete", "do", "else", "export", "extends", "finally", "for", "from", "function", "if", "import",
+    "in", "instanceof", "let", "new", "of", "return", "static", "super", "switch", "throw", "try",
+    "typeof", "var", "void", "while", "with", "yield",
+)
+CONSTANTS = ("true", "false", "null", "undefined", "NaN", "Infinity", "this")
+
+_NUMBER = (
+    r"(?:0[xX][0-9a-fA-F_]+|0[bB][01_]+|0[oO][0-7_]+|(?:\d[\d_]*(?:\.\d*)?|\.\d+)(?:[eE][+-]?\d+)?)n?"
+    r"(?![\w$])"
+)
+
+
+class JsLexer(RegexLexer):
+    language = "javascript"
+    rules = {
+        CODE: (
+            (r"//.*", "comment", None),
+            (r"/\*.*?\*/", "comment", None),
+            (r"/\*.*", "comment", BLOCK_COMMENT),
+            (r'"(?:[^"\\]|\\.)*"?', "string", None),
+            (r"'(?:[^'\\]|\\.)*'?", "string", None),
+            (r"`(?:[^`\\]|\\.)*`", "string", None),
+            (r"`(?:[^`\\]|\\.)*", "string", TEMPLATE),
+            (_NUMBER, "number", None),
+            (r"\b(?:%s)\b(?![$])" % "|".join(KEYWORDS), "keyword", None),
+            (r"\b(?:%s)\b(?![$])" % "|".join(CONSTANTS), "constant", None),
+            (r"[A-Za-z_$][\w$]*(?=\s*\()", "function", None),
+            (r"[A-Za-z_$][\w$]*", None, None),
+            (r"=>|[-+*/%=&|^!<>?~]+", "operator", None),
+        ),
+        BLOCK_COMMENT: (
+            (r".*?\*/", "comment", CODE),
+            (r".+", "comment", None),
+        ),
+        TEMPLATE: (
+            (r"(?:[^`\\]|\\.)*`", "string", CODE),
+            (r".+", "string", None),
+        ),
+    }
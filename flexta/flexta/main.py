@@ -0,0 +1,32 @@
+from __future__ import annotations
+
+import sys
+from typing import Optional, Sequence
+
+from PySide6.QtWidgets import QApplication
+
+from flexta.database import settings_db
+from flexta.ui.theme_engine import ensure_theme_applied
+
+
+def create_application(argv: Optional[Sequence[str]] = None) -> QApplication:
+    app = QApplication.instance()
+    if app is None:
+        app = QApplication(list(argv if argv is not None else sys.argv))
+    app.setApplicationName("Flexta")
+    # Drain queued settings writes before Qt tears down the event loop.
+    app.aboutToQuit.connect(settings_db.close_store)
+    ensure_theme_applied(app)
+    return app
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    app = create_application(argv)
+
+    # Only the main window and its startup view are built before the first
+    # paint. Dialogs, wizard pages and the template catalogue load on demand.
+    from flexta.ui.main_window import MainWindow
+
+    window = MainWindow()
+    window.show()
+    return app.exec()
@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+from typing import Any, Callable, Hashable, Optional
+
+from PySide6.QtCore import (
+    QAbstractAnimation,
+    QEasingCurve,
+    QObject,
+    QPauseAnimation,
+    QPropertyAnimation,
+    QSequentialAnimationGroup,
+    QTimer,
+)
+import shiboken6
+
+
+class _PooledAnimation:
+    __slots__ = ("target", "group", "pause", "animation", "on_finished")
+
+    def __init__(self, target: QObject, prop: bytes, owner: QObject) -> None:
+        # Holding the wrapper keeps id(target) stable for the pool key.
+        self.target = target
+        self.group = QSequentialAnimationGroup(owner)
+        self.pause = QPauseAnimation(0)
+        self.animation = QPropertyAnimation(target, prop)
+        self.group.addAnimation(self.pause)
+        self.group.addAnimation(self.animation)
+        self.on_finished: Optional[Callable[[], None]] = None
+
+
+class AnimationManager(QObject):
+    # One reusable animation per (target, property). Starting a new animation
+    # on a busy pair retargets it from the current value instead of stacking a
+    # second animation that fights the first.
+    def __init__(self, parent: Optional[QObject] = None) -> None:
+        super().__init__(parent)
+        self._pool: dict[tuple[int, bytes], _PooledAnimation] = {}
+        self._coalesced: dict[Hashable, Callable[[], None]] = {}
+        self._coalesce_timer = QTimer(self)
+        self._coalesce_timer.setSingleShot(True)
+        self._coalesce_timer.setInterval(0)
+        self._coalesce_timer.timeout.connect(self._run_coalesced)
+
+    def animate(
+        self,
+        target: QObject,
+        prop: bytes,
+        end_value: Any,
+        duration: int = 240,
+        easing: QEasingCurve.Type = QEasingCurve.Type.OutCubic,
+        delay: int = 0,
+        on_finished: Optional[Callable[[], None]] = None,
+    ) -> QPropertyAnimation:
+        pooled = self._pooled(target, prop)
+        pooled.group.stop()
+        pooled.on_finished = on_finished
+        pooled.pause.setDuration(delay)
+        # No explicit start value: Qt reads the property when the animation
+        # starts, which is what makes retargeting mid-flight seamless.
+        pooled.animation.setDuration(duration)
+        pooled.animation.setEasingCurve(easing)
+        pooled.animation.setEndValue(end_value)
+        pooled.group.start()
+        return pooled.animation
+
+    def stop(self, target: QObject, prop: Optional[bytes] = None) -> None:
+        for (target_id, pooled_prop), pooled in self._pool.items():
+            if target_id == id(target) and (prop is None or pooled_prop == prop):
+                pooled.group.stop()
+
+    def coalesce(self, key: Hashable, callback: Callable[[], None]) -> None:
+        # Repeated triggers within one event-loop pass run the callback once.
+        self._coalesced[key] = callback
+        self._coalesce_timer.start()
+
+    def live_count(self) -> int:
+        return sum(
+            1 for pooled in self._pool.values() if pooled.group.state() == QAbstractAnimation.State.Running
+        )
+
+    def pooled_count(self) -> int:
+        return len(self._pool)
+
+    def _pooled(self, target: QObject, prop: bytes) -> _PooledAnimation:
+        key = (id(target), bytes(prop))
+        pooled = self._pool.get(key)
+        if pooled is None:
+            if not any(target_id == key[0] for target_id, _ in self._pool):
+                target.destroyed.connect(lambda _=None, target_id=key[0]: self._forget(target_id))
+            pooled = _PooledAnimation(target, key[1], self)
+            pooled.group.finished.connect(lambda pooled=pooled: self._handle_finished(pooled))
+            self._pool[key] = pooled
+        return pooled
+
+    def _handle_finished(self, pooled: _PooledAnimation) -> None:
+        callback, pooled.on_finished = pooled.on_finished, None
+        if callback is not None:
+            callback()
+
+    def _forget(self, target_id: int) -> None:
+        if not shiboken6.isValid(self):
+            return
+        for key in [key for key in self._pool if key[0] == target_id]:
+            pooled = self._pool.pop(key)
+            pooled.group.stop()
+            pooled.group.deleteLater()
+
+    def _run_coalesced(self) -> None:
+        pending, self._coalesced = self._coalesced, {}
+        for callback in pending.values():
+            callback()
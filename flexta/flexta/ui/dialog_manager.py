@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Optional
+
+from PySide6.QtCore import QObject, Qt, QTimer, Signal
+from PySide6.QtWidgets import QWidget
+
+if TYPE_CHECKING:
+    from .dialogs.create_project_dialog import CreateProjectDialog
+
+
+class DialogManager(QObject):
+    # Re-emitted from the shared dialog so listeners survive its lazy creation.
+    project_created = Signal(str)
+
+    def __init__(self, window: QWidget) -> None:
+        super().__init__(window)
+        self.setObjectName("flexta-dialog-manager")
+        self._create_project_dialog: Optional[CreateProjectDialog] = None
+        self._prewarm_scheduled = False
+
+    @classmethod
+    def for_window(cls, widget: QWidget) -> "DialogManager":
+        window = widget.window()
+        manager = window.findChild(cls, "flexta-dialog-manager", Qt.FindChildOption.FindDirectChildrenOnly)
+        if manager is None:
+            manager = cls(window)
+        return manager
+
+    def create_project_dialog(self) -> CreateProjectDialog:
+        if self._create_project_dialog is None:
+            from .dialogs.create_project_dialog import CreateProjectDialog
+
+            # parent() rather than a stored reference: the window already
+            # holds the manager, and a Python-level cycle would leave both to
+            # the garbage collector, which may run on a worker thread.
+            dialog = CreateProjectDialog(self.parent())
+            dialog.project_created.connect(self.project_created)
+            self._create_project_dialog = dialog
+        return self._create_project_dialog
+
+    def current_create_project_dialog(self) -> Optional[CreateProjectDialog]:
+        return self._create_project_dialog
+
+    def open_create_project_dialog(self) -> CreateProjectDialog:
+        dialog = self.create_project_dialog()
+        if not dialog.isVisible():
+            dialog.reset()
+        dialog.open()
+        dialog.raise_()
+        dialog.activateWindow()
+        return dialog
+
+    def prewarm(self) -> None:
+        # Build the dialog and index templates once the event loop is idle so
+        # the first click only has to show it.
+        if self._prewarm_scheduled or self._create_project_dialog is not None:
+            return
+        self._prewarm_scheduled = True
+        QTimer.singleShot(0, self, self._prewarm)
+
+    def _prewarm(self) -> None:
+        self.create_project_dialog().load_templates()
@@ -0,0 +1,23 @@
+from __future__ import annotations
+
+from importlib import import_module
+from typing import Any
+
+# Dialogs are imported on first attribute access so that importing the
+# package (or the main window) does not pull in every dialog module.
+_LAZY_EXPORTS = {
+    "CreateProjectDialog": ".create_project_dialog",
+    "LoginDialog": ".login_dialog",
+    "SetupWizard": ".login_dialog",
+}
+
+__all__ = list(_LAZY_EXPORTS)
+
+
+def __getattr__(name: str) -> Any:
+    module_name = _LAZY_EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
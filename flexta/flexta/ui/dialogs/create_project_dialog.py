@@ -1,10 +1,11 @@
 from __future__ import annotations
 
 from pathlib import Path
-import shutil
-from typing import Iterable, Optional
+import threading
+from typing import Optional
 
-from PySide6.QtCore import Qt, Signal
+from PySide6.QtCore import QObject, Qt, Signal
+from PySide6.QtGui import QShowEvent
 from PySide6.QtWidgets import (
     QComboBox,
     QDialog,
@@ -14,15 +15,58 @@ from PySide6.QtWidgets import (
     QHBoxLayout,
     QLabel,
     QLineEdit,
+    QProgressBar,
     QPushButton,
     QVBoxLayout,
     QWidget,
 )
 
+from flexta.core.project_seeder import ProjectSeeder, SeedCancelled
 from flexta.database import settings_db
+from flexta.exceptions import TemplateError
+from flexta.utils.resource_loader import Template, get_template_registry
 from flexta.utils.validation import does_folder_exist, is_empty_name, is_invalid_path
 
 
+class ProjectSeedJob(QObject):
+    # All signals are emitted from the worker thread and queued onto the
+    # thread that owns the job (the GUI thread).
+    progress = Signal(int, int)
+    finished = Signal(str)
+    failed = Signal(str)
+    cancelled = Signal()
+
+    def __init__(self, template: Template, project_path: Path, parent: Optional[QObject] = None) -> None:
+        super().__init__(parent)
+        self.project_path = project_path
+        self._seeder = ProjectSeeder(template, project_path, progress=self.progress.emit)
+        self._thread = threading.Thread(target=self._run, name="flexta-create-project", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def cancel(self) -> None:
+        self._seeder.cancel()
+
+    def is_running(self) -> bool:
+        return self._thread.is_alive()
+
+    def wait(self, timeout: Optional[float] = None) -> None:
+        self._thread.join(timeout)
+
+    def _run(self) -> None:
+        try:
+            self._seeder.run()
+        except SeedCancelled:
+            self.cancelled.emit()
+        except OSError as error:
+            self.failed.emit(f"Could not create project: {error.strerror or error}")
+        except Exception as error:
+            self.failed.emit(f"Could not create project: {error}")
+        else:
+            self.finished.emit(str(self.project_path))
+
+
 class CreateProjectDialog(QDialog):
     project_created = Signal(str)
 
@@ -30,7 +74,9 @@ class CreateProjectDialog(QDialog):
         super().__init__(parent)
         self.setWindowTitle("Create Project")
         self.setModal(True)
-        self._templates_dir = Path(__file__).resolve().parents[2] / "resources" / "templates"
+        self._templates = get_template_registry()
+        self._template_names: list[str] = []
+        self._seed_job: Optional[ProjectSeedJob] = None
         self._build_ui()
 
     def _build_ui(self) -> None:
@@ -51,20 +97,21 @@ class CreateProjectDialog(QDialog):
         form_layout.addRow("Directory", directory_layout)
 
         self.template_picker = QComboBox()
-        templates = list(self._load_templates())
-        if templates:
-            self.template_picker.addItems(templates)
-        else:
-            self.template_picker.addItem("default")
         form_layout.addRow("Template", self.template_picker)
 
         layout.addLayout(form_layout)
 
         self.error_label = QLabel("")
-        self.error_label.setStyleSheet("color: #c62828;")
+        self.error_label.setObjectName("FormError")
         self.error_label.setAlignment(Qt.AlignmentFlag.AlignLeft)
         layout.addWidget(self.error_label)
 
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setRange(0, 1000)
+        self.progress_bar.setTextVisible(False)
+        self.progress_bar.hide()
+        layout.addWidget(self.progress_bar)
+
         button_box = QDialogButtonBox(QDialogButtonBox.StandardButton.Cancel)
         self.create_button = QPushButton("Create")
         self.create_button.setDefault(True)
@@ -73,6 +120,42 @@ class CreateProjectDialog(QDialog):
         button_box.rejected.connect(self.reject)
         layout.addWidget(button_box)
 
+    def showEvent(self, event: QShowEvent) -> None:
+        self.load_templates()
+        super().showEvent(event)
+
+    def load_templates(self) -> None:
+        # The templates directory is only scanned once the dialog is shown or
+        # pre-warmed, keeping construction cheap. Later calls hit the
+        # registry's cache and only rebuild the picker when templates changed.
+        templates = self._templates.list_templates()
+        names = [template.name for template in templates] or ["default"]
+        if names == self._template_names:
+            return
+        self._template_names = names
+        selected = self.template_picker.currentText()
+        self.template_picker.clear()
+        for template in templates:
+            self.template_picker.addItem(template.name)
+            if template.description:
+                index = self.template_picker.count() - 1
+                self.template_picker.setItemData(index, template.description, Qt.ItemDataRole.ToolTipRole)
+        if not templates:
+            self.template_picker.addItem("default")
+        self.template_picker.setCurrentIndex(max(0, self.template_picker.findText(selected)))
+
+    def reset(self) -> None:
+        # The dialog is reused between openings; keep the chosen directory
+        # and template but start from a clean name and message.
+        if self._seed_job is not None:
+            return
+        self.name_input.clear()
+        self._set_error("")
+        self.progress_bar.hide()
+        if not self.directory_input.text():
+            self.directory_input.setText(settings_db.get_last_used_folder() or "")
+        self.name_input.setFocus()
+
     def _browse_directory(self) -> None:
         start_dir = settings_db.get_last_used_folder()
         directory = QFileDialog.getExistingDirectory(
@@ -84,15 +167,6 @@ class CreateProjectDialog(QDialog):
             self.directory_input.setText(directory)
             settings_db.set_last_used_folder(directory)
 
-    def _load_templates(self) -> Iterable[str]:
-        if not self._templates_dir.exists():
-            return []
-        template_names: set[str] = set()
-        for template_file in self._templates_dir.iterdir():
-            if template_file.is_file() and template_file.suffix:
-                template_names.add(template_file.stem.split(".")[0])
-        return sorted(template_names)
-
     def _handle_create(self) -> None:
         name = self.name_input.text().strip()
         directory = self.directory_input.text().strip()
@@ -108,23 +182,66 @@ class CreateProjectDialog(QDialog):
             self._set_error("Project folder already exists.")
             return
 
-        project_path.mkdir(parents=True, exist_ok=False)
-        self._seed_project(project_path, self.template_picker.currentText())
-        self.project_created.emit(str(project_path))
-        settings_db.add_recent_project(str(project_path))
-        settings_db.set_last_used_folder(str(project_path.parent))
-        self.accept()
+        self.load_templates()
+        self._start_seeding(project_path, self.template_picker.currentText())
+
+    def is_creating(self) -> bool:
+        return self._seed_job is not None
 
-    def _seed_project(self, project_path: Path, template_name: str) -> None:
-        if not self._templates_dir.exists():
+    def reject(self) -> None:
+        # Cancel rolls back an in-flight creation instead of closing the dialog.
+        if self._seed_job is not None:
+            self._seed_job.cancel()
             return
-        template_files = list(self._templates_dir.glob(f"{template_name}.*"))
-        if not template_files:
-            template_files = list(self._templates_dir.glob("*.*"))
-        for template_file in template_files:
-            if template_file.is_file():
-                destination = project_path / template_file.name
-                shutil.copy2(template_file, destination)
+        super().reject()
+
+    def _start_seeding(self, project_path: Path, template_name: str) -> None:
+        try:
+            template = self._templates.get(template_name)
+        except TemplateError:
+            template = Template(name=template_name, description="", files=())
+
+        self._set_error("")
+        self._set_busy(True)
+        job = ProjectSeedJob(template, project_path, self)
+        job.progress.connect(self._handle_seed_progress)
+        job.finished.connect(self._handle_seed_finished)
+        job.failed.connect(self._handle_seed_failed)
+        job.cancelled.connect(self._handle_seed_cancelled)
+        self._seed_job = job
+        job.start()
+
+    def _handle_seed_progress(self, done: int, total: int) -> None:
+        self.progress_bar.setValue(done * 1000 // total if total else 1000)
+
+    def _handle_seed_finished(self, project_path: str) -> None:
+        self._finish_seeding()
+        self.project_created.emit(project_path)
+        settings_db.add_recent_project(project_path)
+        settings_db.set_last_used_folder(str(Path(project_path).parent))
+        self.accept()
+
+    def _handle_seed_failed(self, message: str) -> None:
+        self._finish_seeding()
+        self._set_error(message)
+
+    def _handle_seed_cancelled(self) -> None:
+        self._finish_seeding()
+        self._set_error("Project creation cancelled.")
+
+    def _finish_seeding(self) -> None:
+        if self._seed_job is not None:
+            self._seed_job.deleteLater()
+            self._seed_job = None
+        self._set_busy(False)
+
+    def _set_busy(self, busy: bool) -> None:
+        self.name_input.setEnabled(not busy)
+        self.directory_input.setEnabled(not busy)
+        self.template_picker.setEnabled(not busy)
+        self.create_button.setEnabled(not busy)
+        self.progress_bar.setValue(0)
+        self.progress_bar.setVisible(busy)
 
     def _set_error(self, message: str) -> None:
         self.error_label.setText(message)
@@ -3,28 +3,155 @@ from PySide6.QtWidgets import (
     QDialog, QWidget, QVBoxLayout, QHBoxLayout, QLabel, 
     QLineEdit, QPushButton, QFrame, QStackedWidget, 
     QGraphicsDropShadowEffect, QApplication, QCheckBox,
-    QGraphicsOpacityEffect, QGridLayout, QScrollArea,
-    QButtonGroup
+    QGraphicsOpacityEffect, QButtonGroup
 )
 from PySide6.QtCore import (
-    Qt, Signal, QPoint, QPropertyAnimation, 
-    QEasingCurve, QParallelAnimationGroup, QTimer, QSize, QRect, QAbstractAnimation
+    Qt, Signal, QPoint, QPropertyAnimation, QVariantAnimation,
+    QEasingCurve, QParallelAnimationGroup, QSize
 )
-from PySide6.QtGui import QColor, QFont, QLinearGradient, QPalette, QBrush, QIcon
+from PySide6.QtGui import QColor, QFont, QPainter, QPixmap
+
+from flexta.ui.animations import AnimationManager
+from flexta.database import settings_db
+from flexta.ui.theme_engine import DEFAULT_THEME, THEME_SETTING, ensure_theme_applied, get_theme_engine
+from flexta.utils.metrics import FrameTimer
 
 # ==========================================
 #  SHARED ANIMATION CLASS
 # ==========================================
+class _CrossfadeOverlay(QWidget):
+    # Paints two pre-rendered page snapshots; no child widgets are involved,
+    # so each animation frame is just two pixmap blits.
+    def __init__(self, parent):
+        super().__init__(parent)
+        self.setAttribute(Qt.WidgetAttribute.WA_NoSystemBackground)
+        self.out_pixmap = QPixmap()
+        self.in_pixmap = QPixmap()
+        self.out_opacity = 1.0
+        self.in_opacity = 0.0
+
+    def set_opacities(self, out_opacity, in_opacity):
+        self.out_opacity = out_opacity
+        self.in_opacity = in_opacity
+        self.update()
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.setOpacity(self.out_opacity)
+        painter.drawPixmap(0, 0, self.out_pixmap)
+        painter.setOpacity(self.in_opacity)
+        painter.drawPixmap(0, 0, self.in_pixmap)
+        painter.end()
+
+
 class FadeStackWidget(QStackedWidget):
-    def __init__(self, parent=None):
+    TRANSITION_SNAPSHOT = "snapshot"
+    TRANSITION_EFFECT = "effect"
+
+    # Emitted with a FrameStats once a crossfade has finished.
+    transition_finished = Signal(object)
+
+    def __init__(self, parent=None, transition=TRANSITION_SNAPSHOT, duration=300):
         super().__init__(parent)
+        self.transition = transition
+        self.duration = duration
         self.is_animating = False
+        self.last_frame_stats = None
         self._cleanup_effects = []
+        self._page_factories = {}
+        self._frame_timer = FrameTimer()
+        self._overlay = None
+        self._snapshot_anim = None
+        self._out_curve = QEasingCurve(QEasingCurve.Type.OutQuad)
+        self._in_curve = QEasingCurve(QEasingCurve.Type.InQuad)
+
+    # Lazy pages: a cheap placeholder holds the slot until the page is first
+    # navigated to, so dialogs only pay for the page that is actually shown.
+    def add_lazy_widget(self, factory):
+        placeholder = QWidget()
+        self._page_factories[placeholder] = factory
+        return self.addWidget(placeholder)
+
+    def ensure_widget(self, index):
+        placeholder = self.widget(index)
+        factory = self._page_factories.pop(placeholder, None)
+        if factory is None:
+            return placeholder
+        page = factory()
+        self.blockSignals(True)
+        self.insertWidget(index, page)
+        self.removeWidget(placeholder)
+        self.blockSignals(False)
+        placeholder.deleteLater()
+        return page
+
+    def is_built(self, index):
+        return self.widget(index) not in self._page_factories
 
     def crossfade_to_index(self, index):
         if self.is_animating or index == self.currentIndex():
             return
 
+        self.ensure_widget(index)
+        if not self.isVisible() or self.duration <= 0:
+            self.setCurrentIndex(index)
+            return
+
+        if self.transition == self.TRANSITION_EFFECT:
+            self._crossfade_with_effects(index)
+        else:
+            self._crossfade_with_snapshots(index)
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        if self._overlay is not None:
+            self._overlay.setGeometry(self.rect())
+
+    def _crossfade_with_snapshots(self, index):
+        self.is_animating = True
+        current = self.currentWidget()
+        next_widget = self.widget(index)
+        next_widget.setGeometry(current.geometry())
+
+        # Each page is rendered exactly once; the animation only blends the
+        # cached pixmaps, and the live widget is revealed when it is done.
+        if self._overlay is None:
+            self._overlay = _CrossfadeOverlay(self)
+            self._snapshot_anim = QVariantAnimation(self)
+            self._snapshot_anim.setStartValue(0.0)
+            self._snapshot_anim.setEndValue(1.0)
+            self._snapshot_anim.valueChanged.connect(self._step_snapshot)
+            self._snapshot_anim.finished.connect(self._finish_snapshot)
+        overlay = self._overlay
+        overlay.out_pixmap = current.grab()
+        overlay.in_pixmap = next_widget.grab()
+        overlay.set_opacities(1.0, 0.0)
+        overlay.setGeometry(self.rect())
+
+        self.setCurrentIndex(index)
+        next_widget.hide()
+        overlay.show()
+        overlay.raise_()
+
+        self._snapshot_anim.setDuration(self.duration)
+        self._frame_timer.start()
+        self._snapshot_anim.start()
+
+    def _step_snapshot(self, progress):
+        self._overlay.set_opacities(
+            1.0 - self._out_curve.valueForProgress(progress),
+            self._in_curve.valueForProgress(progress),
+        )
+        self._frame_timer.tick()
+
+    def _finish_snapshot(self):
+        self.currentWidget().show()
+        self._overlay.hide()
+        self._overlay.out_pixmap = QPixmap()
+        self._overlay.in_pixmap = QPixmap()
+        self._finish_transition()
+
+    def _crossfade_with_effects(self, index):
         self.is_animating = True
         current = self.currentWidget()
         next_widget = self.widget(index)
@@ -42,37 +169,46 @@ class FadeStackWidget(QStackedWidget):
         self.setCurrentIndex(index)
 
         anim_out = QPropertyAnimation(out_effect, b"opacity", self)
-        anim_out.setDuration(300)
+        anim_out.setDuration(self.duration)
         anim_out.setStartValue(1.0)
         anim_out.setEndValue(0.0)
         anim_out.setEasingCurve(QEasingCurve.Type.OutQuad)
 
         anim_in = QPropertyAnimation(in_effect, b"opacity", self)
-        anim_in.setDuration(300)
+        anim_in.setDuration(self.duration)
         anim_in.setStartValue(0.0)
         anim_in.setEndValue(1.0)
         anim_in.setEasingCurve(QEasingCurve.Type.InQuad)
+        anim_in.valueChanged.connect(lambda _value: self._frame_timer.tick())
 
         self._cleanup_effects = [out_effect, in_effect, anim_out, anim_in]
 
         def cleanup():
-            self.is_animating = False
             current.setGraphicsEffect(None)
             next_widget.setGraphicsEffect(None)
             self._cleanup_effects.clear()
+            self._finish_transition()
 
         group = QParallelAnimationGroup(self)
         group.addAnimation(anim_out)
         group.addAnimation(anim_in)
         group.finished.connect(cleanup)
+        self._frame_timer.start()
         group.start()
 
+    def _finish_transition(self):
+        self.is_animating = False
+        self.last_frame_stats = self._frame_timer.stop()
+        self.transition_finished.emit(self.last_frame_stats)
+
 # ==========================================
 #  SETUP WIZARD (NEW INTERACTIVE MENU)
 # ==========================================
 class SetupWizard(QDialog):
     def __init__(self, parent=None):
         super().__init__(parent)
+        self.animations = AnimationManager(self)
+        ensure_theme_applied()
         self.setWindowTitle("Flexta Setup")
         self.setFixedSize(800, 500)
         self.setWindowFlags(Qt.WindowType.FramelessWindowHint)
@@ -85,13 +221,6 @@ class SetupWizard(QDialog):
 
         self.container = QFrame()
         self.container.setObjectName("WizardContainer")
-        self.container.setStyleSheet("""
-            QFrame#WizardContainer {
-                background-color: qlineargradient(spread:pad, x1:0, y1:0, x2:1, y2:1, stop:0 #1a1a1a, stop:1 #000000);
-                border-radius: 20px;
-                border: 1px solid #333;
-            }
-        """)
         self.container_layout = QVBoxLayout(self.container)
         self.container_layout.setContentsMargins(0, 0, 0, 0)
         self.main_layout.addWidget(self.container)
@@ -108,11 +237,11 @@ class SetupWizard(QDialog):
         self.header_layout.setContentsMargins(30, 20, 30, 10)
         
         self.lbl_title = QLabel("Welcome to Flexta")
-        self.lbl_title.setStyleSheet("color: white; font-size: 24px; font-weight: bold;")
+        self.lbl_title.setObjectName("WizardTitle")
         
         self.btn_close = QPushButton("✕")
         self.btn_close.setCursor(Qt.CursorShape.PointingHandCursor)
-        self.btn_close.setStyleSheet("color: #888; background: transparent; border: none; font-size: 18px;")
+        self.btn_close.setObjectName("WizardClose")
         self.btn_close.clicked.connect(self.close)
 
         self.header_layout.addWidget(self.lbl_title)
@@ -123,8 +252,8 @@ class SetupWizard(QDialog):
         # --- CONTENT STACK ---
         self.stack = FadeStackWidget()
         self.stack.addWidget(self.create_theme_page())   # Page 0
-        self.stack.addWidget(self.create_profile_page()) # Page 1
-        self.stack.addWidget(self.create_settings_page())# Page 2
+        self.stack.add_lazy_widget(self.create_profile_page)  # Page 1, built on first visit
+        self.stack.add_lazy_widget(self.create_settings_page) # Page 2, built on first visit
         
         self.stack.currentChanged.connect(self.update_nav_state)
         
@@ -148,8 +277,8 @@ class SetupWizard(QDialog):
         self.dots = []
         for i in range(3): # 3 Pages
             dot = QLabel()
+            dot.setObjectName("NavDot")
             dot.setFixedSize(10, 10)
-            dot.setStyleSheet("background-color: #444; border-radius: 5px;")
             self.dots_layout.addWidget(dot)
             self.dots.append(dot)
         
@@ -181,7 +310,7 @@ class SetupWizard(QDialog):
         layout.setAlignment(Qt.AlignmentFlag.AlignCenter)
         
         lbl = QLabel("Choose your Theme")
-        lbl.setStyleSheet("color: #AAA; font-size: 16px; margin-bottom: 20px;")
+        lbl.setObjectName("WizardSubtitle")
         lbl.setAlignment(Qt.AlignmentFlag.AlignCenter)
         layout.addWidget(lbl)
 
@@ -191,46 +320,32 @@ class SetupWizard(QDialog):
 
         self.theme_group = QButtonGroup(self)
         self.theme_group.setExclusive(True)
-        self.theme_anims = [] # Keep refs to prevent gc
 
-        themes = [("Dark", "#222"), ("Light", "#EEE"), ("Cyber", "#2a0a33")]
+        # Card label -> theme file in resources/themes
+        themes = [("Dark", "dark"), ("Light", "light"), ("Cyber", "custom")]
+        current_theme = get_theme_engine().current_theme or DEFAULT_THEME
         
-        for name, col in themes:
+        for name, theme in themes:
             btn = QPushButton(name)
             # Default Small Size
             btn.setMinimumSize(120, 150)
             btn.setCursor(Qt.CursorShape.PointingHandCursor)
             btn.setCheckable(True)
             
-            # Custom properties to make stylesheet logic easier
-            btn.setStyleSheet(f"""
-                QPushButton {{
-                    background-color: {col};
-                    color: {'#FFF' if name != 'Light' else '#000'};
-                    border: 2px solid #444;
-                    border-radius: 15px;
-                    font-size: 14px;
-                    font-weight: bold;
-                }}
-                QPushButton:hover {{ border: 2px solid #FFF; }}
-                QPushButton:checked {{ 
-                    border: 2px solid #FFF; 
-                    font-size: 16px; /* Bigger font when selected */
-                }}
-            """)
+            # Styled by the app stylesheet (QPushButton#ThemeCard[themeName=...])
+            btn.setObjectName("ThemeCard")
+            btn.setProperty("themeName", theme)
             
             self.theme_group.addButton(btn)
             grid.addWidget(btn)
             
-            if name == "Dark":
+            if theme == current_theme:
                 btn.setChecked(True)
 
         layout.addLayout(grid)
 
         # Logic to resize buttons on click
         def update_button_sizes():
-            self.theme_anims.clear()
-            
             for btn in self.theme_group.buttons():
                 # Target size
                 if btn.isChecked():
@@ -249,33 +364,22 @@ class SetupWizard(QDialog):
                 new_x = center_x - target_w // 2
                 new_y = center_y - target_h // 2
 
-                # Animate size
-                anim_size = QPropertyAnimation(btn, b"size", btn)
-                anim_size.setDuration(240)
-                anim_size.setStartValue(current_size)
-                anim_size.setEndValue(QSize(target_w, target_h))
-                anim_size.setEasingCurve(QEasingCurve.Type.OutBack)
-
-                # Animate position
-                anim_pos = QPropertyAnimation(btn, b"pos", btn)
-                anim_pos.setDuration(240)
-                anim_pos.setStartValue(current_pos)
-                anim_pos.setEndValue(QPoint(new_x, new_y))
-                anim_pos.setEasingCurve(QEasingCurve.Type.OutBack)
-
-                # Run both together
-                group = QParallelAnimationGroup()
-                group.addAnimation(anim_size)
-                group.addAnimation(anim_pos)
-                group.start(QAbstractAnimation.DeleteWhenStopped)
-                
-                self.theme_anims.append(group)
+                # Pooled per button; a click mid-animation retargets it
+                self.animations.animate(btn, b"size", QSize(target_w, target_h), 240, QEasingCurve.Type.OutBack)
+                self.animations.animate(btn, b"pos", QPoint(new_x, new_y), 240, QEasingCurve.Type.OutBack)
+
+        # buttonToggled fires for both the unchecked and the checked button;
+        # run the resize once per event loop pass
+        def schedule_button_sizes():
+            self.animations.coalesce("theme-cards", update_button_sizes)
 
         # Connect Signal
-        self.theme_group.buttonToggled.connect(update_button_sizes)
+        self.theme_group.buttonToggled.connect(schedule_button_sizes)
+        # Live preview: one app-wide restyle per pick
+        self.theme_group.buttonClicked.connect(lambda btn: get_theme_engine().apply(btn.property("themeName")))
         
         # Trigger initial size set
-        QTimer.singleShot(10, update_button_sizes)
+        schedule_button_sizes()
 
         return page
 
@@ -285,27 +389,17 @@ class SetupWizard(QDialog):
         layout.setAlignment(Qt.AlignmentFlag.AlignCenter)
 
         lbl = QLabel("Setup Profile")
-        lbl.setStyleSheet("color: #AAA; font-size: 16px; margin-bottom: 20px;")
+        lbl.setObjectName("WizardSubtitle")
         lbl.setAlignment(Qt.AlignmentFlag.AlignCenter)
 
         avatar = QLabel("Upload\nPhoto")
         avatar.setAlignment(Qt.AlignmentFlag.AlignCenter)
         avatar.setFixedSize(120, 120)
-        avatar.setStyleSheet("""
-            background-color: #222;
-            color: #666;
-            border: 2px dashed #444;
-            border-radius: 60px; /* Circle */
-            font-weight: bold;
-        """)
+        avatar.setObjectName("AvatarPlaceholder")
         
         name_input = QLineEdit()
         name_input.setPlaceholderText("Display Name")
         name_input.setFixedWidth(250)
-        name_input.setStyleSheet("""
-            background-color: #222; color: white; border: 1px solid #444; 
-            border-radius: 20px; padding: 10px;
-        """)
 
         layout.addWidget(lbl)
         layout.addWidget(avatar, 0, Qt.AlignmentFlag.AlignCenter)
@@ -319,7 +413,7 @@ class SetupWizard(QDialog):
         layout.setAlignment(Qt.AlignmentFlag.AlignCenter)
 
         lbl = QLabel("Preferences")
-        lbl.setStyleSheet("color: #AAA; font-size: 16px; margin-bottom: 20px;")
+        lbl.setObjectName("WizardSubtitle")
         lbl.setAlignment(Qt.AlignmentFlag.AlignCenter)
 
         container = QFrame()
@@ -330,12 +424,17 @@ class SetupWizard(QDialog):
         opts = ["Enable Auto-Save", "Show Line Numbers", "Enable Minimap", "Git Integration"]
         for opt in opts:
             chk = QCheckBox(opt)
-            chk.setStyleSheet("""
-                QCheckBox { color: white; font-size: 14px; spacing: 10px; }
-                QCheckBox::indicator { width: 18px; height: 18px; border-radius: 4px; background: #333; }
-                QCheckBox::indicator:checked { background: #FFF; }
-            """)
             vbox.addWidget(chk)
+            if opt == "Enable Auto-Save":
+                # Backed by the edit journal; imported here so the wizard
+                # module stays cheap to load.
+                from flexta.core.journal import AUTOSAVE_SETTING, autosave_enabled
+
+                chk.setChecked(autosave_enabled())
+                chk.toggled.connect(
+                    lambda checked: settings_db.set_setting(AUTOSAVE_SETTING, "1" if checked else "0")
+                )
+                self.autosave_checkbox = chk
 
         layout.addWidget(lbl)
         layout.addWidget(container, 0, Qt.AlignmentFlag.AlignCenter)
@@ -348,6 +447,7 @@ class SetupWizard(QDialog):
             self.stack.crossfade_to_index(idx + 1)
         else:
             print("Wizard Completed")
+            settings_db.set_setting(THEME_SETTING, get_theme_engine().current_theme or DEFAULT_THEME)
             self.close()
 
     def go_prev(self):
@@ -357,25 +457,21 @@ class SetupWizard(QDialog):
 
     def update_nav_state(self, index):
         for i, dot in enumerate(self.dots):
-            if i == index:
-                dot.setFixedSize(20, 10) 
-                dot.setStyleSheet("background-color: white; border-radius: 5px;")
-            else:
-                dot.setFixedSize(10, 10)
-                dot.setStyleSheet("background-color: #444; border-radius: 5px;")
+            active = i == index
+            dot.setFixedSize(20 if active else 10, 10)
+            if dot.property("active") != active:
+                # Re-polish only the dot whose [active] selector changed
+                dot.setProperty("active", active)
+                dot.style().unpolish(dot)
+                dot.style().polish(dot)
 
-        if index == 0:
-            self.btn_prev.setDisabled(True)
-            self.btn_prev.setStyleSheet("color: #333; background: transparent; border: none; font-size: 24px;")
-        else:
-            self.btn_prev.setDisabled(False)
-            self.btn_prev.setStyleSheet("color: white; background: transparent; border: none; font-size: 24px;")
+        # NavArrow:disabled in the stylesheet dims the arrow
+        self.btn_prev.setDisabled(index == 0)
 
         if index == self.stack.count() - 1:
             self.btn_next.setText("✓") 
         else:
             self.btn_next.setText("→")
-        self.btn_next.setStyleSheet("color: white; background: transparent; border: none; font-size: 24px;")
 
     # --- DRAG LOGIC ---
     def mousePressEvent(self, event):
@@ -407,6 +503,7 @@ class LoginDialog(QDialog):
 
     def __init__(self, parent=None):
         super().__init__(parent)
+        self.animations = AnimationManager(self)
         self.setWindowTitle("Flexta")
         self.setFixedSize(900, 550)
         self.setWindowFlags(Qt.WindowType.FramelessWindowHint)
@@ -477,16 +574,6 @@ class LoginDialog(QDialog):
         
         self.error_effect = QGraphicsOpacityEffect(self.lbl_error)
         self.lbl_error.setGraphicsEffect(self.error_effect)
-        
-        self.error_anim = QPropertyAnimation(self.error_effect, b"opacity")
-        self.error_anim.setDuration(500) 
-        self.error_anim.setEndValue(0.0)
-        self.error_anim.setEasingCurve(QEasingCurve.Type.InQuad)
-        self.error_anim.finished.connect(self.lbl_error.hide)
-        
-        self.error_timer = QTimer()
-        self.error_timer.setSingleShot(True)
-        self.error_timer.timeout.connect(self.error_anim.start)
 
         self.auth_stack = FadeStackWidget()
         
@@ -533,18 +620,18 @@ class LoginDialog(QDialog):
         self.btn_import.clicked.connect(lambda: self.guest_access.emit("import"))
         self.btn_export.clicked.connect(lambda: self.guest_access.emit("export"))
 
-        self.apply_styles()
+        ensure_theme_applied()
 
     def setup_floating_logo(self):
         font_logo = QFont("Segoe UI", 48, QFont.Weight.Bold)
         self.lbl_fle = QLabel("Fle", self)
         self.lbl_fle.setFont(font_logo)
-        self.lbl_fle.setStyleSheet("color: white; background-color: transparent;")
+        self.lbl_fle.setObjectName("LogoLabel")
         self.lbl_fle.adjustSize()
         
         self.lbl_xta = QLabel("xta", self)
         self.lbl_xta.setFont(font_logo)
-        self.lbl_xta.setStyleSheet("color: white; background-color: transparent;")
+        self.lbl_xta.setObjectName("LogoLabel")
         self.lbl_xta.adjustSize()
 
         seam_x = 362
@@ -659,10 +746,13 @@ class LoginDialog(QDialog):
         
         self.lbl_error.move(x, y)
         self.lbl_error.raise_()
-        self.error_anim.stop()
         self.error_effect.setOpacity(1.0)
         self.lbl_error.show()
-        self.error_timer.start(1000)
+        # Hold for a second, then fade; a new error restarts the same animation
+        self.animations.animate(
+            self.error_effect, b"opacity", 0.0, 500, QEasingCurve.Type.InQuad,
+            delay=1000, on_finished=self.lbl_error.hide,
+        )
         
     def handle_login(self):
         email = self.inp_login_email.text()
@@ -700,63 +790,6 @@ class LoginDialog(QDialog):
     def mouseReleaseEvent(self, event):
         self.old_pos = None
 
-    def apply_styles(self):
-        self.setStyleSheet("""
-            QFrame#Container {
-                background-color: transparent;
-                border-radius: 20px;
-            }
-            QFrame#LeftPanel {
-                background-color: qlineargradient(spread:pad, x1:0, y1:0, x2:1, y2:1, stop:0 #3a3a3a, stop:1 #2D2D2D);
-                border-top-left-radius: 20px;
-                border-bottom-left-radius: 20px;
-            }
-            QPushButton#GuestButton {
-                color: #CCCCCC; background-color: transparent; text-align: left; font-size: 15px; border: none; padding: 12px 10px; border-radius: 10px;
-            }
-            QPushButton#GuestButton:hover { color: #FFFFFF; background-color: rgba(255, 255, 255, 0.05); padding-left: 20px; }
-
-            QFrame#RightPanel {
-                background-color: qlineargradient(spread:pad, x1:0, y1:0, x2:1, y2:1, stop:0 #1a1a1a, stop:1 #000000);
-                border-top-right-radius: 20px;
-                border-bottom-right-radius: 20px;
-            }
-            QPushButton#MinBtn { color: #888; background: transparent; border: none; font-size: 14px; border-radius: 15px; }
-            QPushButton#MinBtn:hover { background-color: #333333; color: white; }
-            QPushButton#CloseBtn { color: #888; background: transparent; border: none; font-size: 16px; border-radius: 15px; }
-            QPushButton#CloseBtn:hover { background-color: #D32F2F; color: white; }
-
-            QLabel#AuthHeader { color: white; font-size: 26px; font-family: 'Segoe UI', sans-serif; font-weight: 700; letter-spacing: 1px; }
-            QLabel#ErrorLabel { background-color: #FF4444; color: white; font-size: 13px; font-weight: bold; border-radius: 6px; padding: 6px 12px; }
-            
-            QLineEdit {
-                background-color: #222222; color: #FFFFFF; border: 2px solid #333333; border-radius: 20px; padding: 10px 15px; font-size: 14px;
-            }
-            QLineEdit:focus { border: 2px solid #555555; background-color: #2a2a2a; }
-            
-            QPushButton#ActionBtn {
-                background-color: #FFFFFF; color: #121212; border-radius: 20px; padding: 12px; font-weight: bold; font-size: 15px; border: 1px solid white;
-            }
-            QPushButton#ActionBtn:hover { background-color: #E0E0E0; border: 1px solid #CCCCCC; }
-            QPushButton#ActionBtn:pressed { background-color: #BBBBBB; }
-
-            QCheckBox { color: #AAAAAA; font-size: 12px; }
-            QCheckBox::indicator { width: 15px; height: 15px; border-radius: 3px; border: 1px solid #555; background: #222; }
-            QCheckBox::indicator:checked { background: #888; border: 1px solid #888; }
-            
-            QPushButton#ForgotBtn { color: #777777; background: transparent; border: none; font-size: 12px; }
-            QPushButton#ForgotBtn:hover { color: #BBBBBB; text-decoration: underline; }
-
-            QFrame#ToggleContainer { background-color: #222222; border-radius: 25px; min-height: 50px; max-width: 300px; border: 1px solid #333; }
-            QPushButton#ToggleActive {
-                background-color: #FFFFFF; color: #121212; border-radius: 20px; font-weight: bold; border: none; min-height: 40px; min-width: 100px;
-            }
-            QPushButton#ToggleInactive {
-                background-color: transparent; color: #888888; border-radius: 20px; border: none; min-height: 40px; min-width: 100px;
-            }
-            QPushButton#ToggleInactive:hover { color: #FFFFFF; }
-        """)
-
 if __name__ == "__main__":
     app = QApplication(sys.argv)
     window = LoginDialog()
@@ -1,28 +1,97 @@
 from __future__ import annotations
 
-from PySide6.QtCore import Signal
-from PySide6.QtWidgets import QMainWindow
+from typing import TYPE_CHECKING, Optional
 
+from PySide6.QtCore import QTimer, Signal
+from PySide6.QtGui import QShowEvent
+from PySide6.QtWidgets import QAbstractButton, QApplication, QMainWindow, QMessageBox, QWidget
+
+from .dialog_manager import DialogManager
 from .widgets.startup_widget import StartupWidget
 
+if TYPE_CHECKING:
+    from flexta.core.journal import JournalManager, RecoveredBuffer
+    from .widgets.code_widget import CodeWidget
+
 
 class MainWindow(QMainWindow):
     create_project_requested = Signal()
     open_project_requested = Signal()
     template_selected = Signal(str)
     recent_project_requested = Signal(str)
+    # RecoveredBuffers of journals a crash left behind, found at launch.
+    buffers_recovered = Signal(list)
 
     def __init__(self, parent=None) -> None:
         super().__init__(parent)
         self.setWindowTitle("Flexta")
 
+        self.dialog_manager = DialogManager.for_window(self)
         self.startup_widget = StartupWidget(self)
         self.setCentralWidget(self.startup_widget)
+        # One edit journal for every editor, when auto-save is on.
+        self.journals: Optional[JournalManager] = None
+        self._journals_scheduled = False
+        self._recovered: list[RecoveredBuffer] = []
 
         self.startup_widget.create_project_requested.connect(self.create_project_requested)
         self.startup_widget.open_project_requested.connect(self.open_project_requested)
         self.startup_widget.template_selected.connect(self.template_selected)
         self.startup_widget.recent_project_requested.connect(self.recent_project_requested)
+        self.startup_widget.create_project_requested.connect(self.dialog_manager.open_create_project_dialog)
+        self.dialog_manager.project_created.connect(self._handle_project_created)
+
+    def showEvent(self, event: QShowEvent) -> None:
+        super().showEvent(event)
+        self.dialog_manager.prewarm()
+        if not self._journals_scheduled:
+            # After the first paint, like the dialogs: the journal module
+            # and the editor core stay off the startup path.
+            self._journals_scheduled = True
+            QTimer.singleShot(0, self, self.start_journals)
+
+    def start_journals(self) -> None:
+        from flexta.core.journal import JournalManager, autosave_enabled
+
+        if self.journals is not None or not autosave_enabled():
+            return
+        self.journals = JournalManager(parent=self)
+        QApplication.instance().aboutToQuit.connect(self.journals.close)
+        recovered = self.journals.recover()
+        if recovered:
+            self.buffers_recovered.emit(recovered)
+            self._show_recovered(recovered)
+
+    def create_code_widget(self, parent: Optional[QWidget] = None) -> CodeWidget:
+        from .widgets.code_widget import CodeWidget
+
+        return CodeWidget(journals=self.journals, parent=parent if parent is not None else self)
+
+    def _show_recovered(self, buffers: list[RecoveredBuffer]) -> None:
+        names = [buffer.path or "Untitled" for buffer in buffers]
+        box = QMessageBox(QMessageBox.Icon.Information, "Unsaved changes recovered", "", parent=self)
+        box.setObjectName("flexta-recovered-buffers")
+        box.setText(
+            f"{len(buffers)} file(s) had unsaved changes when Flexta last closed unexpectedly. "
+            "Keep them to get the changes back when the files are opened again."
+        )
+        box.setDetailedText("\n".join(names))
+        box.addButton("Keep", QMessageBox.ButtonRole.AcceptRole)
+        box.addButton("Discard", QMessageBox.ButtonRole.DestructiveRole).setObjectName("discard")
+        # A bound method rather than a lambda over box: no Python-level
+        # cycle for the garbage collector to find on a worker thread.
+        self._recovered = buffers
+        box.buttonClicked.connect(self._handle_recovered_choice)
+        box.open()
+
+    def _handle_recovered_choice(self, button: QAbstractButton) -> None:
+        if button.objectName() == "discard" and self.journals is not None:
+            for buffer in self._recovered:
+                self.journals.dismiss(buffer)
+        self._recovered = []
+
+    def _handle_project_created(self, project_path: str) -> None:
+        self.startup_widget.refresh_recent_projects()
 
     def record_recent_project(self, project_path: str) -> None:
         self.startup_widget.record_recent_project(project_path)
@@ -1,19 +1,21 @@
 from __future__ import annotations
 
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
 
 from PySide6.QtCore import Qt, Signal
-from PySide6.QtWidgets import QPushButton, QVBoxLayout, QWidget
+from PySide6.QtWidgets import QDialog, QPushButton, QVBoxLayout, QWidget
 
-from .dialogs.create_project_dialog import CreateProjectDialog
+from .dialog_manager import DialogManager
+
+if TYPE_CHECKING:
+    from .dialogs.create_project_dialog import CreateProjectDialog
 
 
 class Sidebar(QWidget):
-    create_project_opened = Signal(CreateProjectDialog)
+    create_project_opened = Signal(QDialog)
 
     def __init__(self, parent: Optional[QWidget] = None) -> None:
         super().__init__(parent)
-        self._create_project_dialog: Optional[CreateProjectDialog] = None
         self._build_ui()
 
     def _build_ui(self) -> None:
@@ -28,10 +30,8 @@ class Sidebar(QWidget):
         layout.addStretch(1)
 
     def _open_create_project_dialog(self) -> None:
-        dialog = CreateProjectDialog(self.window())
-        dialog.open()
-        self._create_project_dialog = dialog
+        dialog = DialogManager.for_window(self).open_create_project_dialog()
         self.create_project_opened.emit(dialog)
 
     def current_dialog(self) -> Optional[CreateProjectDialog]:
-        return self._create_project_dialog
+        return DialogManager.for_window(self).current_create_project_dialog()
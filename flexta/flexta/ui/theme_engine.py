@@ -0,0 +1,188 @@
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+from pathlib import Path
+import re
+import threading
+from typing import Optional
+
+from PySide6.QtCore import QObject, Signal
+from PySide6.QtWidgets import QApplication
+
+from flexta.database import settings_db
+from flexta.exceptions import ThemeError
+from flexta.utils.resource_loader import get_resources_dir
+
+
+DEFAULT_THEME = "dark"
+THEME_SETTING = "theme"
+BASE_STYLESHEET = "base.qss"
+# Bump when the compiler output changes so stale cache files are ignored.
+_COMPILER_VERSION = b"1"
+_COMMENT = re.compile(r"/\*.*?\*/", re.DOTALL)
+_DECLARATION = re.compile(r"^\s*@([A-Za-z_][A-Za-z0-9_]*)\s*:\s*(.*?)\s*;\s*$", re.MULTILINE)
+_TOKEN = re.compile(r"@([A-Za-z_][A-Za-z0-9_]*)")
+
+logger = logging.getLogger(__name__)
+
+
+def get_themes_dir() -> Path:
+    return get_resources_dir() / "themes"
+
+
+def get_theme_cache_dir() -> Path:
+    return Path.home() / ".flexta" / "cache" / "themes"
+
+
+class ThemeEngine(QObject):
+    theme_changed = Signal(str)
+
+    def __init__(
+        self,
+        themes_dir: Optional[Path] = None,
+        cache_dir: Optional[Path] = None,
+        parent: Optional[QObject] = None,
+    ) -> None:
+        super().__init__(parent)
+        self._themes_dir = themes_dir if themes_dir is not None else get_themes_dir()
+        self._cache_dir = cache_dir if cache_dir is not None else get_theme_cache_dir()
+        self._lock = threading.Lock()
+        self._sources: dict[str, str] = {}
+        self._compiled: dict[str, str] = {}
+        self._current: Optional[str] = None
+
+    @property
+    def current_theme(self) -> Optional[str]:
+        return self._current
+
+    def available_themes(self) -> list[str]:
+        return sorted(
+            path.stem for path in self._themes_dir.glob("*.qss") if path.name != BASE_STYLESHEET
+        )
+
+    def compile(self, name: str) -> str:
+        with self._lock:
+            chain = self._theme_chain(name)
+            sources = [self._source(BASE_STYLESHEET)] + [self._source(f"{theme}.qss") for theme in chain]
+            digest = hashlib.sha256(b"\0".join([_COMPILER_VERSION, *(s.encode("utf-8") for s in sources)]))
+            key = digest.hexdigest()
+            stylesheet = self._compiled.get(key)
+            if stylesheet is None:
+                stylesheet = self._read_cache(name, key)
+            if stylesheet is None:
+                stylesheet = _resolve(sources, name)
+                self._write_cache(name, key, stylesheet)
+            self._compiled[key] = stylesheet
+            return stylesheet
+
+    def apply(self, name: str, app: Optional[QApplication] = None) -> str:
+        # One application-wide stylesheet: switching themes re-polishes the
+        # widget tree once instead of re-parsing per-widget style strings.
+        stylesheet = self.compile(name)
+        app = app if app is not None else QApplication.instance()
+        if app is not None and app.styleSheet() != stylesheet:
+            app.setStyleSheet(stylesheet)
+        if name != self._current:
+            self._current = name
+            self.theme_changed.emit(name)
+        return stylesheet
+
+    def reload(self) -> None:
+        with self._lock:
+            self._sources.clear()
+
+    def _source(self, filename: str) -> str:
+        source = self._sources.get(filename)
+        if source is None:
+            try:
+                source = (self._themes_dir / filename).read_text(encoding="utf-8")
+            except OSError as error:
+                raise ThemeError(f"Cannot read theme file {filename}: {error}") from error
+            self._sources[filename] = source
+        return source
+
+    def _theme_chain(self, name: str) -> list[str]:
+        # Parents first, so later palettes override the tokens they extend.
+        chain: list[str] = []
+        current: Optional[str] = name
+        while current is not None:
+            if current in chain:
+                raise ThemeError(f"Theme {name} extends itself through {current}")
+            if current == Path(BASE_STYLESHEET).stem or not (self._themes_dir / f"{current}.qss").is_file():
+                raise ThemeError(f"Unknown theme: {current}")
+            chain.insert(0, current)
+            current = _declarations(self._source(f"{current}.qss"))[0].get("extends")
+        return chain
+
+    def _cache_path(self, name: str, key: str) -> Path:
+        return self._cache_dir / f"{name}-{key[:16]}.qss"
+
+    def _read_cache(self, name: str, key: str) -> Optional[str]:
+        try:
+            return self._cache_path(name, key).read_text(encoding="utf-8")
+        except OSError:
+            return None
+
+    def _write_cache(self, name: str, key: str, stylesheet: str) -> None:
+        path = self._cache_path(name, key)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            for stale in path.parent.glob(f"{name}-{'?' * 16}.qss"):
+                stale.unlink(missing_ok=True)
+            temporary = path.with_suffix(f".{os.getpid()}.tmp")
+            temporary.write_text(stylesheet, encoding="utf-8")
+            os.replace(temporary, path)
+        except OSError:
+            logger.warning("Could not cache compiled theme %s", name, exc_info=True)
+
+
+def _declarations(source: str) -> tuple[dict[str, str], str]:
+    source = _COMMENT.sub("", source)
+    tokens = {match.group(1): match.group(2) for match in _DECLARATION.finditer(source)}
+    return tokens, _DECLARATION.sub("", source)
+
+
+def _resolve(sources: list[str], name: str) -> str:
+    tokens: dict[str, str] = {}
+    rules = []
+    for source in sources:
+        declared, remainder = _declarations(source)
+        tokens.update(declared)
+        rules.append(remainder)
+
+    def replace(match: re.Match) -> str:
+        value = tokens.get(match.group(1))
+        if value is None:
+            raise ThemeError(f"Theme {name} does not define @{match.group(1)}")
+        return value
+
+    stylesheet = _TOKEN.sub(replace, "\n".join(rules))
+    return "\n".join(line.rstrip() for line in stylesheet.splitlines() if line.strip()) + "\n"
+
+
+_engine: Optional[ThemeEngine] = None
+_engine_lock = threading.Lock()
+
+
+def get_theme_engine() -> ThemeEngine:
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = ThemeEngine()
+        return _engine
+
+
+def ensure_theme_applied(app: Optional[QApplication] = None) -> ThemeEngine:
+    # Applies the saved theme the first time any top-level UI needs it; later
+    # calls are free.
+    engine = get_theme_engine()
+    if engine.current_theme is None:
+        saved = settings_db.get_setting(THEME_SETTING) or DEFAULT_THEME
+        try:
+            engine.apply(saved, app)
+        except ThemeError:
+            logger.warning("Falling back to the %s theme", DEFAULT_THEME, exc_info=True)
+            engine.apply(DEFAULT_THEME, app)
+    return engine
@@ -1,21 +1,23 @@
 from __future__ import annotations
 
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
 
 from PySide6.QtCore import Signal
 from PySide6.QtGui import QAction
-from PySide6.QtWidgets import QToolBar, QWidget
+from PySide6.QtWidgets import QDialog, QToolBar, QWidget
 
-from .dialogs.create_project_dialog import CreateProjectDialog
+from .dialog_manager import DialogManager
+
+if TYPE_CHECKING:
+    from .dialogs.create_project_dialog import CreateProjectDialog
 
 
 class AppToolBar(QToolBar):
-    create_project_opened = Signal(CreateProjectDialog)
+    create_project_opened = Signal(QDialog)
 
     def __init__(self, parent: Optional[QWidget] = None) -> None:
         super().__init__(parent)
         self.setObjectName("main-toolbar")
-        self._create_project_dialog: Optional[CreateProjectDialog] = None
         self._build_actions()
 
     def _build_actions(self) -> None:
@@ -24,10 +26,8 @@ class AppToolBar(QToolBar):
         self.addAction(self.create_project_action)
 
     def _open_create_project_dialog(self) -> None:
-        dialog = CreateProjectDialog(self.window())
-        dialog.open()
-        self._create_project_dialog = dialog
+        dialog = DialogManager.for_window(self).open_create_project_dialog()
         self.create_project_opened.emit(dialog)
 
     def current_dialog(self) -> Optional[CreateProjectDialog]:
-        return self._create_project_dialog
+        return DialogManager.for_window(self).current_create_project_dialog()
@@ -0,0 +1,448 @@
+from __future__ import annotations
+
+import os
+from pathlib import Path
+import re
+import threading
+from typing import Optional, Union
+
+from PySide6.QtCore import QPoint, QRect, Qt, Signal
+from PySide6.QtGui import (
+    QContextMenuEvent,
+    QFontDatabase,
+    QKeyEvent,
+    QKeySequence,
+    QMouseEvent,
+    QPainter,
+    QPalette,
+    QPaintEvent,
+    QTextCursor,
+)
+from PySide6.QtWidgets import QAbstractScrollArea, QMenu, QPlainTextEdit, QStackedLayout, QWidget
+
+from flexta.core.editor import EditorDocument, open_document
+from flexta.core.journal import DocumentJournal, JournalManager
+from flexta.core.search import SearchQuery, compile_query
+from flexta.highlighters.engine import Highlighter, attach_highlighter
+from flexta.utils.file_utils import MappedFile
+
+
+# Files at least this large open in LargeFileView instead of being loaded
+# into a string and a QTextDocument.
+LARGE_FILE_BYTES = 8 * 1024 * 1024
+_TAB_WIDTH = 4
+# Scrolled further right than this, lines are read from this many
+# characters left of the viewport rather than from their start; tabs
+# before that point are taken as one column wide.
+_WINDOW_MARGIN = 4096
+_GUTTER_PADDING = 8
+
+
+class LargeFileView(QAbstractScrollArea):
+    # Read-only view over a MappedFile. The vertical scroll bar counts lines
+    # and each paint reads and decodes only the lines in the viewport, so
+    # memory use does not grow with the file. The line index is built on a
+    # worker thread; lines become reachable as it advances.
+    indexing_finished = Signal()
+    # Whether the last find() matched; the search runs on a worker thread.
+    find_finished = Signal(bool)
+    # Emitted from the indexing thread; Qt queues delivery onto the GUI thread.
+    _indexed = Signal(int)
+    # (find generation, match start, match end), -1 offsets for no match;
+    # emitted from the find thread.
+    _found = Signal(int, int, int)
+
+    def __init__(self, path: Union[str, Path], parent: Optional[QWidget] = None) -> None:
+        super().__init__(parent)
+        self.mapped = MappedFile(os.fspath(path))
+        self.current_line = 0
+        # (line, column, length) of the last find() hit.
+        self.match: Optional[tuple[int, int, int]] = None
+        self._columns = 0
+        self.setFont(QFontDatabase.systemFont(QFontDatabase.SystemFont.FixedFont))
+        self.setFocusPolicy(Qt.FocusPolicy.StrongFocus)
+        self._cancelled = threading.Event()
+        self._indexed.connect(self._handle_indexed)
+        self._found.connect(self._handle_found)
+        self._finding = threading.Event()
+        self._find_thread: Optional[threading.Thread] = None
+        self._find_generation = 0
+        self._thread = threading.Thread(
+            target=self.mapped.build_index,
+            args=(self._cancelled, self._indexed.emit),
+            name="flexta-line-index",
+            daemon=True,
+        )
+        self._thread.start()
+        self._update_scroll_bars()
+
+    @property
+    def line_count(self) -> int:
+        return max(self.mapped.line_count, 1)
+
+    @property
+    def first_visible_line(self) -> int:
+        return self.verticalScrollBar().value()
+
+    def close_file(self) -> None:
+        self._cancelled.set()
+        self._finding.set()
+        self._thread.join()
+        if self._find_thread is not None:
+            self._find_thread.join()
+        self.mapped.close()
+
+    def wait_for_index(self, timeout: Optional[float] = None) -> None:
+        self._thread.join(timeout)
+
+    def visible_rows(self) -> int:
+        return max(self.viewport().height() // self.fontMetrics().lineSpacing(), 1)
+
+    def go_to_line(self, line: int) -> None:
+        self.current_line = max(0, min(line, self.line_count - 1))
+        self._center(self.current_line)
+        self.viewport().update()
+
+    def find(self, query: SearchQuery) -> None:
+        # Next match after the current one (or from the current line),
+        # wrapping once; find_finished reports the result. Runs over the
+        # mapping as bytes on a worker thread, so nothing is decoded but the
+        # line the match lands on. A new find cancels the one in progress.
+        self._finding.set()
+        self._find_generation += 1
+        if not query.pattern:
+            self._found.emit(self._find_generation, -1, -1)
+            return
+        regex, _ = compile_query(query)
+        mapped = self.mapped
+        if self.match is not None and self.match[0] == self.current_line:
+            start = mapped.offset_of(self.match[0], self.match[1] + max(self.match[2], 1))
+        else:
+            start = mapped.line_offset(self.current_line)
+        self._finding = threading.Event()
+        self._find_thread = threading.Thread(
+            target=self._search,
+            args=(regex, start, self._finding, self._find_generation),
+            name="flexta-large-find",
+            daemon=True,
+        )
+        self._find_thread.start()
+
+    def _search(self, regex: re.Pattern, start: int, cancelled: threading.Event, generation: int) -> None:
+        mapped = self.mapped
+        span = mapped.search(regex, start, mapped.size, cancelled) or mapped.search(regex, 0, start, cancelled)
+        if not cancelled.is_set():
+            self._found.emit(generation, *(span or (-1, -1)))
+
+    def scrollContentsBy(self, dx: int, dy: int) -> None:
+        self.viewport().update()
+
+    def resizeEvent(self, event) -> None:
+        super().resizeEvent(event)
+        self._update_scroll_bars()
+
+    def paintEvent(self, event: QPaintEvent) -> None:
+        painter = QPainter(self.viewport())
+        palette = self.palette()
+        metrics = self.fontMetrics()
+        line_height = metrics.lineSpacing()
+        char_width = metrics.horizontalAdvance(" ")
+        first = self.first_visible_line
+        gutter = self._gutter_width()
+        left_column = self.horizontalScrollBar().value()
+        window = max(left_column - _WINDOW_MARGIN, 0)
+        lines = self.mapped.lines(first, self.visible_rows() + 1, window)
+        columns = self.viewport().width() // max(char_width, 1) + 1
+        painter.fillRect(event.rect(), palette.color(QPalette.ColorRole.Base))
+        painter.fillRect(QRect(0, 0, gutter, self.viewport().height()), palette.color(QPalette.ColorRole.AlternateBase))
+        widest = self._columns
+        for row, text in enumerate(lines):
+            number = first + row
+            top = row * line_height
+            if number == self.current_line:
+                painter.fillRect(
+                    QRect(gutter, top, self.viewport().width() - gutter, line_height),
+                    palette.color(QPalette.ColorRole.AlternateBase),
+                )
+            expanded = text.expandtabs(_TAB_WIDTH)
+            widest = max(widest, window + len(expanded))
+            if self.match is not None and self.match[0] == number and self.match[1] >= window:
+                _, column, length = self.match
+                start = window + len(text[:column - window].expandtabs(_TAB_WIDTH)) - left_column
+                end = window + len(text[:column + length - window].expandtabs(_TAB_WIDTH)) - left_column
+                painter.fillRect(
+                    QRect(gutter + _GUTTER_PADDING + start * char_width, top, (end - start) * char_width, line_height),
+                    palette.color(QPalette.ColorRole.Highlight),
+                )
+            painter.setPen(palette.color(QPalette.ColorRole.PlaceholderText))
+            painter.drawText(
+                QRect(0, top, gutter - _GUTTER_PADDING, line_height),
+                int(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter),
+                str(number + 1),
+            )
+            painter.setPen(palette.color(QPalette.ColorRole.Text))
+            painter.setClipRect(QRect(gutter, 0, self.viewport().width() - gutter, self.viewport().height()))
+            visible = expanded[left_column - window:left_column - window + columns]
+            painter.drawText(gutter + _GUTTER_PADDING, top + metrics.ascent(), visible)
+            painter.setClipping(False)
+        painter.end()
+        if widest > self._columns:
+            # The widest line seen so far sets the horizontal range; the
+            # longest line in the file is never searched for.
+            self._columns = widest
+            self._update_scroll_bars()
+
+    def keyPressEvent(self, event: QKeyEvent) -> None:
+        key = event.key()
+        control = bool(event.modifiers() & Qt.KeyboardModifier.ControlModifier)
+        moves = {
+            Qt.Key.Key_Up: -1,
+            Qt.Key.Key_Down: 1,
+            Qt.Key.Key_PageUp: -self.visible_rows(),
+            Qt.Key.Key_PageDown: self.visible_rows(),
+        }
+        if key in moves:
+            self._move_to(self.current_line + moves[key])
+        elif control and key == Qt.Key.Key_Home:
+            self._move_to(0)
+        elif control and key == Qt.Key.Key_End:
+            self._move_to(self.line_count - 1)
+        else:
+            super().keyPressEvent(event)
+
+    def mousePressEvent(self, event: QMouseEvent) -> None:
+        row = int(event.position().y()) // self.fontMetrics().lineSpacing()
+        self.current_line = min(self.first_visible_line + row, self.line_count - 1)
+        self.viewport().update()
+
+    def _move_to(self, line: int) -> None:
+        self.current_line = max(0, min(line, self.line_count - 1))
+        first = self.first_visible_line
+        rows = self.visible_rows()
+        if self.current_line < first:
+            self.verticalScrollBar().setValue(self.current_line)
+        elif self.current_line >= first + rows:
+            self.verticalScrollBar().setValue(self.current_line - rows + 1)
+        self.viewport().update()
+
+    def _center(self, line: int) -> None:
+        self.verticalScrollBar().setValue(line - self.visible_rows() // 2)
+
+    def _reveal_column(self, column: int, length: int) -> None:
+        char_width = max(self.fontMetrics().horizontalAdvance(" "), 1)
+        visible = max((self.viewport().width() - self._gutter_width() - _GUTTER_PADDING) // char_width, 1)
+        scroll_bar = self.horizontalScrollBar()
+        self._columns = max(self._columns, column + length)
+        self._update_scroll_bars()
+        if column < scroll_bar.value() or column + length > scroll_bar.value() + visible:
+            scroll_bar.setValue(max(column - visible // 4, 0))
+
+    def _gutter_width(self) -> int:
+        return self.fontMetrics().horizontalAdvance("9" * len(str(self.line_count))) + 2 * _GUTTER_PADDING
+
+    def _update_scroll_bars(self) -> None:
+        rows = self.visible_rows()
+        vertical = self.verticalScrollBar()
+        vertical.setRange(0, max(self.line_count - rows, 0))
+        vertical.setPageStep(rows)
+        char_width = max(self.fontMetrics().horizontalAdvance(" "), 1)
+        columns = (self.viewport().width() - self._gutter_width()) // char_width
+        horizontal = self.horizontalScrollBar()
+        horizontal.setRange(0, max(self._columns - columns + 1, 0))
+        horizontal.setPageStep(max(columns, 1))
+
+    def _handle_found(self, generation: int, start: int, end: int) -> None:
+        if generation != self._find_generation:
+            return
+        if start < 0:
+            self.match = None
+            self.viewport().update()
+            self.find_finished.emit(False)
+            return
+        mapped = self.mapped
+        line = mapped.line_at(start)
+        length = mapped.count_chars(start, min(end, mapped.line_end(start)))
+        self.match = (line, mapped.column_at(start), length)
+        self.current_line = line
+        self._center(line)
+        self._reveal_column(*self.match[1:])
+        self.viewport().update()
+        self.find_finished.emit(True)
+
+    def _handle_indexed(self, lines: int) -> None:
+        self._update_scroll_bars()
+        self.viewport().update()
+        if self.mapped.complete:
+            self.indexing_finished.emit()
+
+
+class _DocumentEditor(QPlainTextEdit):
+    # An EditorDocument owns undo history, not the QTextDocument (its undo
+    # stack is disabled), so the shortcuts and the context menu's Undo and
+    # Redo are routed back to it. Also reports scrolls and resizes so the
+    # highlighter can follow the viewport.
+    viewport_moved = Signal()
+
+    def __init__(self, parent: Optional[QWidget] = None) -> None:
+        super().__init__(parent)
+        self.source: Optional[EditorDocument] = None
+
+    def keyPressEvent(self, event: QKeyEvent) -> None:
+        if self.source is not None and not self.isReadOnly():
+            if event.matches(QKeySequence.StandardKey.Undo):
+                self.source.undo()
+                return
+            if event.matches(QKeySequence.StandardKey.Redo):
+                self.source.redo()
+                return
+        super().keyPressEvent(event)
+
+    def contextMenuEvent(self, event: QContextMenuEvent) -> None:
+        menu = self._context_menu(event.pos())
+        menu.exec(event.globalPos())
+        menu.deleteLater()
+
+    def _context_menu(self, position: QPoint) -> QMenu:
+        menu = self.createStandardContextMenu(position)
+        if self.source is not None:
+            for action in menu.actions():
+                if action.objectName() == "edit-undo":
+                    action.triggered.disconnect()
+                    action.triggered.connect(self.source.undo)
+                    action.setEnabled(not self.isReadOnly() and self.source.buffer.can_undo())
+                elif action.objectName() == "edit-redo":
+                    action.triggered.disconnect()
+                    action.triggered.connect(self.source.redo)
+                    action.setEnabled(not self.isReadOnly() and self.source.buffer.can_redo())
+        return menu
+
+    def scrollContentsBy(self, dx: int, dy: int) -> None:
+        super().scrollContentsBy(dx, dy)
+        self.viewport_moved.emit()
+
+    def resizeEvent(self, event) -> None:
+        super().resizeEvent(event)
+        self.viewport_moved.emit()
+
+
+class CodeWidget(QWidget):
+    # One open file. Ordinary files are edited in a QPlainTextEdit over an
+    # EditorDocument, journaled when a JournalManager is given (auto-save);
+    # files of large_file_bytes and more open read-only in a LargeFileView.
+    file_opened = Signal(str)
+    # Result of find(), also for large files, whose search finishes later.
+    find_finished = Signal(bool)
+
+    def __init__(
+        self,
+        large_file_bytes: int = LARGE_FILE_BYTES,
+        journals: Optional[JournalManager] = None,
+        parent: Optional[QWidget] = None,
+    ) -> None:
+        super().__init__(parent)
+        self.large_file_bytes = large_file_bytes
+        self.journals = journals
+        self.journal: Optional[DocumentJournal] = None
+        self.document: Optional[EditorDocument] = None
+        self.highlighter: Optional[Highlighter] = None
+        self.large_view: Optional[LargeFileView] = None
+        self.editor = _DocumentEditor(self)
+        self.editor.setFont(QFontDatabase.systemFont(QFontDatabase.SystemFont.FixedFont))
+        self.editor.viewport_moved.connect(self._update_visible_range)
+        self._layout = QStackedLayout(self)
+        self._layout.addWidget(self.editor)
+
+    @property
+    def is_large_file(self) -> bool:
+        return self.large_view is not None
+
+    @property
+    def path(self) -> Optional[Path]:
+        if self.large_view is not None:
+            return Path(self.large_view.mapped.path)
+        return self.document.path if self.document is not None else None
+
+    def open_file(self, path: Union[str, Path]) -> None:
+        self.close_file()
+        path = Path(path)
+        if path.stat().st_size >= self.large_file_bytes:
+            self.large_view = LargeFileView(path, self)
+            self.large_view.find_finished.connect(self.find_finished)
+            self._layout.addWidget(self.large_view)
+            self._layout.setCurrentWidget(self.large_view)
+        else:
+            self.document = open_document(path, self)
+            self.editor.setDocument(self.document.document)
+            self.editor.source = self.document
+            self.editor.setReadOnly(False)
+            self.highlighter = attach_highlighter(self.document.document, self.document.language)
+            self._update_visible_range()
+            if self.journals is not None:
+                # Restores unsaved text a crash left in the journal.
+                self.journal = self.journals.attach(self.document)
+            self._layout.setCurrentWidget(self.editor)
+        self.file_opened.emit(str(path))
+
+    def close_file(self) -> None:
+        if self.large_view is not None:
+            self.large_view.close_file()
+            self._layout.removeWidget(self.large_view)
+            self.large_view.deleteLater()
+            self.large_view = None
+        if self.document is not None:
+            if self.journals is not None:
+                self.journals.detach(self.document)
+                self.journal = None
+            self.editor.source = None
+            self.editor.setDocument(None)
+            self.highlighter = None
+            self.document.deleteLater()
+            self.document = None
+
+    def undo(self) -> bool:
+        return self.document is not None and self.document.undo()
+
+    def redo(self) -> bool:
+        return self.document is not None and self.document.redo()
+
+    def go_to_line(self, line: int) -> None:
+        if self.large_view is not None:
+            self.large_view.go_to_line(line)
+            return
+        block = self.editor.document().findBlockByNumber(max(0, min(line, self.editor.blockCount() - 1)))
+        self.editor.setTextCursor(QTextCursor(block))
+        self.editor.centerCursor()
+
+    def find(self, query: SearchQuery) -> Optional[bool]:
+        # None when a large file is being searched; find_finished follows.
+        if self.large_view is not None:
+            self.large_view.find(query)
+            return None
+        found = self._find_in_document(query)
+        self.find_finished.emit(found)
+        return found
+
+    def _find_in_document(self, query: SearchQuery) -> bool:
+        if self.document is None or not query.pattern:
+            return False
+        # The same pattern find-in-files compiles, as text rather than bytes.
+        pattern, _ = compile_query(query)
+        regex = re.compile(pattern.pattern.decode("utf-8"), pattern.flags & (re.IGNORECASE | re.MULTILINE))
+        text = self.document.text()
+        cursor = self.editor.textCursor()
+        found = regex.search(text, cursor.selectionEnd()) or regex.search(text, 0, cursor.selectionEnd())
+        if found is None:
+            return False
+        cursor.setPosition(found.start())
+        cursor.setPosition(found.end(), QTextCursor.MoveMode.KeepAnchor)
+        self.editor.setTextCursor(cursor)
+        self.editor.centerCursor()
+        return True
+
+    def _update_visible_range(self) -> None:
+        # Only blocks near the viewport get their formats applied.
+        if self.highlighter is None:
+            return
+        first = self.editor.firstVisibleBlock().blockNumber()
+        last = self.editor.cursorForPosition(self.editor.viewport().rect().bottomLeft()).block().blockNumber()
+        self.highlighter.set_visible_range(first, max(first, last))
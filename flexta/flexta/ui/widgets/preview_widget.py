@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+from typing import Optional
+
+from PySide6.QtCore import QUrl
+from PySide6.QtWidgets import QTextBrowser, QVBoxLayout, QWidget
+
+from flexta.core.preview import PreviewPipeline, PreviewUpdate
+
+try:
+    from PySide6.QtWebEngineWidgets import QWebEngineView
+except ImportError:
+    # Qt WebEngine is an optional component; without it the preview falls
+    # back to QTextBrowser, which renders static HTML only.
+    QWebEngineView = None
+
+
+class PreviewWidget(QWidget):
+    def __init__(self, pipeline: Optional[PreviewPipeline] = None, parent: Optional[QWidget] = None) -> None:
+        super().__init__(parent)
+        self.pipeline = pipeline if pipeline is not None else PreviewPipeline(parent=self)
+        self._loading: Optional[PreviewUpdate] = None
+        # setHtml() calls not yet finished; a load cut short by the next one
+        # still reports loadFinished(False).
+        self._loads = 0
+        # Patches that arrived during a load. They are diffs from the source
+        # being loaded, so they run in order once it has.
+        self._queued: list[PreviewUpdate] = []
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        if QWebEngineView is not None:
+            self.view = QWebEngineView(self)
+            self.view.loadFinished.connect(self._handle_load_finished)
+        else:
+            self.view = QTextBrowser(self)
+            self.view.setOpenLinks(False)
+        layout.addWidget(self.view)
+        self.pipeline.update_ready.connect(self.apply_update)
+
+    @property
+    def supports_patching(self) -> bool:
+        return QWebEngineView is not None
+
+    def apply_update(self, update: PreviewUpdate) -> None:
+        if not self.supports_patching:
+            self._show_static(update)
+            return
+        if update.kind == "reload":
+            # The new source already shows whatever an unfinished load or
+            # queued patches would have.
+            if self._loading is not None:
+                self.pipeline.discard(self._loading)
+            for queued in self._queued:
+                self.pipeline.discard(queued)
+            self._queued = []
+            self._loading = update
+            self._loads += 1
+            self.view.setHtml(update.html, QUrl(update.base_url))
+            return
+        if self._loading is not None:
+            self._queued.append(update)
+            return
+        self._run_patch(update)
+
+    def _run_patch(self, update: PreviewUpdate) -> None:
+        self.view.page().runJavaScript(update.script, 0, lambda applied: self._handle_patched(update, applied))
+
+    def _handle_patched(self, update: PreviewUpdate, applied: object) -> None:
+        if applied is True:
+            self.pipeline.painted(update)
+        else:
+            self.pipeline.failed(update)
+
+    def _handle_load_finished(self, ok: bool) -> None:
+        self._loads = max(self._loads - 1, 0)
+        if self._loads:
+            return
+        update, self._loading = self._loading, None
+        queued, self._queued = self._queued, []
+        if update is None:
+            return
+        if not ok:
+            # Reloading again would likely fail the same way; the next
+            # edit brings a fresh update.
+            for dropped in [update, *queued]:
+                self.pipeline.discard(dropped)
+            return
+        self.pipeline.painted(update)
+        for patch in queued:
+            self._run_patch(patch)
+
+    def _show_static(self, update: PreviewUpdate) -> None:
+        # QTextBrowser cannot run scripts, so every update is a re-render;
+        # keep the scroll position across it.
+        source = self.pipeline.current_source()
+        if source is None:
+            return
+        scroll_bar = self.view.verticalScrollBar()
+        position = scroll_bar.value()
+        if update.base_url:
+            self.view.document().setBaseUrl(QUrl(update.base_url))
+        self.view.setHtml(source)
+        scroll_bar.setValue(position)
+        self.pipeline.painted(update)
@@ -0,0 +1,189 @@
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Any, Iterable, Optional
+
+from PySide6.QtCore import QAbstractListModel, QModelIndex, QObject, Qt, QTimer, Signal
+from PySide6.QtGui import QColor
+
+from flexta.database import settings_db
+from flexta.database.settings_db import ProjectMetadata
+from flexta.utils.string_utils import FuzzyFilter, SearchKey, format_size
+
+
+PATH_ROLE = Qt.ItemDataRole.UserRole
+_MISSING_COLOR = QColor("#9e9e9e")
+# Past this many row operations a single model reset is cheaper for the view.
+_MAX_DIFF_OPERATIONS = 64
+
+
+class RecentProjectsModel(QAbstractListModel):
+    # Paths that became visible without fresh metadata, batched per event loop pass.
+    scan_requested = Signal(list)
+
+    def __init__(self, parent: Optional[QObject] = None) -> None:
+        super().__init__(parent)
+        self._projects: list[str] = []
+        self._rows: list[str] = []
+        self._row_index: dict[str, int] = {}
+        self._keys: dict[str, SearchKey] = {}
+        self._filter = FuzzyFilter([])
+        self._filter_text = ""
+        self._metadata: dict[str, ProjectMetadata] = {}
+        self._scan_requested: set[str] = set()
+        self._pending_scan: list[str] = []
+        self._scan_timer = QTimer(self)
+        self._scan_timer.setSingleShot(True)
+        self._scan_timer.setInterval(0)
+        self._scan_timer.timeout.connect(self._emit_scan_requests)
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        if parent.isValid():
+            return 0
+        return len(self._rows)
+
+    def data(self, index: QModelIndex, role: int = Qt.ItemDataRole.DisplayRole) -> Any:
+        if not index.isValid() or not 0 <= index.row() < len(self._rows):
+            return None
+        project = self._rows[index.row()]
+        metadata = self._metadata.get(project)
+        if role == Qt.ItemDataRole.DisplayRole:
+            self._request_scan(project)
+            if metadata is not None and metadata.exists is False:
+                return f"{project} (missing)"
+            return project
+        if role == PATH_ROLE:
+            return project
+        if role == Qt.ItemDataRole.ToolTipRole:
+            return _format_tooltip(project, metadata)
+        if role == Qt.ItemDataRole.ForegroundRole:
+            if metadata is not None and metadata.exists is False:
+                return _MISSING_COLOR
+        return None
+
+    def projects(self) -> list[str]:
+        return list(self._rows)
+
+    def project_count(self) -> int:
+        return len(self._projects)
+
+    def filter_text(self) -> str:
+        return self._filter_text
+
+    def set_projects(self, projects: Iterable[str]) -> None:
+        self._projects = list(dict.fromkeys(projects))
+        known = set(self._projects)
+        self._keys = {path: key for path, key in self._keys.items() if path in known}
+        self._filter = FuzzyFilter(self._projects, self._keys)
+        # Visible rows are re-requested; the scanner's TTL cache absorbs repeats.
+        self._scan_requested.clear()
+        for key in self._filter.keys:
+            self._keys[key.text] = key
+        missing = [key.text for key in self._filter.keys if key.text not in self._metadata]
+        if missing:
+            self._metadata.update(settings_db.get_projects_metadata(missing))
+        self._apply_rows(self._filtered_rows())
+
+    def set_filter_text(self, text: str) -> None:
+        if text == self._filter_text:
+            return
+        self._filter_text = text
+        self._apply_rows(self._filtered_rows())
+
+    def update_metadata(self, metadata: ProjectMetadata) -> None:
+        previous = self._metadata.get(metadata.path)
+        if metadata.exists is None and previous is not None:
+            # A timeout says nothing new about a path we already know.
+            return
+        self._metadata[metadata.path] = metadata
+        row = self._row_index.get(metadata.path)
+        if row is not None:
+            model_index = self.index(row)
+            self.dataChanged.emit(model_index, model_index)
+
+    def _filtered_rows(self) -> list[str]:
+        return [self._projects[index] for index in self._filter.filter(self._filter_text)]
+
+    def _request_scan(self, project: str) -> None:
+        if project in self._scan_requested:
+            return
+        self._scan_requested.add(project)
+        self._pending_scan.append(project)
+        self._scan_timer.start()
+
+    def _emit_scan_requests(self) -> None:
+        pending, self._pending_scan = self._pending_scan, []
+        if pending:
+            self.scan_requested.emit(pending)
+
+    def _apply_rows(self, rows: list[str]) -> None:
+        current = self._rows
+        if rows == current:
+            return
+
+        wanted = set(rows)
+        removals = [row for row, path in enumerate(current) if path not in wanted]
+        operations = 0
+        # Remove bottom-up in contiguous ranges so earlier row numbers stay valid.
+        while removals:
+            last = removals.pop()
+            first = last
+            while removals and removals[-1] == first - 1:
+                first = removals.pop()
+            operations += 1
+            if operations > _MAX_DIFF_OPERATIONS:
+                self._reset_rows(rows)
+                return
+            self.beginRemoveRows(QModelIndex(), first, last)
+            del current[first:last + 1]
+            self.endRemoveRows()
+
+        present = set(current)
+        row = 0
+        while row < len(rows):
+            path = rows[row]
+            if row < len(current) and current[row] == path:
+                row += 1
+                continue
+            operations += 1
+            if operations > _MAX_DIFF_OPERATIONS:
+                self._reset_rows(rows)
+                return
+            if path in present:
+                source = current.index(path, row)
+                self.beginMoveRows(QModelIndex(), source, source, QModelIndex(), row)
+                current.insert(row, current.pop(source))
+                self.endMoveRows()
+                row += 1
+                continue
+            end = row
+            while end < len(rows) and rows[end] not in present:
+                end += 1
+            self.beginInsertRows(QModelIndex(), row, end - 1)
+            current[row:row] = rows[row:end]
+            present.update(rows[row:end])
+            self.endInsertRows()
+            row = end
+        self._row_index = {path: position for position, path in enumerate(current)}
+
+    def _reset_rows(self, rows: list[str]) -> None:
+        self.beginResetModel()
+        self._rows = list(rows)
+        self._row_index = {path: position for position, path in enumerate(self._rows)}
+        self.endResetModel()
+
+
+def _format_tooltip(project: str, metadata: Optional[ProjectMetadata]) -> str:
+    if metadata is None:
+        return project
+    if metadata.exists is None:
+        return f"{project}\nNot responding"
+    if not metadata.exists:
+        return f"{project}\nFolder not found"
+    details = [project]
+    if metadata.file_count is not None and metadata.total_size is not None:
+        details.append(f"{metadata.file_count} files, {format_size(metadata.total_size)}")
+    if metadata.modified is not None:
+        modified = datetime.fromtimestamp(metadata.modified).strftime("%Y-%m-%d %H:%M")
+        details.append(f"Modified {modified}")
+    return "\n".join(details)
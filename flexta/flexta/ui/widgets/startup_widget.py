@@ -2,33 +2,44 @@ from __future__ import annotations
 
 from typing import Iterable, Optional
 
-from PySide6.QtCore import Qt, Signal
+from PySide6.QtCore import QModelIndex, Qt, Signal
 from PySide6.QtWidgets import (
     QComboBox,
     QGroupBox,
     QHBoxLayout,
     QLabel,
-    QListWidget,
-    QListWidgetItem,
+    QLineEdit,
+    QListView,
     QPushButton,
     QSpacerItem,
+    QStackedLayout,
     QVBoxLayout,
     QWidget,
     QSizePolicy,
 )
 
 from flexta.database import settings_db
+from flexta.utils.project_scanner import RecentProjectScanner
+
+from .recent_projects_model import PATH_ROLE, RecentProjectsModel
+
 
 class StartupWidget(QWidget):
     create_project_requested = Signal()
     open_project_requested = Signal()
     template_selected = Signal(str)
     recent_project_requested = Signal(str)
+    # Emitted from scanner threads; Qt queues delivery onto the GUI thread.
+    _metadata_scanned = Signal(object)
 
     def __init__(self, parent: Optional[QWidget] = None, show_open_button: bool = True) -> None:
         super().__init__(parent)
         self._show_open_button = show_open_button
-        self._recent_placeholder = QListWidgetItem("No recent projects")
+        self.recent_model = RecentProjectsModel(self)
+        self._scanner = RecentProjectScanner(self._metadata_scanned.emit)
+        self._metadata_scanned.connect(self.recent_model.update_metadata)
+        self.recent_model.scan_requested.connect(self._scanner.scan)
+        self.destroyed.connect(self._scanner.shutdown)
         self._build_ui()
         self.refresh_recent_projects()
 
@@ -39,7 +50,7 @@ class StartupWidget(QWidget):
 
         title = QLabel("Welcome to Flexta")
         title.setAlignment(Qt.AlignmentFlag.AlignLeft)
-        title.setStyleSheet("font-size: 28px; font-weight: 600;")
+        title.setObjectName("StartupTitle")
         layout.addWidget(title)
 
         actions_layout = QHBoxLayout()
@@ -71,11 +82,26 @@ class StartupWidget(QWidget):
         recent_group = QGroupBox("Recent Projects")
         recent_layout = QVBoxLayout(recent_group)
         recent_layout.setContentsMargins(16, 12, 16, 12)
-        self.recent_list = QListWidget()
-        self.recent_list.itemActivated.connect(self._handle_recent_activation)
-        self.recent_list.addItem(self._recent_placeholder)
-        self._recent_placeholder.setFlags(Qt.ItemFlag.NoItemFlags)
-        recent_layout.addWidget(self.recent_list)
+        self.recent_filter = QLineEdit()
+        self.recent_filter.setPlaceholderText("Search recent projects")
+        self.recent_filter.setClearButtonEnabled(True)
+        self.recent_filter.textChanged.connect(self.recent_model.set_filter_text)
+        self.recent_filter.returnPressed.connect(self._activate_first_match)
+        recent_layout.addWidget(self.recent_filter)
+
+        self.recent_view = QListView()
+        self.recent_view.setModel(self.recent_model)
+        # Uniform rows let the view lay out thousands of entries without
+        # measuring each one; only visible rows are ever asked for data.
+        self.recent_view.setUniformItemSizes(True)
+        self.recent_view.setEditTriggers(QListView.EditTrigger.NoEditTriggers)
+        self.recent_view.activated.connect(self._handle_recent_activation)
+        self.recent_placeholder = QLabel("No recent projects")
+        self.recent_placeholder.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self._recent_stack = QStackedLayout()
+        self._recent_stack.addWidget(self.recent_view)
+        self._recent_stack.addWidget(self.recent_placeholder)
+        recent_layout.addLayout(self._recent_stack)
         layout.addWidget(recent_group, 1)
 
     def set_templates(self, templates: Iterable[str]) -> None:
@@ -85,27 +111,25 @@ class StartupWidget(QWidget):
             self.template_selected.emit(self.template_picker.currentText())
 
     def set_recent_projects(self, projects: Iterable[str]) -> None:
-        self.recent_list.clear()
-        project_list = list(projects)
-        if not project_list:
-            self.recent_list.addItem(self._recent_placeholder)
-            self._recent_placeholder.setFlags(Qt.ItemFlag.NoItemFlags)
-            return
-
-        for project in project_list:
-            item = QListWidgetItem(project)
-            item.setToolTip(project)
-            self.recent_list.addItem(item)
+        self.recent_model.set_projects(projects)
+        has_projects = self.recent_model.project_count() > 0
+        self._recent_stack.setCurrentWidget(self.recent_view if has_projects else self.recent_placeholder)
+        self.recent_filter.setEnabled(has_projects)
 
     def refresh_recent_projects(self) -> None:
-        self.set_recent_projects(settings_db.get_recent_projects())
+        self.set_recent_projects(settings_db.get_recent_projects(limit=None))
 
     def record_recent_project(self, project_path: str) -> None:
         settings_db.add_recent_project(project_path)
         self.refresh_recent_projects()
 
-    def _handle_recent_activation(self, item: QListWidgetItem) -> None:
-        if item.flags() == Qt.ItemFlag.NoItemFlags:
+    def _activate_first_match(self) -> None:
+        if self.recent_model.rowCount() > 0:
+            self._handle_recent_activation(self.recent_model.index(0))
+
+    def _handle_recent_activation(self, index: QModelIndex) -> None:
+        project = index.data(PATH_ROLE)
+        if not project:
             return
-        self.record_recent_project(item.text())
-        self.recent_project_requested.emit(item.text())
+        self.record_recent_project(project)
+        self.recent_project_requested.emit(project)
@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+from pathlib import Path
+import sqlite3
+from typing import Callable, Iterable
+
+
+_STATEMENT_CACHE_SIZE = 64
+
+_CREATE_VERSION_TABLE = """
+    CREATE TABLE IF NOT EXISTS schema_version (
+        version INTEGER PRIMARY KEY,
+        applied_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP
+    )
+"""
+_SELECT_VERSION = "SELECT MAX(version) FROM schema_version"
+_INSERT_VERSION = "INSERT INTO schema_version (version) VALUES (?)"
+
+Migrations = Iterable[tuple[int, str]]
+
+
+def connect(db_path: Path, cached_statements: int = _STATEMENT_CACHE_SIZE) -> sqlite3.Connection:
+    # Shared by the GUI thread and a writer thread, so callers serialise
+    # access themselves. WAL lets readers proceed while a batch commits.
+    connection = sqlite3.connect(
+        db_path,
+        check_same_thread=False,
+        cached_statements=cached_statements,
+    )
+    connection.row_factory = sqlite3.Row
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("PRAGMA synchronous=NORMAL")
+    return connection
+
+
+def schema_version(connection: sqlite3.Connection) -> int:
+    return connection.execute(_SELECT_VERSION).fetchone()[0] or 0
+
+
+def migrate(connection: sqlite3.Connection, target: int, load_migrations: Callable[[], Migrations]) -> int:
+    # Migrations are loaded only when the database is behind, so an
+    # up-to-date database costs one query on open.
+    with connection:
+        connection.execute(_CREATE_VERSION_TABLE)
+    current = schema_version(connection)
+    if current >= target:
+        return current
+
+    for version, script in load_migrations():
+        if version <= current:
+            continue
+        connection.executescript(script)
+        with connection:
+            connection.execute(_INSERT_VERSION, (version,))
+        current = version
+    return current
@@ -0,0 +1,538 @@
+from __future__ import annotations
+
+from array import array
+from bisect import bisect_left
+from collections import deque
+from dataclasses import dataclass, field
+import mmap
+import os
+import re
+import threading
+from typing import Callable, Iterable, Iterator, Optional
+
+
+# Never worth listing in a project explorer, ignored or not.
+DEFAULT_EXCLUDES = (".git", ".hg", ".svn", "node_modules", "bower_components", "__pycache__", ".flexta")
+GITIGNORE = ".gitignore"
+
+# (name, is_dir, size, mtime_ns)
+ScanEntry = tuple[str, bool, int, int]
+
+# MappedFile keeps one line count per block of this many bytes; finding a
+# line rescans at most one block.
+_INDEX_BLOCK = 16 * 1024
+# Blocks counted between progress reports while indexing.
+_INDEX_STEP = 1024
+# Lines are read for display this many bytes at a time, from the column
+# the view is scrolled to, so minified bundles never decode whole.
+_MAX_LINE_BYTES = 16 * 1024
+# Characters are counted over at most this many bytes at once: UTF-8 bytes
+# that are not continuation bytes, without decoding.
+_COUNT_CHUNK = 1024 * 1024
+_CONTINUATION_BYTES = bytes(range(0x80, 0xC0))
+# search() runs the regex over about this many bytes per call, so the
+# worker thread gives up the GIL between calls and notices cancellation.
+_SEARCH_CHUNK = 1024 * 1024
+# Lines longer than _SEARCH_CHUNK are cut; the next chunk starts this far
+# back so a match across the cut is still found unless it is longer.
+_SEARCH_OVERLAP = 4096
+
+
+def _translate_glob(glob: str) -> str:
+    # Gitignore glob syntax: "*" and "?" stay within a path segment, "**"
+    # crosses segments, "[...]" is a character class.
+    parts = []
+    index = 0
+    while index < len(glob):
+        char = glob[index]
+        if glob.startswith("**/", index):
+            parts.append("(?:.*/)?")
+            index += 3
+            continue
+        if glob.startswith("**", index):
+            parts.append(".*")
+            index += 2
+            continue
+        if char == "*":
+            parts.append("[^/]*")
+        elif char == "?":
+            parts.append("[^/]")
+        elif char == "[":
+            end = glob.find("]", index + 2)
+            if end < 0:
+                parts.append(re.escape(char))
+            else:
+                body = glob[index + 1:end]
+                if body.startswith("!"):
+                    body = "^" + body[1:]
+                parts.append(f"[{body.replace(chr(92), chr(92) * 2)}]")
+                index = end
+        elif char == "\\" and index + 1 < len(glob):
+            index += 1
+            parts.append(re.escape(glob[index]))
+        else:
+            parts.append(re.escape(char))
+        index += 1
+    return "".join(parts)
+
+
+class IgnoreRules:
+    # The patterns of one .gitignore (or a list of exclusion globs), matched
+    # against paths relative to the directory the file sits in. Without
+    # negations every pattern is folded into one regex per kind, so a path
+    # costs one or two matches however long the file is.
+    def __init__(self, base: str, patterns: Iterable[str]) -> None:
+        self.base = base
+        self._prefix = f"{base}/" if base else ""
+        self._patterns: list[tuple[re.Pattern, bool, bool]] = []
+        for raw in patterns:
+            line = raw.rstrip("\n")
+            if not line.endswith("\\ "):
+                line = line.rstrip()
+            if not line or line.startswith("#"):
+                continue
+            negate = line.startswith("!")
+            if negate:
+                line = line[1:]
+            elif line.startswith("\\"):
+                line = line[1:]
+            directory_only = line.endswith("/")
+            line = line.rstrip("/")
+            # A slash anywhere but the end, leading one included, anchors
+            # the pattern to this directory.
+            anchored = "/" in line
+            line = line.lstrip("/")
+            if not line:
+                continue
+            regex = _translate_glob(line)
+            if not anchored:
+                regex = f"(?:.*/)?{regex}"
+            self._patterns.append((re.compile(regex, re.S), negate, directory_only))
+        self._combined: Optional[tuple[Optional[re.Pattern], Optional[re.Pattern]]] = None
+        if not any(negate for _, negate, _ in self._patterns):
+            self._combined = (
+                self._fold(pattern for pattern, _, directory_only in self._patterns if not directory_only),
+                self._fold(pattern for pattern, _, directory_only in self._patterns if directory_only),
+            )
+
+    @staticmethod
+    def _fold(patterns: Iterable[re.Pattern]) -> Optional[re.Pattern]:
+        sources = [f"(?:{pattern.pattern})" for pattern in patterns]
+        return re.compile("|".join(sources), re.S) if sources else None
+
+    @classmethod
+    def load(cls, directory: str, base: str) -> Optional["IgnoreRules"]:
+        try:
+            with open(os.path.join(directory, GITIGNORE), encoding="utf-8", errors="replace") as handle:
+                rules = cls(base, handle)
+        except OSError:
+            return None
+        return rules if rules._patterns else None
+
+    def match(self, path: str, is_dir: bool) -> Optional[bool]:
+        # True if path is ignored, False if a negation re-includes it, None
+        # if no pattern here has an opinion.
+        if self._prefix:
+            if not path.startswith(self._prefix):
+                return None
+            path = path[len(self._prefix):]
+        if self._combined is not None:
+            files, directories = self._combined
+            if (files is not None and files.fullmatch(path)) or (
+                is_dir and directories is not None and directories.fullmatch(path)
+            ):
+                return True
+            return None
+        for pattern, negate, directory_only in reversed(self._patterns):
+            if directory_only and not is_dir:
+                continue
+            if pattern.fullmatch(path):
+                return not negate
+        return None
+
+
+def is_ignored(rules: tuple[IgnoreRules, ...], path: str, is_dir: bool) -> bool:
+    # Deeper .gitignore files override shallower ones.
+    for ruleset in reversed(rules):
+        verdict = ruleset.match(path, is_dir)
+        if verdict is not None:
+            return verdict
+    return False
+
+
+def list_directory(
+    root: str,
+    relative: str,
+    rules: tuple[IgnoreRules, ...],
+) -> tuple[list[ScanEntry], tuple[IgnoreRules, ...]]:
+    # One os.scandir of root/relative: its entries that are not ignored, and
+    # the ignore rules that apply to its subdirectories.
+    directory = os.path.join(root, relative) if relative else root
+    local = IgnoreRules.load(directory, relative)
+    if local is not None:
+        rules = (*rules, local)
+    prefix = f"{relative}/" if relative else ""
+    entries: list[ScanEntry] = []
+    with os.scandir(directory) as iterator:
+        for entry in iterator:
+            try:
+                is_dir = entry.is_dir(follow_symlinks=False)
+                if is_ignored(rules, prefix + entry.name, is_dir):
+                    continue
+                if is_dir:
+                    entries.append((entry.name, True, 0, 0))
+                else:
+                    status = entry.stat(follow_symlinks=False)
+                    entries.append((entry.name, False, status.st_size, status.st_mtime_ns))
+            except OSError:
+                continue
+    return entries, rules
+
+
+def root_rules(excludes: Iterable[str] = DEFAULT_EXCLUDES) -> tuple[IgnoreRules, ...]:
+    excludes = list(excludes)
+    return (IgnoreRules("", excludes),) if excludes else ()
+
+
+class TreeScan:
+    # Breadth-first os.scandir walk from start, yielding (directory,
+    # entries, rules) per directory, rules being what its subdirectories
+    # inherit. Within a directory, visible folders are queued
+    # before dot-folders, and prioritize() moves a pending directory (one the
+    # user just expanded) to the front. Safe to prioritize or cancel from
+    # another thread while iterating.
+    def __init__(self, root: str, start: str = "", rules: tuple[IgnoreRules, ...] = ()) -> None:
+        self.root = root
+        self._lock = threading.Lock()
+        self._queue: deque[str] = deque([start])
+        self._urgent: deque[str] = deque()
+        self._pending: dict[str, tuple[IgnoreRules, ...]] = {start: rules}
+        self._cancelled = threading.Event()
+
+    def prioritize(self, relative: str) -> None:
+        with self._lock:
+            if relative in self._pending:
+                self._urgent.append(relative)
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def cancel(self) -> None:
+        self._cancelled.set()
+
+    def __iter__(self) -> Iterator[tuple[str, list[ScanEntry], tuple[IgnoreRules, ...]]]:
+        while not self._cancelled.is_set():
+            with self._lock:
+                relative = None
+                while self._urgent and relative is None:
+                    candidate = self._urgent.popleft()
+                    if candidate in self._pending:
+                        relative = candidate
+                while relative is None and self._queue:
+                    candidate = self._queue.popleft()
+                    if candidate in self._pending:
+                        relative = candidate
+                if relative is None:
+                    return
+                rules = self._pending.pop(relative)
+            try:
+                entries, rules = list_directory(self.root, relative, rules)
+            except OSError:
+                continue
+            prefix = f"{relative}/" if relative else ""
+            folders = sorted((name for name, is_dir, _, _ in entries if is_dir), key=lambda name: name.startswith("."))
+            with self._lock:
+                for name in folders:
+                    self._pending[prefix + name] = rules
+                    self._queue.append(prefix + name)
+            yield relative, entries, rules
+
+
+class FileNode:
+    __slots__ = ("name", "is_dir", "size", "mtime_ns", "children")
+
+    def __init__(self, name: str, is_dir: bool, size: int = 0, mtime_ns: int = 0) -> None:
+        self.name = name
+        self.is_dir = is_dir
+        self.size = size
+        self.mtime_ns = mtime_ns
+        # Directories only: None until the directory has been listed.
+        self.children: Optional[dict[str, FileNode]] = None
+
+
+@dataclass
+class TreeChange:
+    # Relative paths. removed_files includes the files under removed
+    # directories; modified holds files whose size or mtime changed.
+    added: list[str] = field(default_factory=list)
+    removed: list[str] = field(default_factory=list)
+    removed_files: list[str] = field(default_factory=list)
+    modified: list[str] = field(default_factory=list)
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.removed or self.modified)
+
+    def extend(self, other: "TreeChange") -> None:
+        self.added.extend(other.added)
+        self.removed.extend(other.removed)
+        self.removed_files.extend(other.removed_files)
+        self.modified.extend(other.modified)
+
+
+class FileTree:
+    # The in-memory project tree. Directory listings are applied as diffs,
+    # whether they come from the initial scan or from a watcher event, so
+    # both paths report exactly what changed.
+    def __init__(self) -> None:
+        self.root = FileNode("", True)
+        self.file_count = 0
+        self.directory_count = 0
+
+    def node(self, relative: str) -> Optional[FileNode]:
+        node = self.root
+        if not relative:
+            return node
+        for name in relative.split("/"):
+            if node.children is None:
+                return None
+            node = node.children.get(name)
+            if node is None:
+                return None
+        return node
+
+    def __contains__(self, relative: str) -> bool:
+        return self.node(relative) is not None
+
+    def children(self, relative: str = "") -> list[FileNode]:
+        node = self.node(relative)
+        if node is None or node.children is None:
+            return []
+        return sorted(node.children.values(), key=lambda child: (not child.is_dir, child.name.lower()))
+
+    def files(self) -> Iterator[str]:
+        return (path for path, _ in self.file_sizes())
+
+    def file_sizes(self) -> Iterator[tuple[str, int]]:
+        # Breadth-first, in the order the scan listed directories.
+        pending = deque([("", self.root)])
+        while pending:
+            prefix, node = pending.popleft()
+            for child in (node.children or {}).values():
+                path = prefix + child.name
+                if child.is_dir:
+                    pending.append((path + "/", child))
+                else:
+                    yield path, child.size
+
+    def apply(self, relative: str, entries: list[ScanEntry]) -> TreeChange:
+        change = TreeChange()
+        node = self.node(relative)
+        if node is None or not node.is_dir:
+            # Listed before its parent dropped it: stale.
+            return change
+        prefix = f"{relative}/" if relative else ""
+        children = node.children
+        if children is None:
+            children = node.children = {}
+        current = {entry[0] for entry in entries}
+        for name in [name for name in children if name not in current]:
+            self._remove(prefix + name, children.pop(name), change)
+        for name, is_dir, size, mtime_ns in entries:
+            child = children.get(name)
+            if child is not None and child.is_dir == is_dir:
+                if not is_dir and (child.size != size or child.mtime_ns != mtime_ns):
+                    child.size = size
+                    child.mtime_ns = mtime_ns
+                    change.modified.append(prefix + name)
+                continue
+            if child is not None:
+                # A file replaced by a folder of the same name, or back.
+                self._remove(prefix + name, child, change)
+            children[name] = FileNode(name, is_dir, size, mtime_ns)
+            change.added.append(prefix + name)
+            if is_dir:
+                self.directory_count += 1
+            else:
+                self.file_count += 1
+        return change
+
+    def _remove(self, path: str, node: FileNode, change: TreeChange) -> None:
+        change.removed.append(path)
+        pending = [(path, node)]
+        while pending:
+            path, node = pending.pop()
+            if not node.is_dir:
+                self.file_count -= 1
+                change.removed_files.append(path)
+                continue
+            self.directory_count -= 1
+            for child in (node.children or {}).values():
+                pending.append((f"{path}/{child.name}", child))
+
+
+class MappedFile:
+    # A read-only memory map of a file too large to hold as a string. The
+    # line index is sparse: the number of newlines before each _INDEX_BLOCK
+    # boundary, so it costs 8 bytes per 16 KB of file and lines are located
+    # by rescanning a single block. The OS pages the file in and out; only
+    # the lines being shown are ever decoded.
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._handle = open(path, "rb")
+        self.size = os.fstat(self._handle.fileno()).st_size
+        self.data = mmap.mmap(self._handle.fileno(), 0, access=mmap.ACCESS_READ) if self.size else b""
+        # _newlines[i] is the number of newlines before byte i * _INDEX_BLOCK;
+        # appended to by build_index() while readers use what is there.
+        self._newlines = array("q", [0])
+        self._indexed = 0
+        self.complete = self.size == 0
+        # (line start, columns, offset) of the last _advance(); scrolling
+        # along one long line continues from it.
+        self._last_advance = (-1, 0, 0)
+
+    def close(self) -> None:
+        if isinstance(self.data, mmap.mmap):
+            self.data.close()
+        self._handle.close()
+
+    @property
+    def indexed_bytes(self) -> int:
+        return self._indexed
+
+    @property
+    def line_count(self) -> int:
+        # Lines reachable so far; final once complete is set.
+        if self.complete:
+            return self._newlines[-1] + self.data[(len(self._newlines) - 1) * _INDEX_BLOCK:].count(b"\n") + 1
+        return self._newlines[-1]
+
+    def build_index(
+        self, cancelled: Optional[threading.Event] = None, progress: Optional[Callable[[int], None]] = None
+    ) -> None:
+        # Meant for a worker thread. Each block is copied out of the mapping
+        # and counted in C; mmap has no count() of its own.
+        data = self.data
+        newlines = self._newlines
+        count = newlines[-1]
+        start = (len(newlines) - 1) * _INDEX_BLOCK
+        while start + _INDEX_BLOCK <= self.size:
+            if cancelled is not None and cancelled.is_set():
+                return
+            for _ in range(_INDEX_STEP):
+                end = start + _INDEX_BLOCK
+                if end > self.size:
+                    break
+                count += data[start:end].count(b"\n")
+                newlines.append(count)
+                start = end
+            self._indexed = start
+            if progress is not None:
+                progress(count)
+        self._indexed = self.size
+        self.complete = True
+        if progress is not None:
+            progress(self.line_count)
+
+    def search(
+        self, regex: re.Pattern, start: int, end: int, cancelled: Optional[threading.Event] = None
+    ) -> Optional[tuple[int, int]]:
+        # Span of the first match of a bytes regex within [start, end), or
+        # None if there is none or cancelled was set. Meant for a worker
+        # thread. Chunks end at a line end where there is one nearby.
+        data = self.data
+        while start < end:
+            if cancelled is not None and cancelled.is_set():
+                return None
+            stop = min(start + _SEARCH_CHUNK, end)
+            line_end = data.find(b"\n", stop, min(stop + _SEARCH_CHUNK, end))
+            if stop < end:
+                stop = line_end + 1 if line_end >= 0 else stop
+            found = regex.search(data, start, stop)
+            if found is not None:
+                return found.span()
+            if stop >= end:
+                return None
+            start = stop if line_end >= 0 else max(stop - _SEARCH_OVERLAP, start + 1)
+        return None
+
+    def line_offset(self, line: int) -> int:
+        # Byte offset where a line starts; the line must be within the
+        # indexed part of the file.
+        if line <= 0:
+            return 0
+        newlines = self._newlines
+        # The block holding the line's preceding newline.
+        block = bisect_left(newlines, line) - 1
+        offset = block * _INDEX_BLOCK
+        remaining = line - newlines[block]
+        data = self.data
+        while remaining:
+            found = data.find(b"\n", offset)
+            if found < 0:
+                return self.size
+            offset = found + 1
+            remaining -= 1
+        return offset
+
+    def line_at(self, offset: int) -> int:
+        block = min(offset // _INDEX_BLOCK, len(self._newlines) - 1)
+        return self._newlines[block] + self.data[block * _INDEX_BLOCK:offset].count(b"\n")
+
+    def line_end(self, offset: int) -> int:
+        end = self.data.find(b"\n", offset)
+        return self.size if end < 0 else end
+
+    def lines(self, first: int, count: int, column: int = 0) -> list[str]:
+        # Each line from character column on, cut at _MAX_LINE_BYTES.
+        data = self.data
+        offset = self.line_offset(first)
+        lines = []
+        for _ in range(min(count, self.line_count - first)):
+            end = self.line_end(offset)
+            start = self._advance(offset, end, column) if column else offset
+            text = data[start:min(end, start + _MAX_LINE_BYTES)].decode("utf-8", "replace")
+            lines.append(text[:-1] if text.endswith("\r") else text)
+            offset = end + 1
+        return lines
+
+    def count_chars(self, start: int, end: int) -> int:
+        data = self.data
+        count = 0
+        while start < end:
+            stop = min(end, start + _COUNT_CHUNK)
+            count += len(data[start:stop].translate(None, _CONTINUATION_BYTES))
+            start = stop
+        return count
+
+    def column_at(self, offset: int) -> int:
+        # Character column of a byte offset within its line.
+        return self.count_chars(self.data.rfind(b"\n", 0, offset) + 1, offset)
+
+    def offset_of(self, line: int, column: int) -> int:
+        start = self.line_offset(line)
+        return self._advance(start, self.line_end(start), column)
+
+    def _advance(self, line_start: int, end: int, columns: int) -> int:
+        # Byte offset columns characters past a line start, at most end.
+        offset = line_start
+        skipped = 0
+        cached_start, cached_columns, cached_offset = self._last_advance
+        if cached_start == line_start and cached_columns <= columns:
+            offset, skipped = cached_offset, cached_columns
+        data = self.data
+        for size in (_COUNT_CHUNK, 4096):
+            while end - offset >= size:
+                chars = len(data[offset:offset + size].translate(None, _CONTINUATION_BYTES))
+                if skipped + chars > columns:
+                    break
+                skipped += chars
+                offset += size
+        for byte in data[offset:min(end, offset + 4096)]:
+            if byte & 0xC0 != 0x80:
+                if skipped == columns:
+                    break
+                skipped += 1
+            offset += 1
+        self._last_advance = (line_start, skipped, offset)
+        return offset
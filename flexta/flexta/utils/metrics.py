@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+import math
+import time
+from typing import Callable, Iterable, Optional
+
+
+@dataclass(frozen=True)
+class TimingStats:
+    count: int
+    mean_ms: float
+    p50_ms: float
+    p95_ms: float
+    max_ms: float
+
+    @classmethod
+    def from_samples(cls, samples_ms: Iterable[float]) -> "TimingStats":
+        ordered = sorted(samples_ms)
+        if not ordered:
+            return cls(count=0, mean_ms=0.0, p50_ms=0.0, p95_ms=0.0, max_ms=0.0)
+        return cls(
+            count=len(ordered),
+            mean_ms=sum(ordered) / len(ordered),
+            p50_ms=_percentile(ordered, 0.50),
+            p95_ms=_percentile(ordered, 0.95),
+            max_ms=ordered[-1],
+        )
+
+
+def _percentile(ordered: list[float], fraction: float) -> float:
+    # Nearest-rank percentile; the sample lists here are small.
+    rank = max(1, math.ceil(fraction * len(ordered)))
+    return ordered[rank - 1]
+
+
+@dataclass(frozen=True)
+class FrameStats:
+    frames: int
+    duration_ms: float
+    intervals: TimingStats
+    # Frames that took longer than the budget (two 60 Hz vsync periods).
+    dropped: int
+
+    @property
+    def fps(self) -> float:
+        if self.duration_ms <= 0:
+            return 0.0
+        return self.frames * 1000.0 / self.duration_ms
+
+
+class FrameTimer:
+    def __init__(self, budget_ms: float = 1000.0 / 30.0, clock: Callable[[], float] = time.perf_counter) -> None:
+        self.budget_ms = budget_ms
+        self._clock = clock
+        self._started: Optional[float] = None
+        self._last: Optional[float] = None
+        self._intervals: list[float] = []
+
+    def start(self) -> None:
+        self._started = self._last = self._clock()
+        self._intervals = []
+
+    def tick(self) -> None:
+        if self._last is None:
+            return
+        now = self._clock()
+        self._intervals.append((now - self._last) * 1000.0)
+        self._last = now
+
+    def stop(self) -> FrameStats:
+        duration_ms = 0.0
+        if self._started is not None:
+            duration_ms = (self._clock() - self._started) * 1000.0
+        intervals = self._intervals
+        self._started = self._last = None
+        self._intervals = []
+        return FrameStats(
+            frames=len(intervals),
+            duration_ms=duration_ms,
+            intervals=TimingStats.from_samples(intervals),
+            dropped=sum(1 for interval in intervals if interval > self.budget_ms),
+        )
@@ -0,0 +1,253 @@
+from __future__ import annotations
+
+import itertools
+import os
+import queue
+import stat
+import threading
+import time
+from typing import Callable, Iterable, Optional
+
+from flexta.database import settings_db
+from flexta.database.settings_db import ProjectMetadata
+from flexta.utils.file_utils import DEFAULT_EXCLUDES
+
+
+_DEFAULT_WORKERS = 4
+_DEFAULT_TIMEOUT = 2.0
+_DEFAULT_TTL = 60.0
+
+ResultCallback = Callable[[ProjectMetadata], None]
+
+
+class _DeadlineExceeded(Exception):
+    pass
+
+
+def _measure_tree(root: str, deadline: float) -> tuple[int, int]:
+    file_count = 0
+    total_size = 0
+    pending = [root]
+    while pending:
+        if time.monotonic() > deadline:
+            raise _DeadlineExceeded(root)
+        directory = pending.pop()
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            # Dependency and VCS folders dwarf the project
+                            # and would eat the deadline.
+                            if entry.name not in DEFAULT_EXCLUDES:
+                                pending.append(entry.path)
+                        elif entry.is_file(follow_symlinks=False):
+                            file_count += 1
+                            total_size += entry.stat(follow_symlinks=False).st_size
+                    except OSError:
+                        continue
+        except OSError:
+            continue
+    return file_count, total_size
+
+
+def stat_project(path: str, deadline: Optional[float] = None) -> ProjectMetadata:
+    if deadline is None:
+        deadline = time.monotonic() + _DEFAULT_TIMEOUT
+    scanned_at = time.time()
+    try:
+        path_stat = os.stat(os.path.expanduser(path))
+    except (OSError, ValueError):
+        return ProjectMetadata(path=path, exists=False, scanned_at=scanned_at)
+
+    if not stat.S_ISDIR(path_stat.st_mode):
+        return ProjectMetadata(
+            path=path,
+            exists=True,
+            modified=path_stat.st_mtime,
+            file_count=1,
+            total_size=path_stat.st_size,
+            scanned_at=scanned_at,
+        )
+
+    try:
+        file_count, total_size = _measure_tree(os.path.expanduser(path), deadline)
+    except _DeadlineExceeded:
+        # The folder is reachable but too large to count in time; keep the
+        # liveness and mtime, and leave the counts unknown rather than partial.
+        return ProjectMetadata(
+            path=path,
+            exists=True,
+            modified=path_stat.st_mtime,
+            scanned_at=scanned_at,
+        )
+    return ProjectMetadata(
+        path=path,
+        exists=True,
+        modified=path_stat.st_mtime,
+        file_count=file_count,
+        total_size=total_size,
+        scanned_at=scanned_at,
+    )
+
+
+class StatCache:
+    def __init__(self, ttl: float = _DEFAULT_TTL, clock: Callable[[], float] = time.monotonic) -> None:
+        self._ttl = ttl
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: dict[str, tuple[float, ProjectMetadata]] = {}
+
+    def get(self, path: str) -> Optional[ProjectMetadata]:
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is None:
+                return None
+            expires_at, metadata = entry
+            if self._clock() >= expires_at:
+                del self._entries[path]
+                return None
+            return metadata
+
+    def put(self, metadata: ProjectMetadata) -> None:
+        with self._lock:
+            self._entries[metadata.path] = (self._clock() + self._ttl, metadata)
+
+    def invalidate(self, path: Optional[str] = None) -> None:
+        with self._lock:
+            if path is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(path, None)
+
+
+class RecentProjectScanner:
+    # Workers are daemon threads rather than a ThreadPoolExecutor: a stat on an
+    # unreachable network mount can block indefinitely, and executor workers
+    # are joined at interpreter exit, which would hang shutdown. A worker the
+    # watchdog times out is abandoned and replaced, so hung paths cannot use
+    # up the pool; it exits once its stat returns.
+    def __init__(
+        self,
+        on_result: Optional[ResultCallback] = None,
+        max_workers: int = _DEFAULT_WORKERS,
+        timeout: float = _DEFAULT_TIMEOUT,
+        cache: Optional[StatCache] = None,
+        persist: bool = True,
+    ) -> None:
+        self._on_result = on_result
+        self._max_workers = max_workers
+        self._timeout = timeout
+        self._cache = cache if cache is not None else StatCache()
+        self._persist = persist
+        self._jobs: queue.Queue[Optional[str]] = queue.Queue()
+        # Reentrant: the owning widget's destroyed signal can call shutdown()
+        # from a garbage collection that runs in the middle of scan().
+        self._lock = threading.RLock()
+        # path -> deadline once a worker has picked it up, None while queued.
+        self._inflight: dict[str, Optional[float]] = {}
+        self._timed_out: set[str] = set()
+        # path -> the worker stat-ing it.
+        self._owners: dict[str, threading.Thread] = {}
+        # Workers taking jobs; abandoned ones are no longer counted.
+        self._workers: set[threading.Thread] = set()
+        self._worker_ids = itertools.count()
+        self._watchdog: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+
+    def scan(self, paths: Iterable[str]) -> None:
+        fresh: list[ProjectMetadata] = []
+        with self._lock:
+            if self._stopped.is_set():
+                return
+            for path in paths:
+                cached = self._cache.get(path)
+                if cached is not None:
+                    fresh.append(cached)
+                    continue
+                if path in self._inflight:
+                    continue
+                self._inflight[path] = None
+                self._jobs.put(path)
+            # The same reentrant shutdown() can land inside the loop.
+            if self._stopped.is_set():
+                return
+            self._ensure_threads()
+        for metadata in fresh:
+            self._deliver(metadata)
+
+    def is_idle(self) -> bool:
+        with self._lock:
+            return not self._inflight
+
+    def shutdown(self) -> None:
+        with self._lock:
+            self._on_result = None
+            self._stopped.set()
+            for _ in self._workers:
+                self._jobs.put(None)
+
+    def _ensure_threads(self) -> None:
+        while len(self._workers) < self._max_workers:
+            self._start_worker()
+        if self._watchdog is None:
+            self._watchdog = threading.Thread(
+                target=self._run_watchdog, name="flexta-project-scan-watchdog", daemon=True
+            )
+            self._watchdog.start()
+
+    def _start_worker(self) -> None:
+        worker = threading.Thread(
+            target=self._run_worker,
+            name=f"flexta-project-scan-{next(self._worker_ids)}",
+            daemon=True,
+        )
+        self._workers.add(worker)
+        worker.start()
+
+    def _run_worker(self) -> None:
+        current = threading.current_thread()
+        while True:
+            path = self._jobs.get()
+            if path is None or self._stopped.is_set():
+                return
+            deadline = time.monotonic() + self._timeout
+            with self._lock:
+                self._inflight[path] = deadline
+                self._owners[path] = current
+            metadata = stat_project(path, deadline)
+            with self._lock:
+                self._inflight.pop(path, None)
+                self._owners.pop(path, None)
+                self._timed_out.discard(path)
+                abandoned = current not in self._workers
+            self._cache.put(metadata)
+            if self._persist:
+                settings_db.set_project_metadata(metadata)
+            self._deliver(metadata)
+            if abandoned:
+                return
+
+    def _run_watchdog(self) -> None:
+        interval = max(self._timeout / 4, 0.01)
+        while not self._stopped.wait(interval):
+            now = time.monotonic()
+            expired: list[str] = []
+            with self._lock:
+                for path, deadline in self._inflight.items():
+                    # Small grace period so a walk that stops at its own
+                    # deadline reports its partial result instead.
+                    if deadline is not None and now > deadline + interval and path not in self._timed_out:
+                        self._timed_out.add(path)
+                        expired.append(path)
+                        owner = self._owners.get(path)
+                        if owner in self._workers and not self._stopped.is_set():
+                            self._workers.discard(owner)
+                            self._start_worker()
+            for path in expired:
+                self._deliver(ProjectMetadata(path=path, exists=None, scanned_at=time.time()))
+
+    def _deliver(self, metadata: ProjectMetadata) -> None:
+        callback = self._on_result
+        if callback is not None:
+            callback(metadata)
@@ -0,0 +1,297 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+import fnmatch
+import json
+import logging
+import os
+from pathlib import Path, PurePosixPath
+import threading
+from typing import BinaryIO, Iterable, Optional
+import zipfile
+
+from flexta.exceptions import TemplateError
+
+
+MANIFEST_NAME = "template.json"
+_ARCHIVE_SUFFIXES = (".zip", ".flexta-pack")
+
+logger = logging.getLogger(__name__)
+
+
+def get_resources_dir() -> Path:
+    return Path(__file__).resolve().parents[1] / "resources"
+
+
+def get_templates_dir() -> Path:
+    return get_resources_dir() / "templates"
+
+
+@dataclass(frozen=True)
+class TemplateFile:
+    # Destination path inside the new project, always POSIX-style.
+    path: str
+    source: Path
+    size: int
+    # Set when the file lives inside a template pack archive.
+    member: Optional[str] = None
+
+    def open(self) -> BinaryIO:
+        if self.member is None:
+            return self.source.open("rb")
+        archive = zipfile.ZipFile(self.source)
+        try:
+            return _ArchiveMember(archive, archive.open(self.member))
+        except Exception:
+            archive.close()
+            raise
+
+
+class _ArchiveMember:
+    def __init__(self, archive: zipfile.ZipFile, member: BinaryIO) -> None:
+        self._archive = archive
+        self._member = member
+
+    def read(self, size: int = -1) -> bytes:
+        return self._member.read(size)
+
+    def close(self) -> None:
+        try:
+            self._member.close()
+        finally:
+            self._archive.close()
+
+    def __enter__(self) -> "_ArchiveMember":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+
+@dataclass(frozen=True)
+class Template:
+    name: str
+    description: str
+    files: tuple[TemplateFile, ...]
+    variables: dict[str, str] = field(default_factory=dict)
+    source: Optional[Path] = None
+
+    @property
+    def total_size(self) -> int:
+        return sum(template_file.size for template_file in self.files)
+
+
+def _stat_key(path: Path) -> Optional[tuple[int, int]]:
+    try:
+        path_stat = path.stat()
+    except OSError:
+        return None
+    return path_stat.st_mtime_ns, path_stat.st_size
+
+
+def _parse_manifest(raw: bytes, origin: str) -> dict:
+    try:
+        manifest = json.loads(raw.decode("utf-8"))
+    except (UnicodeDecodeError, json.JSONDecodeError) as error:
+        raise TemplateError(f"Invalid template manifest {origin}: {error}") from error
+    if not isinstance(manifest, dict):
+        raise TemplateError(f"Invalid template manifest {origin}: expected an object")
+    variables = manifest.get("variables", {})
+    if not isinstance(variables, dict):
+        raise TemplateError(f"Invalid template manifest {origin}: 'variables' must be an object")
+    manifest["variables"] = {str(key): str(value) for key, value in variables.items()}
+    return manifest
+
+
+def _select_files(manifest: dict, available: Iterable[str]) -> list[str]:
+    available = [
+        name
+        for name in available
+        if PurePosixPath(name).name != MANIFEST_NAME
+        and not PurePosixPath(name).is_absolute()
+        and ".." not in PurePosixPath(name).parts
+    ]
+    patterns = manifest.get("files")
+    if not patterns:
+        return sorted(available)
+    selected = []
+    for name in sorted(available):
+        if any(fnmatch.fnmatchcase(name, pattern) for pattern in patterns):
+            selected.append(name)
+    return selected
+
+
+def _index_directory(template_dir: Path) -> Template:
+    manifest_path = template_dir / MANIFEST_NAME
+    manifest = _parse_manifest(manifest_path.read_bytes(), str(manifest_path))
+    sizes: dict[str, int] = {}
+    for root, _, filenames in os.walk(template_dir):
+        for filename in filenames:
+            absolute = Path(root) / filename
+            sizes[absolute.relative_to(template_dir).as_posix()] = absolute.stat().st_size
+    files = tuple(
+        TemplateFile(path=name, source=template_dir / name, size=sizes[name])
+        for name in _select_files(manifest, sizes)
+    )
+    return Template(
+        name=manifest.get("name", template_dir.name),
+        description=manifest.get("description", ""),
+        files=files,
+        variables=manifest["variables"],
+        source=template_dir,
+    )
+
+
+def _index_archive(archive_path: Path) -> list[Template]:
+    try:
+        with zipfile.ZipFile(archive_path) as archive:
+            infos = {info.filename: info for info in archive.infolist() if not info.is_dir()}
+            manifests = {
+                name: archive.read(name) for name in infos if PurePosixPath(name).name == MANIFEST_NAME
+            }
+    except (OSError, zipfile.BadZipFile) as error:
+        raise TemplateError(f"Invalid template pack {archive_path}: {error}") from error
+
+    templates = []
+    for manifest_name, raw in sorted(manifests.items()):
+        manifest = _parse_manifest(raw, f"{archive_path}:{manifest_name}")
+        prefix = str(PurePosixPath(manifest_name).parent)
+        prefix = "" if prefix == "." else f"{prefix}/"
+        members = {name[len(prefix):]: name for name in infos if name.startswith(prefix)}
+        files = tuple(
+            TemplateFile(
+                path=relative,
+                source=archive_path,
+                size=infos[members[relative]].file_size,
+                member=members[relative],
+            )
+            for relative in _select_files(manifest, members)
+        )
+        default_name = PurePosixPath(prefix).name if prefix else archive_path.stem
+        templates.append(
+            Template(
+                name=manifest.get("name", default_name),
+                description=manifest.get("description", ""),
+                files=files,
+                variables=manifest["variables"],
+                source=archive_path,
+            )
+        )
+    return templates
+
+
+def _index_flat_files(paths: Iterable[Path]) -> list[Template]:
+    # Legacy layout: loose files grouped by the stem before the first dot,
+    # e.g. default.html, default.css and default.js form "default".
+    groups: dict[str, list[TemplateFile]] = {}
+    for path in paths:
+        name = path.stem.split(".")[0]
+        groups.setdefault(name, []).append(
+            TemplateFile(path=path.name, source=path, size=path.stat().st_size)
+        )
+    return [
+        Template(name=name, description="", files=tuple(sorted(files, key=lambda item: item.path)))
+        for name, files in sorted(groups.items())
+    ]
+
+
+class TemplateRegistry:
+    def __init__(self, templates_dir: Optional[Path] = None) -> None:
+        self._templates_dir = templates_dir if templates_dir is not None else get_templates_dir()
+        self._lock = threading.Lock()
+        self._templates: dict[str, Template] = {}
+        # Everything whose mtime can invalidate the index: the templates
+        # directory itself plus every template directory, manifest and pack.
+        # Changes nested deeper inside a template directory need invalidate().
+        self._watched: dict[Path, Optional[tuple[int, int]]] = {}
+        # Packs are re-indexed only when their own mtime or size changes.
+        self._archive_index: dict[Path, tuple[Optional[tuple[int, int]], list[Template]]] = {}
+
+    @property
+    def templates_dir(self) -> Path:
+        return self._templates_dir
+
+    def list_templates(self) -> list[Template]:
+        with self._lock:
+            self._refresh_if_stale()
+            return [self._templates[name] for name in sorted(self._templates)]
+
+    def template_names(self) -> list[str]:
+        return [template.name for template in self.list_templates()]
+
+    def get(self, name: str) -> Template:
+        with self._lock:
+            self._refresh_if_stale()
+            template = self._templates.get(name)
+        if template is None:
+            raise TemplateError(f"Unknown template: {name}")
+        return template
+
+    def files_for(self, name: str) -> tuple[TemplateFile, ...]:
+        return self.get(name).files
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._watched.clear()
+
+    def _refresh_if_stale(self) -> None:
+        if self._watched and all(_stat_key(path) == key for path, key in self._watched.items()):
+            return
+        self._rebuild()
+
+    def _rebuild(self) -> None:
+        templates: dict[str, Template] = {}
+        watched: dict[Path, Optional[tuple[int, int]]] = {self._templates_dir: _stat_key(self._templates_dir)}
+        archive_index = {}
+        flat_files: list[Path] = []
+        if self._templates_dir.is_dir():
+            for entry in sorted(self._templates_dir.iterdir()):
+                try:
+                    indexed = self._index_entry(entry, watched, archive_index, flat_files)
+                except (OSError, TemplateError):
+                    logger.warning("Skipping template %s", entry, exc_info=True)
+                    continue
+                for template in indexed:
+                    templates.setdefault(template.name, template)
+            for template in _index_flat_files(flat_files):
+                templates.setdefault(template.name, template)
+        self._templates = templates
+        self._watched = watched
+        self._archive_index = archive_index
+
+    def _index_entry(
+        self,
+        entry: Path,
+        watched: dict[Path, Optional[tuple[int, int]]],
+        archive_index: dict[Path, tuple[Optional[tuple[int, int]], list[Template]]],
+        flat_files: list[Path],
+    ) -> list[Template]:
+        if entry.is_dir():
+            manifest_path = entry / MANIFEST_NAME
+            if not manifest_path.is_file():
+                return []
+            watched[entry] = _stat_key(entry)
+            watched[manifest_path] = _stat_key(manifest_path)
+            return [_index_directory(entry)]
+        if entry.suffix in _ARCHIVE_SUFFIXES:
+            key = _stat_key(entry)
+            watched[entry] = key
+            cached = self._archive_index.get(entry)
+            templates = cached[1] if cached is not None and cached[0] == key else _index_archive(entry)
+            archive_index[entry] = (key, templates)
+            return templates
+        if entry.is_file() and entry.suffix and not entry.name.startswith("."):
+            flat_files.append(entry)
+        return []
+
+
+_registry: Optional[TemplateRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_template_registry() -> TemplateRegistry:
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = TemplateRegistry()
+        return _registry
@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import re
+from typing import Optional, Sequence
+
+
+_SIZE_UNITS = ("B", "KB", "MB", "GB", "TB")
+
+
+def format_size(num_bytes: int) -> str:
+    size = float(num_bytes)
+    for unit in _SIZE_UNITS:
+        if size < 1024 or unit == _SIZE_UNITS[-1]:
+            if unit == "B":
+                return f"{int(size)} {unit}"
+            return f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{num_bytes} B"
+
+
+_SEGMENT_BREAKS = "/\\_-. "
+# Below this many candidates a narrowed query is matched entry by entry
+# instead of rescanning the whole haystack.
+_INCREMENTAL_LIMIT = 2048
+
+
+class SearchKey:
+    __slots__ = ("text", "lowered", "basename", "basename_start", "segments")
+
+    def __init__(self, text: str) -> None:
+        self.text = text
+        self.lowered = text.lower().replace("\n", " ")
+        self.segments = tuple(segment for segment in re.split(r"[\\/]", self.lowered) if segment)
+        self.basename = self.segments[-1] if self.segments else self.lowered
+        self.basename_start = self.lowered.rfind(self.basename)
+
+
+def _fuzzy_pattern(query: str, excluded: str = "") -> str:
+    # Each gap runs to the first occurrence of the next character, as a lazy
+    # .*? would, but as a class that excludes it: a line without a match is
+    # rejected without retrying every gap length.
+    parts = [re.escape(query[0])]
+    for char in query[1:]:
+        escaped = re.escape(char)
+        parts.append(f"[^{excluded}{escaped}]*{escaped}")
+    return "".join(parts)
+
+
+class FuzzyFilter:
+    def __init__(self, entries: Sequence[str], keys: Optional[dict[str, SearchKey]] = None) -> None:
+        # Entries are expected most-recent first; position feeds the ranking.
+        self._keys = [
+            keys[entry] if keys is not None and entry in keys else SearchKey(entry)
+            for entry in entries
+        ]
+        self._haystack = "\n".join(key.lowered for key in self._keys)
+        self._line_starts: list[int] = []
+        offset = 0
+        for key in self._keys:
+            self._line_starts.append(offset)
+            offset += len(key.lowered) + 1
+        self._last_query = ""
+        self._last_matches: Optional[list[tuple[int, int, int]]] = None
+
+    @property
+    def keys(self) -> list[SearchKey]:
+        return self._keys
+
+    def filter(self, query: str) -> list[int]:
+        query = query.strip().lower()
+        if not query:
+            self._last_query = ""
+            self._last_matches = None
+            return list(range(len(self._keys)))
+
+        if (
+            self._last_matches is not None
+            and query.startswith(self._last_query)
+            and len(self._last_matches) <= _INCREMENTAL_LIMIT
+        ):
+            matches = self._match_candidates(query, [index for index, _, _ in self._last_matches])
+        else:
+            matches = self._match_all(query)
+        self._last_query = query
+        self._last_matches = matches
+        return self._rank(query, matches)
+
+    def _match_all(self, query: str) -> list[tuple[int, int, int]]:
+        # One regex pass over every key joined by newlines keeps the scan in C.
+        # Each match takes the rest of its line too, so the pass moves on to
+        # the next line after the first hit, and the line index advances by
+        # the newlines in between rather than by a lookup per match.
+        pattern = re.compile("(" + _fuzzy_pattern(query, r"\n") + r")[^\n]*")
+        haystack = self._haystack
+        line_starts = self._line_starts
+        matches = []
+        index = 0
+        position = 0
+        for match in pattern.finditer(haystack):
+            start, end = match.span(1)
+            index += haystack.count("\n", position, start)
+            position = start
+            line_start = line_starts[index]
+            matches.append((index, start - line_start, end - line_start))
+        return matches
+
+    def _match_candidates(self, query: str, candidates: list[int]) -> list[tuple[int, int, int]]:
+        pattern = re.compile(_fuzzy_pattern(query))
+        matches = []
+        for index in candidates:
+            match = pattern.search(self._keys[index].lowered)
+            if match is not None:
+                matches.append((index, match.start(), match.end()))
+        return matches
+
+    def _rank(self, query: str, matches: list[tuple[int, int, int]]) -> list[int]:
+        # Score = match tightness + segment-start and basename bonuses + recency.
+        keys = self._keys
+        length = len(query)
+        scored = []
+        for index, start, end in matches:
+            key = keys[index]
+            score = length / (end - start) + 1.0 / (1.0 + index / 10.0)
+            if start == 0 or key.lowered[start - 1] in _SEGMENT_BREAKS:
+                score += 0.5
+            if start >= key.basename_start:
+                score += 2.0 if key.basename.startswith(query) else 1.0
+            scored.append((-score, index))
+        scored.sort()
+        return [index for _, index in scored]
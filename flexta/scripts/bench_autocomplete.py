@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import argparse
+import json
+import os
+from pathlib import Path
+import random
+import string
+import sys
+import tempfile
+import time
+
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PROJECT_ROOT))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from flexta.core.autocomplete import AutocompleteEngine, BuiltinCompletions, ProjectSymbols  # noqa: E402
+from flexta.utils.metrics import TimingStats  # noqa: E402
+
+
+def _ms_since(start: float) -> float:
+    return (time.perf_counter() - start) * 1000
+
+
+def _identifier(rng: random.Random) -> str:
+    head = rng.choice(("get", "set", "handle", "render", "update", "is", "on", "load", "user", "item"))
+    tail = "".join(rng.choice(string.ascii_letters + string.digits) for _ in range(rng.randint(3, 12)))
+    return head + tail
+
+
+def run_benchmark(symbols: int, queries: int, seed: int) -> dict[str, float]:
+    rng = random.Random(seed)
+    results: dict[str, float] = {"symbols": symbols}
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        start = time.perf_counter()
+        builtins = BuiltinCompletions.load(cache_dir=Path(cache_dir))
+        results["builtins_build_ms"] = _ms_since(start)
+        start = time.perf_counter()
+        builtins = BuiltinCompletions.load(cache_dir=Path(cache_dir))
+        results["builtins_cached_ms"] = _ms_since(start)
+
+    project = ProjectSymbols()
+    identifiers = project.indexes["identifier"]
+    names = [_identifier(rng) for _ in range(symbols)]
+    start = time.perf_counter()
+    identifiers.update(dict.fromkeys(names, 1))
+    results["project_insert_ms"] = _ms_since(start)
+
+    engine = AutocompleteEngine(builtins, project)
+    for length in (1, 2, 3, 4):
+        samples = []
+        for _ in range(queries):
+            prefix = rng.choice(names)[:length]
+            began = time.perf_counter()
+            engine.complete("javascript", f"  const value = {prefix}", 16 + length)
+            samples.append(_ms_since(began))
+        stats = TimingStats.from_samples(samples)
+        results[f"prefix{length}_mean_ms"] = stats.mean_ms
+        results[f"prefix{length}_p95_ms"] = stats.p95_ms
+
+    # Typing churn: every keystroke swaps a partial identifier for a longer one.
+    samples = []
+    for _ in range(queries):
+        name = rng.choice(names)
+        began = time.perf_counter()
+        identifiers.discard(name)
+        identifiers.add(name + "x")
+        engine.complete("javascript", name[:2], 2)
+        samples.append(_ms_since(began))
+    stats = TimingStats.from_samples(samples)
+    results["edit_and_query_mean_ms"] = stats.mean_ms
+    results["edit_and_query_p95_ms"] = stats.p95_ms
+    return results
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Measure completion lookup latency on a large project.")
+    parser.add_argument("--symbols", type=int, default=200_000)
+    parser.add_argument("--queries", type=int, default=2_000)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", type=Path)
+    args = parser.parse_args()
+
+    results = run_benchmark(args.symbols, args.queries, args.seed)
+    for metric, value in results.items():
+        print(f"{metric:>24}: {value:10.3f}")
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2), encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
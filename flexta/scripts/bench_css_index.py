@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+import argparse
+import json
+from pathlib import Path
+import random
+import sys
+import tempfile
+import time
+
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from flexta.core.css_editor import SelectorIndex  # noqa: E402
+from flexta.utils.metrics import TimingStats  # noqa: E402
+
+
+_TAGS = ("div", "section", "a", "ul", "li", "p", "span", "button", "nav", "header")
+
+
+def _stylesheet(rng: random.Random, classes: list[str], rules: int) -> str:
+    lines = []
+    for _ in range(rules):
+        selector = f".{rng.choice(classes)}"
+        if rng.random() < 0.5:
+            selector += f" > {rng.choice(_TAGS)}.{rng.choice(classes)}:hover"
+        lines.append(f"{selector}, #{rng.choice(classes)} {{ color: #{rng.randrange(0xffffff):06x}; }}")
+    return "\n".join(lines)
+
+
+def _page(rng: random.Random, classes: list[str], elements: int) -> str:
+    return "\n".join(
+        f'<{tag} class="{rng.choice(classes)} {rng.choice(classes)}" id="{rng.choice(classes)}"></{tag}>'
+        for tag in rng.choices(_TAGS, k=elements)
+    )
+
+
+def _time_ms(function, *args) -> float:
+    started = time.perf_counter()
+    function(*args)
+    return (time.perf_counter() - started) * 1000
+
+
+def run_benchmark(stylesheets: int, pages: int, rules: int, queries: int, seed: int) -> dict[str, float]:
+    rng = random.Random(seed)
+    classes = [f"c{number}" for number in range(20_000)]
+    with tempfile.TemporaryDirectory() as temporary:
+        root = Path(temporary)
+        for number in range(stylesheets):
+            path = root / "css" / f"sheet{number}.css"
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(_stylesheet(rng, classes, rules))
+        for number in range(pages):
+            (root / f"page{number}.html").write_text(_page(rng, classes, 300))
+
+        index = SelectorIndex(root)
+        build_ms = _time_ms(index.build)
+        results: dict[str, float] = {
+            "stylesheets": stylesheets,
+            "pages": pages,
+            "build_ms": build_ms,
+            "unused_rules": len(index.unused_selectors()),
+        }
+
+        stylesheet_updates = [
+            _time_ms(index.update_file, f"css/sheet{rng.randrange(stylesheets)}.css", _stylesheet(rng, classes, rules))
+            for _ in range(50)
+        ]
+        page_updates = [
+            _time_ms(index.update_file, f"page{rng.randrange(pages)}.html", _page(rng, classes, 300))
+            for _ in range(50)
+        ]
+        names = rng.choices(classes, k=queries)
+        sheets = [f"css/sheet{rng.randrange(stylesheets)}.css" for _ in range(queries)]
+        for metric, samples in (
+            ("stylesheet_update", stylesheet_updates),
+            ("page_update", page_updates),
+            ("usages_query", [_time_ms(index.usages, name) for name in names]),
+            ("rules_query", [_time_ms(index.rules, name) for name in names]),
+            ("unused_in_file_query", [_time_ms(index.unused_selectors, sheet) for sheet in sheets]),
+            ("class_completion", [_time_ms(index.complete_class, name[:2]) for name in names]),
+        ):
+            stats = TimingStats.from_samples(samples)
+            results[f"{metric}_mean_ms"] = stats.mean_ms
+            results[f"{metric}_p95_ms"] = stats.p95_ms
+    return results
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Measure the project-wide CSS selector index.")
+    parser.add_argument("--stylesheets", type=int, default=500)
+    parser.add_argument("--pages", type=int, default=200)
+    parser.add_argument("--rules", type=int, default=100)
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", type=Path)
+    args = parser.parse_args()
+
+    results = run_benchmark(args.stylesheets, args.pages, args.rules, args.queries, args.seed)
+    for metric, value in results.items():
+        print(f"{metric:>30}: {value:10.3f}")
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2), encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,189 @@
+from __future__ import annotations
+
+import argparse
+import json
+import os
+from pathlib import Path
+import random
+import sys
+import time
+
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PROJECT_ROOT))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PySide6.QtGui import QTextCursor, QTextDocument  # noqa: E402
+from PySide6.QtWidgets import QApplication, QPlainTextDocumentLayout  # noqa: E402
+
+from flexta.highlighters.engine import Highlighter, UNLEXED  # noqa: E402
+from flexta.highlighters.html_highlighter import HtmlLexer  # noqa: E402
+from flexta.highlighters.js_highlighter import JsLexer  # noqa: E402
+from flexta.utils.metrics import TimingStats  # noqa: E402
+
+
+_SNIPPETS = (
+    "function handle{n}(event, options = {{}}) {{",
+    "  const value{n} = options.items.map((item) => item * {n}.5);",
+    "  // keep the previous selection around for undo",
+    "  if (value{n}.length > 0x{n:x} && !event.defaultPrevented) {{",
+    "    return `row-${{value{n}[0]}}` + 'suffix';",
+    "  }}",
+    "  /* legacy path */ await render(value{n}, null);",
+    "}}",
+)
+
+
+def _make_source(lines: int) -> str:
+    return "\n".join(_SNIPPETS[index % len(_SNIPPETS)].format(n=index) for index in range(lines))
+
+
+def _make_page(script_lines: int) -> tuple[str, int, int]:
+    # A single-file app: markup with inline styles and handlers around one
+    # large inline script. Returns the text and the script's first/last line.
+    head = [
+        "<!DOCTYPE html>",
+        "<html>",
+        "<head>",
+        "<style>",
+        "  body { margin: 0; font: 14px/1.4 sans-serif; }",
+        "  .card:hover { box-shadow: 0 2px 8px rgba(0, 0, 0, 0.2); }",
+        "</style>",
+        "</head>",
+        "<body>",
+    ]
+    markup = [
+        f'<div class="card" style="padding: {index}px" onclick="handle{index}(event)">Item {index}</div>'
+        for index in range(200)
+    ]
+    script = ["<script>"] + [_SNIPPETS[index % len(_SNIPPETS)].format(n=index) for index in range(script_lines)]
+    lines = head + markup + script + ["</script>", "</body>", "</html>"]
+    first = len(head) + len(markup) + 1
+    return "\n".join(lines), first, first + script_lines - 1
+
+
+def _ms_since(start: float) -> float:
+    return (time.perf_counter() - start) * 1000
+
+
+def run_benchmark(lines: int, keystrokes: int, seed: int) -> dict[str, float]:
+    app = QApplication.instance() or QApplication([])
+    rng = random.Random(seed)
+    document = QTextDocument()
+    document.setDocumentLayout(QPlainTextDocumentLayout(document))
+    document.setPlainText(_make_source(lines))
+    lexer = JsLexer()
+
+    # What every keystroke used to cost: re-tokenizing the whole document.
+    start = time.perf_counter()
+    state = lexer.initial_state
+    for line in document.toPlainText().split("\n"):
+        _, state = lexer.tokenize(line, state)
+    full_relex_ms = _ms_since(start)
+
+    highlighter = Highlighter(document, lexer)
+    middle = lines // 2
+    start = time.perf_counter()
+    highlighter.set_visible_range(middle, middle + 60)
+    while highlighter.block_state(middle + 60) == UNLEXED:
+        app.processEvents()
+    first_paint_ms = _ms_since(start)
+    start = time.perf_counter()
+    highlighter.flush()
+    background_ms = _ms_since(start)
+
+    samples = []
+    for _ in range(keystrokes):
+        block = document.findBlockByNumber(rng.randrange(lines))
+        cursor = QTextCursor(block)
+        cursor.setPosition(block.position() + rng.randint(0, block.length() - 1))
+        began = time.perf_counter()
+        cursor.insertText(rng.choice("abcxyz0 (;"))
+        samples.append(_ms_since(began))
+    stats = TimingStats.from_samples(samples)
+
+    return {
+        "lines": lines,
+        "full_relex_ms": full_relex_ms,
+        "visible_first_ms": first_paint_ms,
+        "background_rest_ms": background_ms,
+        "keystroke_mean_ms": stats.mean_ms,
+        "keystroke_p95_ms": stats.p95_ms,
+        "keystroke_max_ms": stats.max_ms,
+    }
+
+
+def _type_at(document: QTextDocument, rng: random.Random, first: int, last: int, keystrokes: int) -> TimingStats:
+    samples = []
+    for _ in range(keystrokes):
+        block = document.findBlockByNumber(rng.randint(first, last))
+        cursor = QTextCursor(block)
+        cursor.setPosition(block.position() + rng.randint(0, block.length() - 1))
+        began = time.perf_counter()
+        cursor.insertText(rng.choice("abcxyz0 "))
+        samples.append(_ms_since(began))
+    return TimingStats.from_samples(samples)
+
+
+def run_embedded_benchmark(script_lines: int, keystrokes: int, seed: int) -> dict[str, float]:
+    QApplication.instance() or QApplication([])
+    rng = random.Random(seed)
+    text, script_first, script_last = _make_page(script_lines)
+    document = QTextDocument()
+    document.setDocumentLayout(QPlainTextDocumentLayout(document))
+    document.setPlainText(text)
+    lexer = HtmlLexer()
+    highlighter = Highlighter(document, lexer)
+    start = time.perf_counter()
+    highlighter.flush()
+    initial_ms = _ms_since(start)
+
+    script_stats = _type_at(document, rng, script_first, script_last, keystrokes)
+    markup_stats = _type_at(document, rng, 10, script_first - 2, keystrokes)
+
+    # Comment out the markup above the script and back: every later line
+    # changes state twice, and on the way back the script comes from cache.
+    misses = lexer.script_lexer.misses
+    cursor = QTextCursor(document.findBlockByNumber(9))
+    start = time.perf_counter()
+    cursor.insertText("<!--")
+    highlighter.flush()
+    cursor.setPosition(cursor.position() - 4, QTextCursor.MoveMode.KeepAnchor)
+    cursor.removeSelectedText()
+    highlighter.flush()
+    toggle_ms = _ms_since(start)
+
+    return {
+        "script_lines": script_lines,
+        "initial_highlight_ms": initial_ms,
+        "script_keystroke_mean_ms": script_stats.mean_ms,
+        "script_keystroke_p95_ms": script_stats.p95_ms,
+        "markup_keystroke_mean_ms": markup_stats.mean_ms,
+        "markup_keystroke_p95_ms": markup_stats.p95_ms,
+        "comment_toggle_ms": toggle_ms,
+        "script_relexed_on_toggle": lexer.script_lexer.misses - misses,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Measure incremental highlighting latency on a large file.")
+    parser.add_argument("--scenario", choices=("js", "html"), default="js")
+    parser.add_argument("--lines", type=int, default=50_000, help="File length (js) or inline script length (html).")
+    parser.add_argument("--keystrokes", type=int, default=2_000)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", type=Path)
+    args = parser.parse_args()
+
+    if args.scenario == "html":
+        results = run_embedded_benchmark(args.lines, args.keystrokes, args.seed)
+    else:
+        results = run_benchmark(args.lines, args.keystrokes, args.seed)
+    for metric, value in results.items():
+        print(f"{metric:>26}: {value:10.2f}")
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2), encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
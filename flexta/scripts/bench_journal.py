@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+import argparse
+import json
+import os
+from pathlib import Path
+import random
+import sys
+import tempfile
+import time
+
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PROJECT_ROOT))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PySide6.QtWidgets import QApplication  # noqa: E402
+
+from flexta.core.editor import EditorDocument  # noqa: E402
+from flexta.core.journal import JournalManager  # noqa: E402
+
+
+def _make_source(size_mb: int, seed: int) -> str:
+    rng = random.Random(seed)
+    words = "const let function return value element style color margin render".split()
+    lines = [" ".join(rng.choice(words) for _ in range(8)) + ";" for _ in range(2048)]
+    block = "\n".join(lines) + "\n"
+    return (block * (size_mb * 1024 * 1024 // len(block) + 1))[: size_mb * 1024 * 1024]
+
+
+def _edits(length: int, count: int, seed: int):
+    # Typing at a cursor that occasionally jumps: mostly single characters,
+    # some backspaces, the odd paste.
+    rng = random.Random(seed)
+    cursor = rng.randrange(length)
+    for _ in range(count):
+        roll = rng.random()
+        if roll < 0.02:
+            cursor = rng.randrange(length)
+        if roll < 0.15 and cursor > 0:
+            cursor -= 1
+            length -= 1
+            yield cursor, 1, ""
+        elif roll < 0.2:
+            text = "value = render(element, style);"
+            yield cursor, 0, text
+            cursor += len(text)
+            length += len(text)
+        else:
+            yield cursor, 0, rng.choice("abcdefghij ;\n")
+            cursor += 1
+            length += 1
+
+
+def run_benchmark(size_mb: int, edits: int, edits_per_flush: int, seed: int) -> dict[str, float]:
+    QApplication.instance() or QApplication([])
+    text = _make_source(size_mb, seed)
+    results: dict[str, float] = {"document_mb": size_mb, "edits": edits, "edits_per_flush": edits_per_flush}
+    with tempfile.TemporaryDirectory() as temporary:
+        source = Path(temporary) / "app.js"
+        source.write_text(text, encoding="utf-8")
+
+        plain = EditorDocument.from_file(source)
+        started = time.perf_counter()
+        for offset, length, inserted in _edits(len(text), edits, seed):
+            plain.apply_edit(offset, length, inserted)
+        plain_seconds = time.perf_counter() - started
+        del plain
+
+        # Flushing by hand every edits_per_flush edits stands in for the
+        # writer's one-second batches at typing speed.
+        manager = JournalManager(Path(temporary) / "journal", flush_delay=3600)
+        document = EditorDocument.from_file(source)
+        journal = manager.attach(document)
+        manager.flush()
+        payload = 0
+        flush_seconds = 0.0
+        started = time.perf_counter()
+        for number, (offset, length, inserted) in enumerate(_edits(len(text), edits, seed), 1):
+            document.apply_edit(offset, length, inserted)
+            payload += len(inserted.encode("utf-8")) + (1 if length else 0)
+            if number % edits_per_flush == 0:
+                flushed = time.perf_counter()
+                manager.flush()
+                flush_seconds += time.perf_counter() - flushed
+        manager.flush()
+        journal_seconds = time.perf_counter() - started - flush_seconds
+        batches = -(-edits // edits_per_flush)
+
+        results["edit_payload_kb"] = payload / 1024
+        results["journal_written_kb"] = manager.bytes_written / 1024
+        results["journal_file_kb"] = journal.file.stat().st_size / 1024
+        results["fsyncs"] = manager.fsyncs
+        results["write_amplification"] = manager.bytes_written / payload
+        # Auto-save by rewriting the file at every batch instead.
+        results["rewrite_written_mb"] = batches * len(text.encode("utf-8")) / (1024 * 1024)
+        results["rewrite_amplification"] = batches * len(text.encode("utf-8")) / payload
+        results["journal_overhead_us_per_edit"] = (journal_seconds - plain_seconds) * 1e6 / edits
+        results["flush_ms_per_batch"] = flush_seconds * 1000 / batches
+
+        # The crash: the manager is abandoned without closing.
+        expected = document.text()
+        started = time.perf_counter()
+        restarted = JournalManager(Path(temporary) / "journal")
+        recovered = restarted.recover()
+        results["recovery_ms"] = (time.perf_counter() - started) * 1000
+        results["recovered_ok"] = float(len(recovered) == 1 and recovered[0].text == expected)
+        restarted.close()
+        manager.close()
+    return results
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Measure the edit journal's write amplification and recovery.")
+    parser.add_argument("--size-mb", type=int, default=10)
+    parser.add_argument("--edits", type=int, default=50_000)
+    parser.add_argument("--edits-per-flush", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", type=Path)
+    args = parser.parse_args()
+
+    results = run_benchmark(args.size_mb, args.edits, args.edits_per_flush, args.seed)
+    for metric, value in results.items():
+        print(f"{metric:>30}: {value:12.2f}")
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2), encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
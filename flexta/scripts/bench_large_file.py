@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import argparse
+import json
+import os
+from pathlib import Path
+import sys
+import tempfile
+import time
+
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PROJECT_ROOT))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PySide6.QtWidgets import QApplication  # noqa: E402
+
+from flexta.core.search import SearchQuery  # noqa: E402
+from flexta.ui.widgets.code_widget import CodeWidget  # noqa: E402
+
+
+def _anonymous_mb() -> float:
+    # Heap and other private memory; the mapped file's pages are file-backed
+    # and show up elsewhere in RSS.
+    with open("/proc/self/status", encoding="ascii") as handle:
+        for line in handle:
+            if line.startswith("RssAnon:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def _make_log(path: Path, size_mb: int) -> int:
+    line = b'2024-05-01T12:00:00Z INFO request handled {"path": "/api/items", "status": 200, "ms": 12}\n'
+    count = size_mb * 1024 * 1024 // len(line)
+    with path.open("wb") as handle:
+        block = line * 10_000
+        for _ in range(count // 10_000):
+            handle.write(block)
+        handle.write(line * (count % 10_000))
+        handle.write(b"2024-05-01T12:00:01Z ERROR upstream timeout\n")
+    return count + 1
+
+
+def run_benchmark(size_mb: int) -> dict[str, float]:
+    app = QApplication.instance() or QApplication([])
+    results: dict[str, float] = {"file_mb": size_mb}
+    with tempfile.TemporaryDirectory() as temporary:
+        path = Path(temporary) / "server.log"
+        results["lines"] = _make_log(path, size_mb)
+        baseline = _anonymous_mb()
+
+        widget = CodeWidget()
+        widget.resize(1000, 700)
+        widget.show()
+        started = time.perf_counter()
+        widget.open_file(path)
+        view = widget.large_view
+        view.viewport().repaint()
+        app.processEvents()
+        results["first_paint_ms"] = (time.perf_counter() - started) * 1000
+
+        finished = []
+        view.indexing_finished.connect(lambda: finished.append(True))
+        while not finished:
+            app.processEvents()
+            time.sleep(0.001)
+        results["index_ms"] = (time.perf_counter() - started) * 1000
+
+        started = time.perf_counter()
+        for fraction in (0.25, 0.5, 0.75, 0.99):
+            widget.go_to_line(int(view.line_count * fraction))
+            view.viewport().repaint()
+        results["go_to_line_ms"] = (time.perf_counter() - started) * 1000 / 4
+
+        widget.go_to_line(0)
+        found = []
+        widget.find_finished.connect(found.append)
+        started = time.perf_counter()
+        widget.find(SearchQuery("ERROR", case_sensitive=True))
+        # The search runs on a worker; the GUI thread keeps handling events.
+        stall = 0.0
+        while not found:
+            tick = time.perf_counter()
+            app.processEvents()
+            time.sleep(0.001)
+            stall = max(stall, time.perf_counter() - tick)
+        assert found == [True]
+        results["find_ms"] = (time.perf_counter() - started) * 1000
+        results["find_event_stall_ms"] = stall * 1000
+        results["private_memory_mb"] = _anonymous_mb() - baseline
+        widget.close_file()
+
+        # What opening it as an ordinary document would cost at the least:
+        # the decoded string, before any QTextDocument is built.
+        started = time.perf_counter()
+        text = path.read_text(encoding="utf-8")
+        results["read_text_ms"] = (time.perf_counter() - started) * 1000
+        results["read_text_memory_mb"] = _anonymous_mb() - baseline
+        del text
+    return results
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Measure opening a large file in the code widget.")
+    parser.add_argument("--size-mb", type=int, default=200)
+    parser.add_argument("--output", type=Path)
+    args = parser.parse_args()
+
+    results = run_benchmark(args.size_mb)
+    for metric, value in results.items():
+        print(f"{metric:>22}: {value:12.2f}")
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2), encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import argparse
+import json
+import os
+from pathlib import Path
+import random
+import sys
+import time
+
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PROJECT_ROOT))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PySide6.QtWidgets import QApplication  # noqa: E402
+
+from flexta.core.editor import EditorDocument  # noqa: E402
+from flexta.extensions.markdown_support import MarkdownRenderer, render_lines  # noqa: E402
+from flexta.utils.metrics import TimingStats  # noqa: E402
+
+
+def _make_document(lines: int, seed: int) -> str:
+    rng = random.Random(seed)
+    parts: list[str] = []
+    count = 0
+    while count < lines:
+        kind = rng.choice(("heading", "paragraph", "paragraph", "list", "code", "quote", "table"))
+        if kind == "heading":
+            block = [f"## Section {count}"]
+        elif kind == "paragraph":
+            block = [f"Some *text* with `code` and a [link](https://example.com/{count}) line {n}." for n in range(4)]
+        elif kind == "list":
+            block = [f"- item **{n}**" for n in range(5)]
+        elif kind == "code":
+            block = ["```python", *(f"value_{n} = {n} * 2" for n in range(6)), "```"]
+        elif kind == "quote":
+            block = [f"> quoted line {n}" for n in range(3)]
+        else:
+            block = ["| a | b |", "|---|--:|", *(f"| {n} | {n * n} |" for n in range(4))]
+        parts.extend(block)
+        parts.append("")
+        count += len(block) + 1
+    return "\n".join(parts)
+
+
+def run_benchmark(lines: int, keystrokes: int, seed: int) -> dict[str, float]:
+    app = QApplication.instance() or QApplication([])
+    text = _make_document(lines, seed)
+    document = EditorDocument(text)
+
+    started = time.perf_counter()
+    render_lines(text.split("\n"))
+    full_ms = (time.perf_counter() - started) * 1000
+
+    renderer = MarkdownRenderer(text)
+    initial = renderer.rendered
+    samples: list[float] = []
+
+    def handle_text_changed(position: int, removed: int, added: int) -> None:
+        started = time.perf_counter()
+        renderer.update(document.buffer, position, removed, added)
+        samples.append((time.perf_counter() - started) * 1000)
+
+    document.text_changed.connect(handle_text_changed)
+    rng = random.Random(seed)
+    # Type at a few places in the file, one character at a time.
+    position = 0
+    for keystroke in range(keystrokes):
+        if keystroke % 50 == 0:
+            position = document.text().find(" line", rng.randrange(len(document.text()) - 100))
+        document.apply_edit(position, 0, "x")
+        position += 1
+    app.processEvents()
+
+    stats = TimingStats.from_samples(samples)
+    return {
+        "lines": document.buffer.line_count,
+        "blocks": renderer.block_count,
+        "full_render_ms": full_ms,
+        "keystroke_mean_ms": stats.mean_ms,
+        "keystroke_p95_ms": stats.p95_ms,
+        "keystroke_max_ms": stats.max_ms,
+        "blocks_rendered_per_keystroke": (renderer.rendered - initial) / keystrokes,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Measure incremental Markdown preview rendering while typing.")
+    parser.add_argument("--lines", type=int, default=10_000)
+    parser.add_argument("--keystrokes", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", type=Path)
+    args = parser.parse_args()
+
+    results = run_benchmark(args.lines, args.keystrokes, args.seed)
+    for metric, value in results.items():
+        print(f"{metric:>30}: {value:10.3f}")
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2), encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
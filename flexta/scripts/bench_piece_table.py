@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+import argparse
+import json
+from pathlib import Path
+import random
+import sys
+import time
+import tracemalloc
+
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from flexta.core.editor import PieceTable  # noqa: E402
+from flexta.utils.metrics import TimingStats  # noqa: E402
+
+
+_ALPHABET = "abcdefghijklmnopqrstuvwxyz <>/=\"{};"
+
+
+def _make_text(size: int, rng: random.Random) -> str:
+    # HTML/JS-like lines of 20-100 characters.
+    line_pool = ["".join(rng.choice(_ALPHABET) for _ in range(rng.randint(20, 100))) for _ in range(2000)]
+    lines = []
+    total = 0
+    while total < size:
+        line = rng.choice(line_pool)
+        lines.append(line)
+        total += len(line) + 1
+    return "\n".join(lines)[:size]
+
+
+def run_benchmark(
+    size: int, edits: int, lookups: int, seed: int, verify: bool, trace_memory: bool
+) -> dict[str, float]:
+    rng = random.Random(seed)
+    text = _make_text(size, rng)
+    if trace_memory:
+        # tracemalloc roughly doubles allocation cost; keep it off for timings.
+        tracemalloc.start()
+
+    start = time.perf_counter()
+    table = PieceTable(text, seed=seed)
+    load_ms = (time.perf_counter() - start) * 1000
+    model = text if verify else None
+
+    samples = []
+    start = time.perf_counter()
+    for _ in range(edits):
+        offset = rng.randint(0, len(table))
+        began = time.perf_counter()
+        if rng.random() < 0.4:
+            length = rng.randint(1, 40)
+            table.delete(offset, length)
+            if model is not None:
+                model = model[:offset] + model[offset + length:]
+        else:
+            inserted = "".join(rng.choice(_ALPHABET + "\n") for _ in range(rng.randint(1, 40)))
+            table.insert(offset, inserted)
+            if model is not None:
+                model = model[:offset] + inserted + model[offset:]
+        samples.append((time.perf_counter() - began) * 1000)
+    edit_total_ms = (time.perf_counter() - start) * 1000
+
+    snapshot = table.snapshot()
+    start = time.perf_counter()
+    for _ in range(lookups):
+        line = rng.randrange(snapshot.line_count)
+        snapshot.line_text(line)
+        snapshot.line_at(rng.randint(0, len(snapshot)))
+    lookup_ms = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    final = snapshot.text()
+    materialize_ms = (time.perf_counter() - start) * 1000
+    peak = 0
+    if trace_memory:
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    if model is not None and final != model:
+        raise SystemExit("piece table diverged from the string model")
+
+    stats = TimingStats.from_samples(samples)
+    return {
+        "size_mb": size / (1 << 20),
+        "edits": edits,
+        "load_ms": load_ms,
+        "edit_total_ms": edit_total_ms,
+        "edit_mean_us": stats.mean_ms * 1000,
+        "edit_p95_us": stats.p95_ms * 1000,
+        "edit_max_us": stats.max_ms * 1000,
+        "lookup_mean_us": lookup_ms * 1000 / max(1, lookups),
+        "materialize_ms": materialize_ms,
+        "peak_traced_mb": peak / (1 << 20),
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Apply random edits to a large document buffer.")
+    parser.add_argument("--size-mb", type=float, default=20.0)
+    parser.add_argument("--edits", type=int, default=100_000)
+    parser.add_argument("--lookups", type=int, default=10_000)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--verify", action="store_true", help="Check the result against a plain string (slow).")
+    parser.add_argument("--trace-memory", action="store_true", help="Report peak traced memory (slows edits).")
+    parser.add_argument("--output", type=Path)
+    args = parser.parse_args()
+
+    results = run_benchmark(
+        int(args.size_mb * (1 << 20)), args.edits, args.lookups, args.seed, args.verify, args.trace_memory
+    )
+    for metric, value in results.items():
+        print(f"{metric:>16}: {value:10.2f}")
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2), encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
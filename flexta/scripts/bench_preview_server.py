@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+import http.client
+import json
+import os
+from pathlib import Path
+import random
+import sys
+import tempfile
+import time
+
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PROJECT_ROOT))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from flexta.core.preview import PreviewServer  # noqa: E402
+from flexta.utils.metrics import TimingStats  # noqa: E402
+
+
+# Browsers open about six connections per origin.
+_CONNECTIONS = 6
+
+
+def _make_project(root: Path, assets: int, seed: int) -> list[str]:
+    rng = random.Random(seed)
+    paths = []
+    for number in range(assets):
+        kind = ("css", "js", "png")[number % 3]
+        size = 30_000 if kind == "png" else 8_000
+        relative = f"assets/{kind}/asset{number}.{kind}"
+        path = root / relative
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(rng.randbytes(size))
+        paths.append("/" + relative)
+    links = "\n".join(f'<link rel="preload" href="{path}">' for path in paths)
+    (root / "index.html").write_text(f"<!DOCTYPE html>\n<html><head>{links}</head><body></body></html>")
+    return paths
+
+
+def _fetch_all(port: int, paths: list[str], etags: dict[str, str]) -> None:
+    # One page load: the document, then every asset over a few keep-alive
+    # connections, revalidating with If-None-Match when an ETag is known.
+    def worker(share: list[str]) -> None:
+        connection = http.client.HTTPConnection("127.0.0.1", port)
+        for path in share:
+            headers = {"If-None-Match": etags[path]} if path in etags else {}
+            connection.request("GET", path, headers=headers)
+            response = connection.getresponse()
+            response.read()
+            etags[path] = response.getheader("ETag")
+        connection.close()
+
+    worker(["/index.html"])
+    with ThreadPoolExecutor(_CONNECTIONS) as pool:
+        list(pool.map(worker, [paths[index::_CONNECTIONS] for index in range(_CONNECTIONS)]))
+
+
+def _measure(root: Path, paths: list[str], reloads: int, cache_bytes: int, revalidate: bool) -> TimingStats:
+    server = PreviewServer(root, cache_bytes=cache_bytes)
+    server.start()
+    port = int(server.url.rsplit(":", 1)[1])
+    etags: dict[str, str] = {}
+    try:
+        _fetch_all(port, paths, etags)
+        samples = []
+        for _ in range(reloads):
+            if not revalidate:
+                etags.clear()
+            started = time.perf_counter()
+            _fetch_all(port, paths, etags)
+            samples.append((time.perf_counter() - started) * 1000)
+    finally:
+        server.stop()
+    return TimingStats.from_samples(samples)
+
+
+def run_benchmark(assets: int, reloads: int, seed: int) -> dict[str, float]:
+    results: dict[str, float] = {"assets": assets}
+    with tempfile.TemporaryDirectory() as temporary:
+        root = Path(temporary)
+        paths = _make_project(root, assets, seed)
+        for name, cache_bytes, revalidate in (
+            ("disk_every_request", 0, False),
+            ("memory_cache", 64 * 1024 * 1024, False),
+            ("memory_cache_304", 64 * 1024 * 1024, True),
+        ):
+            stats = _measure(root, paths, reloads, cache_bytes, revalidate)
+            results[f"{name}_mean_ms"] = stats.mean_ms
+            results[f"{name}_p95_ms"] = stats.p95_ms
+    return results
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Measure preview page reloads through the asset server.")
+    parser.add_argument("--assets", type=int, default=200)
+    parser.add_argument("--reloads", type=int, default=30)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", type=Path)
+    args = parser.parse_args()
+
+    results = run_benchmark(args.assets, args.reloads, args.seed)
+    for metric, value in results.items():
+        print(f"{metric:>26}: {value:10.2f}")
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2), encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
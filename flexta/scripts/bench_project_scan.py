@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import argparse
+import json
+import os
+from pathlib import Path
+import sys
+import tempfile
+import time
+
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PROJECT_ROOT))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PySide6.QtWidgets import QApplication  # noqa: E402
+
+from flexta.core.project_watcher import ProjectWatcher  # noqa: E402
+
+
+def _make_project(root: Path, files: int, per_directory: int) -> None:
+    # A monorepo shape: packages/<n>/src/<m>/ with source files, and a third
+    # of the files under a git-ignored node_modules.
+    (root / ".gitignore").write_text("node_modules/\n*.log\ndist/\n")
+    directories = max(files // per_directory, 1)
+    for number in range(directories):
+        if number % 3 == 2:
+            directory = root / "node_modules" / f"dep{number}" / "lib"
+        else:
+            directory = root / "packages" / f"pkg{number // 20}" / "src" / f"module{number}"
+        directory.mkdir(parents=True, exist_ok=True)
+        for index in range(per_directory):
+            (directory / f"file{index}.js").touch()
+
+
+def _wait(app: QApplication, condition, timeout: float) -> None:
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        app.processEvents()
+        time.sleep(0.001)
+
+
+def run_benchmark(files: int, per_directory: int) -> dict[str, float]:
+    app = QApplication.instance() or QApplication([])
+    with tempfile.TemporaryDirectory() as temporary:
+        root = Path(temporary)
+        _make_project(root, files, per_directory)
+
+        started = time.perf_counter()
+        walked = sum(1 for _ in root.rglob("*"))
+        rglob_ms = (time.perf_counter() - started) * 1000
+
+        watcher = ProjectWatcher(root, excludes=())
+        finished = []
+        watcher.scan_finished.connect(lambda: finished.append(True))
+        watcher.start()
+        _wait(app, lambda: finished, timeout=600)
+        results = {
+            "files_on_disk": files,
+            "rglob_entries": walked,
+            "rglob_ms": rglob_ms,
+            "first_paint_ms": watcher.first_batch_seconds * 1000,
+            "full_scan_ms": watcher.scan_seconds * 1000,
+            "tree_files": watcher.tree.file_count,
+            "tree_directories": watcher.tree.directory_count,
+            "watches_overflowed": watcher.overflowed,
+        }
+
+        # One new file: relists one directory, no rescan.
+        changed = []
+        watcher.files_changed.connect(changed.extend)
+        target = next((root / "packages").iterdir()) / "src"
+        started = time.perf_counter()
+        (target / "new.js").touch()
+        _wait(app, lambda: changed, timeout=10)
+        results["event_to_change_ms"] = (time.perf_counter() - started) * 1000
+        results["full_rescans"] = watcher.full_scans
+        watcher.stop()
+    return results
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Measure the project tree scan and watcher.")
+    parser.add_argument("--files", type=int, default=200_000)
+    parser.add_argument("--per-directory", type=int, default=50)
+    parser.add_argument("--output", type=Path)
+    args = parser.parse_args()
+
+    results = run_benchmark(args.files, args.per_directory)
+    for metric, value in results.items():
+        print(f"{metric:>22}: {value:10.2f}")
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2), encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+import argparse
+import json
+import os
+from pathlib import Path
+import random
+import re
+import sys
+import tempfile
+import time
+
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PROJECT_ROOT))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PySide6.QtWidgets import QApplication  # noqa: E402
+
+from flexta.core.search import SearchEngine, SearchQuery, search_paths  # noqa: E402
+
+
+_WORDS = "const let function return value element style color margin width height render update".split()
+
+
+def _make_corpus(root: Path, size_mb: int, seed: int) -> list[tuple[str, int]]:
+    # Mostly small source files plus a few bundles over the mmap threshold.
+    # One file in twenty carries the needle, as in a real project search.
+    rng = random.Random(seed)
+    lines = [" ".join(rng.choice(_WORDS) for _ in range(8)) + ";\n" for _ in range(4096)]
+    block = "".join(lines).encode()
+    needle = b"  fetchUserProfile(42);\n"
+    target = size_mb * 1024 * 1024
+    written = 0
+    number = 0
+    while written < target:
+        directory = root / f"module{number // 200}"
+        directory.mkdir(exist_ok=True)
+        repeats = 40 if number % 100 == 0 else 1
+        size = min(len(block) * repeats, target - written)
+        data = (block * repeats)[:size]
+        if number % 20 == 7:
+            offset = data.rfind(b"\n", 0, rng.randrange(1, size)) + 1
+            data = data[:offset] + needle + data[offset:]
+        (directory / f"file{number}.js").write_bytes(data)
+        written += len(data)
+        number += 1
+    return search_paths(sorted(str(path) for path in root.rglob("*.js")))
+
+
+def _naive(files: list[tuple[str, int]], pattern: str) -> int:
+    # What a plain implementation does: decode every file and run the regex
+    # line by line to get line and column numbers.
+    regex = re.compile(pattern)
+    matches = 0
+    for path, _ in files:
+        with open(path, encoding="utf-8", errors="replace") as handle:
+            for line in handle:
+                matches += sum(1 for _ in regex.finditer(line))
+    return matches
+
+
+def _engine(app: QApplication, engine: SearchEngine, query: SearchQuery, files) -> dict[str, float]:
+    finished = []
+    first = []
+    started = time.perf_counter()
+    engine.results_ready.connect(lambda search_id, chunk: first or first.append(time.perf_counter() - started))
+    engine.search_finished.connect(lambda search_id, stats: finished.append(stats))
+    engine.search(query, files)
+    while not finished:
+        app.processEvents()
+        time.sleep(0.001)
+    engine.results_ready.disconnect()
+    engine.search_finished.disconnect()
+    stats = finished[0]
+    return {
+        "seconds": stats.seconds,
+        "first_results_ms": (first[0] if first else stats.seconds) * 1000,
+        "matches": stats.matches,
+        "mb_per_second": stats.bytes / (1024 * 1024) / max(stats.seconds, 1e-9),
+    }
+
+
+def run_benchmark(size_mb: int, workers: int, seed: int) -> dict[str, float]:
+    app = QApplication.instance() or QApplication([])
+    results: dict[str, float] = {"corpus_mb": size_mb, "workers": workers}
+    with tempfile.TemporaryDirectory() as temporary:
+        files = _make_corpus(Path(temporary), size_mb, seed)
+        results["files"] = len(files)
+        pattern = r"fetch\w+\(\d+\)"
+
+        started = time.perf_counter()
+        results["naive_matches"] = _naive(files, pattern)
+        results["naive_seconds"] = time.perf_counter() - started
+
+        engine = SearchEngine(workers=workers)
+        try:
+            for name, query in (
+                ("literal", SearchQuery("fetchUserProfile", case_sensitive=True)),
+                ("regex", SearchQuery(pattern, regex=True, case_sensitive=True)),
+                ("regex_nocase", SearchQuery(pattern, regex=True)),
+            ):
+                for metric, value in _engine(app, engine, query, files).items():
+                    results[f"{name}_{metric}"] = value
+        finally:
+            engine.close()
+    results["regex_speedup"] = results["naive_seconds"] / max(results["regex_seconds"], 1e-9)
+    return results
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Measure project-wide find-in-files throughput.")
+    parser.add_argument("--size-mb", type=int, default=1024)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", type=Path)
+    args = parser.parse_args()
+
+    results = run_benchmark(args.size_mb, args.workers, args.seed)
+    for metric, value in results.items():
+        print(f"{metric:>30}: {value:12.2f}")
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2), encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import argparse
+import json
+import os
+from pathlib import Path
+import statistics
+import subprocess
+import sys
+import tempfile
+
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+
+# Runs in a fresh interpreter per sample so import caches and Qt state do not
+# leak between runs. HOME is redirected so the settings database starts empty.
+_PROBE = r"""
+import json
+import resource
+import sys
+import time
+
+start = time.perf_counter()
+from PySide6.QtCore import QEvent, QObject
+from PySide6.QtWidgets import QApplication
+from flexta.main import create_application
+from flexta.ui.main_window import MainWindow
+imported = time.perf_counter()
+
+
+class FirstPaint(QObject):
+    painted_at = None
+
+    def eventFilter(self, watched, event):
+        if event.type() == QEvent.Type.Paint and self.painted_at is None:
+            self.painted_at = time.perf_counter()
+        return False
+
+
+app = create_application([sys.argv[0]])
+window = MainWindow()
+probe = FirstPaint()
+window.installEventFilter(probe)
+window.show()
+shown = time.perf_counter()
+deadline = shown + 5
+while probe.painted_at is None and time.perf_counter() < deadline:
+    app.processEvents()
+
+rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+if sys.platform == "darwin":
+    rss_kb //= 1024
+print(json.dumps({
+    "import_ms": (imported - start) * 1000,
+    "show_ms": (shown - start) * 1000,
+    "first_paint_ms": ((probe.painted_at or shown) - start) * 1000,
+    "peak_rss_mb": rss_kb / 1024,
+}))
+"""
+
+_METRICS = ("import_ms", "show_ms", "first_paint_ms", "peak_rss_mb")
+
+
+def _run_sample(python: str) -> dict[str, float]:
+    with tempfile.TemporaryDirectory() as home:
+        env = dict(os.environ)
+        env["QT_QPA_PLATFORM"] = "offscreen"
+        env["HOME"] = home
+        env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(PROJECT_ROOT), env.get("PYTHONPATH")]))
+        completed = subprocess.run(
+            [python, "-c", _PROBE],
+            capture_output=True,
+            text=True,
+            env=env,
+            check=True,
+        )
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def run_benchmark(runs: int, python: str = sys.executable) -> dict[str, float]:
+    samples = [_run_sample(python) for _ in range(runs)]
+    return {metric: statistics.median(sample[metric] for sample in samples) for metric in _METRICS}
+
+
+def compare(results: dict[str, float], baseline: dict[str, float], tolerance: float) -> list[str]:
+    regressions = []
+    for metric in _METRICS:
+        if metric not in baseline:
+            continue
+        limit = baseline[metric] * (1 + tolerance)
+        if results[metric] > limit:
+            regressions.append(f"{metric}: {results[metric]:.1f} > {limit:.1f} (baseline {baseline[metric]:.1f})")
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Measure Flexta cold-start time and memory.")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--python", default=sys.executable, help="Interpreter or packaged build to measure.")
+    parser.add_argument("--baseline", type=Path, help="JSON file from a previous --output run.")
+    parser.add_argument("--tolerance", type=float, default=0.15)
+    parser.add_argument("--output", type=Path)
+    args = parser.parse_args()
+
+    results = run_benchmark(args.runs, args.python)
+    for metric in _METRICS:
+        print(f"{metric:>16}: {results[metric]:8.1f}")
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2), encoding="utf-8")
+
+    if args.baseline:
+        regressions = compare(results, json.loads(args.baseline.read_text(encoding="utf-8")), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import argparse
+import json
+from pathlib import Path
+import sys
+import tempfile
+import time
+from typing import Optional
+
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from flexta.core.symbol_index import SymbolIndex  # noqa: E402
+
+
+_MODULE = """import {{ helper{previous} }} from './module{previous}.js';
+const cache{n} = new Map();
+
+export function handler{n}(event) {{
+  return helper{previous}(event) + cache{n}.size;
+}}
+
+export class Widget{n} {{
+  render() {{ return `<div>${{handler{n}(null)}}</div>`; }}
+}}
+
+const helper{n} = (value) => value * {n};
+export {{ helper{n} }};
+"""
+
+
+def _make_project(root: Path, files: int) -> None:
+    for number in range(files):
+        folder = root / f"pkg{number // 100}"
+        folder.mkdir(parents=True, exist_ok=True)
+        (folder / f"module{number}.js").write_text(_MODULE.format(n=number, previous=max(number - 1, 0)))
+
+
+def _open(root: Path, db_path: Path, workers: Optional[int]) -> tuple[float, SymbolIndex]:
+    start = time.perf_counter()
+    index = SymbolIndex(root, db_path, workers)
+    index.build()
+    index.wait()
+    return time.perf_counter() - start, index
+
+
+def run_benchmark(files: int, workers: Optional[int]) -> dict[str, float]:
+    with tempfile.TemporaryDirectory() as temporary:
+        root = Path(temporary) / "project"
+        _make_project(root, files)
+        db_path = Path(temporary) / "index.db"
+
+        cold, index = _open(root, db_path, workers)
+        start = time.perf_counter()
+        # The query behind go-to-definition.
+        index.definitions(f"handler{files // 2}")
+        lookup_ms = (time.perf_counter() - start) * 1000
+        index.close()
+
+        warm, index = _open(root, db_path, workers)
+        index.close()
+
+        (root / "pkg0" / "module1.js").write_text("export function edited() {}\n")
+        one_changed, index = _open(root, db_path, workers)
+        index.close()
+
+    return {
+        "files": files,
+        "cold_build_s": cold,
+        "warm_reopen_s": warm,
+        "reopen_one_changed_s": one_changed,
+        "definition_lookup_ms": lookup_ms,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Measure project symbol indexing, cold and warm.")
+    parser.add_argument("--files", type=int, default=5_000)
+    parser.add_argument("--workers", type=int)
+    parser.add_argument("--output", type=Path)
+    args = parser.parse_args()
+
+    results = run_benchmark(args.files, args.workers)
+    for metric, value in results.items():
+        print(f"{metric:>22}: {value:10.3f}")
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2), encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
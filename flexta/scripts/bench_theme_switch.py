@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import argparse
+import json
+import os
+from pathlib import Path
+import statistics
+import sys
+import tempfile
+import time
+
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PROJECT_ROOT))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PySide6.QtWidgets import (  # noqa: E402
+    QApplication,
+    QCheckBox,
+    QFrame,
+    QGridLayout,
+    QLabel,
+    QLineEdit,
+    QPushButton,
+    QScrollArea,
+    QVBoxLayout,
+    QWidget,
+)
+
+from flexta.ui.theme_engine import ThemeEngine  # noqa: E402
+
+
+_THEMES = ("dark", "light", "custom")
+# Text/background pairs standing in for the inline style strings widgets used
+# to carry before the theme engine existed.
+_INLINE_COLORS = {
+    "dark": ("#FFFFFF", "#222222"),
+    "light": ("#111418", "#F4F6F8"),
+    "custom": ("#FFFFFF", "#1f0826"),
+}
+
+
+def _build_tree(panels: int) -> QWidget:
+    # Roughly an editor window's worth of forms: each panel mixes the widget
+    # types the stylesheets target, with the object names they select on.
+    root = QScrollArea()
+    content = QWidget()
+    grid = QGridLayout(content)
+    for index in range(panels):
+        frame = QFrame()
+        frame.setObjectName("WizardContainer")
+        layout = QVBoxLayout(frame)
+        title = QLabel(f"Panel {index}")
+        title.setObjectName("WizardTitle")
+        layout.addWidget(title)
+        for row in range(4):
+            layout.addWidget(QLineEdit(f"value {row}"))
+            layout.addWidget(QCheckBox(f"Option {row}"))
+            button = QPushButton(f"Action {row}")
+            button.setObjectName("ActionBtn")
+            layout.addWidget(button)
+        error = QLabel("error")
+        error.setObjectName("FormError")
+        layout.addWidget(error)
+        grid.addWidget(frame, index // 6, index % 6)
+    root.setWidget(content)
+    root.resize(1400, 900)
+    return root
+
+
+def _timed(app: QApplication, action) -> float:
+    start = time.perf_counter()
+    action()
+    app.processEvents()
+    return (time.perf_counter() - start) * 1000
+
+
+def run_benchmark(runs: int, panels: int) -> dict[str, float]:
+    app = QApplication.instance() or QApplication([])
+    with tempfile.TemporaryDirectory() as cache_dir:
+        engine = ThemeEngine(cache_dir=Path(cache_dir))
+        compile_ms = _timed(app, lambda: [engine.compile(theme) for theme in _THEMES])
+        cached_ms = _timed(app, lambda: ThemeEngine(cache_dir=Path(cache_dir)).compile("dark"))
+
+        root = _build_tree(panels)
+        root.show()
+        app.processEvents()
+        widgets = root.findChildren(QWidget)
+
+        # Previous approach: each styled widget carries its own inline string,
+        # so a switch parses and re-polishes once per widget.
+        per_widget = []
+        for run in range(runs):
+            text, background = _INLINE_COLORS[_THEMES[run % len(_THEMES)]]
+            inline = f"color: {text}; background-color: {background};"
+            per_widget.append(_timed(app, lambda: [widget.setStyleSheet(inline) for widget in widgets]))
+        for widget in widgets:
+            widget.setStyleSheet("")
+        app.processEvents()
+
+        engine_switch = []
+        for run in range(runs):
+            theme = _THEMES[run % len(_THEMES)]
+            engine_switch.append(_timed(app, lambda: engine.apply(theme, app)))
+        root.close()
+
+    return {
+        "widgets": len(widgets),
+        "compile_ms": compile_ms,
+        "cached_compile_ms": cached_ms,
+        "per_widget_switch_ms": statistics.median(per_widget),
+        "engine_switch_ms": statistics.median(engine_switch),
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Measure Flexta theme-switch latency.")
+    parser.add_argument("--runs", type=int, default=9)
+    parser.add_argument("--panels", type=int, default=60, help="Form panels in the widget tree (~17 widgets each).")
+    parser.add_argument("--output", type=Path)
+    args = parser.parse_args()
+
+    results = run_benchmark(args.runs, args.panels)
+    for metric, value in results.items():
+        print(f"{metric:>22}: {value:8.1f}")
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2), encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
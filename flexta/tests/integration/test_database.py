@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+import os
+import sqlite3
+import time
+from pathlib import Path
+
+from flexta.database import settings_db
+
+
+def _isolate_settings_db(tmp_path: Path, monkeypatch) -> Path:
+    db_path = tmp_path / "settings.db"
+    monkeypatch.setattr(settings_db, "_get_db_path", lambda: db_path)
+    return db_path
+
+
+def test_store_reuses_connection_and_applies_schema_once(tmp_path: Path, monkeypatch) -> None:
+    _isolate_settings_db(tmp_path, monkeypatch)
+    schema_reads = []
+    original_schema_path = settings_db._get_schema_path
+
+    def counting_schema_path() -> Path:
+        schema_reads.append(True)
+        return original_schema_path()
+
+    monkeypatch.setattr(settings_db, "_get_schema_path", counting_schema_path)
+
+    store = settings_db.get_store()
+    settings_db.add_recent_project("/tmp/project-alpha")
+    settings_db.set_last_used_folder("/tmp")
+    settings_db.get_recent_projects()
+
+    assert settings_db.get_store() is store
+    assert len(schema_reads) == 1
+    assert store.schema_version == settings_db._SCHEMA_VERSION
+    settings_db.close_store()
+
+
+def test_store_path_is_resolved_once_until_home_changes(tmp_path: Path, monkeypatch) -> None:
+    resolved = []
+
+    def db_path() -> Path:
+        resolved.append(True)
+        return Path(os.environ["HOME"]) / "settings.db"
+
+    monkeypatch.setattr(settings_db, "_get_db_path", db_path)
+    for home in ("first", "second"):
+        (tmp_path / home).mkdir()
+    monkeypatch.setenv("HOME", str(tmp_path / "first"))
+    store = settings_db.get_store()
+    assert all(settings_db.get_store() is store for _ in range(100))
+    assert len(resolved) == 1
+
+    monkeypatch.setenv("HOME", str(tmp_path / "second"))
+    moved = settings_db.get_store()
+    assert moved is not store and moved.path == tmp_path / "second" / "settings.db"
+    settings_db.close_store()
+
+
+def test_store_uses_wal_and_indexes_last_opened(tmp_path: Path, monkeypatch) -> None:
+    db_path = _isolate_settings_db(tmp_path, monkeypatch)
+    settings_db.initialize_db()
+
+    with sqlite3.connect(db_path) as connection:
+        journal_mode = connection.execute("PRAGMA journal_mode").fetchone()[0]
+        indexes = {row[1] for row in connection.execute("PRAGMA index_list('recent_projects')")}
+
+    assert journal_mode == "wal"
+    assert "idx_recent_projects_last_opened" in indexes
+    settings_db.close_store()
+
+
+def test_settings_cache_writes_through_and_survives_reopen(tmp_path: Path, monkeypatch) -> None:
+    _isolate_settings_db(tmp_path, monkeypatch)
+
+    settings_db.set_last_used_folder("/tmp/first")
+    settings_db.set_last_used_folder("/tmp/second")
+    assert settings_db.get_last_used_folder() == "/tmp/second"
+
+    settings_db.close_store()
+    assert settings_db.get_last_used_folder() == "/tmp/second"
+    assert settings_db.get_setting("missing", "fallback") == "fallback"
+    settings_db.close_store()
+
+
+def test_existing_database_is_migrated_in_place(tmp_path: Path, monkeypatch) -> None:
+    db_path = _isolate_settings_db(tmp_path, monkeypatch)
+    schema = settings_db._get_schema_path().read_text(encoding="utf-8")
+    with sqlite3.connect(db_path) as connection:
+        connection.executescript(schema)
+        connection.execute("INSERT INTO recent_projects (path) VALUES ('/tmp/legacy')")
+
+    assert settings_db.get_recent_projects() == ["/tmp/legacy"]
+    assert settings_db.get_store().schema_version == settings_db._SCHEMA_VERSION
+    settings_db.close_store()
+
+
+def _count_rows(db_path: Path, table: str) -> int:
+    with sqlite3.connect(db_path) as connection:
+        return connection.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+
+def test_writes_are_queued_coalesced_and_visible_before_flush(tmp_path: Path) -> None:
+    db_path = tmp_path / "settings.db"
+    store = settings_db.SettingsStore(db_path, flush_delay=60)
+
+    for index in range(50):
+        store.set_setting("last_used_folder", f"/tmp/folder-{index}")
+        store.add_recent_project("/tmp/project-alpha")
+    store.add_recent_project("/tmp/project-bravo")
+
+    assert store.has_pending_writes
+    assert store.get_setting("last_used_folder") == "/tmp/folder-49"
+    assert store.get_recent_projects() == ["/tmp/project-bravo", "/tmp/project-alpha"]
+    assert _count_rows(db_path, "settings") == 0
+
+    store.flush()
+
+    assert not store.has_pending_writes
+    assert _count_rows(db_path, "settings") == 1
+    assert _count_rows(db_path, "recent_projects") == 2
+    store.close()
+
+
+def test_set_recent_projects_replaces_pending_and_persisted_rows(tmp_path: Path) -> None:
+    db_path = tmp_path / "settings.db"
+    store = settings_db.SettingsStore(db_path, flush_delay=60)
+    store.add_recent_project("/tmp/project-old")
+    store.flush()
+
+    store.add_recent_project("/tmp/project-pending")
+    store.set_recent_projects(["/tmp/project-new"])
+    assert store.get_recent_projects() == ["/tmp/project-new"]
+
+    store.close()
+    reopened = settings_db.SettingsStore(db_path)
+    assert reopened.get_recent_projects() == ["/tmp/project-new"]
+    reopened.close()
+
+
+def test_background_writer_persists_without_explicit_flush(tmp_path: Path) -> None:
+    db_path = tmp_path / "settings.db"
+    store = settings_db.SettingsStore(db_path, flush_delay=0.01)
+    store.set_setting("theme", "dark")
+
+    deadline = time.monotonic() + 5
+    while _count_rows(db_path, "settings") == 0 and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    assert _count_rows(db_path, "settings") == 1
+    store.close()
@@ -1,10 +1,12 @@
 from __future__ import annotations
 
 import os
+from pathlib import Path
 
 from PySide6.QtTest import QSignalSpy
-from PySide6.QtWidgets import QApplication
+from PySide6.QtWidgets import QApplication, QLabel, QMessageBox, QPushButton
 
+from flexta.database import settings_db
 from flexta.ui.main_window import MainWindow
 from flexta.ui.sidebar import Sidebar
 from flexta.ui.toolbar import AppToolBar
@@ -52,3 +54,166 @@ def test_welcome_view_first_and_dialog_opens() -> None:
     sidebar_dialog.close()
 
     window.close()
+
+
+def test_setup_wizard_builds_pages_on_first_visit() -> None:
+    app = _get_app()
+    from flexta.ui.dialogs.login_dialog import SetupWizard
+
+    wizard = SetupWizard()
+    assert wizard.stack.is_built(0)
+    assert not wizard.stack.is_built(1)
+    assert not wizard.stack.is_built(2)
+
+    wizard.go_next()
+    app.processEvents()
+
+    assert wizard.stack.currentIndex() == 1
+    assert wizard.stack.is_built(1)
+    assert not wizard.stack.is_built(2)
+    wizard.close()
+
+
+def test_create_project_dialog_seeds_in_background(tmp_path: Path, monkeypatch) -> None:
+    app = _get_app()
+    monkeypatch.setattr(settings_db, "_get_db_path", lambda: tmp_path / "settings.db")
+    from flexta.ui.dialogs.create_project_dialog import CreateProjectDialog
+
+    dialog = CreateProjectDialog()
+    created = QSignalSpy(dialog.project_created)
+    dialog.show()
+    dialog.name_input.setText("site")
+    dialog.directory_input.setText(str(tmp_path))
+    dialog.create_button.click()
+    assert dialog.is_creating()
+    assert not dialog.create_button.isEnabled()
+
+    dialog._seed_job.wait(5)
+    app.processEvents()
+
+    assert created.count() == 1
+    assert (tmp_path / "site").is_dir()
+    assert not dialog.is_creating()
+    assert settings_db.get_recent_projects()[0] == str(tmp_path / "site")
+    settings_db.close_store()
+
+
+def test_create_project_dialog_is_prewarmed_and_shared(tmp_path: Path, monkeypatch) -> None:
+    app = _get_app()
+    monkeypatch.setattr(settings_db, "_get_db_path", lambda: tmp_path / "settings.db")
+
+    window = MainWindow()
+    toolbar = AppToolBar(window)
+    sidebar = Sidebar(window)
+    window.addToolBar(toolbar)
+    sidebar.setParent(window)
+    assert window.dialog_manager.current_create_project_dialog() is None
+
+    window.show()
+    app.processEvents()
+    prewarmed = window.dialog_manager.current_create_project_dialog()
+    assert prewarmed is not None
+    assert not prewarmed.isVisible()
+    assert prewarmed.template_picker.count() > 0
+
+    toolbar.create_project_action.trigger()
+    app.processEvents()
+    assert toolbar.current_dialog() is prewarmed
+    prewarmed.name_input.setText("draft")
+    prewarmed.close()
+
+    window.startup_widget.create_button.click()
+    app.processEvents()
+    assert sidebar.current_dialog() is prewarmed
+    assert prewarmed.isVisible()
+    assert prewarmed.name_input.text() == ""
+    prewarmed.close()
+
+    settings_db.add_recent_project(str(tmp_path / "site"))
+    prewarmed.project_created.emit(str(tmp_path / "site"))
+    assert window.startup_widget.recent_model.projects()[0] == str(tmp_path / "site")
+    window.close()
+    settings_db.close_store()
+
+
+def test_fade_stack_snapshot_and_effect_transitions_report_frame_stats() -> None:
+    app = _get_app()
+    from flexta.ui.dialogs.login_dialog import FadeStackWidget
+
+    for transition in (FadeStackWidget.TRANSITION_SNAPSHOT, FadeStackWidget.TRANSITION_EFFECT):
+        stack = FadeStackWidget(transition=transition, duration=60)
+        stack.addWidget(QLabel("first"))
+        stack.add_lazy_widget(lambda: QLabel("second"))
+        stack.resize(200, 120)
+        stack.show()
+        app.processEvents()
+
+        finished = QSignalSpy(stack.transition_finished)
+        stack.crossfade_to_index(1)
+        assert stack.is_animating
+        assert stack.currentIndex() == 1
+        assert finished.wait(2000)
+
+        assert not stack.is_animating
+        assert stack.currentWidget().isVisible()
+        assert stack.currentWidget().text() == "second"
+        assert stack.last_frame_stats.frames > 0
+        assert stack.last_frame_stats.intervals.count == stack.last_frame_stats.frames
+        stack.close()
+
+
+def test_setup_wizard_theme_cards_reuse_pooled_animations() -> None:
+    app = _get_app()
+    from flexta.ui.dialogs.login_dialog import SetupWizard
+
+    wizard = SetupWizard()
+    wizard.show()
+    app.processEvents()
+    buttons = wizard.theme_group.buttons()
+    for _ in range(10):
+        for button in buttons:
+            button.click()
+            app.processEvents()
+
+    # Two properties per card, however many clicks happened.
+    assert wizard.animations.pooled_count() == 2 * len(buttons)
+    assert wizard.animations.live_count() <= 2 * len(buttons)
+    wizard.close()
+
+
+def test_main_window_journals_edits_and_offers_recovery_when_autosave_is_on(tmp_path: Path, monkeypatch) -> None:
+    app = _get_app()
+    from flexta.core import journal as journal_module
+    from flexta.core.editor import EditorDocument
+
+    monkeypatch.setattr(settings_db, "_get_db_path", lambda: tmp_path / "settings.db")
+    monkeypatch.setattr(journal_module, "default_journal_dir", lambda: tmp_path / "journal")
+    settings_db.set_setting(journal_module.AUTOSAVE_SETTING, "1")
+    # A previous session that never closed its journal.
+    source = tmp_path / "index.html"
+    source.write_text("<p>saved</p>\n")
+    crashed = journal_module.JournalManager(flush_delay=60)
+    document = EditorDocument.from_file(source)
+    crashed.attach(document)
+    document.apply_edit(3, 5, "unsaved")
+    crashed.close()
+
+    window = MainWindow()
+    recovered = QSignalSpy(window.buffers_recovered)
+    window.show()
+    app.processEvents()
+    assert window.journals is not None and recovered.count() == 1
+    box = window.findChild(QMessageBox, "flexta-recovered-buffers")
+    assert box is not None and box.isVisible()
+    box.findChild(QPushButton, "discard").click()
+    app.processEvents()
+    assert window.journals.recover() == []
+
+    editor = window.create_code_widget()
+    assert editor.journals is window.journals
+    editor.open_file(source)
+    assert editor.journal is not None
+    editor.close_file()
+    window.journals.close()
+    window.close()
+    settings_db.close_store()
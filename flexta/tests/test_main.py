@@ -0,0 +1,30 @@
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+import subprocess
+import sys
+
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+
+
+def test_main_window_import_does_not_load_dialogs(tmp_path: Path) -> None:
+    env = dict(os.environ, QT_QPA_PLATFORM="offscreen", HOME=str(tmp_path))
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(PROJECT_ROOT), env.get("PYTHONPATH")]))
+    probe = (
+        "import json, sys\n"
+        "import flexta.main\n"
+        "import flexta.ui.main_window\n"
+        "print(json.dumps(sorted(name for name in sys.modules if name.startswith('flexta.ui.dialogs.'))))\n"
+    )
+    completed = subprocess.run(
+        [sys.executable, "-c", probe],
+        capture_output=True,
+        text=True,
+        env=env,
+        check=True,
+    )
+
+    assert json.loads(completed.stdout) == []
@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import os
+
+from PySide6.QtCore import QCoreApplication, QEvent, QPoint
+from PySide6.QtTest import QTest
+from PySide6.QtWidgets import QApplication, QWidget
+
+from flexta.ui.animations import AnimationManager
+
+
+def _get_app() -> QApplication:
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    app = QApplication.instance()
+    if app is None:
+        app = QApplication([])
+    return app
+
+
+def test_animate_retargets_pooled_animation_and_runs_finish_callback() -> None:
+    _get_app()
+    manager = AnimationManager()
+    widget = QWidget()
+    finished: list[str] = []
+
+    first = manager.animate(widget, b"pos", QPoint(50, 0), duration=40, on_finished=lambda: finished.append("first"))
+    second = manager.animate(widget, b"pos", QPoint(0, 50), duration=40, on_finished=lambda: finished.append("second"))
+
+    assert first is second
+    assert manager.pooled_count() == 1
+    assert manager.live_count() == 1
+    for _ in range(100):
+        if manager.live_count() == 0:
+            break
+        QTest.qWait(20)
+    assert widget.pos() == QPoint(0, 50)
+    assert finished == ["second"]
+
+
+def test_coalesce_runs_once_per_event_loop_pass() -> None:
+    app = _get_app()
+    manager = AnimationManager()
+    calls: list[int] = []
+
+    for value in range(5):
+        manager.coalesce("resize", lambda value=value: calls.append(value))
+    app.processEvents()
+    manager.coalesce("resize", lambda: calls.append(99))
+    app.processEvents()
+
+    assert calls == [4, 99]
+
+
+def test_destroyed_targets_leave_the_pool() -> None:
+    app = _get_app()
+    manager = AnimationManager()
+    widget = QWidget()
+    manager.animate(widget, b"pos", QPoint(10, 10), duration=1000)
+    manager.animate(widget, b"size", widget.size(), duration=1000)
+    assert manager.live_count() == 2
+
+    widget.deleteLater()
+    del widget
+    QCoreApplication.sendPostedEvents(None, QEvent.Type.DeferredDelete)
+    app.processEvents()
+
+    assert manager.pooled_count() == 0
+    assert manager.live_count() == 0
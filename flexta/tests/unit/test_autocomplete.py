@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+from PySide6.QtWidgets import QApplication
+
+from flexta.core.autocomplete import AutocompleteEngine, BuiltinCompletions, CompletionIndex, ProjectSymbols
+from flexta.core.html_editor import HtmlDocument
+from flexta.core.js_editor import JsDocument
+
+
+def _get_app() -> QApplication:
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    app = QApplication.instance()
+    if app is None:
+        app = QApplication([])
+    return app
+
+
+def _labels(completions) -> list[str]:
+    return [completion.label for completion in completions]
+
+
+def test_index_ranks_by_weight_and_keeps_cached_rankings_current() -> None:
+    index = CompletionIndex(f"item{number}" for number in range(1000))
+    index.add("Item", 5)
+
+    assert index.search("ITE", 3) == [("Item", 5), ("item0", 1), ("item1", 1)]
+    assert index.search("item99", 5)[0] == ("item99", 1)
+    assert index.search("x") == []
+
+    index.add("item500", 10)
+    assert index.search("item", 2) == [("item500", 11), ("Item", 5)]
+    index.discard("item500", 10)
+    index.discard("Item", 5)
+    assert "Item" not in index
+    assert index.search("item", 2) == [("item0", 1), ("item1", 1)]
+
+
+def test_builtins_are_rebuilt_once_and_then_loaded_from_cache(tmp_path: Path) -> None:
+    first = BuiltinCompletions.load(cache_dir=tmp_path)
+    cached = list(tmp_path.iterdir())
+    second = BuiltinCompletions.load(cache_dir=tmp_path)
+
+    assert len(cached) == 1
+    assert second.names() == first.names()
+    assert second.index("css.properties").search("backg", 50) == first.index("css.properties").search("backg", 50)
+    assert "src" in second.index("html.attributes:img")
+
+
+def test_engine_completes_by_context(tmp_path: Path) -> None:
+    _get_app()
+    engine = AutocompleteEngine(BuiltinCompletions.load(cache_dir=tmp_path), ProjectSymbols())
+    page = HtmlDocument('<div class="card card-wide" id="main">')
+    engine.project.track(page)
+
+    assert "div" in _labels(engine.complete("html", "<di", 3))
+    assert "src" in _labels(engine.complete("html", '<img alt="x" sr', 15))
+    assert _labels(engine.complete("html", '<p class="a car', 15)) == ["card", "card-wide"]
+    assert _labels(engine.complete("css", ".card-", 6)) == ["card-wide"]
+    assert "block" in _labels(engine.complete("css", "  display: bl", 13))
+    assert _labels(engine.complete("javascript", "document.getElementById('ma", 27)) == ["main"]
+    assert engine.complete("html", "plain text", 10) == []
+
+
+def test_project_symbols_follow_edits_without_rescanning() -> None:
+    _get_app()
+    symbols = ProjectSymbols()
+    script = JsDocument("const counter = 1;\nfunction render() {}\n")
+    symbols.track(script)
+    identifiers = symbols.indexes["identifier"]
+    assert "counter" in identifiers and "render" in identifiers
+
+    script.apply_edit(6, 7, "total")
+    script.apply_edit(len(script.text()), 0, "render(total);\nconst extra = 2;")
+    assert "counter" not in identifiers
+    assert identifiers.weight("total") == 2
+    assert identifiers.weight("render") == 2
+    assert "extra" in identifiers
+
+    script.set_text("let fresh;")
+    assert _labels_of(identifiers) == ["fresh"]
+    symbols.untrack(script)
+    assert len(identifiers) == 0
+
+
+def _labels_of(index: CompletionIndex) -> list[str]:
+    return [label for label, _ in index.search("", 100)]
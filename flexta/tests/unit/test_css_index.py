@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+from flexta.core.css_editor import SelectorIndex, SelectorUsage, parse_stylesheet
+
+
+def test_selectors_are_parsed_with_their_requirements() -> None:
+    rows = parse_stylesheet(
+        "/* .old { } */\n"
+        ".card, ul > li.item:not(.x):hover { color: red; }\n"
+        '@media (min-width: 1px) { #main a[href="{"]::before { content: "}"; } }\n'
+        "@keyframes spin { from { opacity: 0; } }\n"
+        ".sm\\:flex { display: flex; }\n"
+    )
+    assert [(selector, line, column) for selector, line, column, _ in rows] == [
+        (".card", 1, 0),
+        ("ul > li.item:not(.x):hover", 1, 7),
+        ('#main a[href="{"]::before', 2, 26),
+        (".sm\\:flex", 4, 0),
+    ]
+    assert rows[1][3] == {("tag", "ul"), ("tag", "li"), ("class", "item")}
+    assert rows[2][3] == {("id", "main"), ("tag", "a")}
+    assert rows[3][3] == {("class", "sm:flex")}
+
+
+def test_index_tracks_usages_and_unused_rules_incrementally(tmp_path: Path) -> None:
+    (tmp_path / "css").mkdir()
+    (tmp_path / "css" / "site.css").write_text(".card { }\n.card .title { }\nsection.hero { }\n#nav a { }\n")
+    (tmp_path / "index.html").write_text('<div class="card">\n  <h2 class="title">Hi</h2>\n</div>\n')
+    index = SelectorIndex(tmp_path)
+    index.build()
+
+    assert index.usages("card") == [SelectorUsage("index.html", 0, 12)]
+    assert [rule.selector for rule in index.rules("card")] == [".card", ".card .title"]
+    assert [rule.selector for rule in index.unused_selectors()] == ["section.hero", "#nav a"]
+    assert [(d.line, d.column, d.length) for d in index.diagnostics(tmp_path / "css" / "site.css")] == [
+        (2, 0, 12),
+        (3, 0, 6),
+    ]
+    assert index.complete_class("c") == ["card"]
+
+    index.update_file("about.html", '<section class="hero"><nav id="nav"><a href="/">Home</a></nav></section>')
+    assert index.unused_selectors() == []
+    index.update_file("index.html", "<p>gone</p>")
+    assert [rule.selector for rule in index.unused_selectors("css/site.css")] == [".card", ".card .title"]
+    index.remove_file("about.html")
+    assert len(index.unused_selectors()) == 4
+
+    index.update_file("css/site.css", ".card { }\n.badge { }\n")
+    assert index.rules("title") == [] and sorted(index.complete_class("")) == ["badge", "card"]
+    index.remove_file(tmp_path / "css" / "site.css")
+    assert index.unused_selectors() == [] and index.complete_class("") == []
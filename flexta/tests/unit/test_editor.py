@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+import os
+from pathlib import Path
+import random
+
+from PySide6.QtGui import QTextCursor
+from PySide6.QtWidgets import QApplication
+
+from flexta.core.css_editor import CssDocument
+from flexta.core.editor import EditorDocument, PieceTable, open_document
+from flexta.core.html_editor import HtmlDocument
+
+
+def _get_app() -> QApplication:
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    app = QApplication.instance()
+    if app is None:
+        app = QApplication([])
+    return app
+
+
+def _check_lines(table: PieceTable, text: str) -> None:
+    lines = text.split("\n")
+    assert table.line_count == len(lines)
+    offset = 0
+    for number, line in enumerate(lines):
+        assert table.line_start(number) == offset
+        assert table.line_text(number) == line
+        assert table.line_at(offset) == number
+        offset += len(line) + 1
+
+
+def test_piece_table_matches_string_model_under_random_edits() -> None:
+    rng = random.Random(7)
+    text = "".join(rng.choice("ab\n") for _ in range(500))
+    table = PieceTable(text, seed=1)
+    for _ in range(2000):
+        offset = rng.randint(0, len(text))
+        if text and rng.random() < 0.4:
+            length = rng.randint(1, 12)
+            table.delete(offset, length)
+            text = text[:offset] + text[offset + length:]
+        else:
+            inserted = "".join(rng.choice("xy\n") for _ in range(rng.randint(1, 8)))
+            table.insert(offset, inserted)
+            text = text[:offset] + inserted + text[offset:]
+        assert len(table) == len(text)
+
+    assert table.text() == text
+    assert "".join(table.chunks()) == text
+    assert table.text(100, 250) == text[100:250]
+    _check_lines(table, text)
+
+
+def test_snapshots_are_isolated_and_undo_restores_previous_text() -> None:
+    table = PieceTable("hello\nworld")
+    snapshot = table.snapshot()
+
+    for char in "abc":
+        table.insert(len(table), char)
+    table.insert(0, ">> ")
+    with table.group():
+        table.delete(0, 3)
+        table.replace(0, 5, "HELLO")
+
+    assert snapshot.text() == "hello\nworld"
+    assert snapshot.line_text(1) == "world"
+    assert table.text() == "HELLO\nworldabc"
+
+    table.undo()
+    assert table.text() == ">> hello\nworldabc"
+    table.undo()
+    assert table.text() == "hello\nworldabc"
+    # The three keystrokes were typed in a row and undo together.
+    table.undo()
+    assert table.text() == "hello\nworld"
+    assert not table.can_undo()
+
+    table.redo()
+    table.redo()
+    assert table.text() == ">> hello\nworldabc"
+    table.insert(0, "!")
+    assert not table.can_redo()
+
+
+def test_editor_document_mirrors_qt_edits_and_replays_undo(tmp_path: Path) -> None:
+    _get_app()
+    document = EditorDocument("one\ntwo\nthree")
+    cursor = QTextCursor(document.document)
+    cursor.setPosition(4)
+    cursor.insertText("2\n")
+    cursor.setPosition(0)
+    cursor.setPosition(3, QTextCursor.MoveMode.KeepAnchor)
+    cursor.insertText("ONE")
+    document.apply_edit(len(document.buffer), 0, "\nfour")
+
+    assert document.text() == document.document.toPlainText() == "ONE\n2\ntwo\nthree\nfour"
+    assert document.buffer.line_text(1) == "2"
+
+    assert document.undo()
+    assert document.document.toPlainText() == "ONE\n2\ntwo\nthree"
+    assert document.undo()
+    assert document.undo()
+    assert document.document.toPlainText() == document.text() == "one\ntwo\nthree"
+    assert document.redo()
+    assert document.document.toPlainText() == document.text() == "one\n2\ntwo\nthree"
+
+    saved = document.save(tmp_path / "notes.txt")
+    assert saved.read_text(encoding="utf-8") == "one\n2\ntwo\nthree"
+    assert not document.is_modified()
+
+
+def test_editor_document_converts_qt_positions_around_surrogate_pairs() -> None:
+    _get_app()
+    document = EditorDocument("<p>hi \U0001f600</p>\n\U0001f600\U0001f600\nline\n")
+    changes = []
+    document.text_changed.connect(lambda *change: changes.append(change))
+    document.apply_edit(0, 0, "x")
+    assert document.buffer.can_undo() and changes == [(0, 0, 1)]
+
+    # Typed after the emoji: Qt reports UTF-16 positions, two per emoji.
+    cursor = QTextCursor(document.document.findBlockByNumber(1))
+    cursor.movePosition(QTextCursor.MoveOperation.EndOfBlock)
+    cursor.insertText("Z")
+    cursor.setPosition(cursor.position() - 3, QTextCursor.MoveMode.KeepAnchor)
+    cursor.insertText("\U0001f44d")
+    document.apply_edit(document.text().index("</p>"), 4, "</b>")
+    expected = "x<p>hi \U0001f600</b>\n\U0001f600\U0001f44d\nline\n"
+    assert document.text() == document.document.toPlainText() == expected
+    assert all(removed >= 0 for _, removed, _ in changes)
+    assert changes[-2:] == [(14, 2, 1), (8, 4, 4)]
+
+    assert document.undo() and document.undo()
+    assert document.text() == document.document.toPlainText() == "x<p>hi \U0001f600</p>\n\U0001f600\U0001f600Z\nline\n"
+    assert document.redo()
+    assert document.text() == document.document.toPlainText()
+    assert all(removed >= 0 for _, removed, _ in changes)
+
+
+def test_open_document_picks_the_language_class(tmp_path: Path) -> None:
+    _get_app()
+    (tmp_path / "index.html").write_text("<p>hi</p>", encoding="utf-8")
+    (tmp_path / "site.css").write_text("body {}", encoding="utf-8")
+    (tmp_path / "notes.txt").write_text("plain", encoding="utf-8")
+
+    html = open_document(tmp_path / "index.html")
+    assert isinstance(html, HtmlDocument)
+    assert html.text() == "<p>hi</p>"
+    assert isinstance(open_document(tmp_path / "site.css"), CssDocument)
+    assert type(open_document(tmp_path / "notes.txt")) is EditorDocument
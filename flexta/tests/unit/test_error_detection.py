@@ -0,0 +1,150 @@
+from __future__ import annotations
+
+import os
+import time
+
+from PySide6.QtWidgets import QApplication
+
+from flexta.core.css_editor import CssDocument
+from flexta.core.error_detector import (
+    CssValidator,
+    DiagnosticsScheduler,
+    HtmlValidator,
+    JsValidator,
+)
+from flexta.core.js_editor import JsDocument
+
+
+def _get_app() -> QApplication:
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    app = QApplication.instance()
+    if app is None:
+        app = QApplication([])
+    return app
+
+
+def _check(validator, text: str) -> list[tuple[int, str]]:
+    state = validator.initial_state
+    messages = []
+    for number, line in enumerate(text.split("\n")):
+        findings, state = validator.check_line(line, state)
+        messages.extend((number, message) for _, _, _, message in findings)
+    messages.extend((-1, message) for _, _, _, message in validator.finish(state))
+    return messages
+
+
+def _wait_idle(app: QApplication, scheduler: DiagnosticsScheduler, document, timeout: float = 5.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not scheduler.is_idle(document):
+        assert time.monotonic() < deadline
+        app.processEvents()
+        time.sleep(0.001)
+
+
+def test_validators_report_structural_and_line_errors() -> None:
+    _get_app()
+    assert _check(HtmlValidator(), "<div>\n  <p>text\n  <span a='>'></div>\n</section>\n<ul>") == [
+        (2, "Unclosed <span> before </div>"),
+        (3, "Unexpected </section>"),
+        (-1, "Unclosed <ul>"),
+    ]
+    assert _check(HtmlValidator(), "<script>\nif (a < b) { '</div>' }\n</script><br><img src=x />") == []
+    assert _check(CssValidator(), "a:hover { colr: red; color: #12; }\n.b {\n  margin 0;\n  width: ;\n") == [
+        (0, "Unknown property 'colr'"),
+        (0, "Invalid hex color '#12'"),
+        (2, "Expected ':' after 'margin'"),
+        (3, "Missing value for 'width'"),
+        (-1, "Unclosed '{'"),
+    ]
+    js = "const re = /[)]/g, t = `a ${f({x: 1})}\n b`;\nif (a) { call(1];\n'open"
+    assert _check(JsValidator(), js) == [
+        (2, "Expected ')' but found ']'"),
+        (3, "Unterminated string"),
+        (-1, "Unclosed '{'"),
+    ]
+
+
+def test_burst_of_edits_runs_one_debounced_validation() -> None:
+    app = _get_app()
+    scheduler = DiagnosticsScheduler(debounce_ms=50)
+    published = []
+    scheduler.diagnostics_changed.connect(lambda document, removed, added: published.append((removed, added)))
+    document = JsDocument("function main() {\n  return 1;\n}\n" * 200)
+    scheduler.watch(document)
+    _wait_idle(app, scheduler, document)
+
+    for count in range(1000):
+        document.apply_edit(20, 0, "x" if count % 2 == 0 else "(")
+        if count % 10 == 0:
+            app.processEvents()
+    _wait_idle(app, scheduler, document)
+
+    metrics = scheduler.metrics(document)
+    assert metrics.edits == 1000
+    assert metrics.full_runs == 1
+    assert metrics.runs <= 3
+    # 500 unmatched "(" on line 1: the function's "}" closes the wrong bracket.
+    assert [diagnostic.message for diagnostic in scheduler.diagnostics(document)] == [
+        "Expected ')' but found '}'",
+        "Unclosed '{'",
+    ]
+    assert metrics.latency.count == metrics.runs
+    scheduler.close()
+
+
+def test_edits_recheck_only_the_changed_region_and_publish_a_diff() -> None:
+    app = _get_app()
+    scheduler = DiagnosticsScheduler(debounce_ms=10_000)
+    published = []
+    scheduler.diagnostics_changed.connect(lambda document, removed, added: published.append((removed, added)))
+    text = "".join(f".rule{number} {{\n  color: red;\n}}\n" for number in range(2000))
+    document = CssDocument(text)
+    scheduler.watch(document)
+    scheduler.flush(document)
+    assert published == []
+    assert scheduler.metrics(document).lines_checked == 6001
+
+    line = 3 * 1000 + 1
+    offset = document.buffer.line_start(line)
+    document.apply_edit(offset + len("  color"), 1, "")
+    scheduler.flush(document)
+    (removed, added), = published
+    assert removed == []
+    assert [(diagnostic.line, diagnostic.message) for diagnostic in added] == [(line, "Expected ':' after 'color'")]
+    assert scheduler.metrics(document).lines_checked <= 2
+
+    # The unchanged error keeps its published object; only the new one is sent.
+    document.apply_edit(offset, 0, ".inner {\n")
+    scheduler.flush(document)
+    assert published[1][0] == []
+    assert [diagnostic.message for diagnostic in published[1][1]] == ["Unclosed '{'"]
+
+    document.apply_edit(offset + len(".inner {\n  color"), 0, ":")
+    scheduler.flush(document)
+    assert published[2] == (added, [])
+    assert scheduler.metrics(document).lines_checked < 10
+    assert [diagnostic.message for diagnostic in scheduler.diagnostics(document)] == ["Unclosed '{'"]
+    _wait_idle(app, scheduler, document)
+    scheduler.close()
+
+
+def test_diagnostics_below_inserted_lines_report_their_current_line() -> None:
+    _get_app()
+    scheduler = DiagnosticsScheduler(debounce_ms=10_000)
+    published = []
+    scheduler.diagnostics_changed.connect(lambda document, removed, added: published.append((removed, added)))
+    document = CssDocument(".a {\n  color: red;\n}\n.b {\n  margin 0;\n}\n")
+    scheduler.watch(document)
+    scheduler.flush(document)
+    (_, (error,)), = published
+    assert error.line == 4 and scheduler.located(document) == [(4, error)]
+
+    # Moving the error is not a change to publish, but its position follows.
+    document.apply_edit(0, 0, ".top {}\n.next {}\n")
+    scheduler.flush(document)
+    assert len(published) == 1
+    assert scheduler.located(document) == [(6, error)]
+    document.apply_edit(0, len(".top {}\n"), "")
+    scheduler.flush(document)
+    assert scheduler.located(document) == [(5, error)]
+    scheduler.close()
@@ -0,0 +1,319 @@
+from __future__ import annotations
+
+import os
+from pathlib import Path
+import re
+import threading
+import time
+
+from PySide6.QtCore import QPoint, Qt
+from PySide6.QtTest import QTest
+from PySide6.QtWidgets import QApplication
+
+from flexta.core.project_watcher import ProjectWatcher
+from flexta.core.search import SearchQuery
+from flexta.ui.widgets import code_widget
+from flexta.ui.widgets.code_widget import CodeWidget
+from flexta.utils import file_utils
+from flexta.utils.file_utils import (
+    FileTree,
+    IgnoreRules,
+    MappedFile,
+    TreeScan,
+    is_ignored,
+    list_directory,
+    root_rules,
+)
+
+
+def _get_app() -> QApplication:
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    app = QApplication.instance()
+    if app is None:
+        app = QApplication([])
+    return app
+
+
+def _write(root: Path, relative: str, text: str = "") -> None:
+    path = root / relative
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text)
+
+
+def _wait(app: QApplication, condition, timeout: float = 5.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline
+        app.processEvents()
+        time.sleep(0.01)
+
+
+def _find(app: QApplication, widget: CodeWidget, query: SearchQuery) -> bool:
+    found = []
+    widget.find_finished.connect(found.append)
+    try:
+        widget.find(query)
+        _wait(app, lambda: found)
+    finally:
+        widget.find_finished.disconnect(found.append)
+    return found[-1]
+
+
+def test_gitignore_patterns_follow_git_semantics() -> None:
+    rules = (
+        IgnoreRules("", ["*.log", "!keep.log", "/build", "/out/", "dist/", "docs/**/*.tmp", "# comment", ""]),
+        IgnoreRules("web", ["cache/", "*.map"]),
+    )
+    assert is_ignored(rules, "a/b/debug.log", False)
+    assert not is_ignored(rules, "a/keep.log", False)
+    assert is_ignored(rules, "build", True) and not is_ignored(rules, "src/build", True)
+    assert is_ignored(rules, "src/dist", True) and not is_ignored(rules, "src/dist", False)
+    assert is_ignored(rules, "out", True) and not is_ignored(rules, "src/out", True)
+    assert not is_ignored(rules, "out", False)
+    assert is_ignored(rules, "docs/a/b/x.tmp", False) and not is_ignored(rules, "x.tmp", False)
+    assert is_ignored(rules, "web/app.js.map", False) and not is_ignored(rules, "app.js.map", False)
+    assert is_ignored(rules, "web/cache", True)
+
+
+def test_scan_honours_gitignore_and_lists_breadth_first(tmp_path: Path) -> None:
+    _write(tmp_path, ".gitignore", "*.log\nout/\n")
+    _write(tmp_path, "src/app.js")
+    _write(tmp_path, "src/nested/deep.js")
+    _write(tmp_path, "src/.gitignore", "generated.js\n")
+    _write(tmp_path, "src/generated.js")
+    _write(tmp_path, "out/bundle.js")
+    _write(tmp_path, "node_modules/lib/index.js")
+    _write(tmp_path, ".config/settings.json")
+    _write(tmp_path, "zeta/z.txt")
+    _write(tmp_path, "debug.log")
+
+    tree = FileTree()
+    order = []
+    for relative, entries, _ in TreeScan(str(tmp_path), rules=root_rules()):
+        order.append(relative)
+        tree.apply(relative, entries)
+    # Visible folders before dot-folders, parents before children.
+    assert order == ["", "src", "zeta", ".config", "src/nested"]
+    assert sorted(tree.files()) == [
+        ".config/settings.json",
+        ".gitignore",
+        "src/.gitignore",
+        "src/app.js",
+        "src/nested/deep.js",
+        "zeta/z.txt",
+    ]
+    assert [node.name for node in tree.children()] == [".config", "src", "zeta", ".gitignore"]
+
+    scan = TreeScan(str(tmp_path), rules=root_rules())
+    iterator = iter(scan)
+    assert next(iterator)[0] == ""
+    scan.prioritize("zeta")
+    assert next(iterator)[0] == "zeta"
+
+    (tmp_path / "src" / "app.js").write_text("changed")
+    (tmp_path / "src" / "nested" / "deep.js").unlink()
+    os.rename(tmp_path / "src" / "nested", tmp_path / "src" / "moved")
+    entries, _ = list_directory(str(tmp_path), "src", root_rules())
+    change = tree.apply("src", entries)
+    assert (change.added, change.removed, change.removed_files, change.modified) == (
+        ["src/moved"],
+        ["src/nested"],
+        ["src/nested/deep.js"],
+        ["src/app.js"],
+    )
+    assert (tree.file_count, tree.directory_count) == (5, 4)
+
+
+def test_watcher_streams_the_tree_and_patches_it_from_events(tmp_path: Path) -> None:
+    app = _get_app()
+    _write(tmp_path, "index.html", "<p>hi</p>")
+    _write(tmp_path, "css/site.css", "p { }")
+    _write(tmp_path, "node_modules/pkg/index.js")
+    watcher = ProjectWatcher(tmp_path, debounce_ms=10)
+    added, changed = [], []
+    watcher.entries_added.connect(added.extend)
+    watcher.files_changed.connect(changed.extend)
+    finished = []
+    watcher.scan_finished.connect(lambda: finished.append(True))
+    watcher.start()
+    try:
+        _wait(app, lambda: finished)
+        assert sorted(added) == ["css", "css/site.css", "index.html"]
+        assert changed == [] and watcher.first_batch_seconds is not None
+
+        _write(tmp_path, "css/theme.css", "a { }")
+        _write(tmp_path, "js/app.js", "run();")
+        (tmp_path / "index.html").unlink()
+        _wait(app, lambda: {"css/theme.css", "js/app.js"} <= set(watcher.tree.files()) and "index.html" not in watcher.tree)
+        _wait(app, lambda: str(tmp_path / "js" / "app.js") in changed)
+        assert str(tmp_path / "css" / "theme.css") in changed and str(tmp_path / "index.html") in changed
+
+        # A new .gitignore rule prunes what is already in the tree.
+        _write(tmp_path, ".gitignore", "js/\n")
+        _wait(app, lambda: "js" not in watcher.tree)
+        assert watcher.full_scans == 0 and watcher.directory_rescans > 0
+
+        # A directory gone before it could be watched is not an inotify limit.
+        watcher._watch([str(tmp_path / "gone")])
+        assert not watcher.overflowed
+    finally:
+        watcher.stop()
+
+
+def test_mapped_file_locates_lines_through_a_sparse_index(tmp_path: Path, monkeypatch) -> None:
+    monkeypatch.setattr(file_utils, "_INDEX_BLOCK", 16)
+    monkeypatch.setattr(file_utils, "_INDEX_STEP", 2)
+    lines = [f"line {number} " + "é" * (number % 7) for number in range(500)]
+    path = tmp_path / "big.log"
+    path.write_bytes(("\r\n".join(lines[:10]) + "\r\n" + "\n".join(lines[10:])).encode())
+    mapped = MappedFile(str(path))
+    progress = []
+    mapped.build_index(progress=progress.append)
+    try:
+        assert mapped.complete and mapped.line_count == 500
+        assert len(progress) > 1 and progress[-1] == 500
+        assert len(mapped._newlines) == path.stat().st_size // 16 + 1
+        assert mapped.lines(0, 3) == lines[:3]
+        assert mapped.lines(497, 10) == lines[497:]
+        for number in (0, 9, 10, 123, 499):
+            offset = mapped.line_offset(number)
+            assert mapped.line_at(offset) == number
+            assert mapped.column_at(mapped.offset_of(number, 5)) == 5
+    finally:
+        mapped.close()
+
+
+def test_mapped_file_counts_columns_on_long_lines_in_bounded_chunks(tmp_path: Path, monkeypatch) -> None:
+    monkeypatch.setattr(file_utils, "_COUNT_CHUNK", 64)
+    line = "é" * 3000 + "x" * 20000 + "needle" + "y" * 10
+    path = tmp_path / "bundle.min.js"
+    path.write_text("short\n" + line + "\nlast", encoding="utf-8")
+    mapped = MappedFile(str(path))
+    mapped.build_index()
+    try:
+        column = line.index("needle")
+        offset = mapped.offset_of(1, column)
+        assert mapped.data[offset:offset + 6] == b"needle"
+        assert mapped.column_at(offset) == column
+        assert mapped.offset_of(1, 10) == 6 + 20 and mapped.offset_of(1, 10 ** 6) == mapped.line_end(6)
+        # Display is cut at _MAX_LINE_BYTES, but can start at any column.
+        assert mapped.lines(1, 1) == [line[:3000 + 16 * 1024 - 6000]]
+        assert mapped.lines(0, 3, column - 2) == ["", "xxneedle" + "y" * 10, ""]
+    finally:
+        mapped.close()
+
+
+def test_mapped_file_searches_in_chunks_that_can_be_cancelled(tmp_path: Path, monkeypatch) -> None:
+    monkeypatch.setattr(file_utils, "_SEARCH_CHUNK", 64)
+    monkeypatch.setattr(file_utils, "_SEARCH_OVERLAP", 16)
+    path = tmp_path / "server.log"
+    # Lines end on both sides of chunk boundaries, and one line is cut.
+    path.write_bytes(b"line of text\n" * 20 + b"x" * 250 + b"needle" + b"y" * 100 + b"\nend$\n")
+    mapped = MappedFile(str(path))
+    try:
+        needle = re.compile(rb"needle")
+        start = mapped.data.find(b"needle")
+        assert mapped.search(needle, 0, mapped.size) == (start, start + 6)
+        assert mapped.search(needle, start + 1, mapped.size) is None
+        assert mapped.search(needle, 0, start) is None
+        assert mapped.search(re.compile(rb"^end\$$", re.MULTILINE), 0, mapped.size) == (mapped.size - 5, mapped.size - 1)
+        cancelled = threading.Event()
+        cancelled.set()
+        assert mapped.search(needle, 0, mapped.size, cancelled) is None
+    finally:
+        mapped.close()
+
+
+def test_code_widget_opens_large_files_read_only(tmp_path: Path) -> None:
+    app = _get_app()
+    small = tmp_path / "app.js"
+    small.write_text("let a = 1;\nlet needle = 2;\n")
+    large = tmp_path / "bundle.js"
+    large.write_text("".join(f"var v{number} = {number};\n" for number in range(5000)) + "\tcallNeedle(v1);")
+    widget = CodeWidget(large_file_bytes=4096)
+    widget.resize(600, 300)
+    try:
+        widget.open_file(small)
+        assert not widget.is_large_file and widget.document.text().startswith("let a")
+        assert _find(app, widget, SearchQuery("NEEDLE"))
+        assert widget.editor.textCursor().selectedText() == "needle"
+
+        widget.open_file(large)
+        view = widget.large_view
+        assert widget.is_large_file and widget.document is None
+        finished = []
+        view.indexing_finished.connect(lambda: finished.append(True))
+        _wait(app, lambda: finished)
+        assert view.line_count == 5001
+        widget.go_to_line(2500)
+        assert view.current_line == 2500
+        assert view.first_visible_line <= 2500 < view.first_visible_line + view.visible_rows()
+        widget.show()
+        view.viewport().repaint()
+
+        assert _find(app, widget, SearchQuery(r"call(\w+)\(", regex=True, case_sensitive=True))
+        assert view.match == (5000, 1, 11) and view.current_line == 5000
+        assert _find(app, widget, SearchQuery("v4999 ", whole_word=False))
+        assert view.match == (4999, 4, 6)
+        assert not _find(app, widget, SearchQuery("missing"))
+        # A newer find supersedes one still running; only its result lands.
+        found = []
+        widget.find_finished.connect(found.append)
+        widget.find(SearchQuery("missing"))
+        widget.find(SearchQuery("v2 "))
+        _wait(app, lambda: found)
+        assert found == [True] and view.match == (2, 4, 3)
+    finally:
+        widget.close_file()
+        widget.deleteLater()
+
+
+def test_large_file_view_reveals_matches_past_the_display_cut(tmp_path: Path) -> None:
+    app = _get_app()
+    path = tmp_path / "bundle.min.js"
+    path.write_text("var a=1;" * 10000 + "needle();\nend\n")
+    widget = CodeWidget(large_file_bytes=4096)
+    widget.resize(600, 300)
+    try:
+        widget.open_file(path)
+        view = widget.large_view
+        view.wait_for_index()
+        app.processEvents()
+        assert _find(app, widget, SearchQuery("needle", case_sensitive=True))
+        assert view.match == (0, 80000, 6)
+        left = view.horizontalScrollBar().value()
+        assert left < 80000 < left + 60
+        widget.show()
+        view.viewport().repaint()
+        window = max(left - code_widget._WINDOW_MARGIN, 0)
+        assert view.mapped.lines(0, 1, window)[0][80000 - window:].startswith("needle")
+    finally:
+        widget.close_file()
+        widget.deleteLater()
+
+
+def test_code_widget_routes_undo_to_the_document(tmp_path: Path) -> None:
+    _get_app()
+    path = tmp_path / "index.html"
+    path.write_text("hello\n")
+    widget = CodeWidget()
+    try:
+        widget.open_file(path)
+        editor = widget.editor
+        QTest.keyClicks(editor, "XYZ")
+        assert widget.document.text() == "XYZhello\n"
+
+        QTest.keyClick(editor, Qt.Key.Key_Z, Qt.KeyboardModifier.ControlModifier)
+        assert widget.document.text() == "hello\n"
+        QTest.keyClick(editor, Qt.Key.Key_Z, Qt.KeyboardModifier.ControlModifier | Qt.KeyboardModifier.ShiftModifier)
+        assert widget.document.text() == "XYZhello\n"
+
+        menu = editor._context_menu(QPoint(0, 0))
+        actions = {action.objectName(): action for action in menu.actions()}
+        assert actions["edit-undo"].isEnabled() and not actions["edit-redo"].isEnabled()
+        actions["edit-undo"].trigger()
+        assert widget.document.text() == "hello\n"
+        menu.deleteLater()
+    finally:
+        widget.close_file()
+        widget.deleteLater()
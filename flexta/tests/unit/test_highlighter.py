@@ -0,0 +1,176 @@
+from __future__ import annotations
+
+import os
+
+from PySide6.QtGui import QTextCursor, QTextDocument
+from PySide6.QtWidgets import QApplication, QPlainTextDocumentLayout
+
+from flexta.highlighters import css_highlighter, html_highlighter, js_highlighter
+from flexta.highlighters.engine import Highlighter, UNLEXED, pack_state
+from flexta.highlighters.js_highlighter import JsLexer
+
+
+def _get_app() -> QApplication:
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    app = QApplication.instance()
+    if app is None:
+        app = QApplication([])
+    return app
+
+
+def _lex(lexer, lines: list[str]) -> list[tuple[list[tuple[str, str]], int]]:
+    state = lexer.initial_state
+    results = []
+    for line in lines:
+        tokens, state = lexer.tokenize(line, state)
+        results.append(([(line[start:start + length], kind) for start, length, kind in tokens], state))
+    return results
+
+
+class _CountingLexer(JsLexer):
+    def __init__(self) -> None:
+        super().__init__()
+        self.lines: list[str] = []
+
+    def tokenize(self, text: str, state: int):
+        self.lines.append(text)
+        return super().tokenize(text, state)
+
+
+def _document(text: str) -> QTextDocument:
+    document = QTextDocument()
+    document.setDocumentLayout(QPlainTextDocumentLayout(document))
+    document.setPlainText(text)
+    return document
+
+
+def test_lexers_carry_state_across_lines() -> None:
+    js = _lex(js_highlighter.JsLexer(), ["const a = `x", "y` // done", "/* open", "close */ f(1)"])
+    assert js[0] == ([("const", "keyword"), ("=", "operator"), ("`x", "string")], js_highlighter.TEMPLATE)
+    assert js[1] == ([("y`", "string"), ("// done", "comment")], js_highlighter.CODE)
+    assert js[2][1] == js_highlighter.BLOCK_COMMENT
+    assert js[3][0] == [("close */", "comment"), ("f", "function"), ("1", "number")]
+
+    css = _lex(css_highlighter.CssLexer(), ["@media screen {", "a:hover { color: #fff; }", "}"])
+    assert css[1][0] == [
+        ("a", "tag"), (":hover", "selector"), ("color", "property"), ("#fff", "number"),
+    ]
+    assert css[2][1] == css_highlighter.TOP
+
+    html = _lex(html_highlighter.HtmlLexer(), ['<div class="a', 'b"><script>', "x < y /* a", "b */</script>"])
+    assert html[0][1] == html_highlighter.TAG_DOUBLE_QUOTE
+    assert html[1][1] == html_highlighter.SCRIPT
+    # Markup-looking text inside a script is JavaScript, not a tag, and the
+    # script's own state rides along in the packed line state.
+    assert html[2] == (
+        [("<", "operator"), ("/* a", "comment")],
+        pack_state(html_highlighter.SCRIPT, js_highlighter.BLOCK_COMMENT),
+    )
+    assert html[3] == ([("b */", "comment"), ("</script>", "tag")], html_highlighter.TEXT)
+
+
+def test_html_delegates_inline_attributes_and_style_blocks() -> None:
+    lexer = html_highlighter.HtmlLexer()
+    line = '<p style="color: red" onclick="go(1)">x</p><style>a { top: 0 }</style>'
+    tokens, state = lexer.tokenize(line, lexer.initial_state)
+
+    assert [(line[start:start + length], kind) for start, length, kind in tokens] == [
+        ("<p", "tag"), ("style", "attribute"), ("=", "operator"), ('"', "string"),
+        ("color", "property"), ("red", "value"), ('"', "string"),
+        ("onclick", "attribute"), ("=", "operator"), ('"', "string"),
+        ("go", "function"), ("1", "number"), ('"', "string"), (">", "tag"),
+        ("</p", "tag"), (">", "tag"), ("<style", "tag"), (">", "tag"),
+        ("a", "tag"), ("top", "property"), ("0", "number"), ("</style>", "tag"),
+    ]
+    assert state == html_highlighter.TEXT
+
+
+def test_edits_relex_only_until_the_state_converges() -> None:
+    _get_app()
+    lexer = _CountingLexer()
+    document = _document("\n".join(f"let value{i} = {i};" for i in range(2000)))
+    highlighter = Highlighter(document, lexer)
+    highlighter.set_visible_range(0, 40)
+    highlighter.flush()
+    assert len(lexer.lines) == 2000
+    formats = document.findBlockByNumber(10).layout().formats()
+    assert [(item.start, item.length) for item in formats] == [(0, 3), (12, 1), (14, 2)]
+    assert formats[0].format == highlighter.formats.get("keyword")
+
+    lexer.lines.clear()
+    cursor = QTextCursor(document.findBlockByNumber(500))
+    cursor.insertText("x")
+    assert lexer.lines == ["xlet value500 = 500;"]
+
+    # Opening a comment changes every later block's state; the work beyond
+    # the keystroke budget is left for idle time.
+    lexer.lines.clear()
+    cursor = QTextCursor(document.findBlockByNumber(100))
+    cursor.insertText("/*")
+    assert highlighter.is_pending()
+    highlighter.flush()
+    assert highlighter.block_state(1999) == js_highlighter.BLOCK_COMMENT
+    assert len(lexer.lines) == 1900
+
+    lexer.lines.clear()
+    cursor.insertText("*/")
+    highlighter.flush()
+    assert highlighter.block_state(1999) == js_highlighter.CODE
+
+    lexer.lines.clear()
+    cursor = QTextCursor(document.findBlockByNumber(1000))
+    cursor.insertText("one;\ntwo;\n")
+    highlighter.flush()
+    assert lexer.lines == ["one;", "two;", "let value1000 = 1000;"]
+    assert highlighter.block_state(2001) == js_highlighter.CODE
+
+
+def test_visible_blocks_are_highlighted_before_the_rest() -> None:
+    app = _get_app()
+    document = _document("\n".join(f"/* {i} */ call({i});" for i in range(20000)))
+    highlighter = Highlighter(document, JsLexer())
+    highlighter.slice_ms = 1.0
+    highlighter.set_visible_range(15000, 15040)
+    while highlighter.block_state(15040) == UNLEXED:
+        app.processEvents()
+
+    assert all(highlighter.block_state(number) != UNLEXED for number in range(15000, 15041))
+    assert highlighter.block_state(10000) == UNLEXED
+
+    highlighter.flush()
+    assert not highlighter.is_pending()
+    assert highlighter.block_state(10000) == js_highlighter.CODE
+    # Off-screen blocks are lexed but only formatted once scrolled to.
+    assert document.findBlockByNumber(15020).layout().formats()
+    assert not document.findBlockByNumber(10000).layout().formats()
+    highlighter.set_visible_range(10000, 10040)
+    assert document.findBlockByNumber(10000).layout().formats()
+
+
+def test_embedded_script_lines_are_not_relexed_when_only_html_changes() -> None:
+    _get_app()
+    script = "\n".join(f"  let item{i} = compute({i});" for i in range(300))
+    document = _document(f"<main>\n<p>intro</p>\n<script>\n{script}\n</script>\n<footer></footer>")
+    lexer = html_highlighter.HtmlLexer()
+    highlighter = Highlighter(document, lexer)
+    highlighter.flush()
+    script_lexer = lexer.script_lexer
+    assert script_lexer.misses == 300
+
+    # Commenting out the HTML above the script changes every later line's
+    # state; uncommenting it brings the old states back, and the script's
+    # lines come from its cache.
+    cursor = QTextCursor(document.findBlockByNumber(1))
+    cursor.insertText("<!--")
+    highlighter.flush()
+    assert highlighter.block_state(100) == html_highlighter.COMMENT
+    cursor.setPosition(cursor.position() - 4, QTextCursor.MoveMode.KeepAnchor)
+    cursor.removeSelectedText()
+    highlighter.flush()
+    assert highlighter.block_state(100) == pack_state(html_highlighter.SCRIPT, js_highlighter.CODE)
+    assert script_lexer.misses == 300
+
+    cursor = QTextCursor(document.findBlockByNumber(150))
+    cursor.insertText("x")
+    highlighter.flush()
+    assert script_lexer.misses == 301
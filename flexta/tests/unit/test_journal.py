@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+from PySide6.QtWidgets import QApplication
+
+from flexta.core import journal as journal_module
+from flexta.core.editor import EditorDocument
+from flexta.core.journal import JournalManager, read_records, replay
+
+
+def _get_app() -> QApplication:
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    app = QApplication.instance()
+    if app is None:
+        app = QApplication([])
+    return app
+
+
+def test_journal_replays_unsaved_edits_after_a_crash(tmp_path: Path) -> None:
+    _get_app()
+    source = tmp_path / "index.html"
+    source.write_text("<p>hello</p>\r\n<p>world</p>\n", encoding="utf-8")
+    manager = JournalManager(tmp_path / "journal", flush_delay=60)
+    document = EditorDocument.from_file(source)
+    journal = manager.attach(document)
+    document.apply_edit(3, 5, "bonjour")
+    document.apply_edit(0, 0, "<!-- draft -->\n")
+    document.undo()
+    document.apply_edit(len(document.text()), 0, "<p>ünïcode</p>")
+    manager.flush()
+    expected = document.text()
+
+    # Only a header and a base record referring to the file on disk, then
+    # the edits; the undo folds into the insert it takes back.
+    kinds = [kind for kind, _ in read_records(journal.file.read_bytes())]
+    assert kinds == [journal_module._KIND_HEADER, journal_module._KIND_BASE] + [journal_module._KIND_EDIT] * 3
+    assert manager.fsyncs == 1
+
+    # A torn final append is ignored rather than corrupting the rest.
+    with journal.file.open("ab") as handle:
+        handle.write(journal_module._record(journal_module._KIND_EDIT, b"\0" * 20)[:-3])
+    # The "crash": the manager never closes, the journal stays behind.
+    recovered = JournalManager(tmp_path / "journal").recover()
+    assert [(buffer.path, buffer.text, buffer.edits) for buffer in recovered] == [(str(source), expected, 3)]
+
+    reopened = EditorDocument.from_file(source)
+    restarted = JournalManager(tmp_path / "journal", flush_delay=60)
+    assert restarted.attach(reopened).restored
+    assert reopened.text() == expected and reopened.is_modified()
+
+    # Saving makes the journal a bare base record again; closing deletes it.
+    reopened.save()
+    restarted.flush()
+    assert restarted.recover() == [] and replay(journal.file.read_bytes()) is None
+    restarted.detach(reopened)
+    assert not journal.file.exists()
+    manager.close()
+    restarted.close()
+
+
+def test_journal_compacts_into_a_snapshot(tmp_path: Path, monkeypatch) -> None:
+    _get_app()
+    monkeypatch.setattr(journal_module, "_COMPACT_MIN_BYTES", 256)
+    manager = JournalManager(tmp_path, flush_delay=60)
+    document = EditorDocument("x" * 100)
+    journal = manager.attach(document)
+    for number in range(40):
+        document.apply_edit(number, 1, "y")
+    manager.flush()
+    records = read_records(journal.file.read_bytes())
+    assert records[1][0] == journal_module._KIND_SNAPSHOT and len(records) < 40
+    assert replay(journal.file.read_bytes()).text == document.text()
+    assert replay(journal.file.read_bytes()).path is None
+
+    document.set_text("reset")
+    manager.flush()
+    assert [kind for kind, _ in read_records(journal.file.read_bytes())][1:] == [journal_module._KIND_SNAPSHOT]
+    manager.close()
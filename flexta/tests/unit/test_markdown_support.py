@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import os
+
+from PySide6.QtWidgets import QApplication
+
+from flexta.core.editor import EditorDocument
+from flexta.extensions.markdown_support import MarkdownRenderer, render_lines
+
+
+_SOURCE = """# Notes
+
+Some *emphasis*, **strong** and `<code>` with a [link](https://example.com "Example").
+
+- one
+- [x] two
+  - nested
+
+```python
+if a < b:
+
+    pass
+```
+
+| name | size |
+|:-----|-----:|
+| a    | 1    |
+"""
+
+
+def _get_app() -> QApplication:
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    app = QApplication.instance()
+    if app is None:
+        app = QApplication([])
+    return app
+
+
+def test_blocks_render_to_one_element_each() -> None:
+    rendered = render_lines(_SOURCE.split("\n"))
+    assert rendered.split("\n")[:2] == [
+        '<h1 id="notes">Notes</h1>',
+        "<p>Some <em>emphasis</em>, <strong>strong</strong> and <code>&lt;code&gt;</code> with a "
+        '<a href="https://example.com" title="Example">link</a>.</p>',
+    ]
+    assert '<li><input type="checkbox" disabled checked /> two\n<ul>\n<li>nested</li>\n</ul></li>' in rendered
+    assert '<pre><code class="language-python">if a &lt; b:\n\n    pass\n</code></pre>' in rendered
+    assert '<td style="text-align: right">1</td>' in rendered
+    assert MarkdownRenderer(_SOURCE).block_count == 5
+
+
+def test_edits_rerender_only_the_touched_blocks() -> None:
+    _get_app()
+    document = EditorDocument(_SOURCE)
+    renderer = MarkdownRenderer(document.text())
+    diffs = []
+    document.text_changed.connect(
+        lambda position, removed, added: diffs.append(renderer.update(document.buffer, position, removed, added))
+    )
+    rendered = renderer.rendered
+
+    document.apply_edit(document.text().index("one"), 3, "first")
+    (diff,) = diffs
+    assert (diff.index, diff.removed) == (2, 1) and diff.html[0].startswith("<ul>\n<li>first</li>")
+    assert renderer.rendered == rendered + 1
+    assert diff.operation() == {"op": "splice", "path": [], "tags": [], "index": 2, "remove": 1, "html": diff.html[0]}
+
+    # An unclosed fence turns the rest of the file into code; removing it
+    # brings the table back from the cache.
+    position = document.text().index("| name")
+    document.apply_edit(position, 0, "```\n")
+    assert (diffs[-1].index, diffs[-1].removed) == (4, 1) and diffs[-1].html[0].startswith("<pre><code>| name")
+    rendered = renderer.rendered
+    document.apply_edit(position, 4, "")
+    assert diffs[-1].html[0].startswith("<table>") and renderer.rendered == rendered
+    assert renderer.html() == render_lines(document.text().split("\n"))
+
+    document.apply_edit(0, 0, "\n")
+    assert diffs[-1] is None
@@ -0,0 +1,248 @@
+from __future__ import annotations
+
+import os
+from pathlib import Path
+from typing import Optional
+import urllib.error
+import urllib.request
+
+from PySide6.QtCore import Signal
+from PySide6.QtWidgets import QApplication, QWidget
+
+from flexta.core.css_editor import CssDocument
+from flexta.core.html_editor import HtmlDocument
+from flexta.core.js_editor import JsDocument
+from flexta.core.preview import PreviewPipeline, PreviewServer
+from flexta.ui.widgets import preview_widget
+from flexta.ui.widgets.preview_widget import PreviewWidget
+
+
+_PAGE = """<!DOCTYPE html>
+<html>
+<head>
+  <title>Demo</title>
+  <link rel="stylesheet" href="site.css">
+  <style>body { margin: 0; }</style>
+</head>
+<body class="light">
+  <header><h1>Hello</h1></header>
+  <main>
+    <ul><li>one</li><li>two</li></ul>
+    <p id="intro">Welcome</p>
+  </main>
+  <script src="app.js"></script>
+</body>
+</html>
+"""
+
+
+def _get_app() -> QApplication:
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    app = QApplication.instance()
+    if app is None:
+        app = QApplication([])
+    return app
+
+
+def _replace(document, old: str, new: str) -> None:
+    document.apply_edit(document.text().index(old), len(old), new)
+
+
+def test_changes_are_classified_into_patches_or_reloads(tmp_path: Path) -> None:
+    _get_app()
+    pipeline = PreviewPipeline(debounce_ms=10_000)
+    page = HtmlDocument(_PAGE, tmp_path / "index.html")
+    stylesheet = CssDocument("h1 { color: red; }", tmp_path / "site.css")
+    script = JsDocument("console.log(1);", tmp_path / "app.js")
+    assert pipeline.set_page(page).kind == "reload"
+    pipeline.track(stylesheet)
+    pipeline.track(script)
+
+    _replace(page, "<li>two</li>", "<li>two!</li>")
+    update = pipeline.flush()
+    assert update.kind == "patch" and update.changes == {"html"}
+    assert update.operations == (
+        {"op": "inner", "path": [1, 0, 1], "tags": ["main", "ul", "li"], "html": "two!"},
+    )
+
+    _replace(page, "margin: 0", "margin: 4px")
+    _replace(page, 'id="intro"', 'id="intro" hidden')
+    _replace(page, "<title>Demo", "<title>Demo 2")
+    _replace(stylesheet, "red", "blue")
+    update = pipeline.flush()
+    assert update.kind == "patch" and update.changes == {"html", "css"}
+    assert sorted(operation["op"] for operation in update.operations) == ["attrs", "sheet", "style", "title"]
+    sheet = next(operation for operation in update.operations if operation["op"] == "sheet")
+    assert sheet == {"op": "sheet", "url": (tmp_path / "site.css").as_uri(), "css": "h1 { color: blue; }"}
+    assert "data-flexta-source" in update.script
+
+    # An unsaved stylesheet has no URL the page could be using.
+    scratch = CssDocument("h1 { color: red; }")
+    pipeline.track(scratch)
+    _replace(scratch, "red", "blue")
+    assert pipeline.flush() is None
+
+    _replace(page, "<main>", "<main>\n    <section>new</section>")
+    assert pipeline.flush().operations[0]["path"] == [1]
+
+    _replace(script, "1", "2")
+    assert pipeline.flush().kind == "reload"
+    _replace(page, 'src="app.js"', 'src="app.js" defer')
+    update = pipeline.flush()
+    assert update.kind == "reload" and update.base_url == tmp_path.as_uri() + "/"
+    assert pipeline.flush() is None
+
+    metrics = pipeline.metrics()
+    assert (metrics.patches, metrics.reloads) == (3, 2)
+    assert metrics.updates == {"css": 1, "html": 4, "js": 1}
+
+
+def test_edits_are_debounced_and_latency_is_recorded() -> None:
+    app = _get_app()
+    pipeline = PreviewPipeline(debounce_ms=20)
+    updates = []
+    pipeline.update_ready.connect(updates.append)
+    page = HtmlDocument("<p>count: 0</p>")
+    pipeline.set_page(page)
+    pipeline.painted(updates.pop())
+
+    for count in range(200):
+        _replace(page, f"count: {count}", f"count: {count + 1}")
+        app.processEvents()
+    while not updates:
+        app.processEvents()
+
+    (update,) = updates
+    assert update.operations == ({"op": "inner", "path": [0], "tags": ["p"], "html": "count: 200"},)
+    pipeline.painted(update)
+    pipeline.failed(update)
+    assert len(updates) == 1
+    assert pipeline.metrics().latency.count == 2
+
+
+def test_widget_without_web_engine_rerenders_and_reports_paint() -> None:
+    _get_app()
+    widget = PreviewWidget()
+    page = HtmlDocument("<p>first</p>")
+    widget.pipeline.set_page(page)
+    _replace(page, "first", "second")
+    widget.pipeline.flush()
+
+    # With Qt WebEngine installed, paints are reported from the page instead.
+    if widget.supports_patching:
+        return
+    assert "second" in widget.view.toPlainText()
+    assert widget.pipeline.metrics().latency.count == 2
+
+
+class _FakeWebView(QWidget):
+    # Stands in for QWebEngineView: records loads and page scripts, and
+    # finishes loads only when the test says so.
+    loadFinished = Signal(bool)
+
+    def __init__(self, parent: Optional[QWidget] = None) -> None:
+        super().__init__(parent)
+        self.loads: list[str] = []
+        self.scripts: list[tuple[str, object]] = []
+
+    def setHtml(self, html: str, base_url) -> None:
+        self.loads.append(html)
+
+    def page(self) -> "_FakeWebView":
+        return self
+
+    def runJavaScript(self, script: str, world: int, callback) -> None:
+        self.scripts.append((script, callback))
+
+
+def test_patches_during_a_load_wait_for_it_instead_of_reloading(monkeypatch) -> None:
+    _get_app()
+    monkeypatch.setattr(preview_widget, "QWebEngineView", _FakeWebView)
+    widget = PreviewWidget(PreviewPipeline(debounce_ms=10_000))
+    pipeline = widget.pipeline
+    view = widget.view
+    page = HtmlDocument("<p>one</p><p>two</p>")
+    pipeline.set_page(page)
+
+    # Patches arriving mid-load are held, not turned into more reloads.
+    _replace(page, "one", "uno")
+    pipeline.flush()
+    _replace(page, "two", "dos")
+    pipeline.flush()
+    assert len(view.loads) == 1 and view.scripts == []
+
+    # A reload supersedes the unfinished one and the held patches.
+    script = JsDocument("go();")
+    pipeline.track(script)
+    _replace(script, "go", "run")
+    pipeline.flush()
+    assert len(view.loads) == 2 and len(pipeline._in_flight) == 1
+
+    _replace(page, "uno", "eins")
+    pipeline.flush()
+    view.loadFinished.emit(False)
+    assert view.scripts == []
+    view.loadFinished.emit(True)
+    (patch_script, callback), = view.scripts
+    assert "eins" in patch_script
+    callback(True)
+    metrics = pipeline.metrics()
+    assert pipeline._in_flight == {} and (metrics.patches, metrics.reloads, metrics.fallbacks) == (3, 1, 0)
+
+
+# Loopback requests must not go through a proxy from the environment.
+_OPENER = urllib.request.build_opener(urllib.request.ProxyHandler({}))
+
+
+def _get(url: str, headers: Optional[dict] = None) -> tuple[int, dict, bytes]:
+    request = urllib.request.Request(url, headers=headers or {})
+    try:
+        with _OPENER.open(request) as response:
+            return response.status, dict(response.headers), response.read()
+    except urllib.error.HTTPError as error:
+        return error.code, dict(error.headers), error.read()
+
+
+def test_server_serves_buffers_from_memory_and_files_with_etags(tmp_path: Path) -> None:
+    _get_app()
+    (tmp_path / "index.html").write_text("<p>on disk</p>")
+    (tmp_path / "site.css").write_text("p { color: red; }")
+    (tmp_path / "video.bin").write_bytes(bytes(range(256)) * 64)
+    (tmp_path.parent / "secret.txt").write_text("outside")
+    server = PreviewServer(tmp_path, entry_limit=4096)
+    server.start()
+    try:
+        status, headers, body = _get(server.url_for(tmp_path / "site.css"))
+        assert (status, body) == (200, b"p { color: red; }")
+        assert headers["Content-Type"] == "text/css; charset=utf-8"
+        etag = headers["ETag"]
+        assert _get(server.url + "/site.css", {"If-None-Match": etag})[0] == 304
+
+        # Served from the cache until the watcher reports the change.
+        (tmp_path / "site.css").write_text("p { color: blue; }")
+        assert _get(server.url + "/site.css")[2] == b"p { color: red; }"
+        server.invalidate(tmp_path / "site.css")
+        status, headers, body = _get(server.url + "/site.css", {"If-None-Match": etag})
+        assert (status, body) == (200, b"p { color: blue; }")
+
+        page = HtmlDocument("<p>unsaved</p>", tmp_path / "index.html")
+        pipeline = PreviewPipeline(server=server)
+        assert pipeline.set_page(page).base_url == server.url + "/"
+        assert _get(server.url + "/")[2] == b"<p>unsaved</p>"
+        etag = _get(server.url + "/index.html")[1]["ETag"]
+        _replace(page, "unsaved", "edited")
+        status, _, body = _get(server.url + "/index.html", {"If-None-Match": etag})
+        assert (status, body) == (200, b"<p>edited</p>")
+
+        status, headers, body = _get(server.url + "/video.bin", {"Range": "bytes=256-511"})
+        assert (status, body) == (206, bytes(range(256)))
+        assert headers["Content-Range"] == "bytes 256-511/16384"
+        assert len(_get(server.url + "/video.bin")[2]) == 16384
+        assert _get(server.url + "/video.bin", {"Range": "bytes=99999-"})[0] == 416
+        assert _get(server.url + "/video.bin", {"Range": "bytes=-0"})[0] == 416
+        (tmp_path / "empty.txt").write_bytes(b"")
+        assert _get(server.url + "/empty.txt", {"Range": "bytes=-10"})[0] == 416
+        assert _get(server.url + "/..%2Fsecret.txt")[0] == 404
+        assert _get(server.url + "/missing.js")[0] == 404
+    finally:
+        server.stop()
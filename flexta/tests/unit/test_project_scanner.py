@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+from flexta.database import settings_db
+from flexta.database.settings_db import ProjectMetadata
+from flexta.utils import project_scanner
+
+
+def _isolate_settings_db(tmp_path: Path, monkeypatch) -> None:
+    db_path = tmp_path / "settings.db"
+    monkeypatch.setattr(settings_db, "_get_db_path", lambda: db_path)
+
+
+def test_stat_project_counts_files_and_detects_missing(tmp_path: Path) -> None:
+    project = tmp_path / "project"
+    (project / "assets").mkdir(parents=True)
+    (project / "index.html").write_text("<html></html>", encoding="utf-8")
+    (project / "assets" / "logo.svg").write_bytes(b"x" * 100)
+    (project / "node_modules" / "lib").mkdir(parents=True)
+    (project / "node_modules" / "lib" / "index.js").write_bytes(b"x" * 1000)
+
+    metadata = project_scanner.stat_project(str(project))
+    assert metadata.exists
+    assert metadata.file_count == 2
+    assert metadata.total_size == 113
+    assert metadata.modified is not None
+
+    missing = project_scanner.stat_project(str(tmp_path / "missing"))
+    assert missing.exists is False
+
+
+def test_stat_project_leaves_counts_unknown_past_deadline(tmp_path: Path) -> None:
+    (tmp_path / "file.txt").write_text("data", encoding="utf-8")
+
+    metadata = project_scanner.stat_project(str(tmp_path), deadline=time.monotonic() - 1)
+    assert metadata.exists
+    assert metadata.file_count is None
+    assert metadata.total_size is None
+
+
+def test_stat_cache_expires_entries_after_ttl() -> None:
+    now = [100.0]
+    cache = project_scanner.StatCache(ttl=10, clock=lambda: now[0])
+    cache.put(ProjectMetadata(path="/tmp/project", exists=True))
+
+    now[0] = 109.0
+    assert cache.get("/tmp/project") is not None
+    now[0] = 110.0
+    assert cache.get("/tmp/project") is None
+
+
+def test_scanner_reports_and_persists_results(tmp_path: Path, monkeypatch) -> None:
+    _isolate_settings_db(tmp_path, monkeypatch)
+    project = tmp_path / "project"
+    project.mkdir()
+    results: list[ProjectMetadata] = []
+    done = threading.Event()
+
+    def on_result(metadata: ProjectMetadata) -> None:
+        results.append(metadata)
+        if len(results) == 2:
+            done.set()
+
+    scanner = project_scanner.RecentProjectScanner(on_result)
+    scanner.scan([str(project), str(tmp_path / "missing")])
+    assert done.wait(5)
+    scanner.shutdown()
+
+    by_path = {metadata.path: metadata for metadata in results}
+    assert by_path[str(project)].exists
+    assert by_path[str(tmp_path / "missing")].exists is False
+    assert settings_db.get_project_metadata(str(project)).exists
+    settings_db.close_store()
+
+
+def test_scanner_reports_timeout_for_hung_path(tmp_path: Path, monkeypatch) -> None:
+    release = threading.Event()
+    monkeypatch.setattr(
+        project_scanner,
+        "stat_project",
+        lambda path, deadline=None: release.wait(5) and ProjectMetadata(path=path, exists=True),
+    )
+    results: list[ProjectMetadata] = []
+    reported = threading.Event()
+
+    def on_result(metadata: ProjectMetadata) -> None:
+        results.append(metadata)
+        reported.set()
+
+    scanner = project_scanner.RecentProjectScanner(on_result, timeout=0.05, persist=False)
+    scanner.scan(["/mnt/unreachable"])
+    assert reported.wait(5)
+    assert results[0].exists is None
+
+    release.set()
+    scanner.shutdown()
+
+
+def test_scanner_replaces_workers_stuck_on_hung_paths(monkeypatch) -> None:
+    release = threading.Event()
+
+    def fake_stat(path: str, deadline=None) -> ProjectMetadata:
+        if path.startswith("/mnt/"):
+            release.wait(5)
+        return ProjectMetadata(path=path, exists=True)
+
+    monkeypatch.setattr(project_scanner, "stat_project", fake_stat)
+    results: list[ProjectMetadata] = []
+    reported = threading.Event()
+
+    def on_result(metadata: ProjectMetadata) -> None:
+        results.append(metadata)
+        if metadata.path == "/tmp/reachable":
+            reported.set()
+
+    scanner = project_scanner.RecentProjectScanner(on_result, max_workers=2, timeout=0.05, persist=False)
+    scanner.scan(["/mnt/hung-1", "/mnt/hung-2"])
+    time.sleep(0.3)
+    # Both original workers are still blocked; their replacements take this.
+    scanner.scan(["/tmp/reachable"])
+    assert reported.wait(5)
+    assert {metadata.path for metadata in results if metadata.exists is None} == {"/mnt/hung-1", "/mnt/hung-2"}
+
+    release.set()
+    scanner.shutdown()
+
+
+def test_scanner_starts_no_threads_when_shut_down_during_scan() -> None:
+    class ShuttingDownCache(project_scanner.StatCache):
+        def get(self, path: str) -> Optional[ProjectMetadata]:
+            # What a garbage collection run by the cache lookup can do.
+            scanner.shutdown()
+            return None
+
+    scanner = project_scanner.RecentProjectScanner(lambda metadata: None, cache=ShuttingDownCache(), persist=False)
+    scanner.scan(["/tmp/one", "/tmp/two"])
+    assert not scanner._workers and scanner._watchdog is None
@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+import zipfile
+
+import pytest
+
+from flexta.core import project_seeder
+from flexta.core.project_seeder import ProjectSeeder, SeedCancelled
+from flexta.exceptions import FlextaError
+from flexta.utils.resource_loader import Template, TemplateFile, TemplateRegistry
+
+
+def _write(path: Path, content: str) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(content, encoding="utf-8")
+
+
+def test_seeder_copies_files_and_substitutes_across_chunks(tmp_path: Path, monkeypatch) -> None:
+    monkeypatch.setattr(project_seeder, "_CHUNK_SIZE", 7)
+    templates = tmp_path / "templates"
+    _write(
+        templates / "landing" / "template.json",
+        json.dumps({"variables": {"title": "Welcome"}}),
+    )
+    _write(templates / "landing" / "index.html", "<h1>{{ title }}</h1><p>{{project_name}} {{unknown}}</p>")
+    (templates / "landing" / "logo.png").parent.mkdir(parents=True, exist_ok=True)
+    (templates / "landing" / "logo.png").write_bytes(b"\x89PNG{{title}}")
+    with zipfile.ZipFile(templates / "pack.zip", "w") as archive:
+        archive.writestr("blog/template.json", json.dumps({}))
+        archive.writestr("blog/posts/first.md", "# {{title}}")
+
+    registry = TemplateRegistry(templates)
+    reports: list[tuple[int, int]] = []
+    landing = ProjectSeeder(registry.get("landing"), tmp_path / "site", progress=lambda *args: reports.append(args))
+    landing.run()
+    ProjectSeeder(registry.get("blog"), tmp_path / "blog").run()
+
+    assert (tmp_path / "site" / "index.html").read_text() == "<h1>Welcome</h1><p>site {{unknown}}</p>"
+    assert (tmp_path / "site" / "logo.png").read_bytes() == b"\x89PNG{{title}}"
+    assert (tmp_path / "blog" / "posts" / "first.md").read_text() == "# {{title}}"
+    assert reports[-1] == (landing.total_bytes, landing.total_bytes)
+    assert [done for done, _ in reports] == sorted(done for done, _ in reports)
+
+
+def test_seeder_rolls_back_when_cancelled(tmp_path: Path, monkeypatch) -> None:
+    monkeypatch.setattr(project_seeder, "_CHUNK_SIZE", 4)
+    source = tmp_path / "big.txt"
+    source.write_text("x" * 4096)
+    template = Template(
+        name="big",
+        description="",
+        files=(TemplateFile(path="big.txt", source=source, size=4096),),
+        variables={"title": "t"},
+    )
+    destination = tmp_path / "project"
+    seeder = ProjectSeeder(template, destination, progress=lambda done, total: seeder.cancel())
+
+    with pytest.raises(SeedCancelled):
+        seeder.run()
+    assert not destination.exists()
+
+
+def test_seeder_rolls_back_on_error_and_refuses_existing_folder(tmp_path: Path) -> None:
+    good = tmp_path / "good.css"
+    good.write_text("body {}")
+    template = Template(
+        name="broken",
+        description="",
+        files=(
+            TemplateFile(path="good.css", source=good, size=7),
+            TemplateFile(path="missing.js", source=tmp_path / "missing.js", size=10),
+        ),
+    )
+    destination = tmp_path / "project"
+
+    with pytest.raises(OSError):
+        ProjectSeeder(template, destination).run()
+    assert not destination.exists()
+
+    destination.mkdir()
+    with pytest.raises(FileExistsError):
+        ProjectSeeder(Template(name="empty", description="", files=()), destination).run()
+    assert destination.is_dir()
+
+    escaping = Template(
+        name="escape",
+        description="",
+        files=(TemplateFile(path="../outside.css", source=good, size=7),),
+    )
+    with pytest.raises(FlextaError):
+        ProjectSeeder(escaping, tmp_path / "other").run()
+    assert not (tmp_path / "other").exists()
+    assert not (tmp_path / "outside.css").exists()
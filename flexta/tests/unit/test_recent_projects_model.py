@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+from PySide6.QtCore import Qt
+from PySide6.QtTest import QSignalSpy
+from PySide6.QtWidgets import QApplication
+
+from flexta.database import settings_db
+from flexta.ui.widgets.recent_projects_model import PATH_ROLE, RecentProjectsModel
+
+
+def _get_app() -> QApplication:
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    app = QApplication.instance()
+    if app is None:
+        app = QApplication([])
+    return app
+
+
+def _isolate_settings_db(tmp_path: Path, monkeypatch) -> None:
+    db_path = tmp_path / "settings.db"
+    monkeypatch.setattr(settings_db, "_get_db_path", lambda: db_path)
+
+
+def _rows(model: RecentProjectsModel) -> list[str]:
+    return [model.index(row).data(PATH_ROLE) for row in range(model.rowCount())]
+
+
+def test_reordering_projects_moves_rows_instead_of_resetting(tmp_path: Path, monkeypatch) -> None:
+    _get_app()
+    _isolate_settings_db(tmp_path, monkeypatch)
+    model = RecentProjectsModel()
+    model.set_projects([f"/tmp/project-{index}" for index in range(100)])
+
+    reset_spy = QSignalSpy(model.modelReset)
+    moved_spy = QSignalSpy(model.rowsMoved)
+    model.set_projects(["/tmp/project-42"] + [f"/tmp/project-{index}" for index in range(100) if index != 42])
+
+    assert reset_spy.count() == 0
+    assert moved_spy.count() == 1
+    assert _rows(model)[:2] == ["/tmp/project-42", "/tmp/project-0"]
+    settings_db.close_store()
+
+
+def test_filter_ranks_basename_matches_and_restores_full_list(tmp_path: Path, monkeypatch) -> None:
+    _get_app()
+    _isolate_settings_db(tmp_path, monkeypatch)
+    model = RecentProjectsModel()
+    projects = ["/work/portfolio/site", "/work/blog", "/archive/blog-old/src", "/work/api"]
+    model.set_projects(projects)
+
+    model.set_filter_text("blog")
+    assert _rows(model) == ["/work/blog", "/archive/blog-old/src"]
+
+    model.set_filter_text("")
+    assert _rows(model) == projects
+    settings_db.close_store()
+
+
+def test_cached_metadata_is_fetched_in_one_call(tmp_path: Path, monkeypatch) -> None:
+    _get_app()
+    _isolate_settings_db(tmp_path, monkeypatch)
+    settings_db.set_project_metadata(settings_db.ProjectMetadata("/tmp/project-gone", exists=False))
+    calls = []
+    original = settings_db.get_projects_metadata
+    monkeypatch.setattr(settings_db, "get_projects_metadata", lambda paths: calls.append(paths) or original(paths))
+    monkeypatch.setattr(settings_db, "get_project_metadata", lambda path: calls.append(path))
+    model = RecentProjectsModel()
+    model.set_projects([f"/tmp/project-{index}" for index in range(50)] + ["/tmp/project-gone"])
+
+    assert len(calls) == 1 and len(calls[0]) == 51
+    assert model.index(50).data(Qt.ItemDataRole.ForegroundRole) is not None
+    assert model.index(0).data(Qt.ItemDataRole.ForegroundRole) is None
+    settings_db.close_store()
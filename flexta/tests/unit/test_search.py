@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import os
+from pathlib import Path
+import time
+
+from PySide6.QtWidgets import QApplication
+
+from flexta.core import search as search_module
+from flexta.core.search import (
+    SearchEngine,
+    SearchMatch,
+    SearchQuery,
+    compile_query,
+    required_literal,
+    search_file,
+    search_paths,
+)
+
+
+def _get_app() -> QApplication:
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    app = QApplication.instance()
+    if app is None:
+        app = QApplication([])
+    return app
+
+
+def _run(app: QApplication, engine: SearchEngine, query: SearchQuery, files) -> tuple[list, object]:
+    chunks, finished = [], []
+    engine.results_ready.connect(lambda search_id, chunk: chunks.append(chunk))
+    engine.search_finished.connect(lambda search_id, stats: finished.append(stats))
+    engine.search(query, files)
+    deadline = time.monotonic() + 10
+    while not finished:
+        assert time.monotonic() < deadline
+        app.processEvents()
+        time.sleep(0.005)
+    engine.results_ready.disconnect()
+    engine.search_finished.disconnect()
+    return [matches for chunk in chunks for matches in chunk], finished[0]
+
+
+def test_regex_prefilter_literals_are_always_required() -> None:
+    assert required_literal(r"\bcolou?r\.name\b") == "r.name"
+    assert required_literal(r"(get|set)Value\(\d+\)") == "Value("
+    assert required_literal("[a-z]+Error") == "Error"
+    assert required_literal("foo|bar") == ""
+    # Repeat counts are not text, and inline flags change what the text
+    # would have to match.
+    assert required_literal("x{10}") == ""
+    assert required_literal("ab{2,3}cd") == "cd"
+    assert required_literal("(?i)hello") == ""
+    assert compile_query(SearchQuery("(?i)hello", regex=True, case_sensitive=True))[1] == ()
+    assert compile_query(SearchQuery("Value", case_sensitive=True))[1] == (b"Value",)
+    # Ignoring case, the longest run without ASCII letters, else the rarest
+    # letter in either case.
+    assert compile_query(SearchQuery("v4999 "))[1] == (b"4999 ",)
+    assert compile_query(SearchQuery("café"))[1] == ("é".encode(),)
+    assert compile_query(SearchQuery("Value"))[1] == (b"v", b"V")
+
+
+def test_case_insensitive_prefilter_rejects_files_before_the_regex(tmp_path: Path) -> None:
+    class Unused:
+        def finditer(self, data):
+            raise AssertionError("the regex ran")
+
+    _, needles = compile_query(SearchQuery("needle"))
+    miss = tmp_path / "miss.js"
+    miss.write_text("const haystack = 1;\n")
+    assert search_file(str(miss), Unused(), needles) == []
+    hit = tmp_path / "hit.js"
+    hit.write_text("const NeeDle = 1;\n")
+    regex, _ = compile_query(SearchQuery("needle"))
+    assert search_file(str(hit), regex, needles) == [(0, 6, 6, "const NeeDle = 1;")]
+
+
+def test_files_are_searched_as_bytes_and_through_mmap(tmp_path: Path, monkeypatch) -> None:
+    small = tmp_path / "small.js"
+    small.write_text("const café = 1;\nlet total = café + café;\n", encoding="utf-8")
+    regex, needles = compile_query(SearchQuery("café", case_sensitive=True))
+    assert search_file(str(small), regex, needles) == [
+        (0, 6, 4, "const café = 1;"),
+        (1, 12, 4, "let total = café + café;"),
+        (1, 19, 4, "let total = café + café;"),
+    ]
+    (tmp_path / "image.png").write_bytes(b"\x89PNG\0\0" + "café".encode())
+    assert search_file(str(tmp_path / "image.png"), regex, needles) == []
+
+    monkeypatch.setattr(search_module, "_MMAP_THRESHOLD", 16)
+    big = tmp_path / "big.txt"
+    big.write_text("line\n" * 1000 + "needle here\n" + "line\n" * 10)
+    regex, needles = compile_query(SearchQuery(r"need\w+", regex=True))
+    assert search_file(str(big), regex, needles) == [(1000, 0, 6, "needle here")]
+
+
+def test_engine_streams_results_and_replaces(tmp_path: Path) -> None:
+    app = _get_app()
+    for number in range(20):
+        (tmp_path / f"file{number}.css").write_text(f".card-{number} {{ color: red; }}\n.other {{ }}\n")
+    (tmp_path / "file3.css").write_text(".card-3 { color: red; }\n.card-3:hover { color: red; }\n")
+    files = search_paths(sorted(tmp_path.iterdir()))
+    engine = SearchEngine(workers=1)
+    try:
+        results, stats = _run(app, engine, SearchQuery("COLOR: red"), files)
+        assert (stats.files, stats.files_matched, stats.matches, stats.cancelled) == (20, 20, 21, False)
+        assert next(item for item in results if item.path.endswith("file3.css")).matches[1] == SearchMatch(
+            1, 16, 10, ".card-3:hover { color: red; }"
+        )
+
+        results, stats = _run(app, engine, SearchQuery(r"card-(\d)\b", regex=True, max_results=5), files)
+        assert stats.truncated and stats.matches == 5
+
+        query = SearchQuery(r"card-(\d+)", regex=True, case_sensitive=True)
+        counts = engine.replace(query, r"tile-\1", [str(tmp_path / "file3.css"), str(tmp_path / "file4.css")])
+        assert counts == {str(tmp_path / "file3.css"): 2, str(tmp_path / "file4.css"): 1}
+        assert (tmp_path / "file3.css").read_text().startswith(".tile-3 { color: red; }\n.tile-3:hover")
+        assert engine.replace(SearchQuery("a.b"), "x", [str(tmp_path / "file4.css")]) == {}
+    finally:
+        engine.close()
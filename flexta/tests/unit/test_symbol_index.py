@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+from flexta.core import symbol_index
+from flexta.core.symbol_index import SymbolIndex, parse_symbols
+
+
+def test_parse_symbols_finds_declarations_exports_and_imports() -> None:
+    source = "\n".join(
+        [
+            "import React, { useState as useLocal } from 'react';",
+            "import * as path from \"path\";",
+            "const fs = require('fs');",
+            "const { join: joinPath } = require('path');",
+            "/* function commented() {} */",
+            "export default class App {}",
+            "export async function load() {}",
+            "const render = (props) => props;",
+            "let counter = 0;",
+            "export { render as draw };",
+            "module.exports.helper = load;",
+        ]
+    )
+    rows = {(name, kind, line) for name, kind, line, _, _ in parse_symbols(source)}
+
+    assert rows == {
+        ("React", "import", 0),
+        ("useLocal", "import", 0),
+        ("path", "import", 1),
+        ("fs", "import", 2),
+        ("joinPath", "import", 3),
+        ("App", "class", 5),
+        ("App", "export", 5),
+        ("load", "function", 6),
+        ("load", "export", 6),
+        ("render", "function", 7),
+        ("draw", "export", 9),
+        ("helper", "export", 10),
+    }
+    assert ("useLocal", "import", 0, 28, "react") in parse_symbols(source)
+
+
+def test_reopening_reparses_only_changed_files(tmp_path: Path, monkeypatch) -> None:
+    project = tmp_path / "project"
+    (project / "src").mkdir(parents=True)
+    (project / "node_modules").mkdir()
+    (project / "node_modules" / "vendor.js").write_text("function vendored() {}")
+    for number in range(150):
+        (project / "src" / f"module{number}.js").write_text(f"export function handler{number}() {{}}\n")
+    db_path = tmp_path / "index.db"
+
+    index = SymbolIndex(project, db_path, workers=2)
+    index.build()
+    assert index.wait(60)
+    assert index.parsed == 150
+    assert [symbol.path for symbol in index.definitions("handler7")] == ["src/module7.js"]
+    assert index.definitions("vendored") == []
+    index.close()
+
+    parsed = []
+    original = symbol_index._parse_batch
+    monkeypatch.setattr(symbol_index, "_parse_batch", lambda paths: parsed.extend(paths) or original(paths))
+    changed = project / "src" / "module3.js"
+    changed.write_text("export class Renamed {}\n")
+    os.utime(changed, ns=(1, 1))
+    (project / "src" / "module4.js").unlink()
+
+    index = SymbolIndex(project, db_path)
+    index.build()
+    assert index.wait(60)
+    assert [Path(path).name for path in parsed] == ["module3.js"]
+    assert index.definitions("handler3") == []
+    assert index.definitions("handler4") == []
+    assert [symbol.kind for symbol in index.symbols_in(changed)] == ["class", "export"]
+    assert [symbol.name for symbol in index.search("handler1", 3)] == ["handler1", "handler10", "handler100"]
+    index.close()
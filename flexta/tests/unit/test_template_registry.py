@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+import zipfile
+
+import pytest
+
+from flexta.exceptions import TemplateError
+from flexta.utils.resource_loader import TemplateRegistry
+
+
+def _write(path: Path, content: str) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(content, encoding="utf-8")
+
+
+def _bump_mtime(path: Path) -> None:
+    path_stat = path.stat()
+    os.utime(path, ns=(path_stat.st_atime_ns, path_stat.st_mtime_ns + 1_000_000_000))
+
+
+def test_registry_indexes_flat_directory_and_archive_templates(tmp_path: Path) -> None:
+    _write(tmp_path / "default.html", "<html></html>")
+    _write(tmp_path / "default.css", "body {}")
+    _write(
+        tmp_path / "landing" / "template.json",
+        json.dumps({"description": "Landing page", "files": ["*.html", "assets/*"], "variables": {"title": "Hi"}}),
+    )
+    _write(tmp_path / "landing" / "index.html", "<h1>{{title}}</h1>")
+    _write(tmp_path / "landing" / "assets" / "logo.svg", "<svg/>")
+    _write(tmp_path / "landing" / "notes.txt", "not shipped")
+    with zipfile.ZipFile(tmp_path / "pack.zip", "w") as archive:
+        archive.writestr("blog/template.json", json.dumps({"description": "Blog"}))
+        archive.writestr("blog/index.html", "<main></main>")
+        archive.writestr("shop/template.json", json.dumps({}))
+        archive.writestr("shop/cart.js", "export {}")
+
+    registry = TemplateRegistry(tmp_path)
+
+    assert registry.template_names() == ["blog", "default", "landing", "shop"]
+    assert [item.path for item in registry.files_for("default")] == ["default.css", "default.html"]
+    landing = registry.get("landing")
+    assert landing.description == "Landing page"
+    assert landing.variables == {"title": "Hi"}
+    assert [item.path for item in landing.files] == ["assets/logo.svg", "index.html"]
+    blog_index = registry.files_for("blog")[0]
+    with blog_index.open() as handle:
+        assert handle.read() == b"<main></main>"
+
+
+def test_registry_serves_from_memory_until_mtime_changes(tmp_path: Path, monkeypatch) -> None:
+    _write(tmp_path / "default.html", "<html></html>")
+    registry = TemplateRegistry(tmp_path)
+    assert registry.template_names() == ["default"]
+
+    rebuilds = []
+    original_rebuild = registry._rebuild
+    monkeypatch.setattr(registry, "_rebuild", lambda: rebuilds.append(True) or original_rebuild())
+    registry.list_templates()
+    registry.files_for("default")
+    assert rebuilds == []
+
+    _write(tmp_path / "starter.html", "<html></html>")
+    _bump_mtime(tmp_path)
+    assert registry.template_names() == ["default", "starter"]
+    assert len(rebuilds) == 1
+
+
+def test_registry_skips_broken_manifests_and_rejects_unknown_templates(tmp_path: Path) -> None:
+    _write(tmp_path / "broken" / "template.json", "{not json")
+    _write(tmp_path / "broken" / "index.html", "")
+    registry = TemplateRegistry(tmp_path)
+
+    assert registry.template_names() == []
+    with pytest.raises(TemplateError):
+        registry.get("broken")
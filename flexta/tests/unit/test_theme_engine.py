@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+import pytest
+from PySide6.QtWidgets import QApplication
+
+from flexta.exceptions import ThemeError
+from flexta.ui import theme_engine
+from flexta.ui.theme_engine import ThemeEngine
+
+
+def _get_app() -> QApplication:
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    app = QApplication.instance()
+    if app is None:
+        app = QApplication([])
+    return app
+
+
+def _write_themes(themes_dir: Path) -> None:
+    themes_dir.mkdir()
+    (themes_dir / "base.qss").write_text(
+        "/* @comment tokens are ignored */\nQLabel#Title { color: @text; background: @surface; }\n",
+        encoding="utf-8",
+    )
+    (themes_dir / "dark.qss").write_text("@text: #fff;\n@surface: #000;\n", encoding="utf-8")
+    (themes_dir / "dusk.qss").write_text(
+        "@extends: dark;\n@surface: #223;\nQLabel#Extra { color: @text; }\n", encoding="utf-8"
+    )
+
+
+def test_compile_resolves_tokens_and_extends(tmp_path: Path) -> None:
+    _write_themes(tmp_path / "themes")
+    engine = ThemeEngine(tmp_path / "themes", tmp_path / "cache")
+
+    assert engine.available_themes() == ["dark", "dusk"]
+    assert engine.compile("dark") == "QLabel#Title { color: #fff; background: #000; }\n"
+    dusk = engine.compile("dusk")
+    assert "background: #223;" in dusk
+    assert "QLabel#Extra { color: #fff; }" in dusk
+
+    (tmp_path / "themes" / "broken.qss").write_text("@text: #fff;\n", encoding="utf-8")
+    with pytest.raises(ThemeError):
+        engine.compile("broken")
+    with pytest.raises(ThemeError):
+        engine.compile("missing")
+
+
+def test_compiled_stylesheets_are_cached_on_disk_by_content(tmp_path: Path, monkeypatch) -> None:
+    _write_themes(tmp_path / "themes")
+    compiled = ThemeEngine(tmp_path / "themes", tmp_path / "cache").compile("dark")
+    assert len(list((tmp_path / "cache").glob("dark-*.qss"))) == 1
+
+    def fail(*args: object) -> str:
+        raise AssertionError("cache miss")
+
+    monkeypatch.setattr(theme_engine, "_resolve", fail)
+    assert ThemeEngine(tmp_path / "themes", tmp_path / "cache").compile("dark") == compiled
+
+    monkeypatch.undo()
+    (tmp_path / "themes" / "dark.qss").write_text("@text: #eee;\n@surface: #000;\n", encoding="utf-8")
+    assert "#eee" in ThemeEngine(tmp_path / "themes", tmp_path / "cache").compile("dark")
+    assert len(list((tmp_path / "cache").glob("dark-*.qss"))) == 1
+
+
+def test_apply_sets_one_application_stylesheet(tmp_path: Path) -> None:
+    app = _get_app()
+    previous = app.styleSheet()
+    _write_themes(tmp_path / "themes")
+    engine = ThemeEngine(tmp_path / "themes", tmp_path / "cache")
+    changes: list[str] = []
+    engine.theme_changed.connect(changes.append)
+
+    try:
+        engine.apply("dark", app)
+        engine.apply("dark", app)
+        engine.apply("dusk", app)
+        assert app.styleSheet() == engine.compile("dusk")
+        assert changes == ["dark", "dusk"]
+        assert engine.current_theme == "dusk"
+    finally:
+        app.setStyleSheet(previous)
+
+
+def test_bundled_themes_compile(tmp_path: Path) -> None:
+    engine = ThemeEngine(cache_dir=tmp_path)
+    for name in ("dark", "light", "custom"):
+        assert "@" not in engine.compile(name)
@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+from flexta.utils.metrics import FrameTimer, TimingStats
+from flexta.utils.string_utils import FuzzyFilter, format_size
+
+
+def test_format_size_uses_binary_units() -> None:
+    assert format_size(512) == "512 B"
+    assert format_size(2048) == "2.0 KB"
+    assert format_size(5 * 1024 * 1024) == "5.0 MB"
+
+
+def test_fuzzy_filter_matches_subsequences_and_prefers_basenames() -> None:
+    entries = ["/home/me/flexta-site", "/home/me/flexta/docs", "/srv/fxs", "/home/me/other"]
+    fuzzy = FuzzyFilter(entries)
+
+    ranked = [entries[index] for index in fuzzy.filter("fxs")]
+    assert ranked[0] == "/srv/fxs"
+    assert "/home/me/flexta-site" in ranked
+    assert "/home/me/other" not in ranked
+
+
+def test_fuzzy_filter_narrowing_query_reuses_previous_matches() -> None:
+    entries = [f"/projects/app-{index}" for index in range(50)] + ["/projects/blog"]
+    fuzzy = FuzzyFilter(entries)
+
+    assert len(fuzzy.filter("b")) == 1
+    assert [entries[index] for index in fuzzy.filter("blo")] == ["/projects/blog"]
+    assert fuzzy.filter("blox") == []
+    assert len(fuzzy.filter("")) == len(entries)
+
+
+def test_timing_stats_and_frame_timer_summaries() -> None:
+    stats = TimingStats.from_samples([5.0, 1.0, 3.0, 2.0, 4.0])
+    assert (stats.count, stats.mean_ms, stats.p50_ms, stats.p95_ms, stats.max_ms) == (5, 3.0, 3.0, 5.0, 5.0)
+    assert TimingStats.from_samples([]).count == 0
+
+    now = [0.0]
+    timer = FrameTimer(budget_ms=20.0, clock=lambda: now[0])
+    timer.start()
+    for step in (0.016, 0.016, 0.050):
+        now[0] += step
+        timer.tick()
+    frames = timer.stop()
+    assert frames.frames == 3
+    assert frames.dropped == 1
+    assert round(frames.duration_ms) == 82
+    assert round(frames.intervals.max_ms) == 50